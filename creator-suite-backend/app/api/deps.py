@@ -4,18 +4,40 @@ from fastapi.security.base import SecurityBase
 from fastapi.security.utils import get_authorization_scheme_param
 from fastapi.openapi.models import OAuthFlows as OAuthFlowsModel
 from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Generator, Optional
+from typing import Generator, Optional, Tuple
 
 from app.core.config import settings
 from app.core.security import pwd_context
-from app.db.session import SessionLocal
+from app.core.structured_logging import bind_log_context
+from app.db.session import SessionLocal, get_async_db
+from app.db.replica import reporting_session
 from app.models.admin import AdminAuditLog
 from app.models.user import User
-from app.schemas.token import TokenPayload
 from datetime import datetime
+from app.services.principal import Principal, get_principal, get_principal_async, token_id
 from app.services.user import get_user
-from app.services.admin import get_admin_by_user_id
+
+# User that requests with raw=true act as
+RAW_DEFAULT_USER_ID = 2
+
+def token_from_request(request: Request) -> Optional[str]:
+    """Bearer token from the Authorization header, else from the auth cookies"""
+    authorization = request.headers.get("Authorization")
+    scheme, param = get_authorization_scheme_param(authorization)
+    
+    if authorization and scheme.lower() == "bearer":
+        return param
+    
+    # Priority order: access_token (backend) > authToken (frontend)
+    for cookie_name in ["access_token", "authToken"]:
+        token = request.cookies.get(cookie_name)
+        if token:
+            # Handle legacy cookies that might have 'Bearer ' prefix
+            return token[7:] if token.startswith("Bearer ") else token
+    return None
+
 
 class OAuth2PasswordBearerWithCookie(SecurityBase):
     def __init__(self, tokenUrl: str, scheme_name: str = None, auto_error: bool = True):
@@ -25,27 +47,8 @@ class OAuth2PasswordBearerWithCookie(SecurityBase):
         self.model = OAuthFlowsModel(password={"tokenUrl": tokenUrl, "scopes": {}})
 
     async def __call__(self, request: Request) -> str:
-        # First try to get the token from the Authorization header
-        authorization = request.headers.get("Authorization")
-        scheme, param = get_authorization_scheme_param(authorization)
-        
-        if authorization and scheme.lower() == "bearer":
-            return param
-        
-        # If not found, try to get from cookies
-        # Check multiple possible cookie names (backend sets 'access_token', frontend might set 'authToken')
-        token = None
-        
-        # Priority order: access_token (backend) > authToken (frontend)
-        for cookie_name in ["access_token", "authToken"]:
-            token = request.cookies.get(cookie_name)
-            if token:
-                break
-        
+        token = token_from_request(request)
         if token:
-            # Handle legacy cookies that might have 'Bearer ' prefix
-            if token.startswith("Bearer "):
-                return token[7:]
             return token
             
         if self.auto_error:
@@ -68,40 +71,74 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> Tuple[int, str]:
+    """User id and principal cache token id of a valid token; 401 otherwise"""
     try:
-        print(f"[DEBUG] Decoding token: {token[:50]}...")
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        print(f"[DEBUG] Decoded payload: {payload}")
-        user_id: Optional[int] = payload.get("sub")
-        is_admin: bool = payload.get("is_admin", False)
-        print(f"[DEBUG] User ID: {user_id}, Is Admin: {is_admin}")
-        if user_id is None:
-            print("[DEBUG] User ID is None")
-            raise credentials_exception
-        token_data = TokenPayload(sub=user_id, is_admin=is_admin)
-    except JWTError as e:
-        print(f"[DEBUG] JWT Error: {e}")
-        raise credentials_exception
-    
-    print(f"[DEBUG] Looking up user with ID: {token_data.sub}")
-    user = get_user(db, user_id=token_data.sub)
-    print(f"[DEBUG] User found: {user}")
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        raise _credentials_exception()
+    return user_id, token_id(payload)
+
+
+def principal_from_token(db: Session, token: str) -> Principal:
+    """Principal of a token (cached; one query on a miss); 401 if invalid or the user is gone"""
+    user_id, cache_token = _decode_token(token)
+    principal = get_principal(db, user_id, cache_token)
+    if principal is None:
+        raise _credentials_exception()
+    # Lets commits on this request's session be attributed for read-your-writes routing
+    db.info["user_id"] = principal.id
+    bind_log_context(user_id=principal.id)
+    return principal
+
+
+def get_current_principal(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """Authenticated principal; needs no database query when cached"""
+    return principal_from_token(db, token)
+
+
+def get_current_active_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
+def get_current_user(
+    db: Session = Depends(get_db), principal: Principal = Depends(get_current_principal)
+) -> User:
+    """The authenticated user's row, for endpoints that read or change it"""
+    user = db.get(User, principal.id)
     if not user:
-        print("[DEBUG] User not found in database")
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 
+def get_reporting_db(
+    principal: Principal = Depends(get_current_principal),
+) -> Generator:
+    """Admin reporting session, on the read replica unless the user's own recent writes are not replayed yet"""
+    db = reporting_session(principal.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -111,31 +148,91 @@ def get_current_active_user(
 
 
 def get_current_admin_user(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> User:
-    admin = get_admin_by_user_id(db, current_user.id)
-    if not admin:
+    principal: Principal = Depends(get_current_active_principal),
+) -> Principal:
+    """Authenticated active admin; needs no database query when cached"""
+    if not principal.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is not an admin",
         )
-    return current_user
+    return principal
 
 
 def get_current_superadmin_user(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
-) -> User:
-    admin = get_admin_by_user_id(db, current_user.id)
-    if not admin or not admin.is_superadmin:
+    principal: Principal = Depends(get_current_active_principal),
+) -> Principal:
+    """Authenticated active superadmin; needs no database query when cached"""
+    if not principal.is_superadmin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User is not a superadmin",
         )
+    return principal
+
+
+
+async def get_current_principal_async(
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """get_current_principal for async endpoints"""
+    user_id, cache_token = _decode_token(token)
+    principal = await get_principal_async(db, user_id, cache_token)
+    if principal is None:
+        raise _credentials_exception()
+    bind_log_context(user_id=principal.id)
+    return principal
+
+
+async def get_current_active_principal_async(
+    principal: Principal = Depends(get_current_principal_async),
+) -> Principal:
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal_async),
+) -> User:
+    """get_current_user for async endpoints, looking the user up on the async session"""
+    user = await db.get(User, principal.id)
+    if not user:
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async),
+) -> User:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
+def _raw_user_missing() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Default user (ID: {RAW_DEFAULT_USER_ID}) not found in system"
+    )
+
+
+async def get_current_principal_with_raw_check_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    raw: bool = Query(False, description="Set to true to bypass authentication and use default user ID 2")
+) -> Principal:
+    """get_current_principal for async endpoints that accept raw=true (default user ID 2)"""
+    if raw:
+        principal = await get_principal_async(db, RAW_DEFAULT_USER_ID, "raw")
+        if not principal:
+            raise _raw_user_missing()
+        return principal
+
+    token = await oauth2_scheme(request)
+    return await get_current_principal_async(db=db, token=token)
+
 
 def get_current_user_with_raw_check(
     request: Request,
@@ -148,76 +245,19 @@ def get_current_user_with_raw_check(
     """
     if raw:
         # Bypass authentication and use default user ID 2
-        default_user = get_user(db, user_id=2)
+        default_user = get_user(db, user_id=RAW_DEFAULT_USER_ID)
         if not default_user:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Default user (ID: 2) not found in system"
-            )
+            raise _raw_user_missing()
         return default_user
-    
-    # Normal authentication flow
-    try:
-        # Try to get token from request using the same logic as OAuth2PasswordBearerWithCookie
-        token = None
-        
-        # Check Authorization header first
-        authorization = request.headers.get("Authorization")
-        scheme, param = get_authorization_scheme_param(authorization)
-        
-        if authorization and scheme.lower() == "bearer":
-            token = param
-        else:
-            # Check cookies if no Authorization header
-            for cookie_name in ["access_token", "authToken"]:
-                cookie_token = request.cookies.get(cookie_name)
-                if cookie_token:
-                    # Handle legacy cookies that might have 'Bearer ' prefix
-                    token = cookie_token[7:] if cookie_token.startswith("Bearer ") else cookie_token
-                    break
-        
-        if not token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Not authenticated",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        # Validate token and get user
-        try:
-            payload = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-            )
-            user_id: Optional[int] = payload.get("sub")
-            if not user_id:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            
-            user = get_user(db, user_id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            return user
-        except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-    except HTTPException:
-        raise
-    except Exception:
+
+    token = token_from_request(request)
+    if not token:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Authentication error"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
         )
+    return get_current_user(db=db, principal=principal_from_token(db, token))
 
 
 def log_admin_activity(
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 
 from app.api import deps
 from app.models.user import User
+from app.services.principal import Principal
 from app.models.admin import Admin, AdminAuditLog, UserActivityLog, SystemMetrics
 from app.schemas.admin import (
     UserResponse,
@@ -16,6 +17,7 @@ from app.schemas.admin import (
 )
 from app.core.security import get_password_hash
 from app.core.config import settings
+from app.services import credit_service
 
 router = APIRouter()
 
@@ -23,7 +25,7 @@ router = APIRouter()
 @router.get("/users", response_model=List[UserResponse])
 def get_all_users(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: Optional[str] = None,
@@ -62,7 +64,7 @@ def get_all_users(
 def get_user(
     user_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_user)
 ):
     """Get specific user details"""
     user = db.query(User).filter(User.id == user_id).first()
@@ -83,7 +85,7 @@ def update_user(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_user)
 ):
     """Update user information"""
     user = db.query(User).filter(User.id == user_id).first()
@@ -128,7 +130,7 @@ def update_user(
 def delete_user(
     user_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_user)
 ):
     """Delete user (soft delete by deactivating)"""
     user = db.query(User).filter(User.id == user_id).first()
@@ -165,15 +167,24 @@ def modify_user_credits(
     amount: float,
     reason: str,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_user)
 ):
     """Add or subtract credits from user"""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    if amount == 0:
+        raise HTTPException(status_code=400, detail="Amount must not be zero")
+
     old_credits = user.credits
-    user.credits += amount
+    try:
+        credit_service.apply_transaction(
+            db, user_id, credit_service.to_micros(amount), "adjustment",
+            description=reason, commit=False,
+        )
+    except credit_service.InsufficientCreditsError:
+        raise HTTPException(status_code=400, detail="Adjustment would make the balance negative")
     user.updated_at = datetime.utcnow()
     db.commit()
 
@@ -193,7 +204,7 @@ def modify_user_credits(
 @router.get("/audit-logs", response_model=List[AdminAuditLogResponse])
 def get_admin_audit_logs(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
     admin_id: Optional[int] = None,
@@ -217,7 +228,7 @@ def get_admin_audit_logs(
 @router.get("/activity-logs", response_model=List[UserActivityLogResponse])
 def get_user_activity_logs(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     user_id: Optional[int] = None,
@@ -241,7 +252,7 @@ def get_user_activity_logs(
 @router.get("/stats", response_model=AdminStatsResponse)
 def get_admin_stats(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user)
+    current_user: Principal = Depends(deps.get_current_admin_user)
 ):
     """Get admin dashboard statistics"""
     total_users = db.query(User).count()
@@ -267,7 +278,7 @@ def get_admin_stats(
 @router.get("/system-metrics", response_model=List[SystemMetricsResponse])
 def get_system_metrics(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_admin_user),
+    current_user: Principal = Depends(deps.get_current_admin_user),
     metric_type: Optional[str] = None,
     limit: int = Query(100, ge=1, le=1000)
 ):
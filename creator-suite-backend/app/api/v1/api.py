@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, organizations, admins, admin_management, creations, media, services, azure_storage, user_services, test_gemini, feedback, admin_feedback, public, enhanced_auth, credits, billing_management
+from app.api.v1.endpoints import auth, users, organizations, admins, admin_management, creations, media, services, azure_storage, user_services, test_gemini, feedback, admin_feedback, public, enhanced_auth, credits, billing_management, task_events
 from app.api.v1 import health
 
 api_router = APIRouter()
@@ -14,6 +14,7 @@ api_router.include_router(admin_management.router, prefix="/admin/management", t
 api_router.include_router(billing_management.router, prefix="/admin/billing", tags=["admin-billing"])
 api_router.include_router(services.router, prefix="/services", tags=["services"])
 api_router.include_router(creations.router, prefix="/creations", tags=["creations"])
+api_router.include_router(task_events.router, prefix="/creations", tags=["creations"])
 api_router.include_router(media.router, prefix="/media", tags=["media"])
 api_router.include_router(azure_storage.router, prefix="/azure-storage", tags=["azure-storage"])
 api_router.include_router(user_services.router, prefix="/user-services", tags=["user-services"])
@@ -4,8 +4,8 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 import math
 
-from app.api.deps import get_current_admin_user, get_db
-from app.models.user import User
+from app.api.deps import get_current_admin_user, get_db, get_reporting_db
+from app.services.principal import Principal
 from app.schemas.admin_feedback import (
     AdminFeedbackResponse,
     AdminFeedbackDetail,
@@ -27,7 +27,7 @@ router = APIRouter()
 def list_all_feedbacks(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=100, description="Items per page"),
     rating: Optional[int] = Query(None, ge=1, le=5, description="Filter by rating"),
@@ -89,8 +89,8 @@ def list_all_feedbacks(
 @router.get("/stats", response_model=AdminFeedbackStats)
 def get_feedback_statistics(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_reporting_db),
+    current_user: Principal = Depends(get_current_admin_user),
     rating: Optional[int] = Query(None, ge=1, le=5, description="Filter by rating"),
     task_type: Optional[str] = Query(None, description="Filter by task type (video/image)"),
     service_id: Optional[int] = Query(None, description="Filter by service ID"),
@@ -125,7 +125,7 @@ def get_feedback_detail(
     *,
     db: Session = Depends(get_db),
     feedback_id: int,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     """
     Get detailed information about a specific feedback.
@@ -144,7 +144,7 @@ def delete_feedback(
     *,
     db: Session = Depends(get_db),
     feedback_id: int,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     """
     Delete a feedback.
@@ -163,7 +163,7 @@ def get_user_feedback_summary_endpoint(
     *,
     db: Session = Depends(get_db),
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     """
     Get feedback summary for a specific user.
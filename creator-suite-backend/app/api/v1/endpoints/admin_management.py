@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from app.api.deps import get_db, get_current_admin_user
+from app.api.deps import get_db, get_current_admin_user, get_reporting_db
+from app.db.pagination import apply_keyset, next_cursor, NEXT_CURSOR_HEADER
 from app.models.user import User
+from app.services.principal import Principal
 from app.models.user_service import UserService
 from app.models.service import Service
 from app.schemas.organization import Organization, OrganizationCreate, OrganizationUpdate
@@ -19,6 +22,7 @@ from app.services.user import (
     get_users_by_organization, get_user, update_user, delete_user
 )
 from app.services.admin import get_admin_by_user_id
+from app.services import credit_service
 
 router = APIRouter()
 
@@ -27,7 +31,7 @@ router = APIRouter()
 def create_organization_endpoint(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     organization_in: OrganizationCreate,
 ) -> Organization:
     """
@@ -51,7 +55,7 @@ def create_organization_endpoint(
 def create_user_endpoint(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     user_in: UserCreate,
 ) -> UserSchema:
     """
@@ -83,7 +87,7 @@ def create_user_endpoint(
 def list_organizations(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> List[Organization]:
     """
     List all organizations.
@@ -98,7 +102,7 @@ def list_organizations(
 def list_organization_users(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     organization_id: int = Path(..., title="The ID of the organization to get users for"),
 ) -> List[UserWithServices]:
     """
@@ -151,7 +155,7 @@ def list_organization_users(
 def update_organization_endpoint(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     organization_id: int = Path(..., title="The ID of the organization to update"),
     organization_in: OrganizationUpdate,
 ) -> Organization:
@@ -185,7 +189,7 @@ def update_organization_endpoint(
 def delete_organization_endpoint(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     organization_id: int = Path(..., title="The ID of the organization to delete"),
 ) -> Organization:
     """
@@ -217,7 +221,7 @@ def delete_organization_endpoint(
 def update_user_endpoint(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     user_id: int = Path(..., title="The ID of the user to update"),
     user_in: UserUpdate,
 ) -> UserSchema:
@@ -269,11 +273,11 @@ def update_user_endpoint(
 def delete_user_endpoint(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     user_id: int = Path(..., title="The ID of the user to delete"),
 ) -> UserSchema:
     """
-    Delete a user.
+    Delete a user (soft delete by deactivating; the credit ledger keeps their rows).
     
     Only admins can delete users.
     """
@@ -301,7 +305,7 @@ def delete_user_endpoint(
 @router.get("/users", response_model=List[UserSchema])
 def get_all_users(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
     skip: int = 0,
     limit: int = 100,
     search: str = None,
@@ -347,7 +351,7 @@ def modify_user_credits(
     amount: float,
     reason: str = "Admin adjustment",
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Add or subtract credits from user"""
     from app.api.deps import log_admin_activity
@@ -356,8 +360,17 @@ def modify_user_credits(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    if amount == 0:
+        raise HTTPException(status_code=400, detail="Amount must not be zero")
+
     old_credits = user.credits
-    user.credits += amount
+    try:
+        credit_service.apply_transaction(
+            db, user_id, credit_service.to_micros(amount), "adjustment",
+            description=reason, commit=False,
+        )
+    except credit_service.InsufficientCreditsError:
+        raise HTTPException(status_code=400, detail="Adjustment would make the balance negative")
     user.updated_at = datetime.utcnow()
     db.commit()
 
@@ -374,12 +387,35 @@ def modify_user_credits(
     return {"message": f"Credits updated successfully. New balance: {user.credits}"}
 
 
+def _search_pattern(search: str) -> str:
+    """ILIKE substring pattern with LIKE wildcards in the search term escaped"""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _paginate_logs(query, model, response: Response, cursor: Optional[str], skip: int, limit: int):
+    """Keyset-paginate a log query newest first, setting X-Next-Cursor when more rows exist"""
+    try:
+        query = apply_keyset(query, model.created_at, model.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not cursor and skip:
+        query = query.offset(skip)
+    rows = query.all()
+    cursor_value = next_cursor([row[0] for row in rows], limit)
+    if cursor_value:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_value
+    return rows
+
+
 @router.get("/audit-logs")
 def get_admin_audit_logs(
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
     admin_id: int = None,
     action: str = None,
     target_user_id: int = None,
@@ -388,11 +424,14 @@ def get_admin_audit_logs(
     date_from: str = None,
     date_to: str = None
 ):
-    """Get admin audit logs"""
+    """
+    Get admin audit logs, newest first.
+    Paginate with ?cursor= (X-Next-Cursor response header); skip is ignored when a cursor is given.
+    """
     from app.models.admin import AdminAuditLog
-    from sqlalchemy import or_
 
-    query = db.query(AdminAuditLog)
+    # Resolve usernames in the same query instead of one lookup per row
+    query = db.query(AdminAuditLog, User.username).outerjoin(User, AdminAuditLog.admin_id == User.id)
 
     if admin_id:
         query = query.filter(AdminAuditLog.admin_id == admin_id)
@@ -402,16 +441,11 @@ def get_admin_audit_logs(
         query = query.filter(AdminAuditLog.target_user_id == target_user_id)
 
     if search:
-        query = query.filter(
-            or_(
-                AdminAuditLog.action.ilike(f"%{search}%"),
-                AdminAuditLog.resource.ilike(f"%{search}%"),
-                AdminAuditLog.details.ilike(f"%{search}%")
-            )
-        )
+        # Trigram-indexed (ix_admin_audit_logs_search_trgm)
+        query = query.filter(AdminAuditLog.search_document().ilike(_search_pattern(search), escape="\\"))
 
     if admin_username:
-        query = query.join(User, AdminAuditLog.admin_id == User.id).filter(User.username == admin_username)
+        query = query.filter(User.username == admin_username)
 
     if date_from:
         query = query.filter(AdminAuditLog.created_at >= date_from)
@@ -419,19 +453,18 @@ def get_admin_audit_logs(
     if date_to:
         query = query.filter(AdminAuditLog.created_at <= date_to)
 
-    logs = query.order_by(AdminAuditLog.created_at.desc()).offset(skip).limit(limit).all()
+    rows = _paginate_logs(query, AdminAuditLog, response, cursor, skip, limit)
 
     # Format for frontend
     result = []
-    for log in logs:
-        admin = db.query(User).filter(User.id == log.admin_id).first()
+    for log, admin_name in rows:
         result.append({
             "id": log.id,
             "admin_id": log.admin_id,
-            "admin_username": admin.username if admin else "Unknown",
+            "admin_username": admin_name or "Unknown",
             "action": log.action,
-            "resource": log.resource,
-            "details": log.details,
+            "resource": log.target_resource_type,
+            "details": log.description,
             "ip_address": log.ip_address,
             "user_agent": log.user_agent,
             "created_at": log.created_at.isoformat()
@@ -442,10 +475,12 @@ def get_admin_audit_logs(
 
 @router.get("/activity-logs")
 def get_user_activity_logs(
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     user_id: int = None,
     activity_type: str = None,
     is_bot_activity: bool = None,
@@ -455,11 +490,14 @@ def get_user_activity_logs(
     date_from: str = None,
     date_to: str = None
 ):
-    """Get user activity logs"""
+    """
+    Get user activity logs, newest first.
+    Paginate with ?cursor= (X-Next-Cursor response header); skip is ignored when a cursor is given.
+    """
     from app.models.admin import UserActivityLog
-    from sqlalchemy import or_
 
-    query = db.query(UserActivityLog)
+    # Resolve usernames in the same query instead of one lookup per row
+    query = db.query(UserActivityLog, User.username).outerjoin(User, UserActivityLog.user_id == User.id)
 
     if user_id:
         query = query.filter(UserActivityLog.user_id == user_id)
@@ -469,19 +507,14 @@ def get_user_activity_logs(
         query = query.filter(UserActivityLog.is_bot_activity == is_bot_activity)
 
     if search:
-        query = query.filter(
-            or_(
-                UserActivityLog.action.ilike(f"%{search}%"),
-                UserActivityLog.resource.ilike(f"%{search}%"),
-                UserActivityLog.details.ilike(f"%{search}%")
-            )
-        )
+        # Trigram-indexed (ix_user_activity_logs_search_trgm)
+        query = query.filter(UserActivityLog.search_document().ilike(_search_pattern(search), escape="\\"))
 
     if action:
-        query = query.filter(UserActivityLog.action == action)
+        query = query.filter(UserActivityLog.activity_type == action)
 
     if username:
-        query = query.join(User, UserActivityLog.user_id == User.id).filter(User.username == username)
+        query = query.filter(User.username == username)
 
     if date_from:
         query = query.filter(UserActivityLog.created_at >= date_from)
@@ -489,22 +522,22 @@ def get_user_activity_logs(
     if date_to:
         query = query.filter(UserActivityLog.created_at <= date_to)
 
-    logs = query.order_by(UserActivityLog.created_at.desc()).offset(skip).limit(limit).all()
+    rows = _paginate_logs(query, UserActivityLog, response, cursor, skip, limit)
 
     # Format for frontend
     result = []
-    for log in logs:
-        user = db.query(User).filter(User.id == log.user_id).first()
+    for log, username_value in rows:
+        extra_data = log.extra_data if isinstance(log.extra_data, dict) else {}
         result.append({
             "id": log.id,
             "user_id": log.user_id,
-            "username": user.username if user else "Unknown",
-            "action": log.action,
-            "resource": log.resource,
-            "details": log.details,
+            "username": username_value or "Unknown",
+            "action": log.activity_type,
+            "resource": extra_data.get("resource"),
+            "details": log.description,
             "ip_address": log.ip_address,
             "user_agent": log.user_agent,
-            "session_id": log.session_id,
+            "session_id": extra_data.get("session_id"),
             "created_at": log.created_at.isoformat()
         })
 
@@ -513,17 +546,28 @@ def get_user_activity_logs(
 
 @router.get("/stats")
 def get_admin_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: Session = Depends(get_reporting_db),
+    current_user: Principal = Depends(get_current_admin_user)
 ):
-    """Get admin dashboard statistics"""
+    """Get admin dashboard statistics (user totals from the user_stats_rollup snapshot)"""
     from datetime import datetime, timedelta
     from app.models.admin import UserActivityLog
-
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    admin_users = db.query(User).filter(User.is_admin == True).count()
-    total_credits = db.query(User).with_entities(db.func.sum(User.credits)).scalar() or 0
+    from app.services.rollups import get_user_stats
+
+    user_stats = get_user_stats(db)
+    if user_stats is not None:
+        total_users = user_stats.total_users
+        active_users = user_stats.active_users
+        admin_users = user_stats.admin_users
+        total_credits = user_stats.total_credits
+    else:
+        # Rollups not refreshed yet: one pass over users
+        total_users, active_users, admin_users, total_credits = db.query(
+            func.count(User.id),
+            func.count(User.id).filter(User.is_active == True),
+            func.count(User.id).filter(User.is_admin == True),
+            func.coalesce(func.sum(User.credits), 0),
+        ).one()
 
     # Recent activity (last 24 hours)
     yesterday = datetime.utcnow() - timedelta(days=1)
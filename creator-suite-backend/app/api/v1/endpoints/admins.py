@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from app.api.deps import get_db, get_current_superadmin_user
-from app.models.user import User
+from app.services.principal import Principal
 from app.schemas.admin import Admin, AdminCreate, AdminUpdate
 from app.services.admin import (
     create_admin,
@@ -21,7 +21,7 @@ def read_admins(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superadmin_user),
+    current_user: Principal = Depends(get_current_superadmin_user),
 ) -> List[Admin]:
     """
     Retrieve all admins.
@@ -36,7 +36,7 @@ def create_admin_endpoint(
     db: Session = Depends(get_db),
     admin_in: AdminCreate,
     user_id: int,
-    current_user: User = Depends(get_current_superadmin_user),
+    current_user: Principal = Depends(get_current_superadmin_user),
 ) -> Admin:
     """
     Create a new admin.
@@ -50,7 +50,7 @@ def read_admin(
     *,
     db: Session = Depends(get_db),
     admin_id: int,
-    current_user: User = Depends(get_current_superadmin_user),
+    current_user: Principal = Depends(get_current_superadmin_user),
 ) -> Admin:
     """
     Get a specific admin by ID.
@@ -70,7 +70,7 @@ def update_admin_endpoint(
     db: Session = Depends(get_db),
     admin_id: int,
     admin_in: AdminUpdate,
-    current_user: User = Depends(get_current_superadmin_user),
+    current_user: Principal = Depends(get_current_superadmin_user),
 ) -> Admin:
     """
     Update an admin.
@@ -90,7 +90,7 @@ def delete_admin_endpoint(
     *,
     db: Session = Depends(get_db),
     admin_id: int,
-    current_user: User = Depends(get_current_superadmin_user),
+    current_user: Principal = Depends(get_current_superadmin_user),
 ) -> Admin:
     """
     Delete an admin.
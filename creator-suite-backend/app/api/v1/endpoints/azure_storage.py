@@ -2,16 +2,24 @@ from fastapi import APIRouter, UploadFile, File, HTTPException, status, Response
 from typing import Optional
 
 from app.core.config import settings
-from app.services.azure_storage import AzureStorageService
 from app.schemas.azure_storage import AzureFileUploadResponse
 
 router = APIRouter()
 
-# Initialize Azure Storage service
-azure_storage = AzureStorageService(
-    connection_string=settings.AZURE_STORAGE_CONNECTION_STRING,
-    container_name=settings.AZURE_VIDEO_CONTAINER_NAME
-)
+_azure_storage = None
+
+
+def get_azure_storage():
+    """Azure Storage service, built on first upload (the Azure SDK is slow to import)"""
+    global _azure_storage
+    if _azure_storage is None:
+        from app.services.azure_storage import AzureStorageService
+
+        _azure_storage = AzureStorageService(
+            connection_string=settings.AZURE_STORAGE_CONNECTION_STRING,
+            container_name=settings.AZURE_VIDEO_CONTAINER_NAME
+        )
+    return _azure_storage
 
 
 @router.options("/upload")
@@ -50,7 +58,7 @@ async def upload_file(
         content_type = file.content_type or "application/octet-stream"
         
         # Upload to Azure Blob Storage
-        result = azure_storage.upload_file(
+        result = get_azure_storage().upload_file(
             file=file.file,
             filename=file.filename,
             content_type=content_type
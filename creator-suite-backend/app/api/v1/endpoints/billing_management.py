@@ -8,6 +8,7 @@ from pydantic import BaseModel
 from app.db.session import get_db
 from app.api.deps import get_current_admin_user, log_admin_activity
 from app.models.user import User
+from app.services.principal import Principal
 from app.models.admin import AdminAuditLog, UserActivityLog
 from app.api.deps import log_admin_activity
 
@@ -115,7 +116,7 @@ mock_payments = [
 @router.get("/stats", response_model=BillingStats)
 async def get_billing_stats(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get billing statistics"""
     try:
@@ -172,7 +173,7 @@ async def get_subscriptions(
     limit: int = 100,
     status_filter: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get all subscriptions with optional filtering"""
     try:
@@ -215,7 +216,7 @@ async def get_subscriptions(
 async def get_subscription(
     subscription_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get a specific subscription"""
     try:
@@ -258,7 +259,7 @@ async def update_subscription(
     subscription_id: int,
     subscription_update: SubscriptionUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Update a subscription"""
     try:
@@ -302,7 +303,7 @@ async def update_subscription(
 async def cancel_subscription(
     subscription_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Cancel a subscription"""
     try:
@@ -335,7 +336,7 @@ async def cancel_subscription(
 async def reactivate_subscription(
     subscription_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Reactivate a cancelled subscription"""
     try:
@@ -370,7 +371,7 @@ async def get_payments(
     limit: int = 100,
     status_filter: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Get all payments with optional filtering"""
     try:
@@ -412,7 +413,7 @@ async def get_payments(
 async def create_payment(
     payment: PaymentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_user)
 ):
     """Create a new payment record"""
     try:
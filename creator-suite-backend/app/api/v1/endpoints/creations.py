@@ -1,34 +1,51 @@
+import logging
 import uuid
 import json
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from fastapi.security.utils import get_authorization_scheme_param
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, undefer
 from pydantic import BaseModel, conint, constr
 import httpx
-import google.generativeai as genai
-from jose import jwt, JWTError
+import redis
 
-from app.api.deps import get_current_user, get_current_user_with_raw_check, get_db
-from app.services.user import get_user
+from app.api.deps import (
+    RAW_DEFAULT_USER_ID, get_current_principal, get_current_principal_async,
+    get_current_principal_with_raw_check_async, get_current_user, get_db, principal_from_token, token_from_request,
+)
+from app.db.session import get_async_db
+from app.db.replica import get_replica_db
+from app.services.principal import Principal, get_principal
+from app.core.celery_app import celery_app
 from app.core.config import settings
+from app.core.structured_logging import bind_log_context
+from app.core.tracing import TASK_ATTRIBUTE, TIMELINE_ROOT_ATTRIBUTE, load_task_timeline, timeline_breakdown, tracer
+from app.db.pagination import apply_keyset, next_cursor, NEXT_CURSOR_HEADER
 from app.models.user import User
-from app.models.creation_task import CreationTask as CreationTaskModel
+from app.models.creation_task import CreationTask as CreationTaskModel, CreationTaskArchive, CreationTaskProviderPayload
+from app.services import credit_service
+from app.services.cancellation import CANCELLABLE_STATUSES, cancel_creation
+from app.services.task_archive import decode_archive_payload, load_archived_payload
 from app.models.service import Service as ServiceModel
 from app.creator_suite.schemas import (
     CreationTask, CreationTaskCreate, CreationTaskUpdate, 
-    TaskStatus, AssetType
+    CreationTaskSummary, TaskStatus, AssetType
 )
-from app.creator_suite.video.tasks.long_video_tasks import generate_long_video, pause_long_video_generation, resume_long_video_generation
-from app.creator_suite.video.tasks.hailuo_02_tasks import generate_hailuo_02_video
-from app.creator_suite.video.tasks.minimax_tasks import generate_minimax_video
-from app.creator_suite.video.tasks.veo_3_tasks import generate_veo_3_video
-from app.creator_suite.image.tasks.imagen_4_ultra_tasks import generate_imagen_4_ultra_image
-from app.creator_suite.image.tasks.runway_gen4_image_tasks import generate_runway_gen4_image
-from app.creator_suite.image.tasks.magic_hour_image_tasks import generate_magic_hour_image
-from app.creator_suite.video.tasks.runway_gen4_video_tasks import generate_runway_gen4_video
-from app.creator_suite.video.tasks.magic_hour_tasks import generate_magic_hour_video
-from app.creator_suite.schemas import LongVideoGeneration, VideoSegment
+from app.creator_suite.schemas import LongVideoGeneration, VideoSegment, LongVideoSegmentEditRequest
+
+logger = logging.getLogger(__name__)
+
+# Generation tasks are sent by name: importing their modules would load every provider
+# and ffmpeg/PIL into the API process (see scripts/audit_import_time.py)
+CELERY_TASKS_BY_SERVICE = {
+    ("runway", "runway/gen-3-alpha-image"): "generate_runway_gen4_image",
+    ("magic_hour", "magic_hour/image"): "generate_magic_hour_image",
+    ("runway", "runway/gen-3-alpha-video"): "generate_runway_gen4_video",
+    ("magic_hour", "magic_hour/video"): "generate_magic_hour_video",
+}
 
 # Pydantic models for /vet endpoint
 class VetIn(BaseModel):
@@ -57,6 +74,11 @@ def creation_task_options(task_id: str):
     """Handle CORS preflight for specific creation task endpoint"""
     return {"message": "OK"}
 
+@router.options("/{task_id}/cancel")
+def creation_cancel_options(task_id: str):
+    """Handle CORS preflight for cancel endpoint"""
+    return {"message": "OK"}
+
 @router.options("/{task_id}/pause")
 def creation_pause_options(task_id: str):
     """Handle CORS preflight for pause endpoint"""
@@ -67,6 +89,11 @@ def creation_resume_options(task_id: str):
     """Handle CORS preflight for resume endpoint"""
     return {"message": "OK"}
 
+@router.options("/{task_id}/segments/edit")
+def creation_segments_edit_options(task_id: str):
+    """Handle CORS preflight for segment edit endpoint"""
+    return {"message": "OK"}
+
 @router.options("/vet")
 def creation_vet_options():
     """Handle CORS preflight for vet endpoint"""
@@ -86,6 +113,8 @@ def creation_featured_options():
 def get_gemini_rewriter():
     if not settings.GEMINI_API_KEY:
         return None
+    # Imported on first use: the SDK (grpc, protobuf) takes longer to import than the rest of the API
+    import google.generativeai as genai
     
     genai.configure(api_key=settings.GEMINI_API_KEY)
     return genai.GenerativeModel(
@@ -133,76 +162,25 @@ def create_creation_task(
 
     # Handle authentication based on raw flag
     if task_in.raw:
-        # Bypass authentication and use default user ID 2
-        current_user = get_user(db, user_id=2)
+        # Bypass authentication and use the default user
+        current_user = get_principal(db, RAW_DEFAULT_USER_ID, "raw")
         if not current_user:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Default user (ID: 2) not found in system"
+                detail=f"Default user (ID: {RAW_DEFAULT_USER_ID}) not found in system"
             )
     else:
-        # Normal authentication flow
-        try:
-            # Try to get token from request
-            token = None
-            
-            # Check Authorization header first
-            authorization = request.headers.get("Authorization")
-            scheme, param = get_authorization_scheme_param(authorization)
-            
-            if authorization and scheme.lower() == "bearer":
-                token = param
-            else:
-                # Check cookies if no Authorization header
-                for cookie_name in ["access_token", "authToken"]:
-                    cookie_token = request.cookies.get(cookie_name)
-                    if cookie_token:
-                        # Handle legacy cookies that might have 'Bearer ' prefix
-                        token = cookie_token[7:] if cookie_token.startswith("Bearer ") else cookie_token
-                        break
-            
-            if not token:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Not authenticated",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            
-            # Validate token and get user
-            try:
-                payload = jwt.decode(
-                    token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-                )
-                user_id = payload.get("sub")
-                if not user_id:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Could not validate credentials",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                
-                current_user = get_user(db, user_id=user_id)
-                if not current_user:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Could not validate credentials",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-            except JWTError:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-        except HTTPException:
-            raise
-        except Exception:
+        token = token_from_request(request)
+        if not token:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Authentication error"
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
             )
+        current_user = principal_from_token(db, token)
     # Generate unique task ID
     task_id = str(uuid.uuid4())
+    bind_log_context(task_id=task_id)
     
     # Verify service exists
     service = db.query(ServiceModel).filter(ServiceModel.id == task_in.service_id).first()
@@ -223,6 +201,9 @@ def create_creation_task(
         input_data=task_in.input_data,
     )
 
+    # Generations charged for: one per 8-second segment for long videos
+    generations = 1
+
     # Handle long video configuration
     if task_in.long_video_config:
         # Validate long video configuration
@@ -238,6 +219,7 @@ def create_creation_task(
 
         # Calculate number of segments (8 seconds each)
         num_segments = (config.total_duration + 7) // 8  # Round up
+        generations = num_segments
 
         # Create segments
         segments = []
@@ -255,52 +237,94 @@ def create_creation_task(
         config.segments = segments
         db_task.long_video_config = config.dict()
 
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
-    
-    # Dispatch to appropriate Celery task based on provider and service
-    if task_in.long_video_config:
-        # Handle long video generation
-        generate_long_video.delay(task_id, task_in.input_data, task_in.long_video_config.dict())
-    elif task_in.provider == "runway" and service.name == "runway/gen-3-alpha-image":
-        generate_runway_gen4_image.delay(task_id, task_in.input_data)
-    elif task_in.provider == "magic_hour" and service.name == "magic_hour/image":
-        generate_magic_hour_image.delay(task_id, task_in.input_data)
-    elif task_in.provider == "runway" and service.name == "runway/gen-3-alpha-video":
-        generate_runway_gen4_video.delay(task_id, task_in.input_data)
-    elif task_in.provider == "magic_hour" and service.name == "magic_hour/video":
-        generate_magic_hour_video.delay(task_id, task_in.input_data)
-    else:
-        # Update task to failed if provider/service not supported
-        db_task.status = TaskStatus.FAILED
-        db_task.error_message = f"Provider {task_in.provider} with service {service.name} not supported"
+    # The span's context travels in the Celery message, so the worker continues this trace
+    with tracer.start_as_current_span(
+        "creation.enqueue", attributes={TASK_ATTRIBUTE: task_id, TIMELINE_ROOT_ATTRIBUTE: True},
+    ):
+        db.add(db_task)
+
+        # Reserve the credits in the same transaction as the task; the hold is
+        # settled or released when the task completes or fails
+        cost_micros = credit_service.to_micros(service.cost_per_generation * generations)
+        if cost_micros > 0:
+            try:
+                credit_service.reserve_credits(
+                    db, current_user.id, cost_micros,
+                    task_id=task_id,
+                    service_id=service.id,
+                    description=f"{service.name} generation",
+                    idempotency_key=f"task:{task_id}",
+                    commit=False,
+                )
+            except credit_service.InsufficientCreditsError:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                    detail="Insufficient credits",
+                )
+
         db.commit()
+        db.refresh(db_task)
+    
+        # Dispatch to appropriate Celery task based on provider and service. The Celery task id is
+        # the creation task id, so cancelling can revoke the message without looking it up
+        celery_task = CELERY_TASKS_BY_SERVICE.get((task_in.provider, service.name))
+        if task_in.long_video_config:
+            # Handle long video generation
+            celery_app.send_task(
+                "generate_long_video",
+                args=[task_id, task_in.input_data, task_in.long_video_config.dict()],
+                task_id=task_id,
+            )
+        elif celery_task:
+            celery_app.send_task(celery_task, args=[task_id, task_in.input_data], task_id=task_id)
+        else:
+            # Update task to failed if provider/service not supported (releases the credit hold)
+            db_task.status = TaskStatus.FAILED
+            db_task.error_message = f"Provider {task_in.provider} with service {service.name} not supported"
+            db.commit()
         
-        raise HTTPException(
-            status_code=400,
-            detail=f"Provider {task_in.provider} with service {service.name} not supported"
-        )
+            raise HTTPException(
+                status_code=400,
+                detail=f"Provider {task_in.provider} with service {service.name} not supported"
+            )
     
     return db_task
 
 
+# Columns of the fields=summary projection; skips the heavy JSON columns
+SUMMARY_COLUMNS = [
+    getattr(CreationTaskModel, name) for name in CreationTaskSummary.model_fields
+]
+
+
 @router.get("/", response_model=List[CreationTask])
-def list_creation_tasks(
+async def list_creation_tasks(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    skip: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated offset pagination, ignored when cursor is given"),
     limit: int = Query(100, ge=1, le=100),
     task_type: Optional[AssetType] = None,
     status: Optional[TaskStatus] = None,
+    fields: str = Query("full", pattern="^(full|summary)$", description="'summary' omits input_data, output_assets, long_video_config and service"),
 ):
     """
-    List creation tasks for the current user.
+    List creation tasks for the current user, newest first.
+
+    Paginate by passing the X-Next-Cursor response header back as ?cursor=;
+    the header is absent on the last page. Use fields=summary for list views.
     """
-    query = db.query(CreationTaskModel).options(
-        joinedload(CreationTaskModel.service)
-    ).filter(
+    if fields == "summary":
+        query = select(*SUMMARY_COLUMNS)
+    else:
+        query = select(CreationTaskModel).options(
+            joinedload(CreationTaskModel.service),
+            undefer(CreationTaskModel.long_video_config),
+        )
+    query = query.filter(
         CreationTaskModel.user_id == current_user.id
     )
     
@@ -310,26 +334,140 @@ def list_creation_tasks(
     if status:
         query = query.filter(CreationTaskModel.status == status)
     
-    tasks = query.order_by(CreationTaskModel.created_at.desc()).offset(skip).limit(limit).all()
-    
+    try:
+        query = apply_keyset(query, CreationTaskModel.created_at, CreationTaskModel.id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not cursor and skip:
+        query = query.offset(skip)
+    result = await db.execute(query)
+    tasks = result.all() if fields == "summary" else result.scalars().all()
+
+    headers = {}
+    cursor_value = next_cursor(tasks, limit)
+    if cursor_value:
+        headers[NEXT_CURSOR_HEADER] = cursor_value
+
+    if fields == "summary":
+        rows = [CreationTaskSummary.model_validate(task) for task in tasks]
+        return JSONResponse(content=jsonable_encoder(rows), headers=headers)
+
+    response.headers.update(headers)
     return tasks
 
 
 @router.get("/{task_id}", response_model=CreationTask)
-def get_creation_task(
+async def get_creation_task(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     task_id: str,
-    current_user: User = Depends(get_current_user_with_raw_check),
+    current_user: Principal = Depends(get_current_principal_with_raw_check_async),
     request: Request,
 ):
     """
     Get a specific creation task by ID.
     Add ?raw=true to bypass authentication and use default user ID 2.
     """
-    task = db.query(CreationTaskModel).options(
-        joinedload(CreationTaskModel.service)
-    ).filter(
+    task = (await db.execute(
+        select(CreationTaskModel).options(
+            joinedload(CreationTaskModel.service),
+            undefer(CreationTaskModel.long_video_config),
+        ).filter(
+            CreationTaskModel.id == task_id,
+            CreationTaskModel.user_id == current_user.id
+        )
+    )).scalars().first()
+    
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if task.archived_at is not None:
+        # Old finished task: the row holds a slim copy, the full payload is in cold storage
+        payload = (await db.execute(
+            select(CreationTaskArchive.payload).filter(CreationTaskArchive.task_id == task.id)
+        )).scalar()
+        if payload is not None:
+            db.expunge(task)
+            archived = decode_archive_payload(payload)
+            task.input_data = archived.get("input_data") or task.input_data
+            task.output_assets = archived.get("output_assets")
+            task.long_video_config = archived.get("long_video_config")
+    
+    return task
+
+
+@router.get("/{task_id}/provider-payload")
+def get_creation_task_provider_payload(
+    *,
+    db: Session = Depends(get_db),
+    task_id: str,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Raw provider output of a task's assets (logs, metrics), one entry per output asset.
+    Kept out of the task itself; fetch it only when debugging a generation.
+    """
+    task = db.query(CreationTaskModel.id, CreationTaskModel.archived_at).filter(
+        CreationTaskModel.id == task_id,
+        CreationTaskModel.user_id == current_user.id
+    ).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if task.archived_at is not None:
+        archived = load_archived_payload(db, task_id) or {}
+        asset_metadata = archived.get("provider_payload")
+    else:
+        asset_metadata = db.query(CreationTaskProviderPayload.asset_metadata).filter(
+            CreationTaskProviderPayload.task_id == task_id
+        ).scalar()
+    return {"task_id": task_id, "assets": asset_metadata or []}
+
+
+@router.get("/{task_id}/timeline")
+def get_creation_task_timeline(
+    *,
+    db: Session = Depends(get_db),
+    task_id: str,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Where a task's time went: queue wait, provider generation and polls, media
+    stages and database commits, from its trace spans (kept for
+    TASK_TIMELINE_TTL_SECONDS; empty when tracing is off or the trace was not sampled).
+    """
+    owned = db.query(CreationTaskModel.id).filter(
+        CreationTaskModel.id == task_id,
+        CreationTaskModel.user_id == current_user.id
+    ).first()
+    if not owned:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    try:
+        spans = load_task_timeline(task_id)
+    except redis.RedisError:
+        raise HTTPException(status_code=503, detail="Timeline store unavailable")
+    return {
+        "task_id": task_id,
+        "total_seconds": round(max(s["end"] for s in spans) - min(s["start"] for s in spans), 3) if spans else None,
+        "stages": timeline_breakdown(spans),
+        "spans": spans,
+    }
+
+
+@router.post("/{task_id}/cancel")
+def cancel_creation_task(
+    *,
+    db: Session = Depends(get_db),
+    task_id: str,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Cancel a pending or processing task and release its reserved credits.
+    Queued work is revoked, running provider predictions are cancelled and the
+    worker stops polling; for a long video this covers every unfinished segment.
+    """
+    task = db.query(CreationTaskModel).filter(
         CreationTaskModel.id == task_id,
         CreationTaskModel.user_id == current_user.id
     ).first()
@@ -337,7 +475,10 @@ def get_creation_task(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return task
+    if task.status not in CANCELLABLE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Task is already {task.status.value}")
+    
+    return cancel_creation(db, task)
 
 
 @router.post("/{task_id}/pause")
@@ -363,7 +504,7 @@ def pause_long_video_task(
         raise HTTPException(status_code=400, detail="Task is not a long video generation task")
     
     # Pause the generation
-    pause_long_video_generation.delay(task_id, segment_index)
+    celery_app.send_task("pause_long_video_generation", args=[task_id, segment_index])
     
     return {"message": f"Video generation paused at segment {segment_index}"}
 
@@ -391,11 +532,97 @@ def resume_long_video_task(
         raise HTTPException(status_code=400, detail="Task is not a long video generation task")
     
     # Resume the generation
-    resume_long_video_generation.delay(task_id, new_prompt)
+    celery_app.send_task("resume_long_video_generation", args=[task_id, new_prompt])
     
     return {"message": "Video generation resumed"}
 
 
+@router.post("/{task_id}/segments/edit")
+def edit_long_video_segments(
+    *,
+    db: Session = Depends(get_db),
+    task_id: str,
+    edit_in: LongVideoSegmentEditRequest,
+    current_user: Principal = Depends(get_current_principal),
+):
+    """
+    Regenerate selected 8-second segments of a completed long video.
+    Unchanged segments are reused from the segment cache and the video is re-spliced with stream copy.
+    """
+    # Locked until the commit below, so two edits cannot both start from COMPLETED
+    task = db.query(CreationTaskModel).filter(
+        CreationTaskModel.id == task_id,
+        CreationTaskModel.user_id == current_user.id
+    ).with_for_update().first()
+    
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    if task.archived_at is not None:
+        # The segment bookkeeping and full inputs are in cold storage, and reads serve the archived copy
+        raise HTTPException(status_code=409, detail="Long video is archived and can no longer be edited")
+
+    config = task.long_video_config or {}
+    cache_paths = config.get("segment_cache_paths")
+    if not cache_paths:
+        raise HTTPException(status_code=400, detail="Task is not an assembled long video")
+    
+    if task.status != TaskStatus.COMPLETED:
+        raise HTTPException(status_code=400, detail="Long video is still processing")
+    
+    segment_ids = [segment.segment_id for segment in edit_in.segments_to_edit]
+    if len(set(segment_ids)) != len(segment_ids):
+        raise HTTPException(status_code=400, detail="Each segment can only be edited once per request")
+    invalid = [segment_id for segment_id in segment_ids if segment_id > len(cache_paths)]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid segment IDs {invalid}. Video has {len(cache_paths)} segments"
+        )
+    
+    from app.creator_suite.video.video_editor import VideoSegmentEditor  # ffmpeg/PIL stay out of API startup
+
+    cost = len(segment_ids) * VideoSegmentEditor().credit_per_segment
+
+    # Reserved with the status change; the splice settles the hold, a failed edit releases it
+    hold_id = None
+    cost_micros = credit_service.to_micros(cost)
+    if cost_micros > 0:
+        try:
+            hold = credit_service.reserve_credits(
+                db, current_user.id, cost_micros,
+                task_id=task_id,
+                service_id=task.service_id,
+                description=f"Long video edit of {len(segment_ids)} segment(s)",
+                idempotency_key=f"edit:{task_id}:{config.get('edit_revision', 0) + 1}",
+                commit=False,
+            )
+        except credit_service.InsufficientCreditsError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_402_PAYMENT_REQUIRED,
+                detail="Insufficient credits",
+            )
+        hold_id = hold.id
+
+    task.status = TaskStatus.PROCESSING
+    task.error_message = None
+    db.commit()
+
+    celery_app.send_task("regenerate_long_video_segments", args=[
+        task_id,
+        [segment.dict() for segment in edit_in.segments_to_edit],
+        edit_in.crossfade_duration,
+        hold_id
+    ])
+    
+    return {
+        "message": f"Regenerating {len(segment_ids)} segment(s)",
+        "segments": sorted(segment_ids),
+        "cost": cost
+    }
+
+
 def check_content_violations(text: str) -> List[str]:
     """Simple keyword-based content violation detection"""
     violations = []
@@ -437,7 +664,7 @@ def generate_safe_alternatives(prompt: str, n_alternatives: int) -> List[AltOut]
         return safe_alts
         
     except Exception as e:
-        print(f"Error generating safe alternatives: {e}")
+        logger.warning("Error generating safe alternatives: %s", e)
         # Fallback: return a generic safe version
         return [AltOut(
             prompt="A peaceful and family-friendly scene",
@@ -448,7 +675,7 @@ def generate_safe_alternatives(prompt: str, n_alternatives: int) -> List[AltOut]
 async def vet_prompt(
     *,
     vet_in: VetIn,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Validate a user prompt and return safe alternatives if non-compliant.
@@ -474,7 +701,6 @@ async def vet_prompt(
 @router.get("/features")
 def get_creation_features():
     """Get available creation features and capabilities (public endpoint)"""
-    print("[DEBUG] get_creation_features endpoint called")
     return {
         "video_generation": {
             "providers": ["runway", "magic_hour"],
@@ -507,24 +733,31 @@ def get_creation_features():
 
 
 @router.get("/featured")
-def get_featured_creations(db: Session = Depends(get_db)):
+def get_featured_creations(db: Session = Depends(get_replica_db)):
     """
     Get featured creations for the homepage showcase.
     Returns a curated selection of completed tasks.
     """
     # Get recent completed tasks for featured section
-    tasks = db.query(CreationTaskModel).filter(
+    tasks = db.query(
+            CreationTaskModel.id,
+            CreationTaskModel.task_type,
+            CreationTaskModel.status,
+            CreationTaskModel.provider,
+            CreationTaskModel.created_at,
+            CreationTaskModel.local_video_url,
+            CreationTaskModel.local_image_url,
+            CreationTaskModel.local_thumbnail_url,
+            CreationTaskModel.input_data["prompt"].astext.label("prompt"),
+        ).filter(
             CreationTaskModel.status == "COMPLETED"
         ).order_by(CreationTaskModel.created_at.desc()).limit(6).all()
 
-    # Debug: Log the retrieved tasks
-    print("[DEBUG] Retrieved tasks:", tasks)
-
     featured_items = []
     for task in tasks:
         item = {
             "id": task.id,
-            "title": task.input_data.get("prompt", "Featured Creation")[:60] if task.input_data else "Featured Creation",
+            "title": (task.prompt or "Featured Creation")[:60],
             "type": task.task_type,
             "created_at": task.created_at.isoformat() if task.created_at else None,
             "provider": task.provider,
@@ -540,8 +773,7 @@ def get_featured_creations(db: Session = Depends(get_db)):
 
         featured_items.append(item)
 
-    # Debug: Log the featured items
-    print("[DEBUG] Featured items:", featured_items)
+    logger.debug("Featured creations: %s", [item["id"] for item in featured_items])
 
     return {
         "featured": featured_items,
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
 
-from app.api.deps import get_db, get_current_active_user, get_current_admin_user
+from app.api.deps import (
+    get_db, get_current_active_principal, get_current_active_principal_async, get_current_active_user,
+    get_current_admin_user,
+)
+from app.db.session import get_async_db
 from app.models.user import User as UserModel
 from app.models.enhanced_auth import CreditTransaction
 from app.schemas.user import User
 from app.core.enhanced_security import audit_logger
+from app.services import credit_service
+from app.services.principal import Principal
 
 
 class CreditPurchaseRequest(BaseModel):
@@ -38,27 +46,24 @@ router = APIRouter()
 
 
 @router.get("/balance", response_model=CreditBalanceResponse)
-def get_credit_balance(
+async def get_credit_balance(
     *,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_principal_async),
 ) -> CreditBalanceResponse:
     """
     Get current user's credit balance and statistics.
     """
-    # Calculate totals from transactions
-    transactions = db.query(CreditTransaction).filter(
-        CreditTransaction.user_id == current_user.id
-    ).all()
-
-    total_earned = sum(t.amount for t in transactions if t.transaction_type in ['purchase', 'bonus', 'refund'])
-    total_spent = abs(sum(t.amount for t in transactions if t.transaction_type == 'usage'))
+    # Running totals kept next to the balance, cached in Redis
+    summary = await credit_service.get_balance_summary(db, current_user.id)
+    if summary is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     return CreditBalanceResponse(
-        current_balance=current_user.credits,
-        total_earned=total_earned,
-        total_spent=total_spent,
-        transaction_count=len(transactions)
+        current_balance=credit_service.from_micros(summary["balance_micros"]),
+        total_earned=credit_service.from_micros(summary["earned_micros"]),
+        total_spent=credit_service.from_micros(summary["spent_micros"]),
+        transaction_count=summary["transaction_count"]
     )
 
 
@@ -69,7 +74,7 @@ def get_credit_transactions(
     skip: int = 0,
     limit: int = 50,
     transaction_type: Optional[str] = Query(None, description="Filter by transaction type"),
-    current_user: UserModel = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_principal),
 ) -> List[CreditTransactionResponse]:
     """
     Get user's credit transaction history.
@@ -100,10 +105,12 @@ def purchase_credits(
     *,
     db: Session = Depends(get_db),
     purchase_request: CreditPurchaseRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: UserModel = Depends(get_current_active_user),
 ):
     """
     Initiate credit purchase (would integrate with payment provider).
+    Retries carrying the same Idempotency-Key header are applied once.
     """
     if purchase_request.amount <= 0:
         raise HTTPException(
@@ -113,42 +120,35 @@ def purchase_credits(
 
     # For now, simulate credit purchase
     # In production, this would integrate with Razorpay/Stripe/etc.
-    balance_before = current_user.credits
-    current_user.credits += purchase_request.amount
-
-    # Create transaction record
-    transaction = CreditTransaction(
-        user_id=current_user.id,
-        amount=purchase_request.amount,
-        transaction_type="purchase",
+    entry = credit_service.credit(
+        db,
+        current_user.id,
+        credit_service.to_micros(purchase_request.amount),
+        "purchase",
+        idempotency_key=idempotency_key,
         description=f"Credit purchase via {purchase_request.payment_method}",
-        balance_before=balance_before,
-        balance_after=current_user.credits,
-        payment_method=purchase_request.payment_method
+        payment_method=purchase_request.payment_method,
     )
 
-    db.add(transaction)
-    db.commit()
-    db.refresh(transaction)
-
-    audit_logger.log_activity(
-        user_id=current_user.id,
-        action="credit_purchase",
-        resource="credit",
-        resource_id=transaction.id,
-        details={
-            "amount": purchase_request.amount,
-            "payment_method": purchase_request.payment_method,
-            "balance_before": balance_before,
-            "balance_after": current_user.credits
-        },
-        success=True
-    )
+    if not entry.replayed:
+        audit_logger.log_activity(
+            user_id=current_user.id,
+            action="credit_purchase",
+            resource="credit",
+            resource_id=entry.transaction_id,
+            details={
+                "amount": entry.amount,
+                "payment_method": purchase_request.payment_method,
+                "balance_before": entry.balance - entry.amount,
+                "balance_after": entry.balance
+            },
+            success=True
+        )
 
     return {
         "message": "Credits purchased successfully",
-        "transaction_id": transaction.id,
-        "new_balance": current_user.credits
+        "transaction_id": entry.transaction_id,
+        "new_balance": entry.balance
     }
 
 
@@ -159,11 +159,13 @@ def deduct_credits(
     amount: float = Query(..., description="Amount to deduct"),
     description: str = Query(..., description="Description of the deduction"),
     service_id: Optional[int] = Query(None, description="Service ID for the usage"),
-    task_id: Optional[int] = Query(None, description="Task ID for the usage"),
+    task_id: Optional[str] = Query(None, description="Task ID for the usage"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     current_user: UserModel = Depends(get_current_active_user),
 ):
     """
     Deduct credits for service usage.
+    Retries carrying the same Idempotency-Key header are charged once.
     """
     if amount <= 0:
         raise HTTPException(
@@ -171,51 +173,43 @@ def deduct_credits(
             detail="Deduction amount must be positive",
         )
 
-    if current_user.credits < amount:
+    try:
+        entry = credit_service.debit(
+            db,
+            current_user.id,
+            credit_service.to_micros(amount),
+            idempotency_key=idempotency_key,
+            description=description,
+            service_id=service_id,
+            task_id=task_id,
+        )
+    except credit_service.InsufficientCreditsError:
         raise HTTPException(
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
             detail="Insufficient credits",
         )
 
-    balance_before = current_user.credits
-    current_user.credits -= amount
-
-    # Create transaction record
-    transaction = CreditTransaction(
-        user_id=current_user.id,
-        amount=-amount,  # Negative for deductions
-        transaction_type="usage",
-        description=description,
-        service_id=service_id,
-        task_id=task_id,
-        balance_before=balance_before,
-        balance_after=current_user.credits
-    )
-
-    db.add(transaction)
-    db.commit()
-    db.refresh(transaction)
-
-    audit_logger.log_activity(
-        user_id=current_user.id,
-        action="credit_usage",
-        resource="credit",
-        resource_id=transaction.id,
-        details={
-            "amount": amount,
-            "description": description,
-            "service_id": service_id,
-            "task_id": task_id,
-            "balance_before": balance_before,
-            "balance_after": current_user.credits
-        },
-        success=True
-    )
+    if not entry.replayed:
+        audit_logger.log_activity(
+            user_id=current_user.id,
+            action="credit_usage",
+            resource="credit",
+            resource_id=entry.transaction_id,
+            details={
+                "amount": amount,
+                "description": description,
+                "service_id": service_id,
+                "task_id": task_id,
+                "balance_before": entry.balance - entry.amount,
+                "balance_after": entry.balance
+            },
+            success=True
+        )
 
     return {
         "message": "Credits deducted successfully",
-        "transaction_id": transaction.id,
-        "remaining_balance": current_user.credits
+        "transaction_id": entry.transaction_id,
+        "remaining_balance": entry.balance
     }
 
 
@@ -226,53 +220,52 @@ def grant_credit_bonus(
     user_id: int = Query(..., description="User ID to grant bonus to"),
     amount: float = Query(..., description="Bonus amount"),
     description: str = Query("Bonus credits", description="Bonus description"),
-    current_user: UserModel = Depends(get_current_admin_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     """
     Grant credit bonus to a user (admin only).
     """
-    target_user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if not target_user:
+    if amount <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bonus amount must be positive",
+        )
+
+    try:
+        entry = credit_service.credit(
+            db,
+            user_id,
+            credit_service.to_micros(amount),
+            "bonus",
+            idempotency_key=idempotency_key,
+            description=description,
+        )
+    except LookupError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
-    balance_before = target_user.credits
-    target_user.credits += amount
-
-    # Create transaction record
-    transaction = CreditTransaction(
-        user_id=user_id,
-        amount=amount,
-        transaction_type="bonus",
-        description=description,
-        balance_before=balance_before,
-        balance_after=target_user.credits
-    )
-
-    db.add(transaction)
-    db.commit()
-    db.refresh(transaction)
-
-    audit_logger.log_activity(
-        user_id=current_user.id,
-        action="credit_bonus_grant",
-        resource="credit",
-        resource_id=transaction.id,
-        details={
-            "target_user_id": user_id,
-            "amount": amount,
-            "description": description,
-            "admin_id": current_user.id
-        },
-        success=True
-    )
+    if not entry.replayed:
+        audit_logger.log_activity(
+            user_id=current_user.id,
+            action="credit_bonus_grant",
+            resource="credit",
+            resource_id=entry.transaction_id,
+            details={
+                "target_user_id": user_id,
+                "amount": amount,
+                "description": description,
+                "admin_id": current_user.id
+            },
+            success=True
+        )
 
     return {
         "message": f"Bonus credits granted to user {user_id}",
-        "transaction_id": transaction.id,
-        "new_balance": target_user.credits
+        "transaction_id": entry.transaction_id,
+        "new_balance": entry.balance
     }
 
 
@@ -284,7 +277,7 @@ def get_all_credit_transactions(
     limit: int = 100,
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     transaction_type: Optional[str] = Query(None, description="Filter by transaction type"),
-    current_user: UserModel = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> List[CreditTransactionResponse]:
     """
     Get all credit transactions (admin only).
@@ -317,13 +310,13 @@ def get_all_credit_transactions(
 def get_credit_statistics(
     *,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ):
     """
     Get credit system statistics (admin only).
     """
     # Total credits in system
-    total_credits = db.query(UserModel).with_entities(db.func.sum(UserModel.credits)).scalar() or 0
+    total_credits = db.query(UserModel).with_entities(func.sum(UserModel.credits)).scalar() or 0
 
     # Total transactions
     total_transactions = db.query(CreditTransaction).count()
@@ -2,8 +2,9 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_principal, get_current_user, get_db
 from app.models.user import User
+from app.services.principal import Principal
 from app.schemas.feedback import (
     Feedback,
     FeedbackCreate,
@@ -41,7 +42,7 @@ def create_feedback_endpoint(
 def list_user_feedbacks(
     *,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
 ):
@@ -61,7 +62,7 @@ def get_feedback_endpoint(
     *,
     db: Session = Depends(get_db),
     feedback_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Get a specific feedback by ID.
@@ -118,7 +119,7 @@ def get_creation_task_feedbacks(
     *,
     db: Session = Depends(get_db),
     creation_task_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Get all feedbacks for a specific creation task.
@@ -136,7 +137,7 @@ def get_creation_task_feedback_stats(
     *,
     db: Session = Depends(get_db),
     creation_task_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """
     Get feedback statistics for a specific creation task.
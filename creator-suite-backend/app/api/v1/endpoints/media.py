@@ -1,22 +1,39 @@
 from pathlib import Path
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db
+from app.db.replica import get_replica_async_db
+from app.db.session import get_async_db
+from app.creator_suite.schemas import TaskStatus
 from app.models.creation_task import CreationTask
 
 router = APIRouter()
 
 
+async def _get_media_row(db: AsyncSession, task_id: str):
+    """Fetch only the columns media serving needs"""
+    result = await db.execute(
+        select(
+            CreationTask.id,
+            CreationTask.local_video_url,
+            CreationTask.local_image_url,
+            CreationTask.local_thumbnail_url,
+            CreationTask.input_data["prompt"].astext.label("prompt"),
+        ).filter(CreationTask.id == task_id)
+    )
+    return result.first()
+
+
 @router.get("/videos/{task_id}")
-def get_video(task_id: str, db: Session = Depends(get_db)):
+async def get_video(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Serve video file for a specific task.
     Public endpoint - no authentication required.
     """
     # Get task from database
-    task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+    task = await _get_media_row(db, task_id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -38,13 +55,13 @@ def get_video(task_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/images/{task_id}")
-def get_image(task_id: str, db: Session = Depends(get_db)):
+async def get_image(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Serve image file for a specific task.
     Public endpoint - no authentication required.
     """
     # Get task from database
-    task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+    task = await _get_media_row(db, task_id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -73,13 +90,13 @@ def get_image(task_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/thumbnails/{task_id}")
-def get_thumbnail(task_id: str, db: Session = Depends(get_db)):
+async def get_thumbnail(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Serve thumbnail image for a specific task.
     Public endpoint - no authentication required.
     """
     # Get task from database
-    task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+    task = await _get_media_row(db, task_id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -101,13 +118,13 @@ def get_thumbnail(task_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/download/{task_id}")
-def download_media(task_id: str, db: Session = Depends(get_db)):
+async def download_media(task_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Download media file (video or image) for a specific task.
     Public endpoint - no authentication required.
     """
     # Get task from database
-    task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+    task = await _get_media_row(db, task_id)
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -140,9 +157,8 @@ def download_media(task_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Media file not found")
     
     # Generate a descriptive filename
-    prompt = ""
-    if task.input_data and isinstance(task.input_data, dict):
-        prompt = task.input_data.get("prompt", "")
+    prompt = task.prompt or ""
+    if prompt:
         # Clean up prompt for filename
         prompt = "".join(c for c in prompt if c.isalnum() or c in (' ', '-', '_')).rstrip()
         prompt = prompt[:50]  # Limit length
@@ -160,21 +176,32 @@ def download_media(task_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/showcase")
-def get_showcase(db: Session = Depends(get_db)):
+async def get_showcase(db: AsyncSession = Depends(get_replica_async_db)):
     """
     Get showcase content for the homepage.
     Returns featured creations and media for display.
     """
     # Get recent completed tasks for showcase
-    tasks = db.query(CreationTask).filter(
-        CreationTask.status == "completed"
-    ).order_by(CreationTask.created_at.desc()).limit(12).all()
+    tasks = (await db.execute(
+        select(
+            CreationTask.id,
+            CreationTask.task_type,
+            CreationTask.status,
+            CreationTask.created_at,
+            CreationTask.local_video_url,
+            CreationTask.local_image_url,
+            CreationTask.local_thumbnail_url,
+            CreationTask.input_data["prompt"].astext.label("prompt"),
+        ).filter(
+            CreationTask.status == TaskStatus.COMPLETED
+        ).order_by(CreationTask.created_at.desc()).limit(12)
+    )).all()
 
     showcase_items = []
     for task in tasks:
         item = {
             "id": task.id,
-            "title": task.input_data.get("prompt", "Generated Content")[:80] if task.input_data else "Generated Content",
+            "title": (task.prompt or "Generated Content")[:80],
             "type": task.task_type,
             "created_at": task.created_at.isoformat() if task.created_at else None,
             "status": task.status
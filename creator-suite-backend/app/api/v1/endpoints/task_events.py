@@ -0,0 +1,265 @@
+"""
+Push-based task status: Server-Sent Events and WebSocket streams, plus
+cheap single and batch status polls backed by the same Redis snapshots.
+
+Clients subscribe once per task instead of polling GET /creations/{task_id}.
+Authorization checks the token's user through the principal cache (one query
+on a miss), so deactivated users are refused, and reads the task from Postgres
+at most once per subscription (not at all when the Redis status snapshot
+already knows its owner); no database connection is held while the stream is
+open.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import oauth2_scheme, principal_from_token
+from app.core.task_events import task_event_hub, is_terminal
+from app.creator_suite.schemas import TaskStatusBatchRequest, TaskStatusBatchResponse, TaskStatusRow
+from app.db.session import SessionLocal
+from app.models.creation_task import CreationTask as CreationTaskModel
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = 15
+
+
+def _user_id_from_token(token: Optional[str]) -> str:
+    """Id of the token's user, who must still exist and be active (cached principal; one query on a miss)"""
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db = SessionLocal()
+    try:
+        principal = principal_from_token(db, token)
+    finally:
+        db.close()
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return str(principal.id)
+
+
+def _load_task_snapshots(task_ids: List[str], user_id: str) -> List[Dict[str, Any]]:
+    """Read the status of the user's tasks among task_ids from Postgres in one primary-key lookup"""
+    db = SessionLocal()
+    try:
+        tasks = db.query(
+            CreationTaskModel.id,
+            CreationTaskModel.status,
+            CreationTaskModel.user_id,
+            CreationTaskModel.error_message,
+            CreationTaskModel.progress,
+        ).filter(
+            CreationTaskModel.id.in_(task_ids),
+            CreationTaskModel.user_id == int(user_id)
+        ).all()
+    finally:
+        db.close()
+
+    return [
+        {
+            "task_id": task.id,
+            "status": getattr(task.status, "value", task.status),
+            "user_id": task.user_id,
+            "error_message": task.error_message,
+            "progress": task.progress,
+            "version": 0,
+        }
+        for task in tasks
+    ]
+
+
+def _load_task_snapshot(task_id: str, user_id: str) -> Dict[str, Any]:
+    """Read a task's status from Postgres with a short-lived session"""
+    snapshots = _load_task_snapshots([task_id], user_id)
+    if not snapshots:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return snapshots[0]
+
+
+async def authorize_task_subscription(task_id: str, token: Optional[str]) -> Dict[str, Any]:
+    """
+    Check the token owns the task and return its current snapshot.
+
+    The Redis snapshot is trusted when it records the owner; otherwise the
+    task is looked up once in Postgres.
+    """
+    user_id = await run_in_threadpool(_user_id_from_token, token)
+    snapshot = await task_event_hub.snapshot(task_id)
+    if snapshot and snapshot.get("user_id") is not None:
+        if str(snapshot["user_id"]) != user_id:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return snapshot
+    return await run_in_threadpool(_load_task_snapshot, task_id, user_id)
+
+
+async def task_event_stream(task_id: str, initial: Dict[str, Any]) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Yield the task's current snapshot, then every newer one until it finishes.
+
+    Yields None every HEARTBEAT_SECONDS without news so transports can send
+    keep-alives (and notice dead peers).
+    """
+    queue = await task_event_hub.subscribe(task_id)
+    try:
+        # Re-read after subscribing so a transition between auth and subscribe is not lost
+        snapshot = await task_event_hub.snapshot(task_id) or initial
+        version = snapshot.get("version", 0)
+        yield snapshot
+        if is_terminal(snapshot):
+            return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if event.get("version", 0) <= version:
+                continue
+            version = event["version"]
+            yield event
+            if is_terminal(event):
+                return
+    finally:
+        await task_event_hub.unsubscribe(task_id, queue)
+
+
+@router.options("/status:batch")
+def task_status_batch_options():
+    """Handle CORS preflight for the batch status endpoint"""
+    return {"message": "OK"}
+
+
+@router.post("/status:batch", response_model=TaskStatusBatchResponse, response_model_exclude_none=True)
+async def get_task_status_batch(
+    request: TaskStatusBatchRequest,
+    token: str = Depends(oauth2_scheme),
+):
+    """
+    Status of many tasks in one call.
+
+    Snapshots come from Redis in a single pipelined round trip; tasks Redis has
+    no owned snapshot for are read from Postgres in one query and cached for
+    the next call. Pass known_versions to receive only tasks whose status
+    changed since, so an idle dashboard poll returns an empty list.
+    """
+    user_id = await run_in_threadpool(_user_id_from_token, token)
+    task_ids = list(dict.fromkeys(request.task_ids))
+    known_versions = request.known_versions or {}
+
+    snapshots = await task_event_hub.snapshots(task_ids)
+    owned: Dict[str, Dict[str, Any]] = {}
+    unresolved = []
+    for task_id in task_ids:
+        snapshot = snapshots.get(task_id)
+        if snapshot and snapshot.get("user_id") is not None and snapshot.get("status"):
+            if str(snapshot["user_id"]) == user_id:
+                owned[task_id] = snapshot
+        else:
+            unresolved.append(task_id)
+
+    if unresolved:
+        loaded = await run_in_threadpool(_load_task_snapshots, unresolved, user_id)
+        owned.update((snapshot["task_id"], snapshot) for snapshot in loaded)
+        await task_event_hub.seed(loaded)
+
+    rows = [
+        TaskStatusRow(**owned[task_id])
+        for task_id in task_ids
+        if task_id in owned and owned[task_id].get("version", 0) > known_versions.get(task_id, -1)
+    ]
+    return TaskStatusBatchResponse(
+        tasks=rows,
+        missing=[task_id for task_id in task_ids if task_id not in owned],
+    )
+
+
+@router.get("/{task_id}/status")
+async def get_task_status(
+    task_id: str,
+    token: str = Depends(oauth2_scheme),
+):
+    """
+    Lightweight status/progress poll: status, progress, stage and ETA.
+    Served from the Redis status snapshot; Postgres is only read for tasks Redis has no snapshot of.
+    """
+    return await authorize_task_subscription(task_id, token)
+
+
+@router.get("/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+):
+    """
+    Server-Sent Events stream of a task's status transitions.
+    Each event is the full status snapshot; the stream ends after a terminal status.
+    """
+    initial = await authorize_task_subscription(task_id, token)
+
+    async def event_source():
+        async for event in task_event_stream(task_id, initial):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event.get('version', 0)}\nevent: status\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _websocket_token(websocket: WebSocket) -> Optional[str]:
+    authorization = websocket.headers.get("Authorization")
+    scheme, param = get_authorization_scheme_param(authorization)
+    if authorization and scheme.lower() == "bearer":
+        return param
+
+    token = websocket.query_params.get("token")
+    if token:
+        return token
+
+    for cookie_name in ["access_token", "authToken"]:
+        cookie_token = websocket.cookies.get(cookie_name)
+        if cookie_token:
+            return cookie_token[7:] if cookie_token.startswith("Bearer ") else cookie_token
+    return None
+
+
+@router.websocket("/{task_id}/ws")
+async def task_events_websocket(websocket: WebSocket, task_id: str):
+    """
+    WebSocket stream of a task's status transitions (same payloads as the SSE stream).
+    Authenticate with a Bearer header, ?token= or the access_token cookie.
+    """
+    try:
+        initial = await authorize_task_subscription(task_id, _websocket_token(websocket))
+    except HTTPException as e:
+        await websocket.close(code={401: 4401, 403: 4403}.get(e.status_code, 4404))
+        return
+
+    await websocket.accept()
+    try:
+        async for event in task_event_stream(task_id, initial):
+            if event is None:
+                await websocket.send_json({"type": "heartbeat"})
+                continue
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
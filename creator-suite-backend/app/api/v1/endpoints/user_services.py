@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from app.api.deps import get_db, get_current_admin_user
-from app.models.user import User
+from app.services.principal import Principal
 from app.schemas.user_service import (
     UserService,
     UserServiceCreate,
@@ -22,7 +22,9 @@ from app.services.user_service import (
     get_user_services,
     get_user_services_by_user_id,
     get_user_services_by_service_id,
+    get_user_service_by_user_and_service,
     update_user_service,
+    find_missing_references,
     bulk_create_user_services,
     bulk_delete_user_services,
     bulk_update_user_services,
@@ -34,6 +36,21 @@ from app.services.service import get_service
 router = APIRouter()
 
 
+def _ensure_references_exist(db: Session, user_ids: List[int], service_ids: List[int]) -> None:
+    """Raise 404 for the first unknown user or service ID (checked in one query per table)"""
+    missing_users, missing_services = find_missing_references(db, user_ids, service_ids)
+    if missing_users:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {missing_users[0]} not found",
+        )
+    if missing_services:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Service with ID {missing_services[0]} not found",
+        )
+
+
 @router.get("/", response_model=List[UserServiceResponse])
 def read_user_services(
     skip: int = 0,
@@ -41,7 +58,7 @@ def read_user_services(
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     service_id: Optional[int] = Query(None, description="Filter by service ID"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> List[UserServiceResponse]:
     """
     Retrieve all user service access records.
@@ -62,7 +79,7 @@ def create_user_service_endpoint(
     *,
     db: Session = Depends(get_db),
     user_service_in: UserServiceCreate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> UserServiceResponse:
     """
     Grant a user access to a service.
@@ -82,6 +99,12 @@ def create_user_service_endpoint(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Service with ID {user_service_in.service_id} not found",
         )
+
+    if get_user_service_by_user_and_service(db, user_service_in.user_id, user_service_in.service_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User already has access to this service",
+        )
     
     # Create user service access
     user_service = create_user_service(db, user_service=user_service_in)
@@ -93,7 +116,7 @@ def read_user_service(
     *,
     db: Session = Depends(get_db),
     user_service_id: int,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> UserServiceResponse:
     """
     Get a specific user service access record by ID.
@@ -113,7 +136,7 @@ def update_user_service_endpoint(
     db: Session = Depends(get_db),
     user_service_id: int,
     user_service_in: UserServiceUpdate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> UserServiceResponse:
     """
     Update a user service access record.
@@ -152,7 +175,7 @@ def delete_user_service_endpoint(
     *,
     db: Session = Depends(get_db),
     user_service_id: int,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> UserServiceResponse:
     """
     Delete a user service access record.
@@ -172,7 +195,7 @@ def bulk_create_user_services_endpoint(
     *,
     db: Session = Depends(get_db),
     bulk_data: BulkUserServiceCreate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> BulkUserServiceResponse:
     """
     Bulk grant users access to services.
@@ -180,20 +203,11 @@ def bulk_create_user_services_endpoint(
     """
     try:
         # Validate all users and services exist
-        for user_service in bulk_data.user_services:
-            user = get_user(db, user_id=user_service.user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"User with ID {user_service.user_id} not found",
-                )
-            
-            service = get_service(db, service_id=user_service.service_id)
-            if not service:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Service with ID {user_service.service_id} not found",
-                )
+        _ensure_references_exist(
+            db,
+            [user_service.user_id for user_service in bulk_data.user_services],
+            [user_service.service_id for user_service in bulk_data.user_services],
+        )
         
         # Create user services
         created_services = bulk_create_user_services(db, bulk_data.user_services)
@@ -215,7 +229,7 @@ def bulk_delete_user_services_endpoint(
     *,
     db: Session = Depends(get_db),
     bulk_data: BulkUserServiceDelete,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> BulkUserServiceResponse:
     """
     Bulk remove users' access to services.
@@ -242,7 +256,7 @@ def update_user_services_endpoint(
     db: Session = Depends(get_db),
     user_id: int,
     service_data: UserServiceUpdateRequest,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> BulkUserServiceResponse:
     """
     Update all services for a specific user.
@@ -258,13 +272,7 @@ def update_user_services_endpoint(
             )
         
         # Verify all services exist
-        for service_id in service_data.service_ids:
-            service = get_service(db, service_id=service_id)
-            if not service:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Service with ID {service_id} not found",
-                )
+        _ensure_references_exist(db, [], service_data.service_ids)
         
         # Update user services
         result = bulk_update_user_services(db, user_id, service_data.service_ids)
@@ -286,7 +294,7 @@ def bulk_update_multiple_users_services_endpoint(
     *,
     db: Session = Depends(get_db),
     bulk_data: BulkUserServiceUpdate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: Principal = Depends(get_current_admin_user),
 ) -> BulkUserServiceResponse:
     """
     Bulk update services for multiple users.
@@ -294,26 +302,12 @@ def bulk_update_multiple_users_services_endpoint(
     """
     try:
         # Validate all users and services exist
-        for update in bulk_data.user_updates:
-            user_id = update.get('user_id')
-            service_ids = update.get('service_ids', [])
-            
-            if user_id:
-                user = get_user(db, user_id=user_id)
-                if not user:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"User with ID {user_id} not found",
-                    )
-                
-                # Verify all services exist
-                for service_id in service_ids:
-                    service = get_service(db, service_id=service_id)
-                    if not service:
-                        raise HTTPException(
-                            status_code=status.HTTP_404_NOT_FOUND,
-                            detail=f"Service with ID {service_id} not found",
-                        )
+        updates = [update for update in bulk_data.user_updates if update.get('user_id')]
+        _ensure_references_exist(
+            db,
+            [update['user_id'] for update in updates],
+            [service_id for update in updates for service_id in update.get('service_ids', [])],
+        )
         
         # Update user services
         result = bulk_update_multiple_users_services(db, bulk_data.user_updates)
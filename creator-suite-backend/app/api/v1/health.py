@@ -3,6 +3,7 @@ Health check endpoint for monitoring
 """
 
 from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 import psutil
 import os
@@ -53,6 +54,11 @@ async def detailed_health_check():
         }
     }
 
+@router.get("/health/db")
+async def database_health_check():
+    """Database latency, local pool usage and server connections per application"""
+    return await check_database()
+
 def get_uptime():
     """Get system uptime"""
     try:
@@ -63,12 +69,14 @@ def get_uptime():
         return 0
 
 async def check_database():
-    """Check database connectivity"""
+    """Check database connectivity, round-trip latency and connection usage"""
     try:
-        from app.db.session import get_db
-        db = next(get_db())
-        db.execute("SELECT 1")
-        return {"status": "healthy", "message": "Database connection successful"}
+        from app.db.session import database_stats
+        from app.db.replica import replica_router
+        stats = await run_in_threadpool(database_stats)
+        await run_in_threadpool(replica_router.replica_lag)
+        stats["replica"] = replica_router.stats()
+        return {"status": "healthy", "message": "Database connection successful", **stats}
     except Exception as e:
         return {"status": "unhealthy", "message": str(e)}
 
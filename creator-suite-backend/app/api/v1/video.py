@@ -16,17 +16,33 @@ from app.models.video import Video
 from app.schemas.video import VideoCreate, VideoResponse, VideoListResponse
 from app.creator_suite.video.runway_gen3 import RunwayGen3Provider
 from app.creator_suite.video.video_editor import VideoEditor
+from app.services import credit_service
 from app.services.user_service import UserService
 from app.core.security import get_current_user
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize providers
-runway_provider = RunwayGen3Provider()
-video_editor = VideoEditor()
+_runway_provider = None
+_video_editor = None
 user_service = UserService()
 
+
+def get_runway_provider() -> RunwayGen3Provider:
+    """Runway provider, built on first use rather than at import"""
+    global _runway_provider
+    if _runway_provider is None:
+        _runway_provider = RunwayGen3Provider()
+    return _runway_provider
+
+
+def get_video_editor() -> VideoEditor:
+    """Video editor, built on first use rather than at import"""
+    global _video_editor
+    if _video_editor is None:
+        _video_editor = VideoEditor()
+    return _video_editor
+
 @router.post("/generate")
 async def generate_video(
     prompt: str,
@@ -65,20 +81,28 @@ async def generate_video(
             generation_data["seed_influence"] = seed_influence
 
         # Calculate cost
-        cost = await runway_provider.calculate_cost(generation_data)
+        cost = await get_runway_provider().calculate_cost(generation_data)
         
-        if current_user.credits < cost:
+        # Reserve the credits before calling the provider; settled on success, released otherwise
+        try:
+            hold = credit_service.reserve_credits(
+                db, current_user.id, credit_service.to_micros(cost),
+                description=f"Video generation: {duration}s",
+            )
+        except credit_service.InsufficientCreditsError:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Insufficient credits. Need {cost} credits, have {current_user.credits}"
             )
 
-        # Generate video
-        result = await runway_provider.generate(generation_data)
+        try:
+            result = await get_runway_provider().generate(generation_data)
+        except Exception:
+            credit_service.release_hold(db, hold.id)
+            raise
         
         if result.get("success"):
-            # Deduct credits
-            current_user.credits -= cost
+            credit_service.settle_hold(db, hold.id, commit=False)
             
             # Create video record
             video_data = {
@@ -112,6 +136,7 @@ async def generate_video(
                 "remaining_credits": current_user.credits
             }
         else:
+            credit_service.release_hold(db, hold.id)
             raise HTTPException(status_code=500, detail=result.get("error", "Generation failed"))
             
     except HTTPException:
@@ -247,20 +272,28 @@ async def edit_video(
         }
         
         # Calculate edit cost
-        cost = await video_editor.calculate_edit_cost(edit_data)
+        cost = await get_video_editor().calculate_edit_cost(edit_data)
         
-        if current_user.credits < cost:
+        try:
+            hold = credit_service.reserve_credits(
+                db, current_user.id, credit_service.to_micros(cost),
+                description=f"Video edit: {action}",
+            )
+        except credit_service.InsufficientCreditsError:
             raise HTTPException(
                 status_code=400,
                 detail=f"Insufficient credits for edit. Need {cost} credits"
             )
         
         # Perform edit
-        result = await video_editor.edit_video(edit_data)
+        try:
+            result = await get_video_editor().edit_video(edit_data)
+        except Exception:
+            credit_service.release_hold(db, hold.id)
+            raise
         
         if result.get("success"):
-            # Deduct credits
-            current_user.credits -= cost
+            credit_service.settle_hold(db, hold.id, commit=False)
             
             # Update video record
             if result.get("new_video_url"):
@@ -276,6 +309,7 @@ async def edit_video(
                 "video_url": video.video_url
             }
         else:
+            credit_service.release_hold(db, hold.id)
             raise HTTPException(status_code=500, detail=result.get("error", "Edit failed"))
             
     except HTTPException:
@@ -395,7 +429,7 @@ async def get_cost_estimate(
             "model": model
         }
         
-        cost = await runway_provider.calculate_cost(generation_data)
+        cost = await get_runway_provider().calculate_cost(generation_data)
         segments = duration // 8
         
         return {
@@ -414,11 +448,11 @@ async def get_cost_estimate(
 async def get_supported_models():
     """Get supported video generation models"""
     try:
-        models = await runway_provider.get_supported_models()
+        models = await get_runway_provider().get_supported_models()
         model_info = []
         
         for model in models:
-            info = await runway_provider.get_model_info(model)
+            info = await get_runway_provider().get_model_info(model)
             model_info.append(info)
         
         return {
@@ -435,7 +469,7 @@ async def get_provider_info(provider: str):
     """Get provider information"""
     try:
         if provider == "runway":
-            return runway_provider.get_provider_info()
+            return get_runway_provider().get_provider_info()
         else:
             raise HTTPException(status_code=404, detail="Provider not found")
             
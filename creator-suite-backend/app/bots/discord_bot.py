@@ -15,6 +15,8 @@ import os
 from typing import Optional, Dict, Any
 import logging
 
+from app.bots.task_watcher import watch_task
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -248,16 +250,14 @@ async def generate_video(ctx, duration: int, *, prompt: str):
     
     task_id = task_response.get('id')
     
-    # Poll for completion
-    max_attempts = 600  # 10 minutes for longer videos
-    for attempt in range(max_attempts):
-        await asyncio.sleep(1)
-        
-        status_response = await bot.api_request('GET', f'/creations/{task_id}', token)
-        if not status_response:
-            continue
-            
-        status = status_response.get('status')
+    # Follow pushed status updates (one subscription instead of polling)
+    last_progress_update = 0
+    async for event in watch_task(bot.api_base, task_id, token, timeout=600):
+        status = event.get('status')
+        elapsed = event['elapsed']
+        if status in ('completed', 'failed'):
+            # One full read for output links / error details
+            status_response = await bot.api_request('GET', f'/creations/{task_id}', token) or event
         
         if status == 'completed':
             embed.color = 0x00ff00
@@ -289,8 +289,9 @@ async def generate_video(ctx, duration: int, *, prompt: str):
             return
         
         # Update progress every 10 seconds
-        if attempt % 10 == 0:
-            embed.description = f"Still generating... ({attempt}s elapsed)"
+        if elapsed - last_progress_update >= 10:
+            last_progress_update = elapsed
+            embed.description = f"Still generating... ({elapsed}s elapsed)"
             await message.edit(embed=embed)
     
     # Timeout
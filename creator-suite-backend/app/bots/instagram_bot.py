@@ -9,9 +9,9 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
-from app.models.credit_transaction import CreditTransaction
 from app.creator_suite.video.runway_gen3 import RunwayGen3Provider
 from app.creator_suite.video.video_editor import VideoEditor
+from app.services import credit_service
 from app.services.user_service import UserService
 from app.core.config import settings
 
@@ -142,9 +142,14 @@ class InstagramBot:
                 await self._send_message(sender_id, "❌ Maximum duration is 1800 seconds (30 minutes)")
                 return
 
-            # Check credits
+            # Reserve credits up front so concurrent requests cannot spend them twice
             segments_needed = duration // 8
-            if user.credits < segments_needed:
+            try:
+                hold = credit_service.reserve_credits(
+                    db, user.id, credit_service.to_micros(segments_needed),
+                    description=f"Video generation: {duration}s ({segments_needed} segments)",
+                )
+            except credit_service.InsufficientCreditsError:
                 await self._send_message(sender_id, 
                     f"❌ Insufficient credits. You need {segments_needed} credits but have {user.credits}.\n"
                     f"Each 8-second segment costs 1 credit.")
@@ -153,30 +158,25 @@ class InstagramBot:
             # Generate video
             await self._send_message(sender_id, f"🎬 Generating {duration}s video: '{prompt}'\nThis will cost {segments_needed} credits...")
             
-            result = await self.runway_provider.generate_video(
-                prompt=prompt,
-                duration=duration,
-                user_id=user.id
-            )
+            try:
+                result = await self.runway_provider.generate_video(
+                    prompt=prompt,
+                    duration=duration,
+                    user_id=user.id
+                )
+            except Exception:
+                credit_service.release_hold(db, hold.id)
+                raise
             
             if result.get("success"):
-                # Deduct credits
-                user.credits -= segments_needed
-                
-                # Log transaction
-                transaction = CreditTransaction(
-                    user_id=user.id,
-                    amount=-segments_needed,
-                    transaction_type="video_generation",
-                    description=f"Video generation: {duration}s ({segments_needed} segments)"
-                )
-                db.add(transaction)
-                db.commit()
+                credit_service.settle_hold(db, hold.id)
+                db.refresh(user)
                 
                 video_url = result.get("video_url")
                 await self._send_video_message(sender_id, video_url, 
                     f"✅ Video generated successfully!\nCredits used: {segments_needed}\nRemaining credits: {user.credits}")
             else:
+                credit_service.release_hold(db, hold.id)
                 await self._send_message(sender_id, f"❌ Video generation failed: {result.get('error', 'Unknown error')}")
                 
         except Exception as e:
@@ -0,0 +1,83 @@
+"""
+Follow a creation task from a bot without polling.
+
+Subscribes once to the API's SSE stream (GET /creations/{task_id}/events) and
+falls back to slow polling only if the stream is unavailable.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+FALLBACK_POLL_SECONDS = 3
+
+
+async def watch_task(api_base: str, task_id: str, token: str,
+                     timeout: float = 600) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield status snapshots for a task until it reaches a terminal status.
+
+    Every yielded dict has "status" and "elapsed" (seconds since watching
+    started); keep-alives re-yield the last known status with "heartbeat": True
+    so callers can refresh progress messages. The generator simply ends if the
+    timeout passes first.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    last: Dict[str, Any] = {"task_id": task_id, "status": "pending"}
+    headers = {'Cookie': f'access_token={token}', 'Accept': 'text/event-stream'}
+
+    def stamp(event: Dict[str, Any]) -> Dict[str, Any]:
+        return {**event, "elapsed": int(loop.time() - started)}
+
+    try:
+        client_timeout = aiohttp.ClientTimeout(total=timeout, sock_read=60)
+        async with aiohttp.ClientSession(timeout=client_timeout) as session:
+            async with session.get(f"{api_base}/creations/{task_id}/events", headers=headers) as response:
+                if response.status == 200:
+                    data_lines = []
+                    async for raw_line in response.content:
+                        line = raw_line.decode().rstrip('\r\n')
+                        if line.startswith(':'):
+                            yield stamp({**last, "heartbeat": True})
+                        elif line.startswith('data:'):
+                            data_lines.append(line[5:].strip())
+                        elif not line and data_lines:
+                            last = json.loads('\n'.join(data_lines))
+                            data_lines = []
+                            yield stamp(last)
+                            if last.get('status') in TERMINAL_STATUSES:
+                                return
+                else:
+                    logger.warning(f"Status stream unavailable for task {task_id}: HTTP {response.status}")
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.warning(f"Status stream for task {task_id} interrupted: {e}")
+
+    # Fallback: poll the task until done
+    async with aiohttp.ClientSession() as session:
+        while loop.time() - started < timeout:
+            try:
+                async with session.get(f"{api_base}/creations/{task_id}", headers={'Cookie': f'access_token={token}'}) as response:
+                    if response.status == 200:
+                        last = await response.json()
+                        yield stamp(last)
+                        if last.get('status') in TERMINAL_STATUSES:
+                            return
+            except aiohttp.ClientError as e:
+                logger.error(f"Status poll failed for task {task_id}: {e}")
+            await asyncio.sleep(FALLBACK_POLL_SECONDS)
+
+
+async def wait_for_task(api_base: str, task_id: str, token: str,
+                        timeout: float = 600) -> Optional[Dict[str, Any]]:
+    """Block until a task finishes; returns its last snapshot, or None on timeout"""
+    async for event in watch_task(api_base, task_id, token, timeout):
+        if event.get('status') in TERMINAL_STATUSES:
+            return event
+    return None
@@ -15,6 +15,8 @@ from typing import Optional, Dict, Any
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
 
+from app.bots.task_watcher import watch_task
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -298,16 +300,14 @@ Generating your video...
 
     task_id = task_response.get('id')
 
-    # Poll for completion
-    max_attempts = 600  # 10 minutes for longer videos
-    for attempt in range(max_attempts):
-        await asyncio.sleep(1)
-
-        status_response = await creator_bot.api_request('GET', f'/creations/{task_id}', token)
-        if not status_response:
-            continue
-
-        status = status_response.get('status')
+    # Follow pushed status updates (one subscription instead of polling)
+    last_progress_update = 0
+    async for event in watch_task(creator_bot.api_base, task_id, token, timeout=600):
+        status = event.get('status')
+        elapsed = event['elapsed']
+        if status in ('completed', 'failed'):
+            # One full read for output links / error details
+            status_response = await creator_bot.api_request('GET', f'/creations/{task_id}', token) or event
 
         if status == 'completed':
             output_assets = status_response.get('output_assets', [])
@@ -346,7 +346,8 @@ Your video is ready for download!
             return
 
         # Update progress every 10 seconds
-        if attempt % 10 == 0:
+        if elapsed - last_progress_update >= 10:
+            last_progress_update = elapsed
             progress_text = f"""
 🎬 **Video Generation in Progress**
 
@@ -354,7 +355,7 @@ Prompt: {prompt[:500]}
 Duration: {duration} seconds
 Model: Run-3 Alpha
 
-⏳ Still generating... ({attempt}s elapsed)
+⏳ Still generating... ({elapsed}s elapsed)
 """
             await message.edit_text(progress_text, parse_mode='Markdown')
 
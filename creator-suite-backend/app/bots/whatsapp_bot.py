@@ -18,6 +18,8 @@ from fastapi.responses import JSONResponse
 import uvicorn
 from datetime import datetime
 
+from app.bots.task_watcher import watch_task
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -393,20 +395,18 @@ This may take 1-3 minutes."""
         self.user_states[phone_number] = "authenticated"
 
     async def poll_video_generation(self, phone_number: str, task_id: str, prompt: str, duration: int) -> None:
-        """Poll for video generation completion"""
+        """Follow video generation until it completes"""
         token = self.user_sessions.get(phone_number)
         if not token:
             return
         
-        max_attempts = 600  # 10 minutes for longer videos
-        for attempt in range(max_attempts):
-            await asyncio.sleep(1)
-            
-            status_response = await self.api_request('GET', f'/creations/{task_id}', token)
-            if not status_response:
-                continue
-                
-            status = status_response.get('status')
+        last_progress_update = 0
+        async for event in watch_task(self.api_base, task_id, token, timeout=600):
+            status = event.get('status')
+            elapsed = event['elapsed']
+            if status in ('completed', 'failed'):
+                # One full read for output links / error details
+                status_response = await self.api_request('GET', f'/creations/{task_id}', token) or event
             
             if status == 'completed':
                 output_assets = status_response.get('output_assets', [])
@@ -452,10 +452,11 @@ Your video is ready!"""
                 return
             
             # Update progress every 30 seconds
-            if attempt % 30 == 0 and attempt > 0:
+            if elapsed - last_progress_update >= 30:
+                last_progress_update = elapsed
                 progress_message = f"""🎬 *Still Generating...*
 
-⏳ {attempt}s elapsed
+⏳ {elapsed}s elapsed
 Your video will be ready soon!"""
                 await self.send_whatsapp_message(phone_number, progress_message)
         
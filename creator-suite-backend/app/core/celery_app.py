@@ -1,6 +1,24 @@
+import importlib
+import logging
 import os
+import sys
+import threading
+import time
+from typing import Iterable, List, Optional
+
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import (
+    before_task_publish, celeryd_init, setup_logging, task_postrun, task_prerun, worker_init, worker_process_init,
+    worker_process_shutdown, worker_ready,
+)
 from app.core.config import settings
+from app.core.metrics import mark_process_dead, observe_task, start_worker_exporter
+from app.core.structured_logging import configure_logging, new_log_context, reset_log_context
+from app.core.tracing import configure_tracing, end_task_span, inject_task_headers, start_task_span
+from app.services.autoscaler import record_task_runtime
+
+logger = logging.getLogger(__name__)
 
 # Create Celery instance
 celery_app = Celery("creator_suite")
@@ -62,6 +80,8 @@ celery_app.conf.update(
     # Error Handling
     task_reject_on_worker_lost=True,
     task_acks_late=True,  # Acknowledge after task completion
+    # A lost worker's message is re-delivered after this; the generation resumes its persisted prediction
+    broker_transport_options={"visibility_timeout": settings.BROKER_VISIBILITY_TIMEOUT_SECONDS},
     
     # Memory Management
     worker_max_memory_per_child=2048000,  # 2GB memory limit per worker
@@ -121,20 +141,254 @@ celery_app.conf.task_routes = {
         'queue': 'bot_messages',
         'priority': 9,  # Highest priority
         'routing_key': 'bot.messages'
+    },
+
+    # Periodic maintenance (beat)
+    'refresh_admin_rollups': {
+        'queue': 'default',
+        'priority': 3,
+        'routing_key': 'default'
+    },
+    'maintain_task_partitions': {
+        'queue': 'default',
+        'priority': 3,
+        'routing_key': 'default'
+    },
+    'archive_creation_tasks': {
+        'queue': 'default',
+        'priority': 1,
+        'routing_key': 'default'
+    },
+    'release_expired_credit_holds': {
+        'queue': 'default',
+        'priority': 5,
+        'routing_key': 'default'
+    },
+    'reconcile_credit_totals': {
+        'queue': 'default',
+        'priority': 1,
+        'routing_key': 'default'
+    },
+    'sweep_stuck_creation_tasks': {
+        'queue': 'default',
+        'priority': 6,
+        'routing_key': 'default'
     }
 }
 
-# Auto-discover tasks
-celery_app.conf.update(
-    imports=[
-        "app.creator_suite.video.tasks.minimax_tasks",
-        "app.creator_suite.video.tasks.hailuo_02_tasks", 
-        "app.creator_suite.video.tasks.veo_3_tasks",
-        "app.creator_suite.video.tasks.runway_tasks",
-        "app.creator_suite.video.tasks.long_video_tasks",
-        "app.creator_suite.image.tasks.imagen_4_ultra_tasks",
-        "app.creator_suite.image.tasks.openai_dalle_tasks",
-        "app.creator_suite.utils.tasks.media_tasks",
-        "app.bots.tasks.message_tasks",
+# Periodic tasks (run with: celery -A celery_worker beat)
+celery_app.conf.beat_schedule = {
+    'refresh-admin-rollups': {
+        'task': 'refresh_admin_rollups',
+        'schedule': crontab(minute='*/5'),
+    },
+    # Catch late changes to older days (deleted feedback, late completions)
+    'refresh-admin-rollups-nightly': {
+        'task': 'refresh_admin_rollups',
+        'schedule': crontab(hour=3, minute=15),
+        'kwargs': {'days': 35},
+    },
+    # Daily so a missed run never lets inserts spill into the default partition
+    'maintain-task-partitions': {
+        'task': 'maintain_task_partitions',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'archive-creation-tasks': {
+        'task': 'archive_creation_tasks',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    # Returns credits reserved by tasks that never reported back
+    'release-expired-credit-holds': {
+        'task': 'release_expired_credit_holds',
+        'schedule': crontab(minute=20),
+    },
+    'reconcile-credit-totals': {
+        'task': 'reconcile_credit_totals',
+        'schedule': crontab(hour=3, minute=45),
+    },
+    # Also sent whenever a worker starts (see _sweep_stuck_tasks_on_start)
+    'sweep-stuck-creation-tasks': {
+        'task': 'sweep_stuck_creation_tasks',
+        'schedule': crontab(minute='*/10'),
+    },
+}
+
+# Task modules and the Celery tasks they register. A worker imports the modules with a task
+# routed to one of its queues (see _import_queue_task_modules), so a video_minimax worker never
+# loads the other providers. minimax_tasks must stay ahead of sequential_tasks, which registers
+# generate_minimax_video again: the first registration wins
+TASK_MODULES = {
+    "app.creator_suite.video.tasks.minimax_tasks": ["generate_minimax_video"],
+    "app.creator_suite.video.tasks.hailuo_02_tasks": ["generate_hailuo_02_video", "cancel_hailuo_02_generation"],
+    "app.creator_suite.video.tasks.veo_3_tasks": ["generate_veo_3_video", "cancel_veo_3_generation"],
+    "app.creator_suite.video.tasks.sequential_tasks": [
+        "generate_veo3_video", "generate_runway_video", "generate_hailuo_video",
+    ],
+    "app.creator_suite.video.tasks.runway_gen4_video_tasks": [
+        "generate_runway_gen4_video", "cancel_runway_gen4_video_generation",
+    ],
+    "app.creator_suite.video.tasks.magic_hour_tasks": [
+        "generate_magic_hour_video", "cancel_magic_hour_video_generation",
+    ],
+    "app.creator_suite.video.tasks.long_video_tasks": [
+        "generate_long_video", "pause_long_video_generation", "resume_long_video_generation",
+        "assemble_long_video", "regenerate_long_video_segments", "splice_edited_long_video",
+        "handle_long_video_segment_failure",
+    ],
+    "app.creator_suite.image.tasks.imagen_4_ultra_tasks": [
+        "generate_imagen_4_ultra_image", "cancel_imagen_4_ultra_generation",
+    ],
+    "app.creator_suite.image.tasks.openai_dalle_tasks": ["generate_openai_dalle_image"],
+    "app.creator_suite.image.tasks.runway_gen4_image_tasks": [
+        "generate_runway_gen4_image", "cancel_runway_gen4_generation",
+    ],
+    "app.creator_suite.image.tasks.magic_hour_image_tasks": [
+        "generate_magic_hour_image", "cancel_magic_hour_generation",
+    ],
+    "app.tasks.maintenance_tasks": [
+        "refresh_admin_rollups", "maintain_task_partitions", "archive_creation_tasks",
+        "release_expired_credit_holds", "reconcile_credit_totals", "sweep_stuck_creation_tasks",
+    ],
+}
+
+
+def worker_task_modules(queues: Optional[Iterable[str]] = None) -> List[str]:
+    """Task modules a worker consuming queues needs (all of them without queues)"""
+    if not queues or not settings.WORKER_QUEUE_SCOPED_IMPORTS:
+        return list(TASK_MODULES)
+    queues = set(queues)
+    routes = celery_app.conf.task_routes
+    default_queue = celery_app.conf.task_default_queue
+    return [
+        module for module, task_names in TASK_MODULES.items()
+        if any(routes.get(name, {}).get("queue", default_queue) in queues for name in task_names)
     ]
-)
\ No newline at end of file
+
+
+_imported_task_modules = {}
+
+
+@celeryd_init.connect
+def _import_queue_task_modules(sender=None, options=None, **kwargs):
+    # Imported here rather than through conf.imports, which cannot see the worker's -Q
+    queues = (options or {}).get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    modules = worker_task_modules(queues)
+    for module in modules:
+        importlib.import_module(module)
+    _imported_task_modules.update(queues=",".join(queues) or "all queues", modules=modules)
+
+
+@worker_ready.connect
+def _log_task_modules(sender=None, **kwargs):
+    # Logging is only configured after celeryd_init
+    if _imported_task_modules:
+        logger.info("Worker serving %s imported %s task modules: %s", _imported_task_modules["queues"],
+                    len(_imported_task_modules["modules"]), ", ".join(_imported_task_modules["modules"]))
+
+
+@setup_logging.connect
+def _configure_worker_logging(**kwargs):
+    # Connecting this signal stops Celery from installing its own root handlers
+    configure_logging()
+
+
+_task_log_contexts = {}
+
+
+@task_prerun.connect
+def _open_task_context(task_id=None, task=None, args=None, kwargs=None, **extra):
+    # Generation tasks take the creation task id as their first argument
+    creation_task_id = (kwargs or {}).get("task_id")
+    if creation_task_id is None and args and isinstance(args[0], str):
+        creation_task_id = args[0]
+    _task_log_contexts[task_id] = new_log_context(
+        celery_task_id=task_id, task_name=getattr(task, "name", None), task_id=creation_task_id,
+    )
+    start_task_span(task_id, task, creation_task_id)
+
+
+@task_postrun.connect
+def _close_task_context(task_id=None, state=None, **extra):
+    end_task_span(task_id, state)
+    token = _task_log_contexts.pop(task_id, None)
+    if token is not None:
+        reset_log_context(token)
+
+
+@worker_init.connect
+def _configure_worker_tracing(**kwargs):
+    configure_tracing("creator-suite-worker")
+
+
+@before_task_publish.connect
+def _propagate_trace_context(headers=None, **kwargs):
+    inject_task_headers(headers)
+
+
+@worker_ready.connect
+def _start_metrics_exporter(**kwargs):
+    if settings.CELERY_METRICS_PORT:
+        start_worker_exporter(settings.CELERY_METRICS_PORT)
+
+
+@worker_ready.connect
+def _sweep_stuck_tasks_on_start(sender=None, **kwargs):
+    # A (re)started worker may be replacing one that died mid-generation. Sent rather than run
+    # here: the sweep inspects the workers, this one included, which cannot reply from this handler
+    try:
+        celery_app.send_task("sweep_stuck_creation_tasks", countdown=30)
+    except Exception as e:
+        logger.warning("Could not schedule the stuck task sweep: %s", e)
+
+
+def _warm_process_state(forked_at: float):
+    from app.core.task_events import get_redis
+    from app.db.session import engine
+
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+        get_redis().ping()
+    except Exception as e:
+        logger.warning("Worker process warm-up failed: %s", e)
+    logger.info("Worker process %s ready %.0f ms after fork (warm-up %.0f ms, %s modules)",
+                os.getpid(), (time.time() - forked_at) * 1000, (time.perf_counter() - started) * 1000,
+                len(sys.modules))
+
+
+@worker_process_init.connect
+def _start_process_warm_up(**kwargs):
+    # Prefork children inherit the parent's modules and settings, not its connections: drop any
+    # the parent opened and connect this child's database pool and Redis before its first task.
+    # In a thread, since the child is replaced if this handler outlasts worker_proc_alive_timeout
+    import psutil
+    from app.db.session import engine
+
+    engine.dispose(close=False)
+    forked_at = psutil.Process().create_time()
+    threading.Thread(target=_warm_process_state, args=(forked_at,), name="process-warm-up", daemon=True).start()
+
+
+@worker_process_shutdown.connect
+def _retire_process_metrics(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def _start_task_timer(task_id=None, **extra):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _observe_task_runtime(task_id=None, task=None, state=None, **extra):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        seconds = time.perf_counter() - started
+        observe_task(getattr(task, "name", ""), state, seconds)
+        record_task_runtime(getattr(task, "name", ""), seconds)
@@ -16,6 +16,24 @@ class Settings(BaseSettings):
     DB_NAME: str = os.getenv("DB_NAME")
     DB_USER: str = os.getenv("DB_USER")
     DB_PASS: str = os.getenv("DB_PASS")
+    # Engine profile of this process: api, worker, bot or admin (see app/db/session.py)
+    DB_ROLE: str = os.getenv("DB_ROLE", "api")
+    # Set when connecting through PgBouncer in transaction pooling mode
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+    # Optional overrides of the role's pool size
+    DB_POOL_SIZE: Optional[int] = int(os.getenv("DB_POOL_SIZE")) if os.getenv("DB_POOL_SIZE") else None
+    DB_MAX_OVERFLOW: Optional[int] = int(os.getenv("DB_MAX_OVERFLOW")) if os.getenv("DB_MAX_OVERFLOW") else None
+    # Read replica for reporting and gallery queries (see app/db/replica.py)
+    DB_REPLICA_HOST: Optional[str] = os.getenv("DB_REPLICA_HOST")
+    DB_REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+    DB_REPLICA_SIMULATED_LAG_SECONDS: float = float(os.getenv("DB_REPLICA_SIMULATED_LAG_SECONDS", "0"))
+    # creation_tasks partitioning and cold storage (see app/services/task_archive.py)
+    TASK_PARTITION_MONTHS_AHEAD: int = int(os.getenv("TASK_PARTITION_MONTHS_AHEAD", "3"))
+    TASK_ARCHIVE_AFTER_DAYS: int = int(os.getenv("TASK_ARCHIVE_AFTER_DAYS", "90"))
+
+    # Authenticated-principal cache (see app/services/principal.py)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+    PRINCIPAL_CACHE_MAX_USERS: int = int(os.getenv("PRINCIPAL_CACHE_MAX_USERS", "10000"))
     
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY")
@@ -41,6 +59,8 @@ class Settings(BaseSettings):
     
     # Replicate API settings
     REPLICATE_API_TOKEN: Optional[str] = os.getenv("REPLICATE_API_TOKEN")
+    # Overridden to point workers at a fake Replicate (scripts/kill_test_prediction_resume.py)
+    REPLICATE_API_URL: str = os.getenv("REPLICATE_API_URL", "https://api.replicate.com/v1")
     
     # Azure Storage settings
     AZURE_STORAGE_CONNECTION_STRING: str = os.getenv(
@@ -58,6 +78,59 @@ class Settings(BaseSettings):
     # Additional optional settings (to prevent pydantic errors)
     DEBUG: Optional[str] = os.getenv("DEBUG", "false")
     LOG_LEVEL: Optional[str] = os.getenv("LOG_LEVEL", "INFO")
+    # Per-logger levels, e.g. "app.api=DEBUG,uvicorn.access=WARNING"
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    # "json" (one object per line) or "text"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    # DEBUG records let through per logger/message and minute before sampling starts
+    LOG_DEBUG_BURST_PER_MINUTE: int = int(os.getenv("LOG_DEBUG_BURST_PER_MINUTE", "20"))
+    # Fraction of DEBUG records kept once a call site is past its burst
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))
+    # Records buffered for the log writer thread; further records are dropped
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Port a Celery worker serves Prometheus metrics on (0 disables)
+    CELERY_METRICS_PORT: int = int(os.getenv("CELERY_METRICS_PORT", "0"))
+    # A worker started with -Q imports only the task modules routed to its queues; false imports them all
+    WORKER_QUEUE_SCOPED_IMPORTS: bool = os.getenv("WORKER_QUEUE_SCOPED_IMPORTS", "true").lower() == "true"
+    # Span export: "none", "otlp" (collector at TRACING_OTLP_ENDPOINT) or "file" (JSON lines)
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_OTLP_ENDPOINT: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_FILE_PATH: str = os.getenv("TRACING_FILE_PATH", "traces.jsonl")
+    # Fraction of new traces recorded (child spans follow their parent's decision)
+    TRACING_SAMPLE_RATIO: float = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+    # How long a task's stage timeline is kept in Redis
+    TASK_TIMELINE_TTL_SECONDS: int = int(os.getenv("TASK_TIMELINE_TTL_SECONDS", str(7 * 24 * 3600)))
+    # Worker autoscaler (scripts/autoscale_workers.py): seconds between scaling decisions
+    AUTOSCALE_INTERVAL_SECONDS: float = float(os.getenv("AUTOSCALE_INTERVAL_SECONDS", "15"))
+    # Longest a task should wait in its queue before a worker picks it up
+    AUTOSCALE_TARGET_WAIT_SECONDS: float = float(os.getenv("AUTOSCALE_TARGET_WAIT_SECONDS", "60"))
+    # Share of the time workers are expected to be busy at steady state
+    AUTOSCALE_TARGET_UTILIZATION: float = float(os.getenv("AUTOSCALE_TARGET_UTILIZATION", "0.8"))
+    # Workers per queue, unless AUTOSCALE_POOL_LIMITS says otherwise ("video_runway=1:6,bot_messages=2:4")
+    AUTOSCALE_MIN_WORKERS: int = int(os.getenv("AUTOSCALE_MIN_WORKERS", "1"))
+    AUTOSCALE_MAX_WORKERS: int = int(os.getenv("AUTOSCALE_MAX_WORKERS", "4"))
+    AUTOSCALE_POOL_LIMITS: str = os.getenv("AUTOSCALE_POOL_LIMITS", "")
+    # How long a pool must want fewer workers before one is drained
+    AUTOSCALE_SCALE_DOWN_DELAY_SECONDS: float = float(os.getenv("AUTOSCALE_SCALE_DOWN_DELAY_SECONDS", "300"))
+    # Recent task runtimes kept per queue, and the runtime assumed before any is recorded
+    AUTOSCALE_RUNTIME_SAMPLES: int = int(os.getenv("AUTOSCALE_RUNTIME_SAMPLES", "50"))
+    AUTOSCALE_DEFAULT_RUNTIME_SECONDS: float = float(os.getenv("AUTOSCALE_DEFAULT_RUNTIME_SECONDS", "120"))
+    # Generation retries (app/creator_suite/retry_policy.py): attempts after the first, and the
+    # backoff before retry n, drawn from [d/2, d] with d = base * 2**n capped at the max
+    GENERATION_MAX_RETRIES: int = int(os.getenv("GENERATION_MAX_RETRIES", "3"))
+    GENERATION_RETRY_BASE_SECONDS: float = float(os.getenv("GENERATION_RETRY_BASE_SECONDS", "15"))
+    GENERATION_RETRY_MAX_SECONDS: float = float(os.getenv("GENERATION_RETRY_MAX_SECONDS", "600"))
+    # Backoff base when the provider rate limited us (429)
+    GENERATION_RATE_LIMIT_BASE_SECONDS: float = float(os.getenv("GENERATION_RATE_LIMIT_BASE_SECONDS", "60"))
+    # Failed generations kept in the dead-letter list (scripts/replay_dead_letters.py)
+    DEAD_LETTER_MAX_ENTRIES: int = int(os.getenv("DEAD_LETTER_MAX_ENTRIES", "10000"))
+    # Seconds before the broker re-delivers the unacknowledged message of a lost worker;
+    # must exceed the longest task time limit plus retry countdown, or running tasks get re-delivered
+    BROKER_VISIBILITY_TIMEOUT_SECONDS: int = int(os.getenv("BROKER_VISIBILITY_TIMEOUT_SECONDS", str(2 * 3600)))
+    # Stuck task sweeper (app/services/stuck_tasks.py): processing tasks untouched this long whose
+    # message no worker or queue holds are resumed or failed; at most one sweep per interval
+    STUCK_TASK_AFTER_SECONDS: float = float(os.getenv("STUCK_TASK_AFTER_SECONDS", "600"))
+    STUCK_TASK_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("STUCK_TASK_SWEEP_INTERVAL_SECONDS", "300"))
     ENVIRONMENT: Optional[str] = os.getenv("ENVIRONMENT", "development")
     ALLOWED_ORIGINS: Optional[str] = os.getenv("ALLOWED_ORIGINS")
     FRONTEND_URL: Optional[str] = os.getenv("FRONTEND_URL")
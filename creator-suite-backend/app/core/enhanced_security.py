@@ -4,6 +4,7 @@ import hashlib
 import hmac
 import base64
 import json
+from functools import cached_property
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import pyotp
@@ -11,7 +12,6 @@ from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import redis
-import geoip2.database
 import user_agents
 
 from app.core.config import settings
@@ -22,7 +22,11 @@ class EnhancedSecurity:
 
     def __init__(self):
         self.redis_client = redis.from_url(settings.REDIS_URL)
-        self.encryption_key = self._derive_key(settings.SECRET_KEY)
+
+    @cached_property
+    def encryption_key(self) -> bytes:
+        # Derived on first encrypt/decrypt: 100k PBKDF2 iterations would otherwise run at import
+        return self._derive_key(settings.SECRET_KEY)
 
     def _derive_key(self, password: str) -> bytes:
         """Derive encryption key from password"""
@@ -90,8 +94,8 @@ class EnhancedSecurity:
 class MFAManager:
     """Multi-Factor Authentication Manager"""
 
-    def __init__(self):
-        self.security = EnhancedSecurity()
+    def __init__(self, security: Optional[EnhancedSecurity] = None):
+        self.security = security or EnhancedSecurity()
 
     def generate_totp_secret(self) -> str:
         """Generate a new TOTP secret"""
@@ -137,8 +141,8 @@ class MFAManager:
 class SessionManager:
     """Session management utilities"""
 
-    def __init__(self):
-        self.security = EnhancedSecurity()
+    def __init__(self, security: Optional[EnhancedSecurity] = None):
+        self.security = security or EnhancedSecurity()
         self.max_concurrent_sessions = 5
 
     def create_session(self, user_id: int, device_info: Dict[str, Any],
@@ -210,8 +214,8 @@ class SessionManager:
 class RateLimitManager:
     """Rate limiting manager using Redis"""
 
-    def __init__(self):
-        self.security = EnhancedSecurity()
+    def __init__(self, security: Optional[EnhancedSecurity] = None):
+        self.security = security or EnhancedSecurity()
 
     def check_rate_limit(self, identifier: str, limit_type: str,
                         max_requests: int = 100, window_seconds: int = 60) -> tuple[bool, int]:
@@ -258,8 +262,8 @@ class RateLimitManager:
 class AuditLogger:
     """Audit logging system"""
 
-    def __init__(self):
-        self.security = EnhancedSecurity()
+    def __init__(self, security: Optional[EnhancedSecurity] = None):
+        self.security = security or EnhancedSecurity()
 
     def log_activity(self, user_id: Optional[int], action: str,
                     resource: Optional[str] = None, resource_id: Optional[int] = None,
@@ -292,9 +296,9 @@ class AuditLogger:
         return log_entry
 
 
-# Global instances
+# Global instances (sharing one Redis client and encryption key)
 security_manager = EnhancedSecurity()
-mfa_manager = MFAManager()
-session_manager = SessionManager()
-rate_limit_manager = RateLimitManager()
-audit_logger = AuditLogger()
+mfa_manager = MFAManager(security_manager)
+session_manager = SessionManager(security_manager)
+rate_limit_manager = RateLimitManager(security_manager)
+audit_logger = AuditLogger(security_manager)
@@ -0,0 +1,272 @@
+"""
+Prometheus metrics for the API, the Celery workers and the providers.
+
+The API serves them on GET /metrics. A Celery worker serves its own on
+CELERY_METRICS_PORT. Its tasks run in pool child processes, so workers use
+prometheus_client's multiprocess mode (PROMETHEUS_MULTIPROC_DIR; set up by
+celery_worker.py). The API uses the same mode when PROMETHEUS_MULTIPROC_DIR
+is set for it, e.g. under several uvicorn workers.
+
+The API's /metrics also collects, on scrape, the SQLAlchemy pool usage of
+the serving process and the depth of every Celery queue in task_routes
+(Redis list lengths, summed over the priority sub-queues).
+"""
+
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+import redis
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+    start_http_server,
+)
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.task_events import get_redis
+from app.core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+# kombu's Redis transport keeps each priority step of a queue in its own list
+_PRIORITY_SEPARATOR = "\x06\x16"
+_PRIORITY_STEPS = (3, 6, 9)
+_GENERATION_TASK = re.compile(r"^generate_(.+)_(?:video|image)$")
+# Provider generations take minutes; the default buckets stop at 10s
+_LONG_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 2400, 3600)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "API request latency by route template",
+    ["method", "route", "status"],
+)
+TASK_SECONDS = Histogram(
+    "celery_task_duration_seconds", "Celery task runtime",
+    ["task", "model", "state"], buckets=_LONG_BUCKETS,
+)
+PROVIDER_REQUEST_SECONDS = Histogram(
+    "provider_http_request_duration_seconds", "Latency of HTTP calls to generation providers",
+    ["provider", "method", "status"],
+)
+MEDIA_STAGE_SECONDS = Histogram(
+    "media_stage_duration_seconds", "MediaProcessor stage durations",
+    ["stage"], buckets=_LONG_BUCKETS,
+)
+MEDIA_BYTES = Counter(
+    "media_bytes_total", "Media bytes downloaded from providers and written to storage",
+    ["direction"],
+)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(seconds)
+
+
+def task_model(task_name: str) -> str:
+    """Provider model a generation task runs, from its name: generate_hailuo_02_video -> hailuo_02"""
+    match = _GENERATION_TASK.match(task_name or "")
+    return match.group(1) if match else ""
+
+
+def observe_task(task_name: str, state: str, seconds: float) -> None:
+    TASK_SECONDS.labels(task_name, task_model(task_name), state or "UNKNOWN").observe(seconds)
+
+
+@contextmanager
+def media_stage(stage: str):
+    """Time and trace a MediaProcessor stage (download, thumbnail, normalize, splice, ...)"""
+    started = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(f"media.{stage}", attributes={"media.stage": stage}):
+            yield
+    finally:
+        MEDIA_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+
+def count_media_bytes(direction: str, size: Optional[int]) -> None:
+    """direction is "downloaded" or "stored\""""
+    if size:
+        MEDIA_BYTES.labels(direction).inc(size)
+
+
+def count_stored_file(path) -> None:
+    try:
+        count_media_bytes("stored", os.path.getsize(path))
+    except OSError:
+        pass
+
+
+class ProviderTransport(httpx.AsyncHTTPTransport):
+    """httpx transport recording latency and status code (or "error") of each provider call, with a span per call"""
+
+    def __init__(self, provider: str, **kwargs):
+        super().__init__(**kwargs)
+        self.provider = provider
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            with tracer.start_as_current_span(
+                "provider.http", kind=SpanKind.CLIENT,
+                attributes={"provider": self.provider, "http.method": request.method},
+            ) as span:
+                response = await super().handle_async_request(request)
+                status = str(response.status_code)
+                span.set_attribute("http.status_code", response.status_code)
+                if response.status_code >= 400:
+                    span.set_status(Status(StatusCode.ERROR))
+                return response
+        finally:
+            PROVIDER_REQUEST_SECONDS.labels(self.provider, request.method, status).observe(
+                time.perf_counter() - started
+            )
+
+
+def provider_transport(provider: str) -> ProviderTransport:
+    """Transport for a provider's httpx.AsyncClient"""
+    return ProviderTransport(provider)
+
+
+class DatabasePoolCollector:
+    """Connections of this process's SQLAlchemy pools"""
+
+    def collect(self):
+        from app.db import session as db_session
+
+        gauge = GaugeMetricFamily(
+            "db_pool_connections", "SQLAlchemy pool connections by state", labels=["engine", "state"],
+        )
+        engines = {"sync": db_session.engine}
+        if db_session._async_engine is not None:
+            engines["async"] = db_session._async_engine.sync_engine
+        for name, role_engine in engines.items():
+            status = db_session.pool_status(role_engine)
+            for state in ("size", "checked_in", "checked_out", "overflow"):
+                if state in status:
+                    gauge.add_metric([name, state], status[state])
+        yield gauge
+
+
+class QueueDepthCollector:
+    """Messages waiting in each Celery queue"""
+
+    def __init__(self, queues: Iterable[str]):
+        self.queues = sorted(set(queues))
+
+    def collect(self):
+        gauge = GaugeMetricFamily("celery_queue_depth", "Messages waiting in a Celery queue", labels=["queue"])
+        try:
+            depths = queue_depths(self.queues)
+        except redis.RedisError as e:
+            logger.warning("Queue depth unavailable: %s", e)
+            return
+        for queue, depth in depths.items():
+            gauge.add_metric([queue], depth)
+        yield gauge
+
+
+def queue_keys(queue: str) -> List[str]:
+    """Redis lists holding a queue's messages: the queue itself and its priority sub-queues"""
+    return [queue] + [f"{queue}{_PRIORITY_SEPARATOR}{step}" for step in _PRIORITY_STEPS]
+
+
+def queue_depths(queues: Iterable[str]) -> Dict[str, int]:
+    """Messages waiting in each queue, priority sub-queues included (raises redis.RedisError)"""
+    queues = list(queues)
+    pipe = get_redis().pipeline(transaction=False)
+    for queue in queues:
+        for key in queue_keys(queue):
+            pipe.llen(key)
+    lengths = pipe.execute()
+    per_queue = len(_PRIORITY_STEPS) + 1
+    return {queue: sum(lengths[i * per_queue:(i + 1) * per_queue]) for i, queue in enumerate(queues)}
+
+
+def celery_queues() -> Iterable[str]:
+    from app.core.celery_app import celery_app
+
+    routes: Dict[str, dict] = celery_app.conf.task_routes or {}
+    return {route["queue"] for route in routes.values() if "queue" in route} | {celery_app.conf.task_default_queue}
+
+
+def _process_registry() -> CollectorRegistry:
+    """Registry with the metrics of this process, or of every process sharing PROMETHEUS_MULTIPROC_DIR"""
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+_api_registry: Optional[CollectorRegistry] = None
+
+
+def render_metrics():
+    """Body and content type of the API's /metrics response"""
+    global _api_registry
+    if _api_registry is None:
+        _api_registry = _process_registry()
+        _api_registry.register(DatabasePoolCollector())
+        _api_registry.register(QueueDepthCollector(celery_queues()))
+    return generate_latest(_api_registry), CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(port: int) -> None:
+    """Serve the task, provider and media metrics of this worker's pool processes on port"""
+    start_http_server(port, registry=_process_registry())
+
+
+def mark_process_dead(pid: int) -> None:
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request under its route template"""
+
+    def __init__(self, app):
+        self.app = app
+        self._endpoint_routes: Optional[Dict[object, str]] = None
+
+    def _route_template(self, scope) -> str:
+        route = scope.get("route")
+        template = getattr(route, "path_format", None) or getattr(route, "path", None)
+        if template:
+            return template
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            # Unmatched paths are not labelled individually (unbounded cardinality)
+            return "unmatched"
+        if self._endpoint_routes is None:
+            app = scope.get("app")
+            # Mounts (static files) carry their app as the endpoint
+            self._endpoint_routes = {
+                getattr(r, "endpoint", None) or getattr(r, "app", None): getattr(r, "path_format", None) or r.path
+                for r in getattr(getattr(app, "router", None), "routes", ())
+            }
+        return self._endpoint_routes.get(endpoint) or "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            observe_request(scope["method"], self._route_template(scope), status, time.perf_counter() - started)
@@ -1,3 +1,4 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import Any, Union
 
@@ -16,7 +17,11 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
         expire = datetime.utcnow() + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
-    to_encode = {"exp": expire, "sub": str(subject), "is_admin": is_admin}
+    # iat/jti identify the token in the principal cache (app/services/principal.py)
+    to_encode = {
+        "exp": expire, "iat": datetime.utcnow(), "jti": uuid.uuid4().hex,
+        "sub": str(subject), "is_admin": is_admin,
+    }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
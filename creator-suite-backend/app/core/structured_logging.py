@@ -0,0 +1,281 @@
+"""
+Structured logging for the API and the Celery workers.
+
+configure_logging installs one root handler: a non-blocking QueueHandler
+whose records are formatted (JSON lines by default) and written by a
+QueueListener thread, so a log call never waits on stdout. When the queue is
+full the record is dropped and counted rather than blocking the caller.
+
+Every record carries the current log context (request_id, task_id, user_id
+and whatever else was bound): RequestContextMiddleware opens a context per
+HTTP request, the Celery task_prerun/task_postrun handlers one per task, and
+bind_log_context adds fields to it.
+
+DEBUG records are rate limited per call site: the first LOG_DEBUG_BURST_PER_MINUTE
+of each logger/message pair per minute pass, the rest are sampled at
+LOG_DEBUG_SAMPLE_RATE. Levels are set per logger with LOG_LEVELS, e.g.
+"app.api=DEBUG,uvicorn.access=WARNING".
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar, Token
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Loggers that libraries configure with their own handlers; routed through ours instead
+_ADOPTED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access", "celery", "celery.task")
+# Attributes every LogRecord has; anything else on a record came from extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "log_context"}
+
+_exception_formatter = logging.Formatter()
+
+_log_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("log_context", default=None)
+
+
+def new_log_context(**fields) -> Token:
+    """Start a fresh log context (one per request or task); pass the token to reset_log_context"""
+    return _log_context.set({key: value for key, value in fields.items() if value is not None})
+
+
+def reset_log_context(token: Token) -> None:
+    _log_context.reset(token)
+
+
+def bind_log_context(**fields) -> None:
+    """
+    Add fields to the current log context.
+
+    The context is a dict shared by everything running for the request, so
+    fields bound in a dependency (which runs in a worker thread) are seen by
+    the endpoint too.
+    """
+    context = _log_context.get()
+    if context is None:
+        _log_context.set({key: value for key, value in fields.items() if value is not None})
+        return
+    context.update((key, value) for key, value in fields.items() if value is not None)
+
+
+def get_log_context() -> Dict[str, Any]:
+    return dict(_log_context.get() or {})
+
+
+class ContextFilter(logging.Filter):
+    """Attach a snapshot of the log context; runs in the calling thread, before the queue"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        record.log_context = dict(context) if context else {}
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Let through a burst of DEBUG records per call site and minute, then a sample of the rest"""
+
+    WINDOW_SECONDS = 60.0
+    MAX_SITES = 2000
+
+    def __init__(self, burst_per_minute: int, sample_rate: float):
+        super().__init__()
+        self.burst_per_minute = burst_per_minute
+        self.sample_rate = sample_rate
+        self._windows: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.INFO:
+            return True
+        key = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.WINDOW_SECONDS:
+                if window is None and len(self._windows) >= self.MAX_SITES:
+                    self._windows.clear()
+                window = self._windows[key] = [now, 0]
+            window[1] += 1
+            if window[1] <= self.burst_per_minute or random.random() < self.sample_rate:
+                return True
+            self.suppressed += 1
+            return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render the traceback here, but keep the traceback out of msg
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, the log context, extra= fields and exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "log_context", None) or {})
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human readable lines for local development, with the log context appended"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        context = getattr(record, "log_context", None)
+        if context:
+            line += " " + " ".join(f"{key}={value}" for key, value in context.items())
+        return line
+
+
+_queue_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_output_handler: Optional[logging.Handler] = None
+_lock = threading.Lock()
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in (spec or "").split(","):
+        name, _, level = item.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _start_listener() -> None:
+    global _listener
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, _output_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def _restart_after_fork() -> None:
+    # The listener thread does not survive fork (uvicorn workers, Celery prefork children)
+    if _queue_handler is not None:
+        _queue_handler.queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+        _start_listener()
+
+
+def configure_logging() -> None:
+    """Install the queue handler on the root logger and apply LOG_LEVEL / LOG_LEVELS; safe to call twice"""
+    global _queue_handler, _output_handler
+    with _lock:
+        if _queue_handler is not None:
+            return
+        _output_handler = logging.StreamHandler(sys.stdout)
+        _output_handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+        _queue_handler = DroppingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+        _queue_handler.addFilter(ContextFilter())
+        _queue_handler.addFilter(DebugSamplingFilter(
+            settings.LOG_DEBUG_BURST_PER_MINUTE, settings.LOG_DEBUG_SAMPLE_RATE,
+        ))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel((settings.LOG_LEVEL or "INFO").upper())
+
+        for name in _ADOPTED_LOGGERS:
+            adopted = logging.getLogger(name)
+            adopted.handlers.clear()
+            adopted.propagate = True
+        for name, level in _parse_levels(settings.LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+
+        _start_listener()
+        atexit.register(shutdown_logging)
+        os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records (stops the listener thread)"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware opening a log context per HTTP request.
+
+    Uses the caller's X-Request-ID when present (else a new one) and echoes
+    it on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers") or ():
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        header = (REQUEST_ID_HEADER.lower().encode(), request_id.encode("latin-1"))
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers") or ()) + [header]
+            await send(message)
+
+        token = new_log_context(request_id=request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            reset_log_context(token)
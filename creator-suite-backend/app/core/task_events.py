@@ -0,0 +1,257 @@
+"""
+Task status events.
+
+Every status transition of a CreationTask is mirrored into Redis:
+
+- ``task_status:{task_id}`` hash holding the latest snapshot (status, progress,
+  error, version, ...) so readers never need Postgres to know where a task is.
+- ``task_events:{task_id}`` pub/sub channel carrying the same snapshot as JSON,
+  consumed by the SSE / WebSocket endpoints.
+
+Publishing is best-effort: a Redis outage must never fail a task or a request.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TASK_STATUS_KEY = "task_status:{task_id}"
+TASK_EVENTS_CHANNEL = "task_events:{task_id}"
+TASK_STATUS_TTL_SECONDS = 7 * 24 * 60 * 60
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+_redis_client: Optional[redis.Redis] = None
+_async_redis_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Shared synchronous Redis client for publishers (API threads and Celery workers)"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Shared asyncio Redis client for async endpoints"""
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_redis_client
+
+
+def status_key(task_id: str) -> str:
+    return TASK_STATUS_KEY.format(task_id=task_id)
+
+
+def events_channel(task_id: str) -> str:
+    return TASK_EVENTS_CHANNEL.format(task_id=task_id)
+
+
+def _status_value(status: Any) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+def publish_task_event(task_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+    """
+    Merge fields into the task's status snapshot and publish the new snapshot.
+
+    Args:
+        task_id: Creation task ID
+        **fields: Snapshot fields to update (status, user_id, progress, error_message, ...)
+
+    Returns:
+        The published snapshot, or None if Redis was unavailable
+    """
+    update = {
+        key: json.dumps(_status_value(value)) for key, value in fields.items() if value is not None
+    }
+    update["updated_at"] = json.dumps(time.time())
+    key = status_key(task_id)
+
+    try:
+        client = get_redis()
+        pipe = client.pipeline()
+        pipe.hset(key, mapping=update)
+        pipe.hincrby(key, "version", 1)
+        pipe.expire(key, TASK_STATUS_TTL_SECONDS)
+        pipe.hgetall(key)
+        snapshot = decode_snapshot(task_id, pipe.execute()[-1])
+        client.publish(events_channel(task_id), json.dumps(snapshot))
+        return snapshot
+    except redis.RedisError as e:
+        logger.warning("Failed to publish status event for task %s: %s", task_id, e)
+        return None
+
+
+def decode_snapshot(task_id: str, raw: Dict[str, str]) -> Dict[str, Any]:
+    """Turn a raw ``task_status`` hash into a snapshot dict"""
+    snapshot: Dict[str, Any] = {"task_id": task_id}
+    for field, value in raw.items():
+        if field == "version":
+            snapshot["version"] = int(value)
+            continue
+        try:
+            snapshot[field] = json.loads(value)
+        except (TypeError, ValueError):
+            snapshot[field] = value
+    return snapshot
+
+
+def get_task_snapshot(task_id: str) -> Optional[Dict[str, Any]]:
+    """Latest cached snapshot for a task, or None if Redis has nothing for it"""
+    try:
+        raw = get_redis().hgetall(status_key(task_id))
+    except redis.RedisError as e:
+        logger.warning("Failed to read status snapshot for task %s: %s", task_id, e)
+        return None
+    return decode_snapshot(task_id, raw) if raw else None
+
+
+def seed_fields(snapshot: Dict[str, Any]) -> Dict[str, str]:
+    """Encode a snapshot loaded from Postgres for HSETNX into an empty/stale ``task_status`` hash"""
+    fields = {
+        key: json.dumps(_status_value(value))
+        for key, value in snapshot.items() if value is not None and key not in ("task_id", "version")
+    }
+    fields["version"] = "0"
+    return fields
+
+
+def is_terminal(snapshot: Optional[Dict[str, Any]]) -> bool:
+    return bool(snapshot) and snapshot.get("status") in TERMINAL_STATUSES
+
+
+class TaskEventHub:
+    """
+    Fan out task events from a single Redis pub/sub connection to local subscribers.
+
+    One API process holds one subscriber connection no matter how many SSE /
+    WebSocket clients are waiting; channels are subscribed on first interest
+    and dropped when the last local listener leaves.
+    """
+
+    def __init__(self, queue_size: int = 32):
+        self._queue_size = queue_size
+        self._client = None
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def _ensure_started(self) -> None:
+        if self._pubsub is None:
+            self._client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            self._pubsub = self._client.pubsub()
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def subscribe(self, task_id: str) -> asyncio.Queue:
+        """Register interest in a task; events are delivered to the returned queue"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            await self._ensure_started()
+            listeners = self._subscribers.setdefault(task_id, set())
+            if not listeners:
+                await self._pubsub.subscribe(events_channel(task_id))
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+            listeners.add(queue)
+        return queue
+
+    async def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        async with self._lock:
+            listeners = self._subscribers.get(task_id)
+            if not listeners:
+                return
+            listeners.discard(queue)
+            if not listeners:
+                del self._subscribers[task_id]
+                try:
+                    await self._pubsub.unsubscribe(events_channel(task_id))
+                except redis.RedisError as e:
+                    logger.warning("Failed to unsubscribe from task %s: %s", task_id, e)
+
+    async def snapshot(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Latest cached snapshot for a task, read without blocking the event loop"""
+        await self._ensure_started()
+        try:
+            raw = await self._client.hgetall(status_key(task_id))
+        except redis.RedisError as e:
+            logger.warning("Failed to read status snapshot for task %s: %s", task_id, e)
+            return None
+        return decode_snapshot(task_id, raw) if raw else None
+
+    async def snapshots(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached snapshots of many tasks in one round trip; tasks Redis knows nothing about are omitted"""
+        await self._ensure_started()
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for task_id in task_ids:
+                pipe.hgetall(status_key(task_id))
+            results = await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Failed to read status snapshots for %d tasks: %s", len(task_ids), e)
+            return {}
+        return {
+            task_id: decode_snapshot(task_id, raw)
+            for task_id, raw in zip(task_ids, results) if raw
+        }
+
+    async def seed(self, snapshots: List[Dict[str, Any]]) -> None:
+        """
+        Cache snapshots read from Postgres so the next lookup skips the database.
+
+        Only missing fields are written: a concurrent publish_task_event always wins.
+        """
+        if not snapshots:
+            return
+        await self._ensure_started()
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for snapshot in snapshots:
+                key = status_key(snapshot["task_id"])
+                for field, value in seed_fields(snapshot).items():
+                    pipe.hsetnx(key, field, value)
+                pipe.expire(key, TASK_STATUS_TTL_SECONDS)
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Failed to seed status snapshots: %s", e)
+
+    async def _read_loop(self) -> None:
+        while True:
+            if not self._subscribers:
+                await asyncio.sleep(0.5)
+                continue
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except redis.RedisError as e:
+                logger.warning("Task event subscriber error: %s", e)
+                await asyncio.sleep(1)
+                continue
+            if not message or message.get("type") != "message":
+                continue
+
+            task_id = message["channel"].split(":", 1)[1]
+            try:
+                event = json.loads(message["data"])
+            except ValueError:
+                continue
+            for queue in list(self._subscribers.get(task_id, ())):
+                if queue.full():
+                    # Slow consumer: drop the oldest event, snapshots are cumulative
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+
+task_event_hub = TaskEventHub()
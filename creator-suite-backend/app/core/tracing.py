@@ -0,0 +1,268 @@
+"""
+OpenTelemetry tracing of a creation from the API through Celery to the
+provider and media stages.
+
+create_creation_task opens a creation.enqueue span; the trace context rides
+in the Celery message headers (before_task_publish) and the worker continues
+the trace in a celery.task span, preceded by a celery.queue_wait span that
+covers the time the message sat in the queue. Inside the task,
+BaseProvider.generate, every provider HTTP call (each poll included),
+MediaProcessor stages and database commits get their own spans.
+
+Spans go to an OTLP collector (TRACING_EXPORTER=otlp) or to a JSON-lines
+file (TRACING_EXPORTER=file); with the default "none" no provider is
+installed and every span is a no-op.
+
+Spans started while a creation task id is in the log context are tagged
+with it, and TaskTimelineProcessor keeps a copy of those spans in Redis
+(task_timeline:<task_id>) so GET /creations/{task_id}/timeline can show the
+stage breakdown without a trace backend.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import redis
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.structured_logging import get_log_context
+from app.core.task_events import get_redis
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("creator_suite")
+
+TASK_ATTRIBUTE = "creation_task.id"
+# Set on the spans that end a unit of work for a task (request, Celery task); flushes its timeline
+TIMELINE_ROOT_ATTRIBUTE = "creation_task.timeline_root"
+TIMELINE_KEY = "task_timeline:{task_id}"
+TIMELINE_MAX_SPANS = 500
+# Tasks whose spans are buffered at once; the oldest buffer is flushed beyond this
+_MAX_BUFFERED_TASKS = 1000
+# Message header carrying the publish time (epoch seconds), for the queue wait span
+PUBLISHED_AT_HEADER = "published_at"
+# session.info key of the span around the commit in progress
+_COMMIT_SPAN = "commit_span"
+
+_configured = False
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends finished spans to a file, one JSON object per line (for local testing)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning("Failed to write spans to %s: %s", self.path, e)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _timeline_entry(span: ReadableSpan) -> Dict[str, Any]:
+    attributes = span.attributes or {}
+    entry = {
+        "name": span.name,
+        "start": span.start_time / 1e9,
+        "end": span.end_time / 1e9,
+        "seconds": round((span.end_time - span.start_time) / 1e9, 3),
+        "status": span.status.status_code.name,
+    }
+    for key in ("celery.task_name", "provider", "http.status_code", "media.stage"):
+        if key in attributes:
+            entry[key] = attributes[key]
+    return entry
+
+
+class TaskTimelineProcessor(SpanProcessor):
+    """Tags spans with the creation task in the log context and keeps their timings in Redis"""
+
+    def __init__(self):
+        self._buffers: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_start(self, span, parent_context=None) -> None:
+        if TASK_ATTRIBUTE not in (span.attributes or {}):
+            task_id = get_log_context().get("task_id")
+            if task_id:
+                span.set_attribute(TASK_ATTRIBUTE, task_id)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        attributes = span.attributes or {}
+        task_id = attributes.get(TASK_ATTRIBUTE)
+        if not task_id:
+            return
+        overflow = []
+        with self._lock:
+            self._buffers.setdefault(task_id, []).append(json.dumps(_timeline_entry(span)))
+            while len(self._buffers) > _MAX_BUFFERED_TASKS:
+                overflow.append(self._buffers.popitem(last=False))
+            flush = self._buffers.pop(task_id) if attributes.get(TIMELINE_ROOT_ATTRIBUTE) else None
+        if flush:
+            overflow.append((task_id, flush))
+        for buffered_task_id, entries in overflow:
+            self._write(buffered_task_id, entries)
+
+    def _write(self, task_id: str, entries: List[str]) -> None:
+        key = TIMELINE_KEY.format(task_id=task_id)
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            pipe.rpush(key, *entries)
+            pipe.ltrim(key, -TIMELINE_MAX_SPANS, -1)
+            pipe.expire(key, settings.TASK_TIMELINE_TTL_SECONDS)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Failed to store timeline of task %s: %s", task_id, e)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        with self._lock:
+            buffers, self._buffers = self._buffers, OrderedDict()
+        for task_id, entries in buffers.items():
+            self._write(task_id, entries)
+        return True
+
+    def shutdown(self) -> None:
+        self.force_flush()
+
+
+def _exporter() -> Optional[SpanExporter]:
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    if settings.TRACING_EXPORTER == "file":
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+    return None
+
+
+def configure_tracing(service_name: str) -> None:
+    """Install the tracer provider for this process (no-op when TRACING_EXPORTER is none); safe to call twice"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    exporter = _exporter()
+    if exporter is None:
+        return
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(TaskTimelineProcessor())
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def load_task_timeline(task_id: str) -> List[Dict[str, Any]]:
+    """Recorded spans of a creation task, oldest first"""
+    entries = get_redis().lrange(TIMELINE_KEY.format(task_id=task_id), 0, -1)
+    return sorted((json.loads(entry) for entry in entries), key=lambda entry: entry["start"])
+
+
+def timeline_breakdown(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Count and total seconds per span name, in order of first occurrence"""
+    stages: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    for span in spans:
+        stage = stages.setdefault(span["name"], {"stage": span["name"], "count": 0, "seconds": 0.0})
+        stage["count"] += 1
+        stage["seconds"] = round(stage["seconds"] + span["seconds"], 3)
+    return list(stages.values())
+
+
+# Celery: trace context in message headers, one span per task run
+
+_task_spans: Dict[str, tuple] = {}
+
+
+def inject_task_headers(headers: Optional[Dict[str, Any]]) -> None:
+    """before_task_publish: carry the current trace context and the publish time in the message"""
+    if headers is None:
+        return
+    propagate.inject(headers)
+    headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+def start_task_span(celery_task_id: str, task, creation_task_id: Optional[str]) -> None:
+    """task_prerun: continue the publisher's trace in a span covering the task run"""
+    request = getattr(task, "request", None)
+    carrier = {
+        field: getattr(request, field)
+        for field in propagate.get_global_textmap().fields
+        if getattr(request, field, None)
+    }
+    parent = propagate.extract(carrier)
+    attributes = {"celery.task_name": task.name, "celery.task_id": celery_task_id, TIMELINE_ROOT_ATTRIBUTE: True}
+    if creation_task_id:
+        attributes[TASK_ATTRIBUTE] = creation_task_id
+    span = tracer.start_span(f"celery.task {task.name}", context=parent, kind=SpanKind.CONSUMER, attributes=attributes)
+
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if isinstance(published_at, (int, float)):
+        wait_attributes = {"celery.task_name": task.name}
+        if creation_task_id:
+            wait_attributes[TASK_ATTRIBUTE] = creation_task_id
+        wait = tracer.start_span(
+            "celery.queue_wait", context=trace.set_span_in_context(span),
+            start_time=int(published_at * 1e9), attributes=wait_attributes,
+        )
+        wait.end()
+
+    token = otel_context.attach(trace.set_span_in_context(span))
+    _task_spans[celery_task_id] = (span, token)
+
+
+def end_task_span(celery_task_id: str, state: Optional[str]) -> None:
+    """task_postrun: close the task's span"""
+    entry = _task_spans.pop(celery_task_id, None)
+    if entry is None:
+        return
+    span, token = entry
+    span.set_attribute("celery.state", state or "UNKNOWN")
+    if state == "FAILURE":
+        span.set_status(Status(StatusCode.ERROR))
+    otel_context.detach(token)
+    span.end()
+
+
+# Database commits (only inside a traced unit of work)
+
+@event.listens_for(Session, "before_commit")
+def _start_commit_span(session):
+    if trace.get_current_span().is_recording():
+        session.info[_COMMIT_SPAN] = tracer.start_span("db.commit")
+
+
+@event.listens_for(Session, "after_commit")
+def _end_commit_span(session):
+    span = session.info.pop(_COMMIT_SPAN, None)
+    if span is not None:
+        span.end()
+
+
+@event.listens_for(Session, "after_rollback")
+def _fail_commit_span(session):
+    span = session.info.pop(_COMMIT_SPAN, None)
+    if span is not None:
+        span.set_status(Status(StatusCode.ERROR))
+        span.end()
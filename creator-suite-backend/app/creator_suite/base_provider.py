@@ -1,14 +1,163 @@
+import asyncio
+import functools
+import inspect
+import logging
+import re
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
+
+import httpx
+
+from app.core.config import settings
+from app.core.tracing import tracer
+from app.creator_suite.errors import ProviderError
 from app.creator_suite.schemas import OutputAsset
 
+logger = logging.getLogger(__name__)
+
+# tqdm-style progress lines in Replicate prediction logs, e.g. " 45%|████▌     | 45/100"
+_REPLICATE_PERCENT = re.compile(r"(\d{1,3})%\|")
+REPLICATE_API_URL = settings.REPLICATE_API_URL
+
+ProgressCallback = Callable[..., None]
+
+
+def _traced_generate(generate):
+    @functools.wraps(generate)
+    async def traced(self, input_data, *args, **kwargs):
+        attributes = {
+            "provider": getattr(self, "provider_name", type(self).__name__),
+            "model": getattr(self, "model_name", None) or "",
+        }
+        with tracer.start_as_current_span("provider.generate", attributes=attributes):
+            return await generate(self, input_data, *args, **kwargs)
+    return traced
+
 
 class BaseProvider(ABC):
     """Base class for all AI generation providers"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, progress_callback: Optional[ProgressCallback] = None):
         self.api_key = api_key
         self.provider_name = self.__class__.__name__.replace("Provider", "").lower()
+        self.model_name: Optional[str] = None
+        self.progress_callback = progress_callback
+        # Provider-side id of the submitted prediction; set before generate() to resume it instead of submitting
+        self.prediction_id: Optional[str] = None
+        # Called with the id right after a prediction is submitted, so it survives a worker crash
+        self.prediction_callback: Optional[Callable[[str], None]] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every provider's generate() runs in a provider.generate span
+        generate = cls.__dict__.get("generate")
+        if generate is not None and inspect.iscoroutinefunction(generate):
+            cls.generate = _traced_generate(generate)
+
+    def report_progress(self, progress: Optional[float] = None, stage: Optional[str] = None, **details: Any) -> None:
+        """
+        Forward a progress signal to the registered callback, if any.
+
+        Args:
+            progress: Fraction complete in [0, 1], or None when the provider cannot tell
+            stage: Provider status such as "starting" or "processing"
+            **details: Extra provider-specific fields worth surfacing
+
+        Progress reporting never interrupts generation; callback errors are logged.
+        """
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(progress=progress, stage=stage, **details)
+        except Exception as e:
+            logger.warning("Progress callback failed for %s: %s", self.provider_name, e)
+
+    def report_replicate_progress(self, prediction: Dict[str, Any]) -> None:
+        """Report progress from a polled Replicate prediction (status and log percentages)"""
+        status = prediction.get("status")
+        progress = None
+        if status == "succeeded":
+            progress = 1.0
+        else:
+            percentages = _REPLICATE_PERCENT.findall(prediction.get("logs") or "")
+            if percentages:
+                progress = min(int(percentages[-1]) / 100, 0.99)
+        self.report_progress(progress, stage=status)
+
+    async def submit_replicate_prediction(
+        self, client: httpx.AsyncClient, headers: Dict[str, str], payload: Dict[str, Any]
+    ) -> str:
+        """
+        Create a Replicate prediction of self.model_name and remember its id.
+
+        When prediction_id is already set (a retry of an earlier submission)
+        nothing is submitted: that prediction is polled instead, so a retry
+        is never billed twice. A new id is handed to prediction_callback
+        before polling starts.
+        """
+        if self.prediction_id:
+            logger.info("Resuming %s prediction %s", self.provider_name, self.prediction_id)
+            return self.prediction_id
+        response = await client.post(
+            f"{REPLICATE_API_URL}/models/{self.model_name}/predictions",
+            headers=headers,
+            json=payload,
+            timeout=30.0,
+        )
+        if response.status_code not in (200, 201):
+            raise ProviderError.from_response(self.provider_name, response, "Failed to create prediction")
+        prediction_id = response.json().get("id")
+        if not prediction_id:
+            raise ProviderError("No prediction ID received from Replicate", provider=self.provider_name)
+        self.prediction_id = prediction_id
+        if self.prediction_callback is not None:
+            self.prediction_callback(prediction_id)
+        return prediction_id
+
+    async def wait_for_replicate_prediction(
+        self, client: httpx.AsyncClient, headers: Dict[str, str], poll_interval: float, max_attempts: int
+    ) -> Dict[str, Any]:
+        """
+        Poll prediction_id until it succeeds and return the prediction.
+
+        Failed polls (network errors, 429, 5xx) are skipped. Raises
+        ProviderError when the prediction fails or is canceled, and a
+        retryable one when it is still running after max_attempts polls.
+        """
+        url = f"{REPLICATE_API_URL}/predictions/{self.prediction_id}"
+        for attempt in range(max_attempts):
+            await asyncio.sleep(poll_interval)
+            try:
+                response = await client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                logger.info("Polling %s prediction %s failed on attempt %s: %s",
+                            self.provider_name, self.prediction_id, attempt, e)
+                continue
+            if response.status_code == 429 or response.status_code >= 500:
+                logger.info("Polling %s prediction %s got HTTP %s on attempt %s",
+                            self.provider_name, self.prediction_id, response.status_code, attempt)
+                continue
+            if response.status_code != 200:
+                raise ProviderError.from_response(self.provider_name, response, "Failed to get prediction status")
+
+            prediction = response.json()
+            self.report_replicate_progress(prediction)
+            status = prediction.get("status")
+            if status == "succeeded":
+                return prediction
+            if status in ("failed", "canceled"):
+                # Over on Replicate's side: a retry has to submit a new prediction
+                self.prediction_id = None
+                if status == "canceled":
+                    raise ProviderError("Prediction was canceled", provider=self.provider_name, retryable=False)
+                raise ProviderError(
+                    f"Prediction failed: {prediction.get('error') or 'Unknown error'}", provider=self.provider_name,
+                )
+        raise ProviderError(
+            f"Prediction did not complete within {poll_interval * max_attempts:.0f} seconds",
+            provider=self.provider_name,
+            retryable=True,
+        )
     
     @abstractmethod
     async def generate(self, input_data: Dict[str, Any]) -> List[OutputAsset]:
@@ -47,4 +196,4 @@ class BaseProvider(ABC):
         Returns:
             JSON schema dictionary
         """
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,150 @@
+"""
+Provider errors and their classification for the generation retry policy.
+
+Providers raise ProviderError with the HTTP status, the provider's error
+code and, for rate limits, the Retry-After delay. classify_error sorts any
+exception raised by a generation into:
+
+- transient: connection errors, 408/409/425/5xx, interrupted predictions,
+  predictions still running when polling gave up; retried with backoff
+  (resuming the prediction when its id is known);
+- rate_limited: 429; retried with a longer backoff;
+- permanent: other 4xx, rejected input, flagged content, cancelled
+  predictions; never retried;
+- unknown: anything else, including a request that timed out after it was
+  sent (the provider may have started, and will bill, the generation); not
+  retried but dead-lettered for replay once understood.
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+from celery.exceptions import SoftTimeLimitExceeded
+
+TRANSIENT = "transient"
+RATE_LIMITED = "rate_limited"
+PERMANENT = "permanent"
+UNKNOWN = "unknown"
+
+_TRANSIENT_STATUSES = {408, 409, 425}
+# Replicate: "Prediction interrupted; please retry (code: PA)"
+_TRANSIENT_PROVIDER_CODES = {"PA"}
+_PROVIDER_CODE = re.compile(r"\(code:\s*([A-Z0-9_]+)\)|^(E\d{3,5})\b")
+_TRANSIENT_MESSAGE = re.compile(
+    r"please retry|interrupted|temporarily unavailable|service unavailable|out of memory|rate limit",
+    re.IGNORECASE,
+)
+_PERMANENT_MESSAGE = re.compile(r"nsfw|flagged|sensitive|safety|content policy|invalid input", re.IGNORECASE)
+
+
+class ProviderError(Exception):
+    """A failed provider call or prediction, with what the provider said about it"""
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        provider: Optional[str] = None,
+        status_code: Optional[int] = None,
+        provider_code: Optional[str] = None,
+        retry_after: Optional[float] = None,
+        retryable: Optional[bool] = None,
+    ):
+        super().__init__(message)
+        self.provider = provider
+        self.status_code = status_code
+        self.provider_code = provider_code if provider_code is not None else provider_error_code(message)
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+    @classmethod
+    def from_response(cls, provider: str, response: httpx.Response, message: str) -> "ProviderError":
+        """Error for an unexpected HTTP response, with the provider's detail and Retry-After"""
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        detail = None
+        if isinstance(body, dict):
+            detail = body.get("detail") or body.get("error") or body.get("message")
+        retry_after = response.headers.get("Retry-After")
+        return cls(
+            f"{message}: HTTP {response.status_code} {detail or response.text[:200]}",
+            provider=provider,
+            status_code=response.status_code,
+            provider_code=(body.get("code") if isinstance(body, dict) else None) or provider_error_code(str(detail)),
+            retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+        )
+
+
+def provider_error_code(message: Optional[str]) -> Optional[str]:
+    """Error code in a provider message: "... (code: PA)" or a leading "E1234" """
+    match = _PROVIDER_CODE.search(message or "")
+    return (match.group(1) or match.group(2)) if match else None
+
+
+@dataclass(frozen=True)
+class ErrorClass:
+    kind: str
+    reason: str
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in (TRANSIENT, RATE_LIMITED)
+
+
+def _classify_status(status_code: int) -> Optional[ErrorClass]:
+    if status_code == 429:
+        return ErrorClass(RATE_LIMITED, "HTTP 429")
+    if status_code >= 500 or status_code in _TRANSIENT_STATUSES:
+        return ErrorClass(TRANSIENT, f"HTTP {status_code}")
+    if 400 <= status_code < 500:
+        return ErrorClass(PERMANENT, f"HTTP {status_code}")
+    return None
+
+
+def classify_error(exc: BaseException) -> ErrorClass:
+    """Whether (and how) a failed generation should be retried"""
+    if isinstance(exc, ProviderError):
+        if exc.retryable is not None:
+            if not exc.retryable:
+                return ErrorClass(PERMANENT, exc.provider_code or "provider")
+            kind = RATE_LIMITED if exc.status_code == 429 else TRANSIENT
+            return ErrorClass(kind, exc.provider_code or "provider")
+        if exc.status_code is not None:
+            by_status = _classify_status(exc.status_code)
+            if by_status is not None:
+                return by_status
+        if exc.provider_code in _TRANSIENT_PROVIDER_CODES:
+            return ErrorClass(TRANSIENT, f"code {exc.provider_code}")
+        message = str(exc)
+        if _PERMANENT_MESSAGE.search(message):
+            return ErrorClass(PERMANENT, "rejected content")
+        if _TRANSIENT_MESSAGE.search(message):
+            return ErrorClass(TRANSIENT, "provider message")
+        return ErrorClass(UNKNOWN, exc.provider_code or "provider")
+    if isinstance(exc, httpx.HTTPStatusError):
+        return _classify_status(exc.response.status_code) or ErrorClass(UNKNOWN, "HTTP status")
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        # The request never reached the provider
+        return ErrorClass(TRANSIENT, type(exc).__name__)
+    if isinstance(exc, httpx.TransportError):
+        # Sent, but no (complete) answer: only safe to repeat if it was a read
+        try:
+            method = exc.request.method
+        except RuntimeError:  # No request attached
+            method = None
+        if method == "GET":
+            return ErrorClass(TRANSIENT, type(exc).__name__)
+        return ErrorClass(UNKNOWN, type(exc).__name__)
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return ErrorClass(TRANSIENT, type(exc).__name__)
+    if isinstance(exc, SoftTimeLimitExceeded):
+        # The provider may still be working; a retry resumes the prediction
+        return ErrorClass(TRANSIENT, "soft time limit")
+    if isinstance(exc, (ValueError, TypeError, KeyError)):
+        return ErrorClass(PERMANENT, type(exc).__name__)
+    return ErrorClass(UNKNOWN, type(exc).__name__)
@@ -1,10 +1,10 @@
 import os
 import httpx
-import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from app.creator_suite.base_provider import BaseProvider
+from app.core.metrics import provider_transport
 from app.creator_suite.schemas import OutputAsset, AssetType
 from app.creator_suite.image.schemas.imagen_4_ultra_schemas import GoogleImagen4UltraInput
 from app.core.config import settings
@@ -39,88 +39,53 @@ class GoogleImagen4UltraProvider(BaseProvider):
         
         start_time = datetime.utcnow()
         
-        async with httpx.AsyncClient(timeout=None) as client:
-            # Create prediction
-            response = await client.post(
-                f"{self.base_url}/models/{self.model_name}/predictions",
-                json=payload,
-                headers=headers
+        async with httpx.AsyncClient(timeout=None, transport=provider_transport(self.provider_name)) as client:
+            prediction_id = await self.submit_replicate_prediction(client, headers, payload)
+
+            # Poll for completion (images are typically faster than videos): 5 minutes with 10-second intervals
+            prediction_status = await self.wait_for_replicate_prediction(
+                client, headers, poll_interval=10, max_attempts=30
             )
-            
-            if response.status_code != 201:
-                error_detail = response.json().get("detail", "Unknown error")
-                raise ValueError(f"Failed to create prediction: {error_detail}")
-            
-            prediction = response.json()
-            prediction_id = prediction["id"]
-            prediction_url = prediction["urls"]["get"]
-            
-            # Poll for completion (images are typically faster than videos)
-            max_attempts = 30  # 5 minutes with 10-second intervals
-            for attempt in range(max_attempts):
-                await asyncio.sleep(10)  # Check every 10 seconds
-                
-                status_response = await client.get(
-                    prediction_url,
-                    headers=headers
-                )
-                
-                if status_response.status_code != 200:
-                    raise ValueError(f"Failed to get prediction status: {status_response.text}")
-                
-                prediction_status = status_response.json()
-                
-                if prediction_status["status"] == "succeeded":
-                    # Get the image URL from the output
-                    output = prediction_status["output"]
-                    
-                    if not output:
-                        raise ValueError("No output returned from the model")
-                    
-                    # The output is typically a list containing the image URL
-                    if isinstance(output, list) and len(output) > 0:
-                        image_url = output[0]
-                    else:
-                        image_url = output
-                    
-                    # Calculate generation time
-                    end_time = datetime.utcnow()
-                    generation_time = (end_time - start_time).total_seconds()
-                    
-                    # Determine MIME type based on output format
-                    output_format = validated_input.output_format or "jpg"
-                    mime_type = f"image/{output_format}"
-                    
-                    # Create output asset
-                    output_asset = OutputAsset(
-                        url=image_url,
-                        asset_type=AssetType.IMAGE,
-                        mime_type=mime_type,
-                        provider="replicate",
-                        model_name=self.model_name,
-                        model_version=prediction_status.get("version"),
-                        generation_time_seconds=generation_time,
-                        metadata={
-                            "prediction_id": prediction_id,
-                            "replicate_prediction": prediction_status,
-                            "prompt": validated_input.prompt,
-                            "aspect_ratio": validated_input.aspect_ratio,
-                            "output_format": validated_input.output_format,
-                            "safety_filter_level": validated_input.safety_filter_level
-                        }
-                    )
-                    
-                    return [output_asset]
-                
-                elif prediction_status["status"] == "failed":
-                    error = prediction_status.get("error", "Unknown error")
-                    raise ValueError(f"Prediction failed: {error}")
-                
-                elif prediction_status["status"] == "canceled":
-                    raise ValueError("Prediction was canceled")
-            
-            # If we get here, we've timed out
-            raise asyncio.TimeoutError("Prediction timed out after 5 minutes")
+
+            # Get the image URL from the output
+            output = prediction_status["output"]
+            if not output:
+                raise ValueError("No output returned from the model")
+
+            # The output is typically a list containing the image URL
+            if isinstance(output, list) and len(output) > 0:
+                image_url = output[0]
+            else:
+                image_url = output
+
+            # Calculate generation time
+            end_time = datetime.utcnow()
+            generation_time = (end_time - start_time).total_seconds()
+
+            # Determine MIME type based on output format
+            output_format = validated_input.output_format or "jpg"
+            mime_type = f"image/{output_format}"
+
+            # Create output asset
+            output_asset = OutputAsset(
+                url=image_url,
+                asset_type=AssetType.IMAGE,
+                mime_type=mime_type,
+                provider="replicate",
+                model_name=self.model_name,
+                model_version=prediction_status.get("version"),
+                generation_time_seconds=generation_time,
+                metadata={
+                    "prediction_id": prediction_id,
+                    "replicate_prediction": prediction_status,
+                    "prompt": validated_input.prompt,
+                    "aspect_ratio": validated_input.aspect_ratio,
+                    "output_format": validated_input.output_format,
+                    "safety_filter_level": validated_input.safety_filter_level
+                }
+            )
+
+            return [output_asset]
     
     def validate_input(self, input_data: Dict[str, Any]) -> GoogleImagen4UltraInput:
         """Validate and transform input data"""
@@ -169,7 +134,7 @@ class GoogleImagen4UltraProvider(BaseProvider):
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with httpx.AsyncClient(timeout=30, transport=provider_transport(self.provider_name)) as client:
             response = await client.post(
                 f"{self.base_url}/predictions/{prediction_id}/cancel",
                 headers=headers
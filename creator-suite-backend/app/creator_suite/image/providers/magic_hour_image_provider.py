@@ -3,6 +3,8 @@ import httpx
 import json
 from typing import Dict, Any, List, Optional
 from app.creator_suite.base_provider import BaseProvider
+from app.creator_suite.errors import ProviderError
+from app.core.metrics import provider_transport
 from app.creator_suite.schemas import OutputAsset, AssetType
 from datetime import datetime
 
@@ -28,7 +30,7 @@ class MagicHourImageProvider(BaseProvider):
         """
         validated_data = self.validate_input(input_data)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=provider_transport(self.provider_name)) as client:
             headers = {
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json",
@@ -56,8 +58,7 @@ class MagicHourImageProvider(BaseProvider):
                 )
 
                 if response.status_code != 200:
-                    error_data = response.json()
-                    raise Exception(f"Magic Hour API error: {error_data.get('error', 'Unknown error')}")
+                    raise ProviderError.from_response(self.provider_name, response, "Magic Hour API error")
 
                 result = response.json()
 
@@ -80,12 +81,18 @@ class MagicHourImageProvider(BaseProvider):
                         }
                     )]
                 else:
-                    raise Exception("No output received from Magic Hour API")
-
-            except httpx.TimeoutException:
-                raise Exception("Request timed out - image generation may take longer")
+                    raise ProviderError("No output received from Magic Hour API", provider=self.provider_name)
+
+            except (ProviderError, httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # Classified by the retry policy as they are
+                raise
+            except httpx.TimeoutException as e:
+                # The provider may still be generating (and billing); not safe to resubmit
+                raise ProviderError(
+                    "Request timed out - image generation may take longer", provider=self.provider_name
+                ) from e
             except Exception as e:
-                raise Exception(f"Failed to generate image: {str(e)}")
+                raise ProviderError(f"Failed to generate image: {str(e)}", provider=self.provider_name) from e
 
     def validate_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -8,6 +8,7 @@ import httpx
 import logging
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.metrics import provider_transport
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,7 @@ class OpenAIDALLEProvider:
         self.api_key = settings.OPENAI_API_KEY
         self.base_url = "https://api.openai.com/v1"
         self.model = "dall-e-3"
+        self.provider_name = "openai"
         
     async def generate_image(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -64,7 +66,7 @@ class OpenAIDALLEProvider:
             logger.info(f"Generating image with DALL-E 3: {prompt[:50]}...")
             
             # Make API request
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with httpx.AsyncClient(timeout=120.0, transport=provider_transport(self.provider_name)) as client:
                 response = await client.post(
                     f"{self.base_url}/images/generations",
                     json=payload,
@@ -1,5 +1,6 @@
+import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from celery import Task
 import httpx
 
@@ -9,10 +10,16 @@ from app.models.creation_task import CreationTask
 from app.models.creation_task import TaskStatus
 from app.creator_suite.image.providers.imagen_4_ultra_provider import GoogleImagen4UltraProvider
 from app.creator_suite.utils import download_and_save_media
+from app.creator_suite.retry_policy import FINISHED_STATUSES, finished_result, prediction_to_resume, retry_or_fail
+from app.services.cancellation import run_cancellable
+from app.creator_suite.utils.progress import TaskProgressReporter
 
 from dotenv import load_dotenv
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class CallbackTask(Task):
 
@@ -23,27 +30,36 @@ class CallbackTask(Task):
 
 @celery_app.task(bind=True, base=CallbackTask, name="generate_imagen_4_ultra_image", 
                  soft_time_limit=300, time_limit=360)  # 5 minutes soft, 6 minutes hard limit
-def generate_imagen_4_ultra_image(self, task_id: str, input_data: Dict[str, Any]):
+def generate_imagen_4_ultra_image(self, task_id: str, input_data: Dict[str, Any], resume_prediction_id: Optional[str] = None):
     """
     Celery task to generate image using Google Imagen 4 Ultra model.
     
     Args:
         task_id: Unique identifier for the creation task
         input_data: Input parameters for image generation
+        resume_prediction_id: Prediction submitted by an earlier attempt, polled instead of submitting anew
     """
     db = SessionLocal()
+    task = None
+    provider = None
     
     try:
         # Update task status to processing
         task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
         if not task:
             raise ValueError(f"Task {task_id} not found")
+        if task.status in FINISHED_STATUSES:
+            # Re-delivered after finishing (the worker was lost before acknowledging), or cancelled
+            return finished_result(task)
         
         task.status = TaskStatus.PROCESSING
         db.commit()
         
         # Initialize provider and generate image
         provider = GoogleImagen4UltraProvider()
+        # Re-delivered after a worker crash: poll the prediction submitted before it
+        provider.prediction_id = prediction_to_resume(task, resume_prediction_id)
+        TaskProgressReporter.attach(provider, task_id)
         
         # Run async generation in sync context
         import asyncio
@@ -51,7 +67,7 @@ def generate_imagen_4_ultra_image(self, task_id: str, input_data: Dict[str, Any]
         asyncio.set_event_loop(loop)
         
         try:
-            output_assets = loop.run_until_complete(provider.generate(input_data))
+            output_assets = run_cancellable(loop, provider.generate(input_data), task_id, provider)
         finally:
             loop.close()
         
@@ -74,7 +90,7 @@ def generate_imagen_4_ultra_image(self, task_id: str, input_data: Dict[str, Any]
                         if local_paths.get("thumbnail_path"):
                             task.local_thumbnail_url = local_paths.get("thumbnail_path")
                 except Exception as e:
-                    print(f"Failed to download image locally: {e}")
+                    logger.warning("Failed to download image locally: %s", e)
                     # Continue even if local download fails
         
         # Convert output assets to dict for JSON storage with datetime serialization
@@ -97,19 +113,9 @@ def generate_imagen_4_ultra_image(self, task_id: str, input_data: Dict[str, Any]
             "output_assets": output_assets_dict
         }
         
-    except asyncio.TimeoutError as e:
-        # Update task with timeout error
-        task.status = TaskStatus.FAILED
-        task.error_message = "Image generation timed out after 5 minutes"
-        db.commit()
-        raise
-        
     except Exception as e:
-        # Update task with error
-        task.status = TaskStatus.FAILED
-        task.error_message = str(e)
-        db.commit()
-        raise
+        # Retried with backoff (resuming the prediction) or marked failed
+        retry_or_fail(self, db, task, e, provider)
         
     finally:
         db.close()
@@ -155,7 +161,7 @@ def cancel_imagen_4_ultra_generation(self, task_id: str):
             try:
                 cancelled = loop.run_until_complete(provider.cancel(prediction_id))
                 if not cancelled:
-                    print(f"Failed to cancel prediction {prediction_id} on Replicate")
+                    logger.warning("Failed to cancel prediction %s on Replicate", prediction_id)
             finally:
                 loop.close()
         
@@ -3,6 +3,7 @@ Celery tasks for OpenAI DALL-E image generation
 Direct alternative to Replicate
 """
 
+import logging
 import asyncio
 from typing import Dict, Any
 from celery import Task
@@ -14,6 +15,9 @@ from app.models.creation_task import CreationTask
 from app.creator_suite.schemas import TaskStatus, AssetType
 from app.creator_suite.image.providers.openai_dalle_provider import OpenAIDALLEProvider
 from app.creator_suite.utils.media_processor import MediaProcessor
+from app.creator_suite.retry_policy import retry_or_fail
+
+logger = logging.getLogger(__name__)
 
 
 class CallbackTask(Task):
@@ -35,6 +39,7 @@ def generate_openai_dalle_image(self, task_id: str, input_data: Dict[str, Any]):
     db = SessionLocal()
     provider = OpenAIDALLEProvider()
     media_processor = MediaProcessor()
+    task = None
     
     try:
         # Get task from database
@@ -46,8 +51,8 @@ def generate_openai_dalle_image(self, task_id: str, input_data: Dict[str, Any]):
         task.status = TaskStatus.PROCESSING
         db.commit()
         
-        print(f"🎨 Starting OpenAI DALL-E image generation for task {task_id}")
-        print(f"📝 Prompt: {input_data.get('prompt', '')[:100]}...")
+        logger.info("Starting OpenAI DALL-E image generation")
+        logger.debug("Prompt: %.100s", input_data.get("prompt", ""))
         
         # Generate image using OpenAI DALL-E
         loop = asyncio.new_event_loop()
@@ -56,7 +61,7 @@ def generate_openai_dalle_image(self, task_id: str, input_data: Dict[str, Any]):
         loop.close()
         
         if result.get("success"):
-            print(f"✅ DALL-E generation successful!")
+            logger.info("DALL-E generation succeeded")
             
             # Process and upload the generated image
             image_url = result["image_url"]
@@ -87,7 +92,7 @@ def generate_openai_dalle_image(self, task_id: str, input_data: Dict[str, Any]):
                 }]
                 task.local_image_url = processed_result["azure_url"]
                 
-                print(f"🎯 Image uploaded to Azure: {processed_result['azure_url']}")
+                logger.info("Image uploaded to Azure: %s", processed_result["azure_url"])
                 
             else:
                 raise Exception(f"Failed to process image: {processed_result.get('error')}")
@@ -96,20 +101,14 @@ def generate_openai_dalle_image(self, task_id: str, input_data: Dict[str, Any]):
             raise Exception(f"DALL-E generation failed: {result.get('error')}")
             
         db.commit()
-        print(f"✅ Task {task_id} completed successfully!")
+        logger.info("Task %s completed", task_id)
         
     except Exception as e:
         error_msg = f"OpenAI DALL-E task failed: {str(e)}"
-        print(f"❌ {error_msg}")
-        
-        # Update task with error
-        if task:
-            task.status = TaskStatus.FAILED
-            task.error_message = error_msg
-            db.commit()
+        logger.exception(error_msg)
         
-        # Re-raise for Celery
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        # Retried with backoff or marked failed
+        retry_or_fail(self, db, task, e, provider, error_message=error_msg)
         
     finally:
         db.close()
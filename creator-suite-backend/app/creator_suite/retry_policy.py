@@ -0,0 +1,142 @@
+"""
+Shared retry policy of the generation tasks.
+
+A generation task calls retry_or_fail from its except block. The error is
+classified (app/creator_suite/errors.py); transient and rate-limited errors
+are retried with exponential backoff and jitter, resuming the provider
+prediction that was already submitted (resume_prediction_id) instead of
+paying for a new one. While retries remain the creation task stays in
+processing, so its credit hold is neither released nor settled.
+
+Otherwise the creation task is marked failed (releasing the hold) and,
+unless the provider rejected the request outright, the call goes to the
+dead-letter list (app/services/dead_letters.py) for replay.
+
+The prediction id is also persisted on the creation task as soon as it is
+submitted (creation_tasks.provider_prediction_id). A task re-delivered
+after its worker died, or re-sent by the stuck-task sweeper
+(app/services/stuck_tasks.py), starts from prediction_to_resume and so
+polls that prediction too; one re-delivered after it already finished
+does nothing.
+"""
+
+import logging
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, NoReturn, Optional
+
+from celery import Task
+from celery.exceptions import Ignore
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.creator_suite.errors import PERMANENT, RATE_LIMITED, classify_error
+from app.creator_suite.schemas import TaskStatus
+from app.models.creation_task import CreationTask
+from app.services.cancellation import GenerationCancelled
+from app.services.dead_letters import dead_letter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int
+    base_seconds: float
+    max_seconds: float
+    rate_limit_base_seconds: float
+
+    def backoff(self, retries: int, kind: str, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds before retry number retries + 1: drawn from [d/2, d] with
+        d = base * 2**retries capped at max_seconds ("equal jitter", so
+        tasks that failed together do not retry together), and never
+        sooner than the provider's Retry-After.
+        """
+        base = self.rate_limit_base_seconds if kind == RATE_LIMITED else self.base_seconds
+        ceiling = min(self.max_seconds, base * 2 ** retries)
+        delay = random.uniform(ceiling / 2, ceiling)
+        return max(delay, retry_after or 0.0)
+
+
+# A generation task finding its creation task in one of these was re-delivered after finishing
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+
+def prediction_to_resume(creation: CreationTask, resume_prediction_id: Optional[str] = None) -> Optional[str]:
+    """The prediction a (re-)started generation should poll instead of submitting a new one"""
+    return resume_prediction_id or creation.provider_prediction_id
+
+
+def finished_result(creation: CreationTask) -> Dict[str, Any]:
+    """Result of a re-delivered generation whose creation task already finished"""
+    logger.info("Task %s already %s; not generating again", creation.id, creation.status.value)
+    return {"status": creation.status.value, "task_id": creation.id, "redelivered": True}
+
+
+def default_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_retries=settings.GENERATION_MAX_RETRIES,
+        base_seconds=settings.GENERATION_RETRY_BASE_SECONDS,
+        max_seconds=settings.GENERATION_RETRY_MAX_SECONDS,
+        rate_limit_base_seconds=settings.GENERATION_RATE_LIMIT_BASE_SECONDS,
+    )
+
+
+def retry_or_fail(
+    task: Task,
+    db: Session,
+    creation: Optional[CreationTask],
+    exc: BaseException,
+    provider=None,
+    policy: Optional[RetryPolicy] = None,
+    error_message: Optional[str] = None,
+) -> NoReturn:
+    """
+    Retry the bound Celery task later, or fail the creation task; always raises
+    (celery.exceptions.Ignore when the task was cancelled).
+
+    provider is the one that ran the generation: a prediction it submitted
+    and that is still running is resumed by the retry (or recorded with the
+    dead letter). error_message overrides str(exc) on the failed task.
+    """
+    policy = policy or default_policy()
+    error = classify_error(exc)
+    retries = task.request.retries
+    prediction_id = getattr(provider, "prediction_id", None)
+    db.rollback()
+    if isinstance(exc, GenerationCancelled) or (creation is not None and creation.status == TaskStatus.CANCELLED):
+        # Cancelled by the user: the creation task is already settled, nothing to retry or record
+        logger.info("%s stopped: task %s was cancelled", task.name, getattr(creation, "id", None))
+        raise Ignore()
+    if creation is not None and provider is not None and creation.provider_prediction_id != prediction_id:
+        # A failed or cancelled prediction is not resumed by the retry or a re-delivery
+        creation.provider_prediction_id = prediction_id
+        db.commit()
+
+    if error.retryable and retries < policy.max_retries:
+        delay = policy.backoff(retries, error.kind, getattr(exc, "retry_after", None))
+        logger.warning(
+            "%s failed (%s, %s): %s; retry %s/%s in %.0fs%s",
+            task.name, error.kind, error.reason, exc, retries + 1, policy.max_retries, delay,
+            f", resuming prediction {prediction_id}" if prediction_id else "",
+        )
+        kwargs = dict(task.request.kwargs or {})
+        if prediction_id:
+            kwargs["resume_prediction_id"] = prediction_id
+        raise task.retry(exc=exc, countdown=delay, max_retries=policy.max_retries, kwargs=kwargs)
+
+    if creation is not None:
+        creation.status = TaskStatus.FAILED
+        creation.error_message = error_message or str(exc)
+        db.commit()
+    if error.kind != PERMANENT:
+        dead_letter(
+            task.name, task.request.args, task.request.kwargs,
+            task_id=creation.id if creation is not None else None,
+            error=f"{type(exc).__name__}: {exc}",
+            kind=error.kind,
+            retries=retries,
+            prediction_id=prediction_id,
+        )
+    raise exc
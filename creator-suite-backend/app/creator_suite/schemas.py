@@ -61,6 +61,18 @@ class LongVideoGeneration(BaseModel):
     credits_per_segment: int = Field(default=1, description="Credits charged per 8-second segment")
 
 
+class SegmentEdit(BaseModel):
+    """A single segment of a long video to regenerate"""
+    segment_id: int = Field(..., ge=1, description="1-based index of the 8-second segment")
+    new_prompt: str = Field(..., min_length=1, description="Prompt to regenerate the segment with")
+
+
+class LongVideoSegmentEditRequest(BaseModel):
+    """Schema for regenerating selected segments of a completed long video"""
+    segments_to_edit: List[SegmentEdit] = Field(..., min_length=1, description="Segments to regenerate")
+    crossfade_duration: float = Field(default=0.0, ge=0.0, le=2.0, description="Crossfade at each edited seam in seconds (0 = hard cut)")
+
+
 class ServiceBase(BaseModel):
     """Base schema for AI services"""
     name: str
@@ -131,10 +143,59 @@ class CreationTask(CreationTaskBase):
     local_thumbnail_url: Optional[str] = None
     error_message: Optional[str] = None
     processing_time_seconds: Optional[float] = None
+    progress: Optional[float] = Field(None, description="Last persisted progress (0-1); live progress is on /creations/{id}/status")
     created_at: datetime
     updated_at: Optional[datetime] = None
     service: Optional[Service] = None  # Include service details
-    long_video_config: Optional[LongVideoGeneration] = Field(None, description="Long video generation configuration")
+    long_video_config: Optional[Dict[str, Any]] = Field(None, description="Long video generation configuration (segment tasks carry their parent/group bookkeeping)")
+
+    class Config:
+        from_attributes = True
+
+class CreationTaskSummary(BaseModel):
+    """Lean creation task for list views: no input/output/long-video JSON"""
+    id: str
+    task_type: AssetType
+    provider: str
+    service_id: int
+    user_id: int
+    status: TaskStatus
+    local_video_url: Optional[str] = None
+    local_image_url: Optional[str] = None
+    local_thumbnail_url: Optional[str] = None
+    error_message: Optional[str] = None
+    processing_time_seconds: Optional[float] = None
+    progress: Optional[float] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+MAX_STATUS_BATCH_SIZE = 500
+
+
+class TaskStatusBatchRequest(BaseModel):
+    """Request for the status of many tasks at once"""
+    task_ids: List[str] = Field(..., min_length=1, max_length=MAX_STATUS_BATCH_SIZE, description="Creation task IDs")
+    known_versions: Optional[Dict[str, int]] = Field(
+        None,
+        description="Status versions the client already has, by task ID; only tasks with a newer version are returned"
+    )
+
+
+class TaskStatusRow(BaseModel):
+    """Compact task status"""
+    task_id: str
+    status: TaskStatus
+    progress: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error_message: Optional[str] = None
+    version: int = 0
+
+
+class TaskStatusBatchResponse(BaseModel):
+    """Status rows for the requested tasks that changed, plus IDs that do not exist for this user"""
+    tasks: List[TaskStatusRow] = []
+    missing: List[str] = []
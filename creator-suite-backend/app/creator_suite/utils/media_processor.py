@@ -1,14 +1,18 @@
+import logging
 import os
 import uuid
 import httpx
 import ffmpeg
 from pathlib import Path
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, List
 from urllib.parse import urlparse
 from PIL import Image
 import io
 
 from app.core.config import settings
+from app.core.metrics import count_media_bytes, count_stored_file, media_stage
+
+logger = logging.getLogger(__name__)
 
 
 class MediaProcessor:
@@ -19,11 +23,13 @@ class MediaProcessor:
         self.videos_dir = self.storage_root / "videos"
         self.images_dir = self.storage_root / "images"
         self.thumbnails_dir = self.storage_root / "thumbnails"
+        self.segments_dir = self.storage_root / "segments"
         
         # Ensure directories exist
         self.videos_dir.mkdir(parents=True, exist_ok=True)
         self.images_dir.mkdir(parents=True, exist_ok=True)
         self.thumbnails_dir.mkdir(parents=True, exist_ok=True)
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
     
     async def combine_video_segments(self, segment_paths: list, output_task_id: str) -> str:
         """
@@ -54,15 +60,17 @@ class MediaProcessor:
                     f.write(f"file '{abs_path}'\n")
             
             # Use ffmpeg to concatenate videos
-            (
-                ffmpeg
-                .input(str(concat_file), format='concat', safe=0)
-                .output(str(output_path), 
-                       vcodec='libx264', 
-                       acodec='aac',
-                       **{'avoid_negative_ts': 'make_zero'})
-                .run(overwrite_output=True, quiet=True)
-            )
+            with media_stage("combine"):
+                (
+                    ffmpeg
+                    .input(str(concat_file), format='concat', safe=0)
+                    .output(str(output_path), 
+                           vcodec='libx264', 
+                           acodec='aac',
+                           **{'avoid_negative_ts': 'make_zero'})
+                    .run(overwrite_output=True, quiet=True)
+                )
+            count_stored_file(output_path)
             
             # Clean up concat file
             concat_file.unlink()
@@ -70,8 +78,10 @@ class MediaProcessor:
             return str(output_path)
             
         except Exception as e:
-            print(f"Error combining video segments: {e}")
+            logger.error("Error combining video segments: %s", e)
             raise
+    
+    async def download_and_process_video(self, video_url: str, task_id: str) -> Tuple[str, str]:
         """
         Download video from URL and generate thumbnail.
         
@@ -133,15 +143,199 @@ class MediaProcessor:
         
         return image_relative_path, thumbnail_relative_path
     
+    def to_storage_url(self, path: Path) -> str:
+        """Convert an on-disk path under public/storage to its /storage/... URL"""
+        return "/" + Path(path).resolve().relative_to(self.storage_root.parent.resolve()).as_posix()
+    
+    def resolve_storage_path(self, storage_url: str) -> Path:
+        """Convert a /storage/... URL stored on a task back to its on-disk path"""
+        return self.storage_root.parent / storage_url.lstrip('/')
+    
+    def segment_cache_path(self, parent_task_id: str, segment_index: int, revision: int = 0) -> Path:
+        """
+        Path of a cached, normalized segment of a long video.
+        
+        Each revision of a segment gets its own file so an edit never overwrites
+        a segment that the currently published video was spliced from.
+        """
+        segment_dir = self.segments_dir / parent_task_id
+        segment_dir.mkdir(parents=True, exist_ok=True)
+        return segment_dir / f"seg_{segment_index:03d}_r{revision}.mp4"
+    
+    def probe_video_profile(self, video_path: Path) -> Dict[str, int]:
+        """Read width, height and frame rate of a video (used as the splice profile)"""
+        probe = ffmpeg.probe(str(video_path))
+        video_stream = next(s for s in probe["streams"] if s["codec_type"] == "video")
+        num, _, den = video_stream.get("r_frame_rate", "24/1").partition("/")
+        fps = round(float(num) / float(den or 1)) if float(num) else 24
+        # libx264 with yuv420p needs even dimensions
+        return {
+            "width": int(video_stream["width"]) // 2 * 2,
+            "height": int(video_stream["height"]) // 2 * 2,
+            "fps": fps or 24,
+        }
+    
+    def probe_duration(self, video_path: Path) -> float:
+        """Duration of a media file in seconds"""
+        return float(ffmpeg.probe(str(video_path))["format"]["duration"])
+    
+    def _conform_video(self, stream, profile: Dict[str, int]):
+        """Scale/pad/retime a video stream to the splice profile"""
+        width, height = profile["width"], profile["height"]
+        return (
+            stream
+            .filter('scale', width, height, force_original_aspect_ratio='decrease')
+            .filter('pad', width, height, '(ow-iw)/2', '(oh-ih)/2')
+            .filter('setsar', 1)
+            .filter('fps', fps=profile["fps"])
+            .filter('format', 'yuv420p')
+        )
+    
+    def _extract_frame(self, video_path: Path, frame_path: Path, last: bool = False) -> None:
+        """Grab the first (or last) frame of a video as a still image"""
+        input_kwargs = {'sseof': -0.25} if last else {}
+        (
+            ffmpeg
+            .input(str(video_path), **input_kwargs)
+            .output(str(frame_path), vframes=1, format='image2', vcodec='png')
+            .overwrite_output()
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    
+    @media_stage("normalize")
+    def normalize_segment(self, source_path: Path, output_path: Path, profile: Dict[str, int],
+                          fade_in_from: Optional[Path] = None, fade_out_to: Optional[Path] = None,
+                          crossfade_duration: float = 0.0) -> Path:
+        """
+        Re-encode one segment to the canonical splice profile.
+        
+        Every cached segment shares codec, resolution, frame rate, pixel format,
+        timebase and audio layout, and starts on a keyframe, so segments can later
+        be concatenated with stream copy. Only the segment passed here is encoded.
+        
+        Args:
+            source_path: Segment as downloaded from the provider
+            output_path: Where to write the normalized segment
+            profile: Target {"width", "height", "fps"}
+            fade_in_from: Previous segment; its last frame is crossfaded into our start
+            fade_out_to: Next segment; our end is crossfaded into its first frame
+            crossfade_duration: Length of each seam crossfade in seconds (0 disables)
+            
+        Returns:
+            output_path
+        """
+        duration = self.probe_duration(source_path)
+        crossfade_duration = min(crossfade_duration, duration / 4)
+        source = ffmpeg.input(str(source_path))
+        video = self._conform_video(source.video, profile)
+        
+        frames = []
+        try:
+            if crossfade_duration > 0 and fade_in_from:
+                frame = output_path.with_suffix('.in.png')
+                self._extract_frame(fade_in_from, frame, last=True)
+                frames.append(frame)
+                still = self._conform_video(
+                    ffmpeg.input(str(frame), loop=1, t=crossfade_duration).video, profile
+                )
+                video = ffmpeg.filter([still, video], 'xfade', transition='fade',
+                                      duration=crossfade_duration, offset=0)
+            if crossfade_duration > 0 and fade_out_to:
+                frame = output_path.with_suffix('.out.png')
+                self._extract_frame(fade_out_to, frame)
+                frames.append(frame)
+                still = self._conform_video(
+                    ffmpeg.input(str(frame), loop=1, t=crossfade_duration).video, profile
+                )
+                video = ffmpeg.filter([video, still], 'xfade', transition='fade',
+                                      duration=crossfade_duration,
+                                      offset=max(duration - crossfade_duration, 0))
+            
+            has_audio = any(
+                s["codec_type"] == "audio" for s in ffmpeg.probe(str(source_path))["streams"]
+            )
+            if has_audio:
+                audio = source.audio.filter('aresample', 48000)
+            else:
+                # Keep a (silent) audio track on every segment so stream layouts match
+                audio = ffmpeg.input('anullsrc=channel_layout=stereo:sample_rate=48000', f='lavfi').audio
+            
+            (
+                ffmpeg
+                .output(video, audio, str(output_path),
+                        t=duration,
+                        vcodec='libx264', preset='veryfast', crf=20, pix_fmt='yuv420p',
+                        g=profile["fps"] * 2,
+                        acodec='aac', ar=48000, ac=2,
+                        video_track_timescale=90000,
+                        movflags='+faststart')
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+        except ffmpeg.Error as e:
+            raise Exception(f"Failed to normalize segment: {e.stderr.decode() if e.stderr else str(e)}")
+        finally:
+            for frame in frames:
+                frame.unlink(missing_ok=True)
+        
+        count_stored_file(output_path)
+        return output_path
+    
+    @media_stage("splice")
+    def splice_segments(self, segment_paths: List[Path], output_task_id: str) -> Tuple[str, str]:
+        """
+        Join normalized segments with stream copy (no re-encode) and thumbnail the result.
+        
+        Segments must come from normalize_segment() so that every join lands on
+        a keyframe with identical stream parameters.
+        
+        Returns:
+            Tuple of (local_video_path, local_thumbnail_path) as /storage/... URLs
+        """
+        if not segment_paths:
+            raise ValueError("No segment paths provided")
+        
+        video_filename = f"{output_task_id}_spliced_{uuid.uuid4().hex[:8]}.mp4"
+        thumbnail_filename = f"{output_task_id}_{uuid.uuid4().hex[:8]}.jpg"
+        video_path = self.videos_dir / video_filename
+        thumbnail_path = self.thumbnails_dir / thumbnail_filename
+        concat_file = self.videos_dir / f"{output_task_id}_{uuid.uuid4().hex[:8]}_concat.txt"
+        
+        try:
+            with open(concat_file, 'w') as f:
+                for segment_path in segment_paths:
+                    f.write(f"file '{Path(segment_path).resolve()}'\n")
+            
+            (
+                ffmpeg
+                .input(str(concat_file), format='concat', safe=0)
+                .output(str(video_path), c='copy', movflags='+faststart')
+                .overwrite_output()
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+        except ffmpeg.Error as e:
+            raise Exception(f"Failed to splice segments: {e.stderr.decode() if e.stderr else str(e)}")
+        finally:
+            concat_file.unlink(missing_ok=True)
+        count_stored_file(video_path)
+        
+        self._generate_thumbnail(video_path, thumbnail_path)
+        
+        return f"/storage/videos/{video_filename}", f"/storage/thumbnails/{thumbnail_filename}"
+    
     async def _download_file(self, url: str, save_path: Path) -> None:
         """Download file from URL to local path"""
-        async with httpx.AsyncClient(timeout=httpx.Timeout(60.0)) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            
-            with open(save_path, 'wb') as f:
-                f.write(response.content)
+        with media_stage("download"):
+            async with httpx.AsyncClient(timeout=httpx.Timeout(60.0)) as client:
+                response = await client.get(url)
+                response.raise_for_status()
+                
+                with open(save_path, 'wb') as f:
+                    f.write(response.content)
+        count_media_bytes("downloaded", len(response.content))
+        count_media_bytes("stored", len(response.content))
     
+    @media_stage("thumbnail")
     def _generate_thumbnail(self, video_path: Path, thumbnail_path: Path) -> None:
         """Generate thumbnail from video file"""
         try:
@@ -165,7 +359,9 @@ class MediaProcessor:
                 )
             except ffmpeg.Error as e2:
                 raise Exception(f"Failed to generate thumbnail: {e2.stderr.decode() if e2.stderr else str(e2)}")
+        count_stored_file(thumbnail_path)
     
+    @media_stage("image_thumbnail")
     def _generate_image_thumbnail(self, image_path: Path, thumbnail_path: Path, max_size: Tuple[int, int] = (512, 512)) -> None:
         """Generate thumbnail from image file"""
         try:
@@ -182,6 +378,7 @@ class MediaProcessor:
                 # Generate thumbnail
                 img.thumbnail(max_size, Image.Resampling.LANCZOS)
                 img.save(thumbnail_path, 'JPEG', quality=85, optimize=True)
+            count_stored_file(thumbnail_path)
         except Exception as e:
             raise Exception(f"Failed to generate image thumbnail: {str(e)}")
     
@@ -271,5 +468,5 @@ def download_and_save_media(media_url: str, task_id: str, media_type: str = "vid
             loop.close()
             
     except Exception as e:
-        print(f"Failed to download and save media: {e}")
+        logger.warning("Failed to download and save media: %s", e)
         return None
\ No newline at end of file
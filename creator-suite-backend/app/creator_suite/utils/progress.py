@@ -0,0 +1,169 @@
+"""
+Progress reporting from providers into task state.
+
+Providers call ``BaseProvider.report_progress`` from their poll loops. The
+TaskProgressReporter attached to a provider turns those calls into:
+
+- throttled updates of the task's Redis status snapshot (and a pub/sub event
+  for SSE / WebSocket subscribers), at most every ``redis_interval`` seconds;
+- rare writes of ``creation_tasks.progress`` (every ``db_interval`` seconds);
+- an immediate write of ``creation_tasks.provider_prediction_id`` when the
+  provider submits a prediction, so a re-delivered task resumes it;
+- an ETA blended from the provider's progress and the model's historical
+  generation durations, which are recorded when a generation finishes.
+"""
+
+import logging
+import statistics
+import time
+from typing import Any, Optional
+
+import redis
+from sqlalchemy import func, update
+
+from app.core.task_events import get_redis, publish_task_event
+from app.db.session import SessionLocal
+from app.models.creation_task import CreationTask
+
+logger = logging.getLogger(__name__)
+
+MODEL_DURATIONS_KEY = "model_durations:{model}"
+MODEL_DURATIONS_SAMPLES = 50
+
+# Never claim completion from a time-based estimate alone
+MAX_ESTIMATED_PROGRESS = 0.95
+
+
+def record_model_duration(model: str, seconds: float) -> None:
+    """Remember how long one generation of a model took"""
+    key = MODEL_DURATIONS_KEY.format(model=model)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.lpush(key, round(seconds, 2))
+        pipe.ltrim(key, 0, MODEL_DURATIONS_SAMPLES - 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Failed to record duration for %s: %s", model, e)
+
+
+def expected_model_duration(model: str) -> Optional[float]:
+    """Median of the model's recent generation durations, or None without history"""
+    try:
+        samples = get_redis().lrange(MODEL_DURATIONS_KEY.format(model=model), 0, -1)
+    except redis.RedisError as e:
+        logger.warning("Failed to read durations for %s: %s", model, e)
+        return None
+    return statistics.median(float(s) for s in samples) if samples else None
+
+
+def estimate_eta(progress: Optional[float], elapsed: float, expected: Optional[float]) -> Optional[float]:
+    """
+    Seconds remaining, blending two estimates.
+
+    Extrapolating from reported progress is noisy early on, the historical
+    duration knows nothing about this particular run; weight the former by
+    how far along we are.
+    """
+    by_history = max(expected - elapsed, 0.0) if expected else None
+    by_progress = elapsed * (1 - progress) / progress if progress and progress >= 0.05 else None
+
+    if by_progress is not None and by_history is not None:
+        return progress * by_progress + (1 - progress) * by_history
+    if by_progress is not None:
+        return by_progress
+    return by_history
+
+
+class TaskProgressReporter:
+    """Throttled sink for the progress signals of one creation task"""
+
+    def __init__(self, task_id: str, model: str,
+                 redis_interval: float = 1.0, db_interval: float = 30.0):
+        self.task_id = task_id
+        self.model = model
+        self.redis_interval = redis_interval
+        self.db_interval = db_interval
+        self.started = time.monotonic()
+        self.expected = expected_model_duration(model)
+        self._last_redis = 0.0
+        self._last_db = self.started
+        self._last_stage: Optional[str] = None
+        self._finished = False
+
+    @classmethod
+    def attach(cls, provider, task_id: str, **kwargs) -> "TaskProgressReporter":
+        """Create a reporter for a task and install it as the provider's progress callback"""
+        reporter = cls(task_id, provider.model_name or provider.provider_name, **kwargs)
+        provider.progress_callback = reporter
+        provider.prediction_callback = reporter.record_prediction
+        return reporter
+
+    def __call__(self, progress: Optional[float] = None, stage: Optional[str] = None, **details: Any) -> None:
+        now = time.monotonic()
+        elapsed = now - self.started
+
+        if progress is not None and progress >= 1.0:
+            self._finish(elapsed)
+            return
+
+        estimated = progress is None and bool(self.expected)
+        if estimated:
+            progress = min(elapsed / self.expected, MAX_ESTIMATED_PROGRESS)
+
+        # Stage changes (starting -> processing) always go out, the rest is throttled
+        if now - self._last_redis >= self.redis_interval or stage != self._last_stage:
+            self._last_redis = now
+            self._last_stage = stage
+            eta = estimate_eta(progress, elapsed, self.expected)
+            publish_task_event(
+                self.task_id,
+                progress=round(progress, 4) if progress is not None else None,
+                progress_estimated=estimated,
+                stage=stage,
+                eta_seconds=round(eta, 1) if eta is not None else None,
+                elapsed_seconds=round(elapsed, 1),
+                **details,
+            )
+
+        if progress is not None and now - self._last_db >= self.db_interval:
+            self._last_db = now
+            self._write_db_progress(progress)
+
+    def _finish(self, elapsed: float) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        record_model_duration(self.model, elapsed)
+        publish_task_event(self.task_id, progress=1.0, eta_seconds=0, elapsed_seconds=round(elapsed, 1))
+
+    def _write_db_progress(self, progress: float) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(CreationTask)
+                .where(CreationTask.id == self.task_id)
+                .values(progress=round(progress, 4))
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Failed to persist progress for task %s: %s", self.task_id, e)
+        finally:
+            db.close()
+
+    def record_prediction(self, prediction_id: str) -> None:
+        """Persist the id of a just-submitted prediction before polling it"""
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(CreationTask)
+                .where(CreationTask.id == self.task_id)
+                .values(provider_prediction_id=prediction_id, prediction_submitted_at=func.now())
+            )
+            db.commit()
+        except Exception as e:
+            # Still generating; only a crash before completion would submit it again
+            db.rollback()
+            logger.warning("Failed to persist prediction %s of task %s: %s", prediction_id, self.task_id, e)
+        finally:
+            db.close()
@@ -1,15 +1,18 @@
+import logging
 import os
 import httpx
-import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from app.creator_suite.base_provider import BaseProvider
+from app.core.metrics import provider_transport
 from app.creator_suite.schemas import OutputAsset, AssetType
 from app.creator_suite.video.schemas.hailuo_02_schemas import MinimaxHailuo02Input, MinimaxHailuo02Output
 from app.core.config import settings
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
 
@@ -40,91 +43,39 @@ class MinimaxHailuo02Provider(BaseProvider):
         
         start_time = datetime.utcnow()
         
-        async with httpx.AsyncClient(timeout=httpx.Timeout(60.0, read=90.0)) as client:
-            # Create prediction
-            response = await client.post(
-                f"{self.base_url}/models/{self.model_name}/predictions",
-                headers=headers,
-                json=payload,
-                timeout=30.0
+        async with httpx.AsyncClient(timeout=httpx.Timeout(60.0, read=90.0), transport=provider_transport(self.provider_name)) as client:
+            prediction_id = await self.submit_replicate_prediction(client, headers, payload)
+
+            # Poll for completion: 10 minutes with 1-second intervals
+            result = await self.wait_for_replicate_prediction(client, headers, poll_interval=1, max_attempts=600)
+
+            output_url = result.get("output")
+            if not output_url:
+                raise ValueError("No output URL in completed prediction")
+
+            generation_time = (datetime.utcnow() - start_time).total_seconds()
+
+            # Create OutputAsset
+            output_asset = OutputAsset(
+                url=output_url,
+                asset_type=AssetType.VIDEO,
+                mime_type="video/mp4",
+                provider="replicate",
+                model_name=self.model_name,
+                model_version=self.model_version,
+                generation_time_seconds=generation_time,
+                metadata={
+                    "prediction_id": prediction_id,
+                    "status": result.get("status"),
+                    "prompt": validated_input.prompt,
+                    "prompt_optimizer": validated_input.prompt_optimizer,
+                    "first_frame_image": validated_input.first_frame_image,
+                    "logs": result.get("logs"),
+                    "metrics": result.get("metrics")
+                }
             )
-            
-            response.raise_for_status()
-            prediction = response.json()
-            
-            prediction_id = prediction.get("id")
-            if not prediction_id:
-                raise ValueError("No prediction ID received from Replicate")
-            
-            # Poll for completion
-            poll_url = f"{self.base_url}/predictions/{prediction_id}"
-            max_attempts = 600  # 10 minutes with 1-second intervals
-            
-            for attempt in range(max_attempts):
-                await asyncio.sleep(1)  # Wait 1 second between polls
-                
-                # Retry polling with timeout handling
-                max_retries = 3
-                for retry in range(max_retries):
-                    try:
-                        poll_response = await client.get(poll_url, headers=headers)
-                        poll_response.raise_for_status()
-                        result = poll_response.json()
-                        break  # Success, exit retry loop
-                    except (httpx.ReadTimeout, httpx.ConnectTimeout) as e:
-                        if retry < max_retries - 1:  # Not the last retry
-                            await asyncio.sleep(2)  # Wait 2 seconds before retry
-                            continue
-                        else:
-                            # Last retry failed, continue to next polling attempt
-                            print(f"Polling timeout on attempt {attempt}, retrying...")
-                            continue
-                else:
-                    # All retries failed, skip this polling attempt
-                    continue
-                
-                status = result.get("status")
-                
-                if status == "succeeded":
-                    output_url = result.get("output")
-                    if not output_url:
-                        raise ValueError("No output URL in completed prediction")
-                    
-                    generation_time = (datetime.utcnow() - start_time).total_seconds()
-                    
-                    # Create OutputAsset
-                    output_asset = OutputAsset(
-                        url=output_url,
-                        asset_type=AssetType.VIDEO,
-                        mime_type="video/mp4",
-                        provider="replicate",
-                        model_name=self.model_name,
-                        model_version=self.model_version,
-                        generation_time_seconds=generation_time,
-                        metadata={
-                            "prediction_id": prediction_id,
-                            "status": status,
-                            "prompt": validated_input.prompt,
-                            "prompt_optimizer": validated_input.prompt_optimizer,
-                            "first_frame_image": validated_input.first_frame_image,
-                            "logs": result.get("logs"),
-                            "metrics": result.get("metrics")
-                        }
-                    )
-                    
-                    return [output_asset]
-                
-                elif status == "failed":
-                    error = result.get("error", "Unknown error")
-                    raise ValueError(f"Prediction failed: {error}")
-                
-                elif status == "canceled":
-                    raise ValueError("Prediction was canceled")
-                
-                # Continue polling for "starting" or "processing" status
-            
-            # Timeout
-            raise TimeoutError(f"Prediction did not complete within {max_attempts} seconds")
+
+            return [output_asset]
     
     def validate_input(self, input_data: Dict[str, Any]) -> MinimaxHailuo02Input:
         """Validate and transform input data"""
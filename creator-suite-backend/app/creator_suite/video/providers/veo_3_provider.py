@@ -1,10 +1,10 @@
 import os
 import httpx
-import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from app.creator_suite.base_provider import BaseProvider
+from app.core.metrics import provider_transport
 from app.creator_suite.schemas import OutputAsset, AssetType
 from app.creator_suite.video.schemas.veo_3_schemas import GoogleVeo3Input
 from app.core.config import settings
@@ -39,76 +39,39 @@ class GoogleVeo3Provider(BaseProvider):
         
         start_time = datetime.utcnow()
         
-        async with httpx.AsyncClient(timeout=None) as client:
-            # Create prediction
-            response = await client.post(
-                f"{self.base_url}/models/{self.model_name}/predictions",
-                json=payload,
-                headers=headers
+        async with httpx.AsyncClient(timeout=None, transport=provider_transport(self.provider_name)) as client:
+            prediction_id = await self.submit_replicate_prediction(client, headers, payload)
+
+            # Poll for completion: 10 minutes with 10-second intervals
+            prediction_status = await self.wait_for_replicate_prediction(
+                client, headers, poll_interval=10, max_attempts=60
             )
-            
-            if response.status_code != 201:
-                error_detail = response.json().get("detail", "Unknown error")
-                raise ValueError(f"Failed to create prediction: {error_detail}")
-            
-            prediction = response.json()
-            prediction_id = prediction["id"]
-            prediction_url = prediction["urls"]["get"]
-            
-            # Poll for completion
-            max_attempts = 60  # 10 minutes with 10-second interval
-            for attempt in range(max_attempts):
-                await asyncio.sleep(10)  # Check every 10 seconds
-                
-                status_response = await client.get(
-                    prediction_url,
-                    headers=headers
-                )
-                
-                if status_response.status_code != 200:
-                    raise ValueError(f"Failed to get prediction status: {status_response.text}")
-                
-                prediction_status = status_response.json()
-                
-                if prediction_status["status"] == "succeeded":
-                    # Get the video URL from the output
-                    output = prediction_status["output"]
-                    
-                    if not output:
-                        raise ValueError("No output returned from the model")
-                    
-                    video_url = output
-                    
-                    # Calculate generation time
-                    end_time = datetime.utcnow()
-                    generation_time = (end_time - start_time).total_seconds()
-                    
-                    # Create output asset
-                    output_asset = OutputAsset(
-                        url=video_url,
-                        asset_type=AssetType.VIDEO,
-                        mime_type="video/mp4",
-                        provider="replicate",
-                        model_name=self.model_name,
-                        model_version=prediction_status.get("version"),
-                        generation_time_seconds=generation_time,
-                        metadata={
-                            "prediction_id": prediction_id,
-                            "replicate_prediction": prediction_status
-                        }
-                    )
-                    
-                    return [output_asset]
-                
-                elif prediction_status["status"] == "failed":
-                    error = prediction_status.get("error", "Unknown error")
-                    raise ValueError(f"Prediction failed: {error}")
-                
-                elif prediction_status["status"] == "canceled":
-                    raise ValueError("Prediction was canceled")
-            
-            # If we get here, we've timed out
-            raise asyncio.TimeoutError("Prediction timed out after 10 minutes")
+
+            # Get the video URL from the output
+            video_url = prediction_status["output"]
+            if not video_url:
+                raise ValueError("No output returned from the model")
+
+            # Calculate generation time
+            end_time = datetime.utcnow()
+            generation_time = (end_time - start_time).total_seconds()
+
+            # Create output asset
+            output_asset = OutputAsset(
+                url=video_url,
+                asset_type=AssetType.VIDEO,
+                mime_type="video/mp4",
+                provider="replicate",
+                model_name=self.model_name,
+                model_version=prediction_status.get("version"),
+                generation_time_seconds=generation_time,
+                metadata={
+                    "prediction_id": prediction_id,
+                    "replicate_prediction": prediction_status
+                }
+            )
+
+            return [output_asset]
     
     def validate_input(self, input_data: Dict[str, Any]) -> GoogleVeo3Input:
         """Validate and transform input data"""
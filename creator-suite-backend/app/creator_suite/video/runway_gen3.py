@@ -23,6 +23,7 @@ class RunwayGen3Provider(BaseProvider):
         self.api_key = os.getenv("RUNWAY_API_KEY")
         self.base_url = "https://api.runwayml.com/v1"
         self.provider_name = "runway"
+        self.model_name = "gen3a_turbo"
         
         if not self.api_key:
             logger.error("RUNWAY_API_KEY not found in environment variables")
@@ -205,6 +206,11 @@ class RunwayGen3Provider(BaseProvider):
                 
                 status = status_response.get("status")
                 logger.debug(f"Runway task {task_id} status: {status} (attempt {attempt + 1})")
+                # Runway reports a 0-1 "progress" fraction while the task is RUNNING
+                self.report_progress(
+                    1.0 if status == "SUCCEEDED" else status_response.get("progress"),
+                    stage=status.lower() if status else None
+                )
                 
                 if status == "SUCCEEDED":
                     output = status_response.get("output", [])
@@ -1,5 +1,6 @@
+import logging
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from celery import Task
 from sqlalchemy.orm import Session
 
@@ -9,6 +10,11 @@ from app.models.creation_task import CreationTask
 from app.creator_suite.schemas import TaskStatus
 from app.creator_suite.video.providers.hailuo_02_provider import MinimaxHailuo02Provider
 from app.creator_suite.utils.media_processor import MediaProcessor
+from app.creator_suite.utils.progress import TaskProgressReporter
+from app.creator_suite.retry_policy import FINISHED_STATUSES, finished_result, prediction_to_resume, retry_or_fail
+from app.services.cancellation import run_cancellable
+
+logger = logging.getLogger(__name__)
 
 
 class CallbackTask(Task):
@@ -20,27 +26,36 @@ class CallbackTask(Task):
 
 @celery_app.task(bind=True, base=CallbackTask, name="generate_hailuo_02_video", 
                  soft_time_limit=600, time_limit=720)  # 10 minutes soft, 12 minutes hard limit
-def generate_hailuo_02_video(self, task_id: str, input_data: Dict[str, Any]):
+def generate_hailuo_02_video(self, task_id: str, input_data: Dict[str, Any], resume_prediction_id: Optional[str] = None):
     """
     Celery task to generate video using Minimax hailuo-02 model.
     
     Args:
         task_id: Unique identifier for the creation task
         input_data: Input parameters for video generation
+        resume_prediction_id: Prediction submitted by an earlier attempt, polled instead of submitting anew
     """
     db = SessionLocal()
+    task = None
+    provider = None
     
     try:
         # Update task status to processing
         task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
         if not task:
             raise ValueError(f"Task {task_id} not found")
+        if task.status in FINISHED_STATUSES:
+            # Re-delivered after finishing (the worker was lost before acknowledging), or cancelled
+            return finished_result(task)
         
         task.status = TaskStatus.PROCESSING
         db.commit()
         
         # Initialize provider and generate video
         provider = MinimaxHailuo02Provider()
+        # Re-delivered after a worker crash: poll the prediction submitted before it
+        provider.prediction_id = prediction_to_resume(task, resume_prediction_id)
+        TaskProgressReporter.attach(provider, task_id)
         
         # Run async generation in sync context
         import asyncio
@@ -48,7 +63,7 @@ def generate_hailuo_02_video(self, task_id: str, input_data: Dict[str, Any]):
         asyncio.set_event_loop(loop)
         
         try:
-            output_assets = loop.run_until_complete(provider.generate(input_data))
+            output_assets = run_cancellable(loop, provider.generate(input_data), task_id, provider)
             
             if not output_assets:
                 raise ValueError("No output assets generated")
@@ -94,17 +109,8 @@ def generate_hailuo_02_video(self, task_id: str, input_data: Dict[str, Any]):
             loop.close()
             
     except Exception as e:
-        # Rollback any pending transaction
-        db.rollback()
-        
-        # Update task status to failed
-        if 'task' in locals():
-            task.status = TaskStatus.FAILED
-            task.error_message = str(e)
-            db.commit()
-        
-        # Re-raise the exception for Celery to handle
-        raise e
+        # Retried with backoff (resuming the prediction) or marked failed
+        retry_or_fail(self, db, task, e, provider)
         
     finally:
         db.close()
@@ -146,12 +152,12 @@ def cancel_hailuo_02_generation(self, task_id: str, prediction_id: str):
                     response.raise_for_status()
                 except Exception as e:
                     # Log the error but don't fail the cancellation
-                    print(f"Failed to cancel Replicate prediction {prediction_id}: {e}")
+                    logger.warning("Failed to cancel Replicate prediction %s: %s", prediction_id, e)
         
         return {"status": "cancelled", "task_id": task_id}
         
     except Exception as e:
-        print(f"Error cancelling hailuo-02 generation {task_id}: {e}")
+        logger.error("Error cancelling hailuo-02 generation %s: %s", task_id, e)
         raise e
         
     finally:
@@ -1,6 +1,7 @@
+import logging
 import uuid
 from typing import Dict, Any, Optional, List
-from celery import Task
+from celery import Task, chord
 from sqlalchemy.orm import Session
 import asyncio
 import json
@@ -13,7 +14,27 @@ from app.creator_suite.schemas import TaskStatus, LongVideoGeneration, VideoSegm
 from app.creator_suite.video.tasks.minimax_tasks import generate_minimax_video
 from app.creator_suite.video.tasks.hailuo_02_tasks import generate_hailuo_02_video
 from app.creator_suite.video.tasks.veo_3_tasks import generate_veo_3_video
-from app.creator_suite.video.tasks.sequential_tasks import generate_runway_video_sequential
+from app.creator_suite.video.video_editor import VideoSegmentEditor
+from app.creator_suite.utils.media_processor import MediaProcessor
+from app.services import credit_service
+
+logger = logging.getLogger(__name__)
+
+
+# Celery task that generates a single 8-second segment, per replicate service
+SEGMENT_TASKS_BY_SERVICE = {
+    "minimax/video-01": generate_minimax_video,
+    "google/veo-3": generate_veo_3_video,
+    "minimax/hailuo-02": generate_hailuo_02_video,
+}
+
+
+def get_segment_task(task: CreationTask):
+    """Return the Celery task used to generate segments for a long video task, or None"""
+    if task.provider != "replicate":
+        return None
+    service_name = task.service.name if task.service else None
+    return SEGMENT_TASKS_BY_SERVICE.get(service_name)
 
 
 class LongVideoTask(Task):
@@ -111,28 +132,25 @@ def generate_long_video(self, task_id: str, input_data: Dict[str, Any], long_vid
         db.commit()
 
         # Dispatch segment tasks to appropriate video generation tasks
+        segment_generator = get_segment_task(task)
+        if segment_generator is None:
+            raise ValueError(f"Unsupported provider {task.provider} / service for long video segments")
+
+        segment_signatures = []
         for i, segment_task_id in enumerate(segment_task_ids):
             segment_input = {
                 **input_data,
                 'prompt': f"[LV:{group_id}][SEG:{i+1}/{len(config.segments)}] {config.segments[i].prompt}",
                 'image': config.segments[i].seed_image_url if config.segments[i].seed_image_url else input_data.get('image')
             }
+            # Celery task id = creation task id, so a cancel can revoke the segment
+            segment_signatures.append(segment_generator.si(segment_task_id, segment_input).set(task_id=segment_task_id))
 
-            # Dispatch based on provider and service name
-            if task.provider == "replicate":
-                service_name = task.service.name if hasattr(task, 'service') and task.service else None
-                if service_name == "minimax/video-01":
-                    generate_minimax_video.delay(segment_task_id, segment_input)
-                elif service_name == "google/veo-3":
-                    generate_veo_3_video.delay(segment_task_id, segment_input)
-                elif service_name == "minimax/hailuo-02":
-                    generate_hailuo_02_video.delay(segment_task_id, segment_input)
-                elif service_name == "runway/gen-3-alpha":
-                    generate_runway_video_sequential.delay(segment_task_id, segment_input)
-                else:
-                    print(f"Unsupported service {service_name} for long video segment")
-            else:
-                print(f"Unsupported provider {task.provider} for long video segment")
+        # Splice the segments once every one of them has been generated; a failed
+        # segment never reaches the callback, so the errback fails the parent
+        chord(segment_signatures)(
+            assemble_long_video.si(task_id).on_error(handle_long_video_segment_failure.si(task_id))
+        )
 
         return {
             "status": "processing",
@@ -182,7 +200,7 @@ def pause_long_video_generation(self, task_id: str, segment_index: int):
             return {"status": "paused", "paused_at": segment_index}
 
     except Exception as e:
-        print(f"Error pausing task {task_id}: {str(e)}")
+        logger.error("Error pausing task %s: %s", task_id, e)
         raise
     finally:
         db.close()
@@ -221,7 +239,320 @@ def resume_long_video_generation(self, task_id: str, new_prompt: Optional[str] =
                 return {"status": "resumed", "from_segment": config.paused_at_segment}
 
     except Exception as e:
-        print(f"Error resuming task {task_id}: {str(e)}")
+        logger.error("Error resuming task %s: %s", task_id, e)
+        raise
+    finally:
+        db.close()
+
+
+
+@celery_app.task(bind=True, base=LongVideoTask, name="assemble_long_video",
+                 soft_time_limit=600, time_limit=720)
+def assemble_long_video(self, task_id: str):
+    """
+    Normalize each generated segment into the segment cache and splice them.
+
+    Segments that are already cached are reused as-is; the final join is a
+    stream copy, so this only pays encode time for segments not yet cached.
+
+    Args:
+        task_id: The long video (parent) task
+    """
+    db = SessionLocal()
+
+    try:
+        task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+        if not task:
+            raise ValueError(f"Task {task_id} not found")
+        if task.status == TaskStatus.CANCELLED:
+            return {"task_id": task_id, "status": "cancelled"}
+
+        config = dict(task.long_video_config or {})
+        segment_task_ids = config.get("segment_task_ids") or []
+        if not segment_task_ids:
+            raise ValueError(f"Task {task_id} has no segment tasks")
+
+        segment_tasks = {
+            segment.id: segment
+            for segment in db.query(CreationTask).filter(CreationTask.id.in_(segment_task_ids))
+        }
+
+        processor = MediaProcessor()
+        cache_paths = list(config.get("segment_cache_paths") or [None] * len(segment_task_ids))
+        profile = config.get("segment_profile")
+
+        for i, segment_task_id in enumerate(segment_task_ids):
+            if cache_paths[i] and processor.resolve_storage_path(cache_paths[i]).exists():
+                continue
+
+            segment = segment_tasks.get(segment_task_id)
+            if not segment or not segment.local_video_url:
+                raise ValueError(f"Segment {i + 1} of task {task_id} has no local video")
+
+            source = processor.resolve_storage_path(segment.local_video_url)
+            if profile is None:
+                profile = processor.probe_video_profile(source)
+
+            output_path = processor.segment_cache_path(task_id, i)
+            processor.normalize_segment(source, output_path, profile)
+            cache_paths[i] = processor.to_storage_url(output_path)
+
+        video_path, thumbnail_path = processor.splice_segments(
+            [processor.resolve_storage_path(path) for path in cache_paths], task_id
+        )
+
+        task.long_video_config = {
+            **config,
+            "segment_cache_paths": cache_paths,
+            "segment_profile": profile,
+        }
+        task.local_video_url = video_path
+        task.local_thumbnail_url = thumbnail_path
+        task.status = TaskStatus.COMPLETED
+        db.commit()
+
+        return {
+            "task_id": task_id,
+            "status": "completed",
+            "local_video_url": video_path,
+            "local_thumbnail_url": thumbnail_path
+        }
+
+    except Exception as e:
+        db.rollback()
+        task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+        if task:
+            task.status = TaskStatus.FAILED
+            task.error_message = f"Failed to assemble long video: {str(e)}"
+            db.commit()
+        raise
+    finally:
+        db.close()
+
+
+def _restore_after_failed_edit(db: Session, task: CreationTask, hold_id: Optional[int], error: str):
+    """Return the edit's credits and put the task back on its previously spliced video"""
+    # Released before the status change, which would otherwise settle the hold
+    if hold_id:
+        credit_service.release_hold(db, hold_id, commit=False)
+    task.status = TaskStatus.COMPLETED if task.local_video_url else TaskStatus.FAILED
+    task.error_message = error
+    db.commit()
+
+
+@celery_app.task(bind=True, base=LongVideoTask, name="handle_long_video_segment_failure")
+def handle_long_video_segment_failure(self, task_id: str, hold_id: Optional[int] = None, edit: bool = False):
+    """
+    Chord errback: a segment of a long video failed, so the splice never runs.
+
+    A fresh generation is marked failed (releasing its credit hold); an edit
+    releases the edit's hold and leaves the previous video in place.
+
+    Args:
+        task_id: The long video (parent) task
+        hold_id: Credit hold of the edit, if any
+        edit: Whether the chord regenerated segments of a completed video
+    """
+    db = SessionLocal()
+
+    try:
+        task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+        # Cancelled, or already resolved by the splice itself
+        if not task or task.status != TaskStatus.PROCESSING:
+            return {"task_id": task_id, "status": task.status if task else "missing"}
+
+        if edit:
+            _restore_after_failed_edit(db, task, hold_id, "Segment edit failed: a regenerated segment failed")
+        else:
+            task.status = TaskStatus.FAILED
+            task.error_message = "Failed to generate long video: a segment failed"
+            db.commit()
+
+        logger.warning("Long video %s: segment failed, task is now %s", task_id, task.status)
+        return {"task_id": task_id, "status": task.status}
+
+    except Exception as e:
+        db.rollback()
+        logger.error("Error handling segment failure for task %s: %s", task_id, e)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, base=LongVideoTask, name="regenerate_long_video_segments")
+def regenerate_long_video_segments(self, task_id: str, segments_to_edit: List[Dict[str, Any]],
+                                   crossfade_duration: float = 0.0, hold_id: Optional[int] = None):
+    """
+    Regenerate only the given segments of a completed long video.
+
+    A new segment task is created per edited segment; once they finish,
+    splice_edited_long_video swaps them into the cached segment list.
+
+    Args:
+        task_id: The long video (parent) task
+        segments_to_edit: Dicts with "segment_id" (1-based) and "new_prompt"
+        crossfade_duration: Seam crossfade length in seconds (0 disables)
+        hold_id: Credit hold reserved for the edit; settled by the splice, released on failure
+    """
+    db = SessionLocal()
+
+    try:
+        task = db.query(CreationTask).join(CreationTask.service).filter(CreationTask.id == task_id).first()
+        if not task:
+            raise ValueError(f"Task {task_id} not found")
+
+        segment_generator = get_segment_task(task)
+        if segment_generator is None:
+            raise ValueError(f"Unsupported provider {task.provider} / service for long video segments")
+
+        config = dict(task.long_video_config or {})
+        segment_task_ids = config.get("segment_task_ids") or []
+        revision = config.get("edit_revision", 0) + 1
+        group_id = config.get("group_id", "")
+
+        originals = {
+            segment.id: segment
+            for segment in db.query(CreationTask).filter(CreationTask.id.in_(segment_task_ids))
+        }
+
+        edited = {}
+        signatures = []
+        for edit in segments_to_edit:
+            index = edit["segment_id"] - 1
+            original = originals.get(segment_task_ids[index])
+            segment_input = {
+                **(original.input_data if original else task.input_data),
+                'prompt': f"[LV:{group_id}][SEG:{index + 1}/{len(segment_task_ids)}] {edit['new_prompt']}",
+            }
+            new_segment = CreationTask(
+                id=f"{task_id}_seg_{index}_r{revision}",
+                user_id=task.user_id,
+                task_type="video",
+                provider=task.provider,
+                service_id=task.service_id,
+                input_data=segment_input,
+                status=TaskStatus.PENDING,
+                long_video_config={
+                    "group_id": group_id,
+                    "segment_index": index,
+                    "total_segments": len(segment_task_ids),
+                    "parent_task_id": task_id,
+                    "edit_revision": revision
+                }
+            )
+            db.add(new_segment)
+            edited[str(index)] = new_segment.id
+            signatures.append(segment_generator.si(new_segment.id, segment_input).set(task_id=new_segment.id))
+
+        task.status = TaskStatus.PROCESSING
+        task.long_video_config = {**config, "edit_revision": revision}
+        db.commit()
+
+        chord(signatures)(
+            splice_edited_long_video.si(task_id, edited, revision, crossfade_duration, hold_id).on_error(
+                handle_long_video_segment_failure.si(task_id, hold_id, True)
+            )
+        )
+
+        return {"status": "processing", "edit_revision": revision, "segment_task_ids": list(edited.values())}
+
+    except Exception as e:
+        db.rollback()
+        logger.error("Error regenerating segments for task %s: %s", task_id, e)
+        task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+        if task and task.status == TaskStatus.PROCESSING:
+            _restore_after_failed_edit(db, task, hold_id, f"Segment edit failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, base=LongVideoTask, name="splice_edited_long_video",
+                 soft_time_limit=300, time_limit=360)
+def splice_edited_long_video(self, task_id: str, edited: Dict[str, str], revision: int,
+                             crossfade_duration: float = 0.0, hold_id: Optional[int] = None):
+    """
+    Swap regenerated segments into a long video and re-splice it with stream copy.
+
+    Args:
+        task_id: The long video (parent) task
+        edited: Mapping of 0-based segment index (as str) to the new segment task ID
+        revision: Edit revision, used to name the new cached segment files
+        crossfade_duration: Seam crossfade length in seconds (0 disables)
+        hold_id: Credit hold reserved for the edit
+    """
+    db = SessionLocal()
+
+    try:
+        task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+        if not task:
+            raise ValueError(f"Task {task_id} not found")
+        if task.status == TaskStatus.CANCELLED:
+            return {"task_id": task_id, "status": "cancelled"}
+
+        config = dict(task.long_video_config or {})
+        new_segments = {
+            segment.id: segment
+            for segment in db.query(CreationTask).filter(CreationTask.id.in_(list(edited.values())))
+        }
+
+        edited_segments = []
+        for index, segment_task_id in edited.items():
+            segment = new_segments.get(segment_task_id)
+            if not segment or not segment.local_video_url:
+                raise ValueError(f"Regenerated segment {int(index) + 1} has no local video")
+            edited_segments.append({
+                "segment_id": int(index) + 1,
+                "generated_video_path": segment.local_video_url,
+                "revision": revision
+            })
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            result = loop.run_until_complete(
+                VideoSegmentEditor().merge_edited_segments(
+                    config["segment_cache_paths"], edited_segments, task_id, crossfade_duration
+                )
+            )
+        finally:
+            loop.close()
+
+        segment_task_ids = list(config.get("segment_task_ids") or [])
+        for index, segment_task_id in edited.items():
+            segment_task_ids[int(index)] = segment_task_id
+
+        task.long_video_config = {
+            **config,
+            "segment_task_ids": segment_task_ids,
+            "segment_cache_paths": result["segment_paths"],
+            "last_edit": {
+                "revision": revision,
+                "operations": result["operations"],
+                "processing_time_seconds": result["processing_time_seconds"]
+            }
+        }
+        task.local_video_url = result["video_path"]
+        task.local_thumbnail_url = result["thumbnail_path"]
+        if hold_id:
+            credit_service.settle_hold(db, hold_id, commit=False)
+        task.status = TaskStatus.COMPLETED
+        task.error_message = None
+        db.commit()
+
+        return {
+            "task_id": task_id,
+            "status": "completed",
+            "local_video_url": result["video_path"],
+            "edited_segments": sorted(int(index) + 1 for index in edited)
+        }
+
+    except Exception as e:
+        db.rollback()
+        task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
+        if task:
+            # The previously spliced video is untouched, so the task stays usable
+            _restore_after_failed_edit(db, task, hold_id, f"Segment edit failed: {str(e)}")
         raise
     finally:
         db.close()
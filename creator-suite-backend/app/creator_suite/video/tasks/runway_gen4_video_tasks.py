@@ -1,3 +1,4 @@
+import logging
 import os
 from typing import Dict, Any
 from celery import Task
@@ -9,10 +10,15 @@ from app.models.creation_task import CreationTask
 from app.models.creation_task import TaskStatus
 from app.creator_suite.video.providers.runway_gen4_video_provider import RunwayGen3AlphaVideoProvider
 from app.creator_suite.utils import download_and_save_media
+from app.creator_suite.retry_policy import FINISHED_STATUSES, finished_result, retry_or_fail
+from app.services.cancellation import run_cancellable
 
 from dotenv import load_dotenv
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class CallbackTask(Task):
 
@@ -32,12 +38,17 @@ def generate_runway_gen4_video(self, task_id: str, input_data: Dict[str, Any]):
         input_data: Input parameters for video generation
     """
     db = SessionLocal()
+    task = None
+    provider = None
 
     try:
         # Update task status to processing
         task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
         if not task:
             raise ValueError(f"Task {task_id} not found")
+        if task.status in FINISHED_STATUSES:
+            # Re-delivered after finishing, or cancelled while queued
+            return finished_result(task)
 
         task.status = TaskStatus.PROCESSING
         db.commit()
@@ -51,7 +62,7 @@ def generate_runway_gen4_video(self, task_id: str, input_data: Dict[str, Any]):
         asyncio.set_event_loop(loop)
 
         try:
-            output_assets = loop.run_until_complete(provider.generate(input_data))
+            output_assets = run_cancellable(loop, provider.generate(input_data), task_id, provider)
         finally:
             loop.close()
 
@@ -74,7 +85,7 @@ def generate_runway_gen4_video(self, task_id: str, input_data: Dict[str, Any]):
                         if local_paths.get("thumbnail_path"):
                             task.local_thumbnail_url = local_paths.get("thumbnail_path")
                 except Exception as e:
-                    print(f"Failed to download video locally: {e}")
+                    logger.warning("Failed to download video locally: %s", e)
                     # Continue even if local download fails
 
         # Convert output assets to dict for JSON storage with datetime serialization
@@ -97,19 +108,9 @@ def generate_runway_gen4_video(self, task_id: str, input_data: Dict[str, Any]):
             "output_assets": output_assets_dict
         }
 
-    except asyncio.TimeoutError as e:
-        # Update task with timeout error
-        task.status = TaskStatus.FAILED
-        task.error_message = "Video generation timed out after 10 minutes"
-        db.commit()
-        raise
-
     except Exception as e:
-        # Update task with error
-        task.status = TaskStatus.FAILED
-        task.error_message = str(e)
-        db.commit()
-        raise
+        # Retried with backoff or marked failed
+        retry_or_fail(self, db, task, e, provider)
 
     finally:
         db.close()
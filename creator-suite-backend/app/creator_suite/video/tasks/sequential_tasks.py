@@ -1,3 +1,4 @@
+import logging
 import uuid
 from typing import Dict, Any, Optional
 from celery import Task
@@ -10,6 +11,8 @@ from app.creator_suite.schemas import TaskStatus
 from app.creator_suite.video.providers.minimax_provider import MinimaxVideoProvider
 from app.creator_suite.utils.media_processor import MediaProcessor
 
+logger = logging.getLogger(__name__)
+
 
 class SequentialTask(Task):
     """
@@ -81,8 +84,8 @@ def generate_minimax_video_sequential(self, task_id: str, input_data: Dict[str,
         provider = MinimaxVideoProvider()
         
         # Sequential video generation
-        print(f"🎬 Starting Minimax video generation for task {task_id}")
-        print(f"📝 Input: {input_data.get('text_prompt', 'No prompt')}")
+        logger.info("Starting Minimax video generation")
+        logger.debug("Prompt: %.100s", input_data.get("text_prompt", ""))
         
         # Use synchronous generation method
         output_assets = provider.generate_sync(input_data)
@@ -100,7 +103,7 @@ def generate_minimax_video_sequential(self, task_id: str, input_data: Dict[str,
         
         # Sequential media processing (no async complexity)
         if output_assets and output_assets[0].url:
-            print(f"📥 Processing media for task {task_id}")
+            logger.info("Processing media")
             media_processor = MediaProcessor()
             
             try:
@@ -112,10 +115,10 @@ def generate_minimax_video_sequential(self, task_id: str, input_data: Dict[str,
                 # Update task with local paths
                 task.local_video_url = local_video_path
                 task.local_thumbnail_url = local_thumbnail_path
-                print(f"✅ Media processed: {local_video_path}")
+                logger.info("Media processed: %s", local_video_path)
                 
             except Exception as media_error:
-                print(f"⚠️ Media processing failed (non-critical): {media_error}")
+                logger.warning("Media processing failed (non-critical): %s", media_error)
                 # Continue without local media - not a critical error
         
         # Update task with successful results
@@ -124,7 +127,7 @@ def generate_minimax_video_sequential(self, task_id: str, input_data: Dict[str,
         task.processing_time_seconds = output_assets[0].generation_time_seconds if output_assets else None
         self.db_session.commit()
         
-        print(f"🎉 Task {task_id} completed successfully")
+        logger.info("Task %s completed", task_id)
         
         return {
             "task_id": task_id,
@@ -137,7 +140,7 @@ def generate_minimax_video_sequential(self, task_id: str, input_data: Dict[str,
         
     except Exception as e:
         error_msg = f"Video generation failed: {str(e)}"
-        print(f"❌ Task {task_id} failed: {error_msg}")
+        logger.error("Task %s failed: %s", task_id, error_msg)
         
         # Update task with error
         self.update_task_status(task_id, TaskStatus.FAILED, error_msg)
@@ -145,7 +148,7 @@ def generate_minimax_video_sequential(self, task_id: str, input_data: Dict[str,
         # Don't retry for most errors - let the user try again
         if "connection" in str(e).lower() or "network" in str(e).lower():
             # Only retry network-related errors
-            print(f"🔄 Retrying task {task_id} due to network error")
+            logger.info("Retrying task %s after network error", task_id)
             self.retry(countdown=60, max_retries=2, exc=e)
         else:
             # Don't retry other errors
@@ -1,5 +1,6 @@
+import logging
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from celery import Task
 from sqlalchemy.orm import Session
 
@@ -9,6 +10,11 @@ from app.models.creation_task import CreationTask
 from app.creator_suite.schemas import TaskStatus
 from app.creator_suite.video.providers.veo_3_provider import GoogleVeo3Provider
 from app.creator_suite.utils.media_processor import MediaProcessor
+from app.creator_suite.utils.progress import TaskProgressReporter
+from app.creator_suite.retry_policy import FINISHED_STATUSES, finished_result, prediction_to_resume, retry_or_fail
+from app.services.cancellation import run_cancellable
+
+logger = logging.getLogger(__name__)
 
 
 class CallbackTask(Task):
@@ -20,27 +26,36 @@ class CallbackTask(Task):
 
 @celery_app.task(bind=True, base=CallbackTask, name="generate_veo_3_video", 
                  soft_time_limit=600, time_limit=720)  # 10 minutes soft, 12 minutes hard limit
-def generate_veo_3_video(self, task_id: str, input_data: Dict[str, Any]):
+def generate_veo_3_video(self, task_id: str, input_data: Dict[str, Any], resume_prediction_id: Optional[str] = None):
     """
     Celery task to generate video using Google Veo-3 model.
     
     Args:
         task_id: Unique identifier for the creation task
         input_data: Input parameters for video generation
+        resume_prediction_id: Prediction submitted by an earlier attempt, polled instead of submitting anew
     """
     db = SessionLocal()
+    task = None
+    provider = None
     
     try:
         # Update task status to processing
         task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
         if not task:
             raise ValueError(f"Task {task_id} not found")
+        if task.status in FINISHED_STATUSES:
+            # Re-delivered after finishing (the worker was lost before acknowledging), or cancelled
+            return finished_result(task)
         
         task.status = TaskStatus.PROCESSING
         db.commit()
         
         # Initialize provider and generate video
         provider = GoogleVeo3Provider()
+        # Re-delivered after a worker crash: poll the prediction submitted before it
+        provider.prediction_id = prediction_to_resume(task, resume_prediction_id)
+        TaskProgressReporter.attach(provider, task_id)
         
         # Run async generation in sync context
         import asyncio
@@ -48,7 +63,7 @@ def generate_veo_3_video(self, task_id: str, input_data: Dict[str, Any]):
         asyncio.set_event_loop(loop)
         
         try:
-            output_assets = loop.run_until_complete(provider.generate(input_data))
+            output_assets = run_cancellable(loop, provider.generate(input_data), task_id, provider)
             
             if not output_assets:
                 raise ValueError("No output assets generated")
@@ -92,43 +107,12 @@ def generate_veo_3_video(self, task_id: str, input_data: Dict[str, Any]):
                 "local_video_url": local_video_path,
                 "local_thumbnail_url": local_thumbnail_path
             }
-            
-        except asyncio.TimeoutError as e:
-            # Rollback any pending transaction
-            db.rollback()
-            # Update task with timeout error
-            task.status = TaskStatus.FAILED
-            task.error_message = "Video generation timed out after 10 minutes"
-            db.commit()
-            
-            # Don't retry timeout errors
-            raise
-            
-        except Exception as e:
-            # Rollback any pending transaction
-            db.rollback()
-            # Update task with error
-            task.status = TaskStatus.FAILED
-            task.error_message = str(e)
-            db.commit()
-            
-            # Only retry for certain errors
-            if "connection" in str(e).lower() or "timeout" in str(e).lower():
-                self.retry(countdown=60, max_retries=2, exc=e)
-            else:
-                raise
         finally:
             loop.close()
             
     except Exception as e:
-        # If we get here, it's a non-retryable error
-        if db:
-            task = db.query(CreationTask).filter(CreationTask.id == task_id).first()
-            if task and task.status == TaskStatus.PROCESSING:
-                task.status = TaskStatus.FAILED
-                task.error_message = f"Task failed: {str(e)}"
-                db.commit()
-        raise
+        # Retried with backoff (resuming the prediction) or marked failed
+        retry_or_fail(self, db, task, e, provider)
         
     finally:
         db.close()
@@ -162,9 +146,9 @@ def cancel_veo_3_generation(self, task_id: str, prediction_id: str):
         response = httpx.post(url, headers=headers)
         
         if response.status_code not in [200, 201]:
-            print(f"Failed to cancel prediction {prediction_id}: {response.text}")
+            logger.warning("Failed to cancel prediction %s: %s", prediction_id, response.text)
         else:
-            print(f"Successfully cancelled prediction {prediction_id}")
+            logger.info("Successfully cancelled prediction %s", prediction_id)
         
     except Exception as e:
-        print(f"Error cancelling prediction {prediction_id}: {str(e)}")
\ No newline at end of file
+        logger.error("Error cancelling prediction %s: %s", prediction_id, e)
\ No newline at end of file
@@ -11,6 +11,8 @@ import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from app.creator_suite.utils.media_processor import MediaProcessor
+
 logger = logging.getLogger(__name__)
 
 class VideoSegmentEditor:
@@ -126,32 +128,74 @@ class VideoSegmentEditor:
             "cost": self.credit_per_segment
         }
     
-    async def merge_edited_segments(self, original_video_url: str, edited_segments: List[Dict], output_path: str) -> str:
-        """Merge original video with edited segments"""
-        # This would integrate with video processing tools like FFmpeg
-        # For now, return a placeholder implementation
+    async def merge_edited_segments(self, segment_paths: List[str], edited_segments: List[Dict],
+                                    output_task_id: str, crossfade_duration: float = 0.0) -> Dict[str, Any]:
+        """
+        Splice regenerated segments into a long video without re-encoding it.
+        
+        Only the edited segments are re-encoded (to the profile of the cached
+        segments, optionally crossfading into their neighbours at the seams);
+        every unchanged segment is reused from the cache and the final video is
+        joined with stream copy.
+        
+        Args:
+            segment_paths: Cached normalized segments (/storage/... URLs) in playback order
+            edited_segments: Dicts with "segment_id" (1-based) and "generated_video_path"
+                             (/storage/... URL of the freshly generated segment)
+            output_task_id: Long video task ID, used for cache and output naming
+            crossfade_duration: Seam crossfade length in seconds (0 disables)
+            
+        Returns:
+            Dict with the new video/thumbnail URLs and the updated segment cache
+        """
+        processor = MediaProcessor()
+        started = datetime.utcnow()
+        cached = [processor.resolve_storage_path(path) for path in segment_paths]
+        edited_by_index = {segment["segment_id"] - 1: segment for segment in edited_segments}
+        
+        for index in edited_by_index:
+            if index < 0 or index >= len(cached):
+                raise ValueError(f"Invalid segment ID: {index + 1}")
+        
+        # All cached segments share one profile; take it from an untouched one when possible
+        reference_index = next((i for i in range(len(cached)) if i not in edited_by_index), 0)
+        profile = await asyncio.to_thread(processor.probe_video_profile, cached[reference_index])
         
         merge_operations = []
-        
-        for segment in edited_segments:
-            operation = {
+        updated = list(cached)
+        for index, segment in sorted(edited_by_index.items()):
+            revision = segment.get("revision", int(started.timestamp()))
+            output_path = processor.segment_cache_path(output_task_id, index, revision)
+            # Seams are blended against the original neighbours, which stay stream-copied
+            await asyncio.to_thread(
+                processor.normalize_segment,
+                processor.resolve_storage_path(segment["generated_video_path"]),
+                output_path,
+                profile,
+                cached[index - 1] if index > 0 else None,
+                cached[index + 1] if index + 1 < len(cached) else None,
+                crossfade_duration,
+            )
+            updated[index] = output_path
+            merge_operations.append({
                 "type": "replace_segment",
-                "start_time": segment["segment_info"]["start_time"],
-                "end_time": segment["segment_info"]["end_time"],
-                "new_video_url": segment["generated_video_url"],
-                "segment_id": segment["segment_id"]
-            }
-            merge_operations.append(operation)
-        
-        # Placeholder for actual video merging logic
-        merged_video_info = {
-            "output_url": f"{output_path}/merged_video_{int(datetime.utcnow().timestamp())}.mp4",
+                "segment_id": index + 1,
+                "start_time": index * self.segment_length,
+                "end_time": (index + 1) * self.segment_length,
+                "segment_path": processor.to_storage_url(output_path),
+            })
+        
+        video_path, thumbnail_path = await asyncio.to_thread(
+            processor.splice_segments, updated, output_task_id
+        )
+        
+        return {
+            "video_path": video_path,
+            "thumbnail_path": thumbnail_path,
+            "segment_paths": [processor.to_storage_url(path) for path in updated],
             "operations": merge_operations,
-            "processing_time": "60-300 seconds",
-            "status": "queued"
+            "processing_time_seconds": (datetime.utcnow() - started).total_seconds(),
         }
-        
-        return merged_video_info
     
     def get_editing_capabilities(self) -> Dict[str, Any]:
         """Get available editing capabilities"""
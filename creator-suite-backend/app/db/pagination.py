@@ -0,0 +1,59 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Lists ordered by ``(created_at DESC, id DESC)`` page with an opaque cursor
+encoding the last row's sort key instead of OFFSET, so page N costs the same
+index range scan as page 1.
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Opaque cursor pointing just past a row"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def apply_keyset(query, created_at_column, id_column, cursor: Optional[str], limit: int):
+    """
+    Order a query newest first and restrict it to the page after cursor.
+
+    The row-value comparison matches a ``(..., created_at, id)`` btree index,
+    so Postgres seeks straight to the cursor position.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if id_column.type.python_type is int:
+            row_id = int(row_id)
+        query = query.filter(tuple_(created_at_column, id_column) < (created_at, row_id))
+    return query.order_by(created_at_column.desc(), id_column.desc()).limit(limit)
+
+
+def next_cursor(rows, limit: int) -> Optional[str]:
+    """Cursor for the page after rows, or None if this was the last page"""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at, last.id)
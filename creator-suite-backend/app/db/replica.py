@@ -0,0 +1,205 @@
+"""
+Read-replica routing for reporting and gallery queries.
+
+Designated read-only dependencies (get_replica_db, get_replica_async_db,
+get_reporting_db) get a session on the replica at DB_REPLICA_HOST, and fall
+back to the primary when:
+
+- no replica is configured or it cannot be reached;
+- its replication lag exceeds DB_REPLICA_MAX_LAG_SECONDS;
+- read-your-writes: the caller committed a write more recently than the
+  replica has replayed (see record_user_write / fresh_since).
+
+Lag is measured at most every LAG_CHECK_SECONDS per process. For testing
+without streaming replication, point DB_REPLICA_HOST at the primary (or a
+second local instance) and set DB_REPLICA_SIMULATED_LAG_SECONDS.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import redis
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.task_events import get_redis
+from app.db.session import (
+    SessionLocal, create_async_role_engine, create_role_engine, database_url,
+    engine, get_async_engine, pool_status,
+)
+
+logger = logging.getLogger(__name__)
+
+LAG_CHECK_SECONDS = 5.0
+USER_WRITE_KEY = "db_write:{user_id}"
+
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """Primary/replica engines of one engine profile and the decision which to use"""
+
+    def __init__(self, role: str):
+        self.role = role
+        self._primary = None
+        self._replica = None
+        self._async_replica = None
+        self._sessions = {}
+        self._lag: Optional[float] = None
+        self._lag_checked = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.DB_REPLICA_HOST)
+
+    def _sessionmaker(self, target: str) -> sessionmaker:
+        if target not in self._sessions:
+            if target == "replica":
+                self._replica = create_role_engine(self.role, database_url(settings.DB_REPLICA_HOST))
+                bind = self._replica
+            else:
+                self._primary = engine if self.role == settings.DB_ROLE else create_role_engine(self.role)
+                bind = self._primary
+            self._sessions[target] = sessionmaker(autocommit=False, autoflush=False, bind=bind)
+        return self._sessions[target]
+
+    def _async_sessionmaker(self, target: str) -> async_sessionmaker:
+        key = f"async_{target}"
+        if key not in self._sessions:
+            if target == "replica":
+                self._async_replica = create_async_role_engine(
+                    self.role, database_url(settings.DB_REPLICA_HOST, "postgresql+asyncpg")
+                )
+                bind = self._async_replica
+            else:
+                bind = get_async_engine()
+            self._sessions[key] = async_sessionmaker(bind, autoflush=False, expire_on_commit=False)
+        return self._sessions[key]
+
+    def replica_lag(self) -> Optional[float]:
+        """Replication lag in seconds (cached briefly), or None if the replica is unusable"""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        if now - self._lag_checked < LAG_CHECK_SECONDS:
+            return self._lag
+        self._lag_checked = now
+        try:
+            db = self._sessionmaker("replica")()
+            try:
+                lag = float(db.execute(REPLICA_LAG_SQL).scalar() or 0)
+            finally:
+                db.close()
+            self._lag = lag + settings.DB_REPLICA_SIMULATED_LAG_SECONDS
+        except SQLAlchemyError as e:
+            logger.warning("Replica unavailable, reading from primary: %s", e)
+            self._lag = None
+        return self._lag
+
+    def use_replica(self, fresh_since: Optional[float] = None, lag: Optional[float] = None) -> bool:
+        """
+        Whether reads may go to the replica.
+
+        Args:
+            fresh_since: Unix time of a write the reader must see
+            lag: Pre-measured lag; measured here when omitted
+        """
+        if lag is None:
+            lag = self.replica_lag()
+        if lag is None or lag > settings.DB_REPLICA_MAX_LAG_SECONDS:
+            return False
+        # The replica has replayed everything committed before now - lag
+        return fresh_since is None or fresh_since < time.time() - lag
+
+    def session(self, fresh_since: Optional[float] = None):
+        return self._sessionmaker("replica" if self.use_replica(fresh_since) else "primary")()
+
+    async def async_session(self, fresh_since: Optional[float] = None):
+        lag = await run_in_threadpool(self.replica_lag)
+        return self._async_sessionmaker("replica" if self.use_replica(fresh_since, lag) else "primary")()
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"enabled": self.enabled, "lag_seconds": self._lag}
+        if self._replica is not None:
+            stats["pool"] = pool_status(self._replica)
+        return stats
+
+
+replica_router = ReplicaRouter(settings.DB_ROLE)
+reporting_router = ReplicaRouter("admin")
+
+
+def record_user_write(user_id: int) -> None:
+    """Remember when a user last committed, for read-your-writes routing"""
+    try:
+        get_redis().set(
+            USER_WRITE_KEY.format(user_id=user_id), time.time(),
+            ex=int(settings.DB_REPLICA_MAX_LAG_SECONDS) + 60,
+        )
+    except redis.RedisError as e:
+        logger.warning("Failed to record write time for user %s: %s", user_id, e)
+
+
+def last_user_write(user_id: int) -> Optional[float]:
+    """Unix time of the user's last recorded commit; "now" if Redis cannot tell, so reads stay on the primary"""
+    try:
+        value = get_redis().get(USER_WRITE_KEY.format(user_id=user_id))
+    except redis.RedisError:
+        return time.time()
+    return float(value) if value else None
+
+
+# Track commits made on behalf of an authenticated user (deps.get_current_user
+# stores the user id in session.info)
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_session_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_session_write(session):
+    if session.info.pop("wrote", False) and session.info.get("user_id"):
+        record_user_write(session.info["user_id"])
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_session_write(session):
+    session.info.pop("wrote", None)
+
+
+def get_replica_db():
+    """Session for read-only gallery queries: replica when fresh enough, else primary"""
+    db = replica_router.session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_replica_async_db():
+    """AsyncSession counterpart of get_replica_db"""
+    db = await replica_router.async_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+def reporting_session(user_id: Optional[int] = None):
+    """
+    Admin reporting session (admin engine profile) on the replica, unless the
+    user wrote something the replica may not have replayed yet.
+    """
+    fresh_since = last_user_write(user_id) if user_id is not None and reporting_router.enabled else None
+    return reporting_router.session(fresh_since)
@@ -1,14 +1,125 @@
-from sqlalchemy import create_engine
+"""
+Database engines and sessions.
+
+Each process type talks to Postgres through an engine profile sized for its
+workload (DB_ROLE: api, worker, bot, admin). Every connection is tagged with
+an application_name of ``creator-suite-<role>`` so pg_stat_activity shows who
+holds which connections, and carries a role-specific statement_timeout.
+
+With DB_PGBOUNCER enabled (transaction pooling), the local pool is disabled
+and the timeout is applied per transaction with SET LOCAL, since PgBouncer
+neither keeps session state nor forwards startup options.
+
+The API additionally has an asyncpg engine (get_async_db) for async
+endpoints, created on first use with the same profile. Read-only reporting
+and gallery sessions are routed to a replica by app.db.replica.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
-DATABASE_URL = f"postgresql://{settings.DB_USER}:{settings.DB_PASS}@{settings.DB_HOST}/{settings.DB_NAME}"
+def database_url(host: str, driver: str = "postgresql") -> str:
+    return f"{driver}://{settings.DB_USER}:{settings.DB_PASS}@{host}/{settings.DB_NAME}"
+
+
+DATABASE_URL = database_url(settings.DB_HOST)
+ASYNC_DATABASE_URL = database_url(settings.DB_HOST, "postgresql+asyncpg")
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """Connection pool and timeout settings of one process role"""
+    pool_size: int
+    max_overflow: int
+    pool_timeout: int  # Seconds to wait for a free connection
+    pool_recycle: int  # Seconds before a connection is replaced (beats server/LB idle timeouts)
+    statement_timeout_ms: int
+
+
+ENGINE_PROFILES: Dict[str, EngineProfile] = {
+    # Short interactive requests; uvicorn runs several of these processes
+    "api": EngineProfile(pool_size=10, max_overflow=10, pool_timeout=10, pool_recycle=1800, statement_timeout_ms=15_000),
+    # One task at a time per worker process; the DB is touched a few times per task
+    "worker": EngineProfile(pool_size=2, max_overflow=2, pool_timeout=30, pool_recycle=1800, statement_timeout_ms=60_000),
+    # Bots mostly go through the HTTP API
+    "bot": EngineProfile(pool_size=2, max_overflow=3, pool_timeout=10, pool_recycle=1800, statement_timeout_ms=15_000),
+    # Admin statistics and exports: few connections, long scans allowed
+    "admin": EngineProfile(pool_size=2, max_overflow=2, pool_timeout=30, pool_recycle=900, statement_timeout_ms=120_000),
+}
+
+
+def _apply_statement_timeout_per_transaction(engine: Engine, timeout_ms: int) -> None:
+    @event.listens_for(engine, "begin")
+    def _set_local_timeout(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def create_role_engine(role: str, url: str = DATABASE_URL) -> Engine:
+    """Create an engine configured with the profile of a process role"""
+    profile = ENGINE_PROFILES[role]
+    connect_args: Dict[str, Any] = {"application_name": f"creator-suite-{role}"}
+    kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer owns pooling; a second pool in front of it only hoards server connections
+        kwargs["poolclass"] = NullPool
+    else:
+        connect_args["options"] = f"-c statement_timeout={profile.statement_timeout_ms}"
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE or profile.pool_size,
+            max_overflow=profile.max_overflow if settings.DB_MAX_OVERFLOW is None else settings.DB_MAX_OVERFLOW,
+            pool_timeout=profile.pool_timeout,
+            pool_recycle=profile.pool_recycle,
+        )
+
+    role_engine = create_engine(url, connect_args=connect_args, **kwargs)
+    if settings.DB_PGBOUNCER:
+        _apply_statement_timeout_per_transaction(role_engine, profile.statement_timeout_ms)
+    return role_engine
 
-engine = create_engine(DATABASE_URL)
+
+def create_async_role_engine(role: str, url: str = ASYNC_DATABASE_URL) -> AsyncEngine:
+    """asyncpg counterpart of create_role_engine"""
+    profile = ENGINE_PROFILES[role]
+    server_settings = {"application_name": f"creator-suite-{role}-async"}
+    connect_args: Dict[str, Any] = {"server_settings": server_settings}
+    kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+
+    if settings.DB_PGBOUNCER:
+        # Named prepared statements do not survive transaction pooling
+        connect_args.update(statement_cache_size=0, prepared_statement_cache_size=0)
+        kwargs["poolclass"] = NullPool
+    else:
+        server_settings["statement_timeout"] = str(profile.statement_timeout_ms)
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE or profile.pool_size,
+            max_overflow=profile.max_overflow if settings.DB_MAX_OVERFLOW is None else settings.DB_MAX_OVERFLOW,
+            pool_timeout=profile.pool_timeout,
+            pool_recycle=profile.pool_recycle,
+        )
+
+    role_engine = create_async_engine(url, connect_args=connect_args, **kwargs)
+    if settings.DB_PGBOUNCER:
+        _apply_statement_timeout_per_transaction(role_engine.sync_engine, profile.statement_timeout_ms)
+    return role_engine
+
+
+engine = create_role_engine(settings.DB_ROLE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_engine = None
+_AsyncSessionLocal = None
+
 Base = declarative_base()
 
 
@@ -17,4 +128,62 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    """The process's asyncpg engine, created on first use"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = create_async_role_engine(settings.DB_ROLE)
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db():
+    """AsyncSession for async endpoints; never blocks the event loop on I/O"""
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+def pool_status(role_engine: Engine) -> Dict[str, Any]:
+    """Connection counts of an engine's pool"""
+    pool = role_engine.pool
+    if isinstance(pool, NullPool):
+        return {"pool": "null"}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def database_stats() -> Dict[str, Any]:
+    """Round-trip latency, local pool usage and server connections per application for the health endpoint"""
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        latency_ms = (time.perf_counter() - started) * 1000
+        rows = conn.execute(text(
+            "SELECT application_name, state, count(*) AS connections FROM pg_stat_activity "
+            "WHERE datname = current_database() AND application_name LIKE 'creator-suite-%' "
+            "GROUP BY application_name, state"
+        )).all()
+
+    server_connections: Dict[str, Dict[str, int]] = {}
+    for row in rows:
+        server_connections.setdefault(row.application_name, {})[row.state or "unknown"] = row.connections
+
+    stats = {
+        "role": settings.DB_ROLE,
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "latency_ms": round(latency_ms, 2),
+        "pool": pool_status(engine),
+        "server_connections": server_connections,
+    }
+    if _async_engine is not None:
+        stats["async_pool"] = pool_status(_async_engine.sync_engine)
+    return stats
@@ -2,7 +2,8 @@ from app.models.organization import Organization
 from app.models.user import User
 from app.models.admin import Admin
 from app.models.service import Service
-from app.models.creation_task import CreationTask
+from app.models.creation_task import CreationTask, CreationTaskArchive, CreationTaskProviderPayload
 from app.models.user_service import UserService
-from app.models.enhanced_auth import CreditTransaction
-from app.models.feedback import Feedback
\ No newline at end of file
+from app.models.enhanced_auth import CreditHold, CreditTransaction
+from app.models.feedback import Feedback
+from app.models.rollups import DailyServiceStats, UserStatsRollup
\ No newline at end of file
@@ -1,10 +1,26 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text, JSON, Float
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text, JSON, Float, Index, cast, literal_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db.session import Base
 
 
+def search_document(*columns):
+    """
+    Concatenated text of columns for substring search.
+
+    Must stay identical to the expression of the pg_trgm GIN indexes
+    (migration e5b8c3d1a9f7) for ILIKE searches to use them; literals are
+    inlined rather than bound so the planner can match the expression.
+    """
+    empty, space = literal_column("''"), literal_column("' '")
+    document = None
+    for column in columns:
+        part = func.coalesce(cast(column, Text) if isinstance(column.type, JSON) else column, empty)
+        document = part if document is None else document.op("||")(space).op("||")(part)
+    return document
+
+
 class Admin(Base):
     __tablename__ = "admins"
 
@@ -35,6 +51,16 @@ class AdminAuditLog(Base):
     admin = relationship("User", foreign_keys=[admin_id])
     target_user = relationship("User", foreign_keys=[target_user_id])
 
+    __table_args__ = (
+        # Keyset pagination, overall and per admin
+        Index("ix_admin_audit_logs_created_id", "created_at", "id"),
+        Index("ix_admin_audit_logs_admin_created_id", "admin_id", "created_at", "id"),
+    )
+
+    @classmethod
+    def search_document(cls):
+        return search_document(cls.action, cls.target_resource_type, cls.description, cls.extra_data)
+
 
 class UserActivityLog(Base):
     __tablename__ = "user_activity_logs"
@@ -52,6 +78,16 @@ class UserActivityLog(Base):
 
     user = relationship("User", back_populates="activity_logs")
 
+    __table_args__ = (
+        # Keyset pagination, overall and per user
+        Index("ix_user_activity_logs_created_id", "created_at", "id"),
+        Index("ix_user_activity_logs_user_created_id", "user_id", "created_at", "id"),
+    )
+
+    @classmethod
+    def search_document(cls):
+        return search_document(cls.activity_type, cls.description, cls.extra_data)
+
 
 class SystemMetrics(Base):
     __tablename__ = "system_metrics"
@@ -1,14 +1,26 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text, Float, JSON, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text, Float, Index, LargeBinary, Enum as SQLEnum
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, relationship, Session, object_session, validates
 from sqlalchemy.sql import func
 import enum
 
 from app.db.session import Base
 from app.creator_suite.schemas import TaskStatus, AssetType
+from app.core.task_events import publish_task_event
+
+# Bulky provider output kept out of the task row (see CreationTaskProviderPayload)
+HEAVY_ASSET_METADATA_KEYS = ("logs", "metrics")
 
 
 class CreationTask(Base):
-    """Database model for tracking AI content creation tasks"""
+    """
+    Database model for tracking AI content creation tasks.
+
+    The table is range-partitioned by month on created_at; in Postgres the
+    primary key is (id, created_at). Filter on created_at where possible so
+    queries touch only the relevant partitions.
+    """
     __tablename__ = "creation_tasks"
 
     id = Column(String, primary_key=True, index=True)
@@ -21,25 +33,163 @@ class CreationTask(Base):
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
     
     # Input/Output data
-    input_data = Column(JSON, nullable=False)
-    output_assets = Column(JSON, nullable=True)  # List of OutputAsset dicts
+    input_data = Column(JSONB, nullable=False)
+    output_assets = Column(JSONB, nullable=True)  # List of OutputAsset dicts, minus HEAVY_ASSET_METADATA_KEYS
+    # LongVideoGeneration + segment bookkeeping; large for long videos, so only loaded on access
+    # (async queries that serialize it must undefer it)
+    long_video_config = deferred(Column(JSONB, nullable=True))
     
     # Local storage URLs
     local_video_url = Column(String, nullable=True)  # Local path to downloaded video
     local_image_url = Column(String, nullable=True)  # Local path to downloaded image
     local_thumbnail_url = Column(String, nullable=True)  # Local path to generated thumbnail
     
+    # Provider-side prediction of the running generation, persisted right after submission so a
+    # re-delivered or swept task resumes it instead of paying for a new one
+    provider_prediction_id = Column(String, nullable=True)
+    prediction_submitted_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Error tracking
     error_message = Column(Text, nullable=True)
     
     # Performance metrics
     processing_time_seconds = Column(Float, nullable=True)
+    progress = Column(Float, nullable=True)  # Last persisted 0-1 fraction; live value lives in Redis
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Set when the heavy JSON moved to creation_task_archives (input_data/output_assets are slim copies)
+    archived_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="creation_tasks")
     service = relationship("Service", back_populates="creation_tasks")
-    feedbacks = relationship("Feedback", back_populates="creation_task")
\ No newline at end of file
+    feedbacks = relationship(
+        "Feedback",
+        primaryjoin="CreationTask.id == foreign(Feedback.creation_task_id)",
+        back_populates="creation_task",
+    )
+    provider_payload = relationship(
+        "CreationTaskProviderPayload",
+        primaryjoin="CreationTask.id == foreign(CreationTaskProviderPayload.task_id)",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        # Keyset pagination of a user's tasks, newest first
+        Index("ix_creation_tasks_user_created_id", "user_id", "created_at", "id"),
+    )
+
+    @validates("output_assets")
+    def _split_provider_payload(self, key, output_assets):
+        """Store provider logs/metrics of the assets in the side table instead of the task row"""
+        if not isinstance(output_assets, list):
+            return output_assets
+        slim_assets, heavy = [], []
+        for asset in output_assets:
+            metadata = asset.get("metadata") if isinstance(asset, dict) else None
+            if not isinstance(metadata, dict):
+                slim_assets.append(asset)
+                heavy.append(None)
+                continue
+            slim_assets.append({
+                **asset,
+                "metadata": {k: v for k, v in metadata.items() if k not in HEAVY_ASSET_METADATA_KEYS},
+            })
+            heavy.append({k: metadata[k] for k in HEAVY_ASSET_METADATA_KEYS if metadata.get(k) is not None} or None)
+
+        if any(heavy):
+            if self.provider_payload is None:
+                self.provider_payload = CreationTaskProviderPayload(asset_metadata=heavy)
+            else:
+                self.provider_payload.asset_metadata = heavy
+        return slim_assets
+
+
+class CreationTaskProviderPayload(Base):
+    """
+    Raw provider output of a task's assets (Replicate logs and metrics),
+    aligned with output_assets. Rarely read, so it lives outside the hot
+    task row and is loaded only through CreationTask.provider_payload.
+    """
+    __tablename__ = "creation_task_provider_payloads"
+
+    task_id = Column(String, primary_key=True)  # creation_tasks.id (no FK: that table is partitioned)
+    asset_metadata = Column(JSONB, nullable=False)  # [{"logs": ..., "metrics": ...} | null per asset]
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class CreationTaskArchive(Base):
+    """Cold storage of an old finished task's full payload (zlib-compressed JSON)"""
+    __tablename__ = "creation_task_archives"
+
+    task_id = Column(String, primary_key=True)
+    task_created_at = Column(DateTime(timezone=True), nullable=False)
+    # {"input_data": ..., "output_assets": ..., "long_video_config": ...}
+    payload = Column(LargeBinary, nullable=False)
+    raw_bytes = Column(Integer, nullable=False)  # Uncompressed size
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+# Status push: collect status transitions during flush, publish once the commit succeeds
+_PENDING_TASK_EVENTS = "pending_task_events"
+
+
+def _queue_task_status_event(target):
+    session = object_session(target)
+    if session is None:
+        return
+    session.info.setdefault(_PENDING_TASK_EVENTS, {})[target.id] = {
+        "status": target.status or TaskStatus.PENDING,
+        "user_id": target.user_id,
+        "error_message": target.error_message,
+        "progress": 1.0 if target.status == TaskStatus.COMPLETED else None,
+    }
+
+
+@event.listens_for(CreationTask, "after_insert")
+def _task_inserted(mapper, connection, target):
+    _queue_task_status_event(target)
+
+
+@event.listens_for(CreationTask, "after_update")
+def _task_updated(mapper, connection, target):
+    if inspect(target).attrs.status.history.has_changes():
+        _queue_task_status_event(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_task_status_events(session):
+    for task_id, fields in session.info.pop(_PENDING_TASK_EVENTS, {}).items():
+        publish_task_event(task_id, **fields)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_task_status_events(session):
+    session.info.pop(_PENDING_TASK_EVENTS, None)
+
+
+# Credit holds: settle when a task completes, release when it fails or is cancelled
+_HOLD_OUTCOMES = {
+    TaskStatus.COMPLETED: True,
+    TaskStatus.FAILED: False,
+    TaskStatus.CANCELLED: False,
+}
+
+
+@event.listens_for(Session, "before_flush")
+def _resolve_task_credit_holds(session, flush_context, instances):
+    tasks = [
+        obj for obj in session.dirty
+        if isinstance(obj, CreationTask) and obj.status in _HOLD_OUTCOMES
+        and inspect(obj).attrs.status.history.has_changes()
+    ]
+    if not tasks:
+        return
+    from app.services.credit_service import settle_task_hold  # credit_service imports the models
+
+    for task in tasks:
+        settle_task_hold(session, task.id, _HOLD_OUTCOMES[task.status])
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text, Float, JSON
+from sqlalchemy import BigInteger, Boolean, Column, ForeignKey, Index, Integer, String, DateTime, Text, Float, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -66,26 +66,70 @@ class AuditLog(Base):
 
 
 class CreditTransaction(Base):
+    """
+    Append-only credit ledger (UPDATE and DELETE are rejected by a trigger).
+    Written only through app.services.credit_service.
+    """
     __tablename__ = "credit_transactions"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    amount = Column(Float, nullable=False)
-    transaction_type = Column(String, nullable=False)  # 'purchase', 'usage', 'refund', 'bonus'
+    amount = Column(Float, nullable=False)  # Credits; amount_micros is authoritative
+    amount_micros = Column(BigInteger, nullable=True)  # Signed, 1 credit = 1_000_000
+    # 'purchase', 'usage', 'refund', 'bonus', 'adjustment', 'hold', 'hold_release'
+    transaction_type = Column(String, nullable=False)
     description = Column(String, nullable=True)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=True)
-    task_id = Column(String, ForeignKey("creation_tasks.id"), nullable=True)
+    task_id = Column(String, nullable=True)  # creation_tasks.id (no FK: that table is partitioned)
     payment_method = Column(String, nullable=True)  # 'razorpay', 'stripe', 'paypal', etc.
     payment_id = Column(String, nullable=True)  # External payment provider ID
     balance_before = Column(Float, nullable=False)
     balance_after = Column(Float, nullable=False)
+    balance_after_micros = Column(BigInteger, nullable=True)
+    # Client-supplied key; a repeated request with the same key returns the original entry
+    idempotency_key = Column(String, nullable=True)
+    hold_id = Column(Integer, ForeignKey("credit_holds.id"), nullable=True)
     transaction_metadata = Column(JSON, nullable=True)  # Additional transaction data
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="credit_transactions")
     service = relationship("Service")
-    task = relationship("CreationTask")
+    task = relationship("CreationTask", primaryjoin="foreign(CreditTransaction.task_id) == CreationTask.id")
+
+    __table_args__ = (
+        Index(
+            "uq_credit_transactions_user_idempotency_key", "user_id", "idempotency_key",
+            unique=True, postgresql_where=idempotency_key.isnot(None),
+        ),
+        Index("ix_credit_transactions_user_created", "user_id", "created_at"),
+    )
+
+
+class CreditHold(Base):
+    """
+    Credits reserved for a pending generation. Reserving debits the balance;
+    settling records the usage and returns any unused part, releasing returns
+    all of it (see app.services.credit_service).
+    """
+    __tablename__ = "credit_holds"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    amount_micros = Column(BigInteger, nullable=False)
+    status = Column(String, nullable=False, default="held")  # 'held', 'settled', 'released'
+    task_id = Column(String, nullable=True, index=True)  # creation_tasks.id (no FK: partitioned)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=True)
+    description = Column(String, nullable=True)
+    settled_amount_micros = Column(BigInteger, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Sweep of expired holds
+        Index("ix_credit_holds_held_expires", "expires_at", postgresql_where=status == "held"),
+    )
 
 
 class BotIntegration(Base):
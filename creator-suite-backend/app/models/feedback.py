@@ -11,7 +11,8 @@ class Feedback(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    creation_task_id = Column(String, ForeignKey("creation_tasks.id"), nullable=False)
+    # No FK: creation_tasks is partitioned and its primary key includes created_at
+    creation_task_id = Column(String, nullable=False, index=True)
     
     # Rating out of 5
     rating = Column(Integer, nullable=False)  # 1-5 scale
@@ -20,9 +21,13 @@ class Feedback(Base):
     feedback_text = Column(Text, nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="feedbacks")
-    creation_task = relationship("CreationTask", back_populates="feedbacks")
+    creation_task = relationship(
+        "CreationTask",
+        primaryjoin="foreign(Feedback.creation_task_id) == CreationTask.id",
+        back_populates="feedbacks",
+    )
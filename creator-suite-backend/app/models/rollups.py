@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, Float, Enum as SQLEnum
+from sqlalchemy.sql import func
+
+from app.db.session import Base
+from app.creator_suite.schemas import AssetType
+
+
+class DailyServiceStats(Base):
+    """
+    Admin dashboard rollup: one row per UTC day x service x task type.
+
+    Maintained by the refresh_admin_rollups beat task (app/services/rollups.py);
+    tasks count on the day they were created, feedback and credit usage on
+    the day they were recorded.
+    """
+    __tablename__ = "daily_service_stats"
+
+    day = Column(Date, primary_key=True)
+    service_id = Column(Integer, ForeignKey("services.id"), primary_key=True)
+    task_type = Column(SQLEnum(AssetType, create_type=False), primary_key=True)
+
+    tasks_created = Column(Integer, nullable=False, default=0)
+    tasks_completed = Column(Integer, nullable=False, default=0)
+    tasks_failed = Column(Integer, nullable=False, default=0)
+    generation_seconds = Column(Float, nullable=False, default=0.0)
+    credits_spent = Column(Float, nullable=False, default=0.0)
+
+    feedback_count = Column(Integer, nullable=False, default=0)
+    feedback_with_text = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_1 = Column(Integer, nullable=False, default=0)
+    rating_2 = Column(Integer, nullable=False, default=0)
+    rating_3 = Column(Integer, nullable=False, default=0)
+    rating_4 = Column(Integer, nullable=False, default=0)
+    rating_5 = Column(Integer, nullable=False, default=0)
+
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class UserStatsRollup(Base):
+    """Single-row snapshot of user totals for the admin dashboard, refreshed with DailyServiceStats"""
+    __tablename__ = "user_stats_rollup"
+
+    id = Column(Integer, primary_key=True, default=1)
+    total_users = Column(Integer, nullable=False, default=0)
+    active_users = Column(Integer, nullable=False, default=0)
+    admin_users = Column(Integer, nullable=False, default=0)
+    total_credits = Column(Float, nullable=False, default=0.0)
+
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
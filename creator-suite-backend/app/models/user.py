@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Float
+from sqlalchemy import BigInteger, Boolean, CheckConstraint, Column, ForeignKey, Integer, String, DateTime, Float
+from sqlalchemy import event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -24,8 +25,15 @@ class User(Base):
     whatsapp_id = Column(String, unique=True, index=True, nullable=True)
     instagram_id = Column(String, unique=True, index=True, nullable=True)
     
-    # Credits system
+    # Credits system: the balance in micro-credits is authoritative and only changed by
+    # app.services.credit_service with conditional UPDATEs; credits mirrors it for display
     credits = Column(Float, default=10.0)  # Welcome credits
+    credit_balance_micros = Column(BigInteger, nullable=False, default=10_000_000, server_default="0")
+    # Running ledger aggregates, changed in the same UPDATE as the balance (see
+    # credit_service.EARNED_TYPES / SPENT_TYPES); checked by reconcile_credit_summaries
+    credits_earned_micros = Column(BigInteger, nullable=False, default=0, server_default="0")
+    credits_spent_micros = Column(BigInteger, nullable=False, default=0, server_default="0")
+    credit_transaction_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -33,9 +41,44 @@ class User(Base):
     organization = relationship("Organization")
     creation_tasks = relationship("CreationTask", back_populates="user")
     feedbacks = relationship("Feedback", back_populates="user")
-    credit_transactions = relationship("CreditTransaction", back_populates="user")
+    # Append-only ledger: never let the ORM null or delete its rows
+    credit_transactions = relationship("CreditTransaction", back_populates="user", passive_deletes="all")
     sessions = relationship("UserSession", back_populates="user")
     mfa_settings = relationship("MFASetting", back_populates="user")
     audit_logs = relationship("AuditLog", foreign_keys="AuditLog.user_id", back_populates="user")
     bot_integrations = relationship("BotIntegration", back_populates="user")
-    activity_logs = relationship("UserActivityLog", back_populates="user")
\ No newline at end of file
+    activity_logs = relationship("UserActivityLog", back_populates="user")
+
+    __table_args__ = (
+        CheckConstraint("credit_balance_micros >= 0", name="ck_users_credit_balance_non_negative"),
+    )
+
+
+@event.listens_for(User, "before_insert")
+def _count_welcome_credits(mapper, connection, target):
+    """Aggregates of the welcome entry written by _record_welcome_credits"""
+    if target.credit_balance_micros is None:
+        # Column defaults are applied after this hook; resolve the balance now
+        target.credit_balance_micros = User.__table__.c.credit_balance_micros.default.arg
+    if target.credit_balance_micros:
+        target.credits_earned_micros = target.credit_balance_micros
+        target.credit_transaction_count = 1
+
+
+@event.listens_for(User, "after_insert")
+def _record_welcome_credits(mapper, connection, target):
+    """Ledger entry for the starting balance, so the ledger alone explains every balance"""
+    if not target.credit_balance_micros:
+        return
+    credits = target.credit_balance_micros / 1_000_000
+    connection.execute(User.metadata.tables["credit_transactions"].insert().values(
+        user_id=target.id,
+        amount=credits,
+        amount_micros=target.credit_balance_micros,
+        transaction_type="bonus",
+        description="Welcome credits",
+        balance_before=0.0,
+        balance_after=credits,
+        balance_after_micros=target.credit_balance_micros,
+        idempotency_key="welcome",
+    ))
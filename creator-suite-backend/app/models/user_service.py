@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, DateTime
+from sqlalchemy import Column, ForeignKey, Integer, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -8,6 +8,10 @@ from app.db.session import Base
 class UserService(Base):
     """Database model for managing user access to services"""
     __tablename__ = "user_services"
+    __table_args__ = (
+        # Conflict target of the set-based bulk grants in app.services.user_service
+        UniqueConstraint("user_id", "service_id", name="uq_user_services_user_service"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
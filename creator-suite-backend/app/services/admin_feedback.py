@@ -9,6 +9,7 @@ from app.models.user import User
 from app.models.service import Service
 from app.models.organization import Organization
 from app.schemas.admin_feedback import AdminFeedbackFilters, AdminFeedbackStats
+from app.services.rollups import can_use_feedback_rollups, get_feedback_stats_from_rollups, get_user_stats
 
 
 def get_admin_feedbacks(
@@ -77,8 +78,12 @@ def get_admin_feedback_stats(
     filters: Optional[AdminFeedbackFilters] = None
 ) -> AdminFeedbackStats:
     """
-    Get comprehensive feedback statistics for admin dashboard
+    Get comprehensive feedback statistics for admin dashboard.
+    Served from the daily_service_stats rollup unless filtered by rating, user,
+    organization or text presence (or the rollups were never refreshed).
     """
+    if can_use_feedback_rollups(filters) and get_user_stats(db) is not None:
+        return get_feedback_stats_from_rollups(db, filters)
     
     # Base query for stats
     base_query = db.query(Feedback)
@@ -0,0 +1,196 @@
+"""
+Queue-depth driven worker counts for the specialized Celery queues.
+
+Workers record each task's runtime and a completion count per queue in
+Redis (task_postrun, see app/core/celery_app.py). Every tick the autoscaler
+reads, per queue in task_routes:
+
+- depth: messages waiting (Redis list lengths, priority sub-queues included);
+- arrival rate: (completions + depth change) / seconds since the last tick,
+  smoothed over ticks;
+- runtime: the mean of the last AUTOSCALE_RUNTIME_SAMPLES task runtimes.
+
+and sizes the queue's pool with Little's law. Keeping up with arrivals takes
+arrival_rate * runtime busy workers (run at AUTOSCALE_TARGET_UTILIZATION so
+bursts do not queue at once). A queue whose wait should stay under
+AUTOSCALE_TARGET_WAIT_SECONDS may hold arrival_rate * target_wait messages;
+the backlog beyond that needs backlog * runtime / target_wait extra workers
+to be drained within the target.
+
+Scaling up is immediate; a pool only shrinks once it has wanted fewer
+workers for AUTOSCALE_SCALE_DOWN_DELAY_SECONDS. Starting and draining the
+processes is scripts/autoscale_workers.py's job.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+
+from app.core.config import settings
+from app.core.metrics import queue_depths
+from app.core.task_events import get_redis
+
+logger = logging.getLogger(__name__)
+
+RUNTIMES_KEY = "autoscale:runtimes:{queue}"
+COMPLETED_KEY = "autoscale:completed:{queue}"
+# Weight of the newest arrival rate sample in the smoothed rate
+ARRIVAL_SMOOTHING = 0.3
+# Runtime samples outlive an idle night, not a deploy of slower models
+_STATS_TTL_SECONDS = 7 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class PoolLimits:
+    min_workers: int
+    max_workers: int
+
+
+@dataclass(frozen=True)
+class QueueSample:
+    """What Redis says about a queue at one tick"""
+    depth: int
+    completed: int
+    runtimes: Tuple[float, ...]
+    at: float
+
+
+@dataclass(frozen=True)
+class ScalingDecision:
+    queue: str
+    current: int
+    desired: int  # Little's law target, clamped to the pool limits
+    target: int  # What the pool should run now (desired, held up by the scale-down delay)
+    depth: int
+    arrival_rate: float
+    runtime_seconds: float
+
+
+def route_queue(task_name: str) -> str:
+    """Queue a task is routed to (task_default_queue when it has no route)"""
+    from app.core.celery_app import celery_app
+
+    route = (celery_app.conf.task_routes or {}).get(task_name) or {}
+    return route.get("queue") or celery_app.conf.task_default_queue
+
+
+def record_task_runtime(task_name: str, seconds: float) -> None:
+    """task_postrun: remember a finished task's runtime for its queue's pool sizing"""
+    queue = route_queue(task_name)
+    runtimes_key = RUNTIMES_KEY.format(queue=queue)
+    completed_key = COMPLETED_KEY.format(queue=queue)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.lpush(runtimes_key, round(seconds, 3))
+        pipe.ltrim(runtimes_key, 0, settings.AUTOSCALE_RUNTIME_SAMPLES - 1)
+        pipe.expire(runtimes_key, _STATS_TTL_SECONDS)
+        pipe.incr(completed_key)
+        pipe.expire(completed_key, _STATS_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning("Failed to record runtime of %s: %s", task_name, e)
+
+
+def sample_queues(queues: Iterable[str]) -> Dict[str, QueueSample]:
+    """Depth, completion count and recent runtimes of each queue (raises redis.RedisError)"""
+    queues = sorted(set(queues))
+    depths = queue_depths(queues)
+    pipe = get_redis().pipeline(transaction=False)
+    for queue in queues:
+        pipe.get(COMPLETED_KEY.format(queue=queue))
+        pipe.lrange(RUNTIMES_KEY.format(queue=queue), 0, -1)
+    results = pipe.execute()
+    now = time.monotonic()
+    return {
+        queue: QueueSample(
+            depth=depths[queue],
+            completed=int(results[2 * i] or 0),
+            runtimes=tuple(float(runtime) for runtime in results[2 * i + 1]),
+            at=now,
+        )
+        for i, queue in enumerate(queues)
+    }
+
+
+def desired_workers(depth: int, arrival_rate: float, runtime_seconds: float,
+                    target_wait_seconds: float, target_utilization: float) -> int:
+    """Workers that keep the queue wait under target_wait_seconds (Little's law, one task per worker)"""
+    busy = arrival_rate * runtime_seconds / target_utilization
+    allowed_backlog = arrival_rate * target_wait_seconds
+    drain = max(0.0, depth - allowed_backlog) * runtime_seconds / target_wait_seconds
+    return math.ceil(busy + drain - 1e-9)
+
+
+def parse_pool_limits(spec: str) -> Dict[str, PoolLimits]:
+    """AUTOSCALE_POOL_LIMITS, e.g. "video_runway=1:6,bot_messages=2:4" (queue=min:max)"""
+    limits = {}
+    for item in (spec or "").split(","):
+        queue, _, bounds = item.strip().partition("=")
+        low, _, high = bounds.partition(":")
+        if queue and low.strip().isdigit() and high.strip().isdigit():
+            limits[queue.strip()] = PoolLimits(int(low), max(int(low), int(high)))
+    return limits
+
+
+class Autoscaler:
+    """Turns successive queue samples into a worker target per queue"""
+
+    def __init__(self, queues: Iterable[str], limits: Optional[Dict[str, PoolLimits]] = None):
+        self.queues = sorted(set(queues))
+        default = PoolLimits(settings.AUTOSCALE_MIN_WORKERS, settings.AUTOSCALE_MAX_WORKERS)
+        limits = limits if limits is not None else parse_pool_limits(settings.AUTOSCALE_POOL_LIMITS)
+        self.limits = {queue: limits.get(queue, default) for queue in self.queues}
+        self._previous: Dict[str, QueueSample] = {}
+        self._arrival_rates: Dict[str, float] = {}
+        # Since when a queue has wanted fewer workers than it runs
+        self._surplus_since: Dict[str, float] = {}
+
+    def _arrival_rate(self, queue: str, sample: QueueSample) -> float:
+        previous = self._previous.get(queue)
+        self._previous[queue] = sample
+        if previous is None or sample.at <= previous.at:
+            return self._arrival_rates.get(queue, 0.0)
+        completed = sample.completed - previous.completed
+        if completed < 0:  # Counter expired or was reset
+            completed = 0
+        rate = max(0.0, (completed + sample.depth - previous.depth) / (sample.at - previous.at))
+        smoothed = self._arrival_rates.get(queue)
+        smoothed = rate if smoothed is None else ARRIVAL_SMOOTHING * rate + (1 - ARRIVAL_SMOOTHING) * smoothed
+        self._arrival_rates[queue] = smoothed
+        return smoothed
+
+    def decide(self, samples: Dict[str, QueueSample], current: Dict[str, int]) -> List[ScalingDecision]:
+        decisions = []
+        for queue in self.queues:
+            sample = samples.get(queue)
+            if sample is None:
+                continue
+            running = current.get(queue, 0)
+            limits = self.limits[queue]
+            arrival_rate = self._arrival_rate(queue, sample)
+            runtime = (
+                sum(sample.runtimes) / len(sample.runtimes) if sample.runtimes
+                else settings.AUTOSCALE_DEFAULT_RUNTIME_SECONDS
+            )
+            wanted = desired_workers(
+                sample.depth, arrival_rate, runtime,
+                settings.AUTOSCALE_TARGET_WAIT_SECONDS, settings.AUTOSCALE_TARGET_UTILIZATION,
+            )
+            desired = min(limits.max_workers, max(limits.min_workers, wanted))
+
+            target = desired
+            if desired < running:
+                since = self._surplus_since.setdefault(queue, sample.at)
+                if sample.at - since < settings.AUTOSCALE_SCALE_DOWN_DELAY_SECONDS:
+                    target = running
+            else:
+                self._surplus_since.pop(queue, None)
+            decisions.append(ScalingDecision(
+                queue=queue, current=running, desired=desired, target=target, depth=sample.depth,
+                arrival_rate=round(arrival_rate, 4), runtime_seconds=round(runtime, 1),
+            ))
+        return decisions
@@ -0,0 +1,166 @@
+"""
+User cancellation of creation tasks.
+
+cancel_creation (POST /creations/{id}/cancel) cancels a task and, for a long
+video, every segment still pending or processing, in one go:
+
+- the creation tasks are marked cancelled in one commit, which releases
+  their credit holds (see app/models/creation_task.py);
+- their queued Celery messages are revoked in one broadcast (generation
+  messages carry the creation task id as their Celery task id);
+- Replicate predictions already submitted are cancelled on Replicate's side.
+  Other providers (Runway, Magic Hour) are single blocking calls with no
+  upstream id, so their cancel is local only: the worker stops waiting but
+  the provider may finish the generation;
+- a cancel flag is set in Redis for each task. Workers run generations
+  through run_cancellable, which checks the flag every
+  CANCEL_CHECK_INTERVAL_SECONDS, stops the provider call or poll loop and
+  cancels a prediction submitted in the meantime.
+
+A message that slips past the revoke finds its task cancelled and does
+nothing (see FINISHED_STATUSES in app/creator_suite/retry_policy.py).
+"""
+
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Awaitable, Dict, List, TypeVar
+
+import httpx
+import redis
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.task_events import get_redis
+from app.creator_suite.schemas import TaskStatus
+from app.models.creation_task import CreationTask
+
+logger = logging.getLogger(__name__)
+
+CANCEL_KEY = "task_cancel:{task_id}"
+# Longer than any generation, retries included
+CANCEL_FLAG_TTL_SECONDS = 24 * 3600
+CANCEL_CHECK_INTERVAL_SECONDS = 2.0
+CANCELLABLE_STATUSES = (TaskStatus.PENDING, TaskStatus.PROCESSING)
+CANCELLED_MESSAGE = "Cancelled by user"
+
+T = TypeVar("T")
+
+
+class GenerationCancelled(Exception):
+    """Raised in a worker when its generation was cancelled by the user"""
+
+    def __init__(self, task_id: str):
+        super().__init__(f"Task {task_id} was cancelled")
+        self.task_id = task_id
+
+
+def is_cancel_requested(task_id: str) -> bool:
+    try:
+        return bool(get_redis().exists(CANCEL_KEY.format(task_id=task_id)))
+    except redis.RedisError as e:
+        logger.warning("Failed to check cancellation of task %s: %s", task_id, e)
+        return False
+
+
+def _flag_cancelled(task_ids: List[str]) -> None:
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.set(CANCEL_KEY.format(task_id=task_id), 1, ex=CANCEL_FLAG_TTL_SECONDS)
+        pipe.execute()
+    except redis.RedisError as e:
+        # Workers still stop once Replicate reports the prediction canceled
+        logger.warning("Failed to flag %s tasks cancelled: %s", len(task_ids), e)
+
+
+def cancel_replicate_prediction(prediction_id: str) -> bool:
+    """Ask Replicate to cancel a prediction; False if it could not be cancelled"""
+    try:
+        response = httpx.post(
+            f"{settings.REPLICATE_API_URL}/predictions/{prediction_id}/cancel",
+            headers={"Authorization": f"Bearer {settings.REPLICATE_API_TOKEN}"},
+            timeout=10.0,
+        )
+    except httpx.HTTPError as e:
+        logger.warning("Failed to cancel Replicate prediction %s: %s", prediction_id, e)
+        return False
+    if response.status_code != 200:
+        logger.warning("Replicate refused to cancel prediction %s: HTTP %s", prediction_id, response.status_code)
+        return False
+    return True
+
+
+def run_cancellable(loop: asyncio.AbstractEventLoop, generation: Awaitable[T], task_id: str, provider=None) -> T:
+    """
+    Run a provider generation on loop, stopping it if the task is cancelled meanwhile.
+
+    Raises GenerationCancelled after cancelling the prediction the provider
+    submitted, if any.
+    """
+    async def watched():
+        work = asyncio.ensure_future(generation)
+        while True:
+            done, _ = await asyncio.wait({work}, timeout=CANCEL_CHECK_INTERVAL_SECONDS)
+            if done:
+                return work.result()
+            if is_cancel_requested(task_id):
+                work.cancel()
+                with suppress(asyncio.CancelledError):
+                    await work
+                raise GenerationCancelled(task_id)
+
+    try:
+        return loop.run_until_complete(watched())
+    except GenerationCancelled:
+        prediction_id = getattr(provider, "prediction_id", None)
+        if prediction_id:
+            # Possibly submitted after the API cancelled the predictions it knew about
+            cancel_replicate_prediction(prediction_id)
+        raise
+
+
+def _segment_tasks(db: Session, parent: CreationTask) -> List[CreationTask]:
+    """Unfinished segment tasks of a long video, edit revisions included"""
+    segment_ids = (parent.long_video_config or {}).get("segment_task_ids") or []
+    return db.query(CreationTask).filter(
+        CreationTask.user_id == parent.user_id,
+        CreationTask.created_at >= parent.created_at,
+        or_(
+            CreationTask.id.in_(segment_ids),
+            CreationTask.long_video_config["parent_task_id"].astext == parent.id,
+        ),
+        CreationTask.status.in_(CANCELLABLE_STATUSES),
+    ).all()
+
+
+def cancel_creation(db: Session, task: CreationTask) -> Dict[str, Any]:
+    """Cancel a pending or processing task (and its unfinished segments); returns what was done"""
+    from app.core.celery_app import celery_app
+
+    tasks = [task] + _segment_tasks(db, task)
+    task_ids = [t.id for t in tasks]
+    predictions = [t.provider_prediction_id for t in tasks if t.provider == "replicate" and t.provider_prediction_id]
+
+    for t in tasks:
+        t.status = TaskStatus.CANCELLED
+        t.error_message = CANCELLED_MESSAGE
+    db.commit()
+
+    _flag_cancelled(task_ids)
+    try:
+        celery_app.control.revoke(task_ids)
+    except Exception as e:
+        # Messages that still run find their task cancelled and return at once
+        logger.warning("Failed to revoke the messages of task %s: %s", task.id, e)
+    cancelled_predictions = sum(cancel_replicate_prediction(p) for p in predictions)
+
+    logger.info("Cancelled task %s (%s tasks, %s/%s predictions)",
+                task.id, len(task_ids), cancelled_predictions, len(predictions))
+    return {
+        "task_id": task.id,
+        "status": TaskStatus.CANCELLED,
+        "cancelled_task_ids": task_ids,
+        "cancelled_predictions": cancelled_predictions,
+    }
@@ -0,0 +1,509 @@
+"""
+Credit ledger.
+
+credit_transactions is the append-only source of truth; users.credit_balance_micros
+is its running total, changed only here and only by a single conditional
+UPDATE per operation:
+
+    UPDATE users SET credit_balance_micros = credit_balance_micros - :x
+    WHERE id = :user_id AND credit_balance_micros >= :x
+    RETURNING credit_balance_micros
+
+so concurrent debits can neither overdraw nor lose updates, and the users row
+is locked only for the rest of that (short) transaction. Amounts are integer
+micro-credits (1 credit = 1_000_000); users.credits and the float ledger
+columns are kept in step for existing readers.
+
+Operations carrying an idempotency_key are applied at most once per user: a
+retry returns the original entry (replayed=True) instead of charging again.
+
+Generations reserve credits when submitted (reserve_credits) and settle when
+the task completes or release them when it fails; see settle_task_hold,
+which CreationTask status changes trigger automatically.
+
+The same UPDATE maintains the user's running totals (earned, spent, number
+of ledger entries), so the balance summary is a primary-key read, cached in
+Redis under credit_summary:{user_id} and invalidated when a change commits.
+reconcile_credit_summaries re-derives the totals from the ledger in bulk.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+from sqlalchemy import bindparam, event, func, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.task_events import get_async_redis, get_redis
+from app.models.enhanced_auth import CreditHold, CreditTransaction
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+MICROS_PER_CREDIT = 1_000_000
+DEFAULT_HOLD_TTL = timedelta(hours=6)
+
+HOLD_HELD = "held"
+HOLD_SETTLED = "settled"
+HOLD_RELEASED = "released"
+
+# Ledger types counted as earned / spent in the balance summary
+EARNED_TYPES = ("purchase", "bonus", "refund")
+SPENT_TYPES = ("usage",)
+
+SUMMARY_CACHE_KEY = "credit_summary:{user_id}"
+# Bounds how long a summary cached by a read racing a commit can stay stale
+SUMMARY_CACHE_TTL_SECONDS = 60
+# session.info key: users whose balance changed in the current transaction
+_CHANGED_USERS = "credit_summary_users"
+
+
+class InsufficientCreditsError(Exception):
+    """The user's balance does not cover the debit"""
+
+    def __init__(self, user_id: int, required_micros: int):
+        super().__init__(f"Insufficient credits: need {from_micros(required_micros)}")
+        self.user_id = user_id
+        self.required_micros = required_micros
+
+
+def to_micros(credits: float) -> int:
+    """Credits (as entered by users/admins) to integer micro-credits"""
+    return int((Decimal(str(credits)) * MICROS_PER_CREDIT).to_integral_value(ROUND_HALF_UP))
+
+
+def from_micros(micros: int) -> float:
+    return micros / MICROS_PER_CREDIT
+
+
+@dataclass
+class LedgerEntry:
+    """Result of a balance change"""
+    transaction_id: int
+    amount_micros: int
+    balance_micros: int
+    replayed: bool = False  # An earlier request with the same idempotency key already applied it
+
+    @property
+    def amount(self) -> float:
+        return from_micros(self.amount_micros)
+
+    @property
+    def balance(self) -> float:
+        return from_micros(self.balance_micros)
+
+
+def _change_balance(db: Session, user_id: int, entries: List[Tuple[str, int]]) -> int:
+    """
+    Apply the ledger entries' (transaction_type, amount_micros) to the balance
+    and running totals atomically; returns the new balance
+    """
+    delta_micros = sum(amount for _, amount in entries)
+    earned = sum(amount for transaction_type, amount in entries if transaction_type in EARNED_TYPES)
+    spent = -sum(amount for transaction_type, amount in entries if transaction_type in SPENT_TYPES)
+    conditions = [User.id == user_id]
+    if delta_micros < 0:
+        conditions.append(User.credit_balance_micros >= -delta_micros)
+    balance = db.execute(
+        update(User)
+        .where(*conditions)
+        .values(
+            credit_balance_micros=User.credit_balance_micros + delta_micros,
+            credits=(User.credit_balance_micros + delta_micros) / float(MICROS_PER_CREDIT),
+            credits_earned_micros=User.credits_earned_micros + earned,
+            credits_spent_micros=User.credits_spent_micros + spent,
+            credit_transaction_count=User.credit_transaction_count + len(entries),
+        )
+        .returning(User.credit_balance_micros)
+        .execution_options(synchronize_session="fetch")
+    ).scalar()
+    if balance is None:
+        if db.get(User, user_id) is None:
+            raise LookupError(f"User {user_id} not found")
+        raise InsufficientCreditsError(user_id, -delta_micros)
+    db.info.setdefault(_CHANGED_USERS, set()).add(user_id)
+    return balance
+
+
+def _ledger_row(
+    user_id: int, amount_micros: int, balance_after_micros: int, transaction_type: str, **fields: Any
+) -> CreditTransaction:
+    balance_before_micros = balance_after_micros - amount_micros
+    return CreditTransaction(
+        user_id=user_id,
+        amount=from_micros(amount_micros),
+        amount_micros=amount_micros,
+        transaction_type=transaction_type,
+        balance_before=from_micros(balance_before_micros),
+        balance_after=from_micros(balance_after_micros),
+        balance_after_micros=balance_after_micros,
+        **fields,
+    )
+
+
+def _replay(db: Session, user_id: int, idempotency_key: str) -> Optional[LedgerEntry]:
+    row = db.execute(
+        select(CreditTransaction.id, CreditTransaction.amount_micros, CreditTransaction.balance_after_micros)
+        .where(CreditTransaction.user_id == user_id, CreditTransaction.idempotency_key == idempotency_key)
+    ).first()
+    if row is None:
+        return None
+    return LedgerEntry(row.id, row.amount_micros, row.balance_after_micros, replayed=True)
+
+
+def apply_transaction(
+    db: Session,
+    user_id: int,
+    amount_micros: int,
+    transaction_type: str,
+    *,
+    idempotency_key: Optional[str] = None,
+    description: Optional[str] = None,
+    service_id: Optional[int] = None,
+    task_id: Optional[str] = None,
+    payment_method: Optional[str] = None,
+    payment_id: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    commit: bool = True,
+) -> LedgerEntry:
+    """
+    Change a user's balance by amount_micros (negative to debit) and record it.
+
+    Raises InsufficientCreditsError if a debit exceeds the balance and
+    LookupError if the user does not exist. With commit=False the change
+    joins the caller's transaction (it runs in a savepoint).
+    """
+    if amount_micros == 0:
+        raise ValueError("Amount must not be zero")
+    if idempotency_key:
+        replayed = _replay(db, user_id, idempotency_key)
+        if replayed:
+            return replayed
+
+    try:
+        with db.begin_nested():
+            balance = _change_balance(db, user_id, [(transaction_type, amount_micros)])
+            transaction = _ledger_row(
+                user_id, amount_micros, balance, transaction_type,
+                idempotency_key=idempotency_key,
+                description=description,
+                service_id=service_id,
+                task_id=task_id,
+                payment_method=payment_method,
+                payment_id=payment_id,
+                transaction_metadata=metadata,
+            )
+            db.add(transaction)
+            db.flush()
+    except IntegrityError:
+        # A concurrent request with the same key won the race; its entry stands
+        replayed = _replay(db, user_id, idempotency_key) if idempotency_key else None
+        if replayed is None:
+            raise
+        return replayed
+
+    if commit:
+        db.commit()
+    return LedgerEntry(transaction.id, amount_micros, balance)
+
+
+def credit(db: Session, user_id: int, amount_micros: int, transaction_type: str, **kwargs: Any) -> LedgerEntry:
+    """Add credits (purchase, bonus, refund, adjustment)"""
+    if amount_micros <= 0:
+        raise ValueError("Credit amount must be positive")
+    return apply_transaction(db, user_id, amount_micros, transaction_type, **kwargs)
+
+
+def debit(db: Session, user_id: int, amount_micros: int, transaction_type: str = "usage", **kwargs: Any) -> LedgerEntry:
+    """Take credits; raises InsufficientCreditsError instead of overdrawing"""
+    if amount_micros <= 0:
+        raise ValueError("Debit amount must be positive")
+    return apply_transaction(db, user_id, -amount_micros, transaction_type, **kwargs)
+
+
+def _existing_hold(db: Session, user_id: int, idempotency_key: str) -> Optional[CreditHold]:
+    return db.execute(
+        select(CreditHold)
+        .join(CreditTransaction, CreditTransaction.hold_id == CreditHold.id)
+        .where(CreditTransaction.user_id == user_id, CreditTransaction.idempotency_key == idempotency_key)
+    ).scalar()
+
+
+def reserve_credits(
+    db: Session,
+    user_id: int,
+    amount_micros: int,
+    *,
+    task_id: Optional[str] = None,
+    service_id: Optional[int] = None,
+    description: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
+    ttl: timedelta = DEFAULT_HOLD_TTL,
+    commit: bool = True,
+) -> CreditHold:
+    """
+    Reserve credits for a generation: debits the balance now (so concurrent
+    submissions cannot spend the same credits) and records a hold to settle
+    or release later. Raises InsufficientCreditsError.
+    """
+    if amount_micros <= 0:
+        raise ValueError("Hold amount must be positive")
+    if idempotency_key:
+        existing = _existing_hold(db, user_id, idempotency_key)
+        if existing:
+            return existing
+
+    try:
+        with db.begin_nested():
+            balance = _change_balance(db, user_id, [("hold", -amount_micros)])
+            hold = CreditHold(
+                user_id=user_id,
+                amount_micros=amount_micros,
+                status=HOLD_HELD,
+                task_id=task_id,
+                service_id=service_id,
+                description=description,
+                expires_at=datetime.now(timezone.utc) + ttl,
+            )
+            db.add(hold)
+            db.flush()
+            db.add(_ledger_row(
+                user_id, -amount_micros, balance, "hold",
+                description=description, service_id=service_id, task_id=task_id,
+                hold_id=hold.id, idempotency_key=idempotency_key,
+            ))
+            db.flush()
+    except IntegrityError:
+        existing = _existing_hold(db, user_id, idempotency_key) if idempotency_key else None
+        if existing is None:
+            raise
+        return existing
+
+    if commit:
+        db.commit()
+    return hold
+
+
+def _resolve_hold(
+    db: Session, hold_filter, used_micros: Optional[int], new_status: str, flush: bool = True
+) -> Optional[LedgerEntry]:
+    """
+    Move a held hold to settled/released exactly once (the status guard makes
+    concurrent or repeated calls no-ops) and post the matching ledger rows.
+    Does not commit. With flush=False (inside a flush) the returned entry has
+    no transaction id yet.
+    """
+    if new_status == HOLD_RELEASED:
+        used = 0
+    elif used_micros is None:
+        used = CreditHold.amount_micros
+    else:
+        used = func.least(CreditHold.amount_micros, max(used_micros, 0))
+    hold = db.execute(
+        update(CreditHold)
+        .where(hold_filter, CreditHold.status == HOLD_HELD)
+        .values(status=new_status, settled_amount_micros=used, resolved_at=datetime.now(timezone.utc))
+        .returning(
+            CreditHold.id, CreditHold.user_id, CreditHold.amount_micros, CreditHold.settled_amount_micros,
+            CreditHold.task_id, CreditHold.service_id, CreditHold.description,
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+    if hold is None:
+        return None
+
+    # Return the whole hold, then charge what was used: the ledger shows the
+    # reservation, its release and the actual usage as separate entries
+    used = hold.settled_amount_micros
+    entries = [("hold_release", hold.amount_micros)] + ([("usage", -used)] if used else [])
+    balance = _change_balance(db, hold.user_id, entries)
+    common = dict(service_id=hold.service_id, task_id=hold.task_id, hold_id=hold.id)
+    release_row = _ledger_row(
+        hold.user_id, hold.amount_micros, balance + used, "hold_release",
+        description=f"Release of hold {hold.id}", **common,
+    )
+    db.add(release_row)
+    entry_row = release_row
+    if used:
+        entry_row = _ledger_row(hold.user_id, -used, balance, "usage", description=hold.description, **common)
+        db.add(entry_row)
+    if flush:
+        db.flush()
+    return LedgerEntry(entry_row.id, entry_row.amount_micros, balance)
+
+
+def settle_hold(db: Session, hold_id: int, used_micros: Optional[int] = None, commit: bool = True) -> Optional[LedgerEntry]:
+    """Charge the used part of a hold (all of it by default) and return the rest; None if already resolved"""
+    entry = _resolve_hold(db, CreditHold.id == hold_id, used_micros, HOLD_SETTLED)
+    if commit:
+        db.commit()
+    return entry
+
+
+def release_hold(db: Session, hold_id: int, commit: bool = True) -> Optional[LedgerEntry]:
+    """Return a hold's credits in full; None if already resolved"""
+    entry = _resolve_hold(db, CreditHold.id == hold_id, None, HOLD_RELEASED)
+    if commit:
+        db.commit()
+    return entry
+
+
+def settle_task_hold(db: Session, task_id: str, succeeded: bool) -> Optional[LedgerEntry]:
+    """
+    Settle (success) or release (failure) the hold of a task in the caller's
+    transaction. Safe to call from a before_flush hook.
+    """
+    return _resolve_hold(
+        db, CreditHold.task_id == task_id, None, HOLD_SETTLED if succeeded else HOLD_RELEASED, flush=False
+    )
+
+
+def release_expired_holds(db: Session, limit: int = 1000) -> int:
+    """Release holds past their expiry (tasks that never reported back); returns the count"""
+    hold_ids = db.execute(
+        select(CreditHold.id)
+        .where(CreditHold.status == HOLD_HELD, CreditHold.expires_at < datetime.now(timezone.utc))
+        .order_by(CreditHold.expires_at)
+        .limit(limit)
+    ).scalars().all()
+    released = 0
+    for hold_id in hold_ids:
+        if release_hold(db, hold_id):
+            released += 1
+    if released:
+        logger.info("Released %s expired credit holds", released)
+    return released
+
+
+def summary_key(user_id: int) -> str:
+    return SUMMARY_CACHE_KEY.format(user_id=user_id)
+
+
+async def get_balance_summary(db: AsyncSession, user_id: int) -> Optional[Dict[str, int]]:
+    """
+    Balance, earned, spent (micro-credits) and ledger entry count of a user,
+    read through the Redis cache; None if the user does not exist
+    """
+    client = get_async_redis()
+    try:
+        cached = await client.get(summary_key(user_id))
+        if cached:
+            return json.loads(cached)
+    except redis.RedisError as e:
+        logger.warning("Failed to read credit summary of user %s: %s", user_id, e)
+
+    row = (await db.execute(
+        select(
+            User.credit_balance_micros, User.credits_earned_micros,
+            User.credits_spent_micros, User.credit_transaction_count,
+        ).where(User.id == user_id)
+    )).first()
+    if row is None:
+        return None
+    summary = {
+        "balance_micros": row.credit_balance_micros,
+        "earned_micros": row.credits_earned_micros,
+        "spent_micros": row.credits_spent_micros,
+        "transaction_count": row.credit_transaction_count,
+    }
+    try:
+        await client.set(summary_key(user_id), json.dumps(summary), ex=SUMMARY_CACHE_TTL_SECONDS)
+    except redis.RedisError as e:
+        logger.warning("Failed to cache credit summary of user %s: %s", user_id, e)
+    return summary
+
+
+def invalidate_summaries(user_ids) -> None:
+    """Drop cached summaries (best-effort; the TTL bounds staleness if Redis is down)"""
+    if not user_ids:
+        return
+    try:
+        get_redis().delete(*(summary_key(user_id) for user_id in user_ids))
+    except redis.RedisError as e:
+        logger.warning("Failed to invalidate credit summaries of %d users: %s", len(user_ids), e)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_summaries(session):
+    invalidate_summaries(session.info.pop(_CHANGED_USERS, None))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_summaries(session):
+    session.info.pop(_CHANGED_USERS, None)
+
+
+_LEDGER_TOTALS_SQL = f"""
+    SELECT u.id AS user_id,
+           u.credit_balance_micros - COALESCE(l.balance, 0) AS balance_drift,
+           COALESCE(l.earned, 0) - u.credits_earned_micros AS d_earned,
+           COALESCE(l.spent, 0) - u.credits_spent_micros AS d_spent,
+           COALESCE(l.entries, 0) - u.credit_transaction_count AS d_count
+    FROM users u
+    LEFT JOIN (
+        SELECT user_id,
+               sum(amount_micros) AS balance,
+               COALESCE(sum(amount_micros) FILTER (
+                   WHERE transaction_type IN ({", ".join(f"'{t}'" for t in EARNED_TYPES)})), 0) AS earned,
+               -COALESCE(sum(amount_micros) FILTER (
+                   WHERE transaction_type IN ({", ".join(f"'{t}'" for t in SPENT_TYPES)})), 0) AS spent,
+               count(*) AS entries
+        FROM credit_transactions
+        GROUP BY user_id
+    ) l ON l.user_id = u.id
+    WHERE u.credit_balance_micros <> COALESCE(l.balance, 0)
+       OR u.credits_earned_micros <> COALESCE(l.earned, 0)
+       OR u.credits_spent_micros <> COALESCE(l.spent, 0)
+       OR u.credit_transaction_count <> COALESCE(l.entries, 0)
+"""
+
+
+def reconcile_credit_summaries(db: Session, fix: bool = True) -> Dict[str, int]:
+    """
+    Compare every user's running totals with the ledger in one aggregate pass.
+
+    Drifted totals are corrected (by the difference, so changes committed
+    meanwhile are kept). A balance that disagrees with the ledger is only
+    reported: the ledger is the source of truth, but moving money is left to
+    an explicit adjustment entry.
+    """
+    users = User.__table__
+    rows = db.execute(text(_LEDGER_TOTALS_SQL)).all()
+    drifted = [row for row in rows if row.d_earned or row.d_spent or row.d_count]
+    balance_drift = [row for row in rows if row.balance_drift]
+    for row in balance_drift:
+        logger.error(
+            "Credit balance of user %s differs from its ledger by %s micro-credits",
+            row.user_id, row.balance_drift,
+        )
+
+    if fix and drifted:
+        db.execute(
+            update(users)
+            .where(users.c.id == bindparam("b_user_id"))
+            .values(
+                credits_earned_micros=users.c.credits_earned_micros + bindparam("b_earned"),
+                credits_spent_micros=users.c.credits_spent_micros + bindparam("b_spent"),
+                credit_transaction_count=users.c.credit_transaction_count + bindparam("b_count"),
+            ),
+            [
+                {"b_user_id": row.user_id, "b_earned": row.d_earned, "b_spent": row.d_spent, "b_count": row.d_count}
+                for row in drifted
+            ],
+        )
+        db.info.setdefault(_CHANGED_USERS, set()).update(row.user_id for row in drifted)
+        db.commit()
+        logger.warning("Corrected credit totals of %d users", len(drifted))
+
+    return {
+        "mismatched_users": len(rows),
+        "totals_drifted": len(drifted),
+        "totals_fixed": len(drifted) if fix else 0,
+        "balance_drift": len(balance_drift),
+    }
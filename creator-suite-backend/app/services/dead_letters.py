@@ -0,0 +1,130 @@
+"""
+Dead-letter list of generations that failed for good.
+
+When a generation task gives up (retries exhausted, or an error the retry
+policy could not classify) its Celery call, the error and the provider
+prediction id still running, if any, are pushed to the dead_letter:generation
+Redis list, newest first, capped at DEAD_LETTER_MAX_ENTRIES.
+
+replay_dead_letter re-runs one: the creation task goes back to pending, a
+credit hold released by the failure is reserved again, and the Celery task
+is re-sent with resume_prediction_id so a prediction that was still running
+is collected rather than paid for twice.
+"""
+
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import redis
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.task_events import get_redis
+from app.creator_suite.schemas import TaskStatus
+from app.models.creation_task import CreationTask
+from app.models.enhanced_auth import CreditHold
+from app.services import credit_service
+
+logger = logging.getLogger(__name__)
+
+DEAD_LETTER_KEY = "dead_letter:generation"
+
+
+def dead_letter(
+    celery_task: str,
+    args: List[Any],
+    kwargs: Dict[str, Any],
+    *,
+    task_id: Optional[str],
+    error: str,
+    kind: str,
+    retries: int,
+    prediction_id: Optional[str] = None,
+) -> Optional[str]:
+    """Record a failed generation; returns the entry id (None if Redis is unavailable)"""
+    entry = {
+        "id": uuid.uuid4().hex,
+        "celery_task": celery_task,
+        "args": list(args or ()),
+        "kwargs": dict(kwargs or {}),
+        "task_id": task_id,
+        "error": error[:2000],
+        "kind": kind,
+        "retries": retries,
+        "prediction_id": prediction_id,
+        "failed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.lpush(DEAD_LETTER_KEY, json.dumps(entry, default=str))
+        pipe.ltrim(DEAD_LETTER_KEY, 0, settings.DEAD_LETTER_MAX_ENTRIES - 1)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.error("Failed to dead-letter %s of task %s: %s", celery_task, task_id, e)
+        return None
+    logger.warning("Dead-lettered %s of task %s (%s): %s", celery_task, task_id, kind, error)
+    return entry["id"]
+
+
+def list_dead_letters(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Dead-lettered generations, newest first"""
+    raw = get_redis().lrange(DEAD_LETTER_KEY, 0, -1 if limit is None else limit - 1)
+    return [json.loads(item) for item in raw]
+
+
+def take_dead_letter(entry_id: str) -> Optional[Dict[str, Any]]:
+    """Remove an entry from the list and return it (None if no such entry)"""
+    client = get_redis()
+    for raw in client.lrange(DEAD_LETTER_KEY, 0, -1):
+        entry = json.loads(raw)
+        if entry["id"] == entry_id:
+            # Removal by value: of concurrent takers only one gets the entry
+            return entry if client.lrem(DEAD_LETTER_KEY, 1, raw) else None
+    return None
+
+
+def _reserve_again(db: Session, creation: CreationTask, entry_id: str) -> None:
+    """Re-reserve the credits of the task's last hold if the failure released it"""
+    hold = db.execute(
+        select(CreditHold).where(CreditHold.task_id == creation.id).order_by(CreditHold.id.desc()).limit(1)
+    ).scalar()
+    if hold is None or hold.status != credit_service.HOLD_RELEASED:
+        return
+    credit_service.reserve_credits(
+        db, hold.user_id, hold.amount_micros,
+        task_id=creation.id,
+        service_id=hold.service_id,
+        description=hold.description,
+        idempotency_key=f"replay:{entry_id}",
+        commit=False,
+    )
+
+
+def replay_dead_letter(db: Session, entry: Dict[str, Any]) -> str:
+    """
+    Re-run a dead-lettered generation; returns the new Celery task id.
+    Raises credit_service.InsufficientCreditsError if the credits can no
+    longer be reserved.
+    """
+    from app.core.celery_app import celery_app
+
+    creation = db.get(CreationTask, entry["task_id"]) if entry.get("task_id") else None
+    if creation is not None:
+        _reserve_again(db, creation, entry["id"])
+        creation.status = TaskStatus.PENDING
+        creation.error_message = None
+        creation.provider_prediction_id = entry.get("prediction_id")
+        db.commit()
+
+    kwargs = dict(entry.get("kwargs") or {})
+    if entry.get("prediction_id"):
+        kwargs["resume_prediction_id"] = entry["prediction_id"]
+    result = celery_app.send_task(
+        entry["celery_task"], args=entry.get("args") or [], kwargs=kwargs, task_id=entry.get("task_id"),
+    )
+    logger.info("Replayed dead letter %s as %s %s", entry["id"], entry["celery_task"], result.id)
+    return result.id
@@ -0,0 +1,244 @@
+"""
+Authenticated-principal cache.
+
+Auth dependencies resolve a bearer token to a Principal: the user's id,
+active/admin flags, organization and service grants. Principals are cached
+in process for PRINCIPAL_CACHE_TTL_SECONDS, keyed by (user_id, token id), so
+an authenticated request whose principal is cached needs no database query
+for auth.
+
+Changes to a user, their admin row or their service grants are collected
+during flush (or marked explicitly with mark_principals_changed for Core
+statements) and, once the transaction commits, published on the
+principal_invalidate Redis channel; every process drops the user's entries
+when the message arrives. If Redis is unavailable the TTL bounds staleness.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import redis
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.task_events import get_redis
+from app.models.admin import Admin
+from app.models.user import User
+from app.models.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "principal_invalidate"
+# Wait between attempts to (re)start the invalidation listener while Redis is down
+LISTENER_RETRY_SECONDS = 30.0
+# session.info key: users whose principal changed in the current transaction
+_CHANGED_PRINCIPALS = "changed_principals"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What auth needs to know about a user, without the ORM row"""
+    id: int
+    is_active: bool
+    is_admin: bool  # Has an admins row
+    is_superadmin: bool
+    organization_id: Optional[int]
+    service_ids: Tuple[int, ...]
+
+
+def token_id(payload: Dict[str, Any]) -> str:
+    """Cache key part of a decoded token: jti, else iat, else exp (tokens issued before jti existed)"""
+    return str(payload.get("jti") or payload.get("iat") or payload.get("exp"))
+
+
+class PrincipalCache:
+    """In-process TTL cache of principals, grouped by user for invalidation"""
+
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._users: "OrderedDict[int, Dict[str, Tuple[float, Principal]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._listener_retry_at = 0.0
+        # Bumped by every invalidation; a principal loaded across one is not cached
+        self.generation = 0
+
+    def get(self, user_id: int, token: str) -> Optional[Principal]:
+        self._ensure_listening()
+        with self._lock:
+            entry = self._users.get(user_id, {}).get(token)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._users[user_id][token]
+                return None
+            self._users.move_to_end(user_id)
+            return principal
+
+    def put(self, user_id: int, token: str, principal: Principal, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._users.setdefault(user_id, {})[token] = (time.monotonic() + self.ttl_seconds, principal)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            self.generation += 1
+            for user_id in user_ids:
+                self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._users.clear()
+
+    def _ensure_listening(self) -> None:
+        if self._listener is not None and self._listener.is_alive():
+            return
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            if time.monotonic() < self._listener_retry_at:
+                return
+            self._listener_retry_at = time.monotonic() + LISTENER_RETRY_SECONDS
+            # Entries cached while no listener ran may have missed invalidations
+            self.generation += 1
+            self._users.clear()
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_message})
+                self._listener = pubsub.run_in_thread(
+                    sleep_time=1.0, daemon=True, exception_handler=self._on_listener_error
+                )
+            except redis.RedisError as e:
+                # Cached principals can then outlive a change by up to the TTL
+                logger.warning("Principal invalidation listener unavailable: %s", e)
+
+    def _on_message(self, message) -> None:
+        try:
+            user_ids = [int(user_id) for user_id in json.loads(message["data"])]
+        except (TypeError, ValueError):
+            return
+        self.invalidate(user_ids)
+
+    def _on_listener_error(self, error, pubsub, thread) -> None:
+        logger.warning("Principal invalidation listener stopped: %s", error)
+        thread.stop()
+        pubsub.close()
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_USERS)
+
+
+def _principal_query(user_id: int):
+    service_ids = (
+        select(func.array_agg(UserService.service_id))
+        .where(UserService.user_id == User.id)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            User.id, User.is_active, User.organization_id,
+            Admin.id.isnot(None).label("is_admin"),
+            func.coalesce(Admin.is_superadmin, False).label("is_superadmin"),
+            service_ids.label("service_ids"),
+        )
+        .outerjoin(Admin, Admin.id == User.id)
+        .where(User.id == user_id)
+    )
+
+
+def _principal_from_row(row) -> Optional[Principal]:
+    if row is None:
+        return None
+    return Principal(
+        id=row.id,
+        is_active=bool(row.is_active),
+        is_admin=bool(row.is_admin),
+        is_superadmin=bool(row.is_superadmin),
+        organization_id=row.organization_id,
+        service_ids=tuple(sorted(row.service_ids or ())),
+    )
+
+
+def get_principal(db: Session, user_id: int, token: str) -> Optional[Principal]:
+    """Cached principal of the user, loading it with one query on a miss; None if the user does not exist"""
+    principal = principal_cache.get(user_id, token)
+    if principal is None:
+        generation = principal_cache.generation
+        principal = _principal_from_row(db.execute(_principal_query(user_id)).first())
+        if principal is not None:
+            principal_cache.put(user_id, token, principal, generation)
+    return principal
+
+
+async def get_principal_async(db: AsyncSession, user_id: int, token: str) -> Optional[Principal]:
+    """get_principal for the async session"""
+    principal = principal_cache.get(user_id, token)
+    if principal is None:
+        generation = principal_cache.generation
+        principal = _principal_from_row((await db.execute(_principal_query(user_id))).first())
+        if principal is not None:
+            principal_cache.put(user_id, token, principal, generation)
+    return principal
+
+
+def invalidate_principals(user_ids: Iterable[int]) -> None:
+    """Drop the users' cached principals here and, through Redis, in every other process"""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    principal_cache.invalidate(user_ids)
+    try:
+        get_redis().publish(INVALIDATION_CHANNEL, json.dumps(user_ids))
+    except redis.RedisError as e:
+        logger.warning("Failed to publish principal invalidation for %d users: %s", len(user_ids), e)
+
+
+def mark_principals_changed(db: Session, user_ids: Iterable[int]) -> None:
+    """Invalidate the users' principals when db commits (for changes made with Core statements)"""
+    db.info.setdefault(_CHANGED_PRINCIPALS, set()).update(user_ids)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_principals(session, flush_context, instances):
+    changed = set()
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and (obj in session.deleted or session.is_modified(obj)):
+            changed.add(obj.id)
+        elif isinstance(obj, Admin):
+            changed.add(obj.id)
+        elif isinstance(obj, UserService):
+            # A grant moved to another user changes both principals
+            changed.update(inspect(obj).attrs.user_id.history.deleted)
+            changed.add(obj.user_id)
+    for obj in session.new:
+        if isinstance(obj, Admin):
+            changed.add(obj.id)
+        elif isinstance(obj, UserService):
+            changed.add(obj.user_id)
+    changed.discard(None)
+    if changed:
+        mark_principals_changed(session, changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changed_principals(session):
+    invalidate_principals(session.info.pop(_CHANGED_PRINCIPALS, ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_principals(session):
+    session.info.pop(_CHANGED_PRINCIPALS, None)
@@ -0,0 +1,187 @@
+"""
+Admin dashboard rollups.
+
+refresh_rollups recomputes the daily_service_stats rows of the last few days
+from creation_tasks, feedbacks and credit_transactions with one
+INSERT ... SELECT ... ON CONFLICT statement, and snapshots user totals.
+Older days are final, so each refresh only scans recent rows and the
+dashboards read a table whose size depends on days x services, not on data
+volume.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.creator_suite.schemas import AssetType
+from app.models.rollups import DailyServiceStats, UserStatsRollup
+from app.models.service import Service
+from app.schemas.admin_feedback import AdminFeedbackFilters, AdminFeedbackStats
+
+# Tasks complete, and feedback arrives, a little after the task's day
+REFRESH_WINDOW_DAYS = 3
+
+_RATING_COLUMNS = ", ".join(f"rating_{r}" for r in range(1, 6))
+_STAT_COLUMNS = (
+    "tasks_created, tasks_completed, tasks_failed, generation_seconds, credits_spent, "
+    "feedback_count, feedback_with_text, rating_sum, " + _RATING_COLUMNS
+)
+
+REFRESH_DAILY_SERVICE_STATS = text(f"""
+    INSERT INTO daily_service_stats (day, service_id, task_type, {_STAT_COLUMNS}, refreshed_at)
+    SELECT day, service_id, task_type,
+           sum(tasks_created), sum(tasks_completed), sum(tasks_failed),
+           sum(generation_seconds), sum(credits_spent),
+           sum(feedback_count), sum(feedback_with_text), sum(rating_sum),
+           {", ".join(f"sum(rating_{r})" for r in range(1, 6))},
+           :refreshed_at
+    FROM (
+        SELECT (t.created_at AT TIME ZONE 'UTC')::date AS day, t.service_id, t.task_type,
+               1 AS tasks_created,
+               (t.status = 'COMPLETED')::int AS tasks_completed,
+               (t.status = 'FAILED')::int AS tasks_failed,
+               COALESCE(t.processing_time_seconds, 0) AS generation_seconds,
+               0 AS credits_spent,
+               0 AS feedback_count, 0 AS feedback_with_text, 0 AS rating_sum,
+               0 AS rating_1, 0 AS rating_2, 0 AS rating_3, 0 AS rating_4, 0 AS rating_5
+        FROM creation_tasks t
+        WHERE t.created_at >= :since
+
+        UNION ALL
+
+        SELECT (c.created_at AT TIME ZONE 'UTC')::date, t.service_id, t.task_type,
+               0, 0, 0, 0, -c.amount,
+               0, 0, 0, 0, 0, 0, 0, 0
+        FROM credit_transactions c
+        JOIN creation_tasks t ON t.id = c.task_id
+        WHERE c.transaction_type = 'usage' AND c.created_at >= :since
+
+        UNION ALL
+
+        SELECT (f.created_at AT TIME ZONE 'UTC')::date, t.service_id, t.task_type,
+               0, 0, 0, 0, 0,
+               1, (COALESCE(f.feedback_text, '') <> '')::int, f.rating,
+               (f.rating = 1)::int, (f.rating = 2)::int, (f.rating = 3)::int,
+               (f.rating = 4)::int, (f.rating = 5)::int
+        FROM feedbacks f
+        JOIN creation_tasks t ON t.id = f.creation_task_id
+        WHERE f.created_at >= :since
+    ) AS facts
+    GROUP BY day, service_id, task_type
+    ON CONFLICT (day, service_id, task_type) DO UPDATE SET
+        {", ".join(f"{c.strip()} = EXCLUDED.{c.strip()}" for c in _STAT_COLUMNS.split(","))},
+        refreshed_at = EXCLUDED.refreshed_at
+""")
+
+# Groups whose facts disappeared (deleted feedback/tasks) since the last refresh
+DELETE_STALE_DAILY_SERVICE_STATS = text("""
+    DELETE FROM daily_service_stats WHERE day >= :since_day AND refreshed_at < :refreshed_at
+""")
+
+REFRESH_USER_STATS = text("""
+    INSERT INTO user_stats_rollup (id, total_users, active_users, admin_users, total_credits, refreshed_at)
+    SELECT 1, count(*), count(*) FILTER (WHERE is_active), count(*) FILTER (WHERE is_admin),
+           COALESCE(sum(credits), 0), :refreshed_at
+    FROM users
+    ON CONFLICT (id) DO UPDATE SET
+        total_users = EXCLUDED.total_users,
+        active_users = EXCLUDED.active_users,
+        admin_users = EXCLUDED.admin_users,
+        total_credits = EXCLUDED.total_credits,
+        refreshed_at = EXCLUDED.refreshed_at
+""")
+
+
+def refresh_rollups(db: Session, days: Optional[int] = REFRESH_WINDOW_DAYS) -> Dict[str, Any]:
+    """
+    Recompute rollups for the last `days` UTC days (all history when None) in one transaction.
+    """
+    refreshed_at = datetime.now(timezone.utc)
+    if days is None:
+        since_day = date(1970, 1, 1)
+    else:
+        since_day = refreshed_at.date() - timedelta(days=days - 1)
+    since = datetime.combine(since_day, datetime.min.time(), tzinfo=timezone.utc)
+
+    upserted = db.execute(REFRESH_DAILY_SERVICE_STATS, {"since": since, "refreshed_at": refreshed_at}).rowcount
+    deleted = db.execute(
+        DELETE_STALE_DAILY_SERVICE_STATS, {"since_day": since_day, "refreshed_at": refreshed_at}
+    ).rowcount
+    db.execute(REFRESH_USER_STATS, {"refreshed_at": refreshed_at})
+    db.commit()
+    return {"since": since_day.isoformat(), "rows": upserted, "deleted": deleted}
+
+
+def get_user_stats(db: Session) -> Optional[UserStatsRollup]:
+    return db.get(UserStatsRollup, 1)
+
+
+def can_use_feedback_rollups(filters: Optional[AdminFeedbackFilters]) -> bool:
+    """Rollups are keyed by day/service/task type; other filters need the live query"""
+    if filters is None:
+        return True
+    return all(value is None for value in (
+        filters.rating, filters.user_id, filters.organization_id, filters.has_text_feedback
+    ))
+
+
+def get_feedback_stats_from_rollups(db: Session, filters: Optional[AdminFeedbackFilters] = None) -> AdminFeedbackStats:
+    """
+    AdminFeedbackStats from daily_service_stats.
+
+    Date filters apply at day granularity (UTC).
+    """
+    query = db.query(DailyServiceStats)
+    if filters:
+        if filters.task_type is not None:
+            query = query.filter(DailyServiceStats.task_type == AssetType(filters.task_type))
+        if filters.service_id is not None:
+            query = query.filter(DailyServiceStats.service_id == filters.service_id)
+        if filters.date_from is not None:
+            query = query.filter(DailyServiceStats.day >= filters.date_from.date())
+        if filters.date_to is not None:
+            query = query.filter(DailyServiceStats.day <= filters.date_to.date())
+    query = query.filter(DailyServiceStats.feedback_count > 0)
+
+    totals = query.with_entities(
+        func.coalesce(func.sum(DailyServiceStats.feedback_count), 0),
+        func.coalesce(func.sum(DailyServiceStats.rating_sum), 0),
+        *[func.coalesce(func.sum(getattr(DailyServiceStats, f"rating_{r}")), 0) for r in range(1, 6)],
+        func.coalesce(func.sum(DailyServiceStats.feedback_count).filter(
+            DailyServiceStats.day >= datetime.now(timezone.utc).date() - timedelta(days=7)
+        ), 0),
+    ).one()
+    total_feedbacks, rating_sum = totals[0], totals[1]
+    rating_distribution = {r: totals[1 + r] for r in range(1, 6)}
+    recent_feedbacks_count = totals[7]
+
+    if total_feedbacks == 0:
+        return AdminFeedbackStats(
+            total_feedbacks=0,
+            average_rating=0,
+            rating_distribution=rating_distribution,
+            feedbacks_by_task_type={},
+            feedbacks_by_service={},
+            recent_feedbacks_count=0
+        )
+
+    task_type_stats = query.with_entities(
+        DailyServiceStats.task_type,
+        func.sum(DailyServiceStats.feedback_count)
+    ).group_by(DailyServiceStats.task_type).all()
+
+    service_stats = query.join(Service, Service.id == DailyServiceStats.service_id).with_entities(
+        Service.name,
+        func.sum(DailyServiceStats.feedback_count)
+    ).group_by(Service.name).all()
+
+    return AdminFeedbackStats(
+        total_feedbacks=total_feedbacks,
+        average_rating=round(rating_sum / total_feedbacks, 2),
+        rating_distribution=rating_distribution,
+        feedbacks_by_task_type={task_type: count for task_type, count in task_type_stats},
+        feedbacks_by_service={service_name: count for service_name, count in service_stats},
+        recent_feedbacks_count=recent_feedbacks_count
+    )
@@ -0,0 +1,215 @@
+"""
+Reconciliation of creation tasks stuck in processing.
+
+Messages are acknowledged late, so a generation whose worker was killed
+(OOM, deploy, max_tasks_per_child gone wrong) is re-delivered, but only
+once the broker's visibility timeout has passed, and not at all if Redis
+lost the message. Meanwhile its creation task sits in processing.
+
+sweep_stuck_tasks runs when a worker starts and then periodically. It looks
+at tasks in processing untouched for STUCK_TASK_AFTER_SECONDS whose Celery
+message is not known to any worker or waiting in a queue:
+
+- with a persisted provider prediction (Replicate models), the generation
+  task is re-sent with resume_prediction_id, so it collects that prediction
+  instead of paying for another one; should the original message be
+  re-delivered later, it finds the task finished and does nothing;
+- without one, and with no unacknowledged message left that the broker
+  could still re-deliver, the task is failed (releasing its credit hold) and
+  dead-lettered, since running it again might pay for a second generation.
+
+Long video segments are resumed like any other task; their long video is
+assembled once the original segment message is re-delivered and completes
+the chord.
+"""
+
+import base64
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Set
+
+import redis
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import celery_queues, queue_keys
+from app.core.task_events import get_redis
+from app.creator_suite.errors import UNKNOWN
+from app.creator_suite.schemas import TaskStatus
+from app.models.creation_task import CreationTask
+from app.models.service import Service
+from app.services.dead_letters import dead_letter
+
+logger = logging.getLogger(__name__)
+
+SWEEP_LOCK_KEY = "stuck_tasks:sweep_lock"
+# kombu's Redis transport keeps delivered, unacknowledged messages in this hash
+UNACKED_KEY = "unacked"
+# Seconds to wait for the workers' replies
+INSPECT_TIMEOUT = 5.0
+
+# Celery generation task of each service (args: creation task id, input data)
+GENERATION_TASKS_BY_SERVICE = {
+    "minimax/video-01": "generate_minimax_video",
+    "minimax/hailuo-02": "generate_hailuo_02_video",
+    "google/veo-3": "generate_veo_3_video",
+    "google/imagen-4-ultra": "generate_imagen_4_ultra_image",
+    "runway/gen-3-alpha": "generate_runway_video",
+    "runway/gen-3-alpha-image": "generate_runway_gen4_image",
+    "runway/gen-3-alpha-video": "generate_runway_gen4_video",
+    "magic_hour/image": "generate_magic_hour_image",
+    "magic_hour/video": "generate_magic_hour_video",
+}
+
+
+def _creation_task_id(args: Any, kwargs: Any) -> Optional[str]:
+    """Generation tasks take the creation task id as their first argument"""
+    if isinstance(kwargs, dict) and isinstance(kwargs.get("task_id"), str):
+        return kwargs["task_id"]
+    if isinstance(args, (list, tuple)) and args and isinstance(args[0], str):
+        return args[0]
+    return None
+
+
+def _message_task_id(raw: str) -> Optional[str]:
+    """Creation task id of a Celery message as kombu stores it in Redis"""
+    try:
+        message = json.loads(raw)
+        if isinstance(message, list):  # unacked entries are [message, exchange, routing_key]
+            message = message[0]
+        body = message["body"]
+        if message.get("properties", {}).get("body_encoding") == "base64":
+            body = base64.b64decode(body)
+        args, kwargs = json.loads(body)[:2]
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        logger.debug("Unreadable broker message skipped: %s", e)
+        return None
+    return _creation_task_id(args, kwargs)
+
+
+def worker_task_ids() -> Optional[Set[str]]:
+    """Creation tasks a live worker is running, holding or has scheduled; None if no worker replied"""
+    from app.core.celery_app import celery_app
+
+    inspect = celery_app.control.inspect(timeout=INSPECT_TIMEOUT)
+    replies = [inspect.active(), inspect.reserved(), inspect.scheduled()]
+    if not any(replies):
+        return None
+    task_ids = set()
+    for reply in replies:
+        for requests in (reply or {}).values():
+            for request in requests:
+                request = request.get("request", request)  # scheduled entries wrap the request
+                task_id = _creation_task_id(request.get("args"), request.get("kwargs"))
+                if task_id:
+                    task_ids.add(task_id)
+    return task_ids
+
+
+def queued_task_ids(queues: Iterable[str]) -> Set[str]:
+    """Creation tasks with a message waiting in one of the queues (raises redis.RedisError)"""
+    client = get_redis()
+    task_ids = set()
+    for queue in queues:
+        for key in queue_keys(queue):
+            for raw in client.lrange(key, 0, -1):
+                task_id = _message_task_id(raw)
+                if task_id:
+                    task_ids.add(task_id)
+    return task_ids
+
+
+def unacked_task_ids() -> Set[str]:
+    """Creation tasks whose message was delivered but not acknowledged (raises redis.RedisError)"""
+    task_ids = set()
+    for raw in get_redis().hvals(UNACKED_KEY):
+        task_id = _message_task_id(raw)
+        if task_id:
+            task_ids.add(task_id)
+    return task_ids
+
+
+def _acquire_sweep_lock() -> bool:
+    """One sweep per interval however many workers start at once"""
+    try:
+        return bool(get_redis().set(SWEEP_LOCK_KEY, "1", nx=True, ex=settings.STUCK_TASK_SWEEP_INTERVAL_SECONDS))
+    except redis.RedisError as e:
+        logger.warning("Stuck task sweep lock unavailable: %s", e)
+        return False
+
+
+def sweep_stuck_tasks(db: Session, stale_after: Optional[float] = None, limit: int = 500) -> Dict[str, int]:
+    """Resume or fail creation tasks stuck in processing; returns counts per outcome"""
+    from app.core.celery_app import celery_app
+
+    counts = {"stuck": 0, "resumed": 0, "failed": 0, "pending_redelivery": 0}
+    if not _acquire_sweep_lock():
+        return counts
+
+    stale_after = settings.STUCK_TASK_AFTER_SECONDS if stale_after is None else stale_after
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+    candidates = db.execute(
+        select(CreationTask, Service.name)
+        .join(Service, Service.id == CreationTask.service_id)
+        .where(
+            CreationTask.status == TaskStatus.PROCESSING,
+            func.coalesce(CreationTask.updated_at, CreationTask.created_at) < cutoff,
+            # A long video stays processing while its segments (swept on their own) generate
+            or_(
+                CreationTask.long_video_config.is_(None),
+                ~CreationTask.long_video_config.has_key("segment_task_ids"),
+            ),
+        )
+        .order_by(CreationTask.created_at)
+        .limit(limit)
+    ).all()
+    if not candidates:
+        return counts
+
+    live = worker_task_ids()
+    if live is None:
+        # Without the workers' view, a busy task is indistinguishable from a lost one
+        logger.warning("No worker replied to inspect; skipping the stuck task sweep")
+        return counts
+    try:
+        live |= queued_task_ids(celery_queues())
+        unacked = unacked_task_ids()
+    except redis.RedisError as e:
+        logger.warning("Broker state unavailable; skipping the stuck task sweep: %s", e)
+        return counts
+
+    for task, service_name in candidates:
+        if task.id in live:
+            continue
+        counts["stuck"] += 1
+        celery_task = GENERATION_TASKS_BY_SERVICE.get(service_name)
+        if task.provider_prediction_id and celery_task:
+            result = celery_app.send_task(
+                celery_task,
+                args=[task.id, task.input_data],
+                kwargs={"resume_prediction_id": task.provider_prediction_id},
+                task_id=task.id,
+            )
+            logger.warning("Resuming stuck task %s (prediction %s) as %s %s",
+                           task.id, task.provider_prediction_id, celery_task, result.id)
+            counts["resumed"] += 1
+        elif task.id in unacked:
+            # The broker re-delivers it once its visibility timeout passes
+            counts["pending_redelivery"] += 1
+        else:
+            error = "Generation interrupted by a worker restart"
+            task.status = TaskStatus.FAILED
+            task.error_message = error
+            db.commit()
+            if celery_task:
+                dead_letter(
+                    celery_task, [task.id, task.input_data], {},
+                    task_id=task.id, error=error, kind=UNKNOWN, retries=0,
+                )
+            logger.warning("Failed stuck task %s (%s); nothing to resume", task.id, service_name)
+            counts["failed"] += 1
+
+    logger.info("Stuck task sweep: %s", counts)
+    return counts
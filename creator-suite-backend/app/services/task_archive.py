@@ -0,0 +1,209 @@
+"""
+Partition maintenance and cold storage of old creation tasks.
+
+creation_tasks is range-partitioned by calendar month (UTC) on created_at.
+ensure_task_partitions creates the coming months' partitions ahead of time so
+inserts never land in the catch-all default partition.
+
+archive_finished_tasks moves the heavy JSON of completed and failed tasks
+older than TASK_ARCHIVE_AFTER_DAYS (full input_data, output_assets,
+long_video_config and the provider logs in creation_task_provider_payloads)
+into creation_task_archives as zlib-compressed JSON. The task row keeps a slim copy (the prompt and the
+asset URLs) so lists and galleries still render; load_archived_payload
+restores the full payload for single-task reads. Archived long videos can
+no longer be edited segment by segment (the edit endpoint answers 409).
+"""
+
+import json
+import logging
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.creator_suite.schemas import TaskStatus
+from app.models.creation_task import CreationTask, CreationTaskArchive, CreationTaskProviderPayload
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+ARCHIVE_BATCH_SIZE = 500
+# input_data keys kept on the hot row of an archived task
+SLIM_INPUT_KEYS = ("prompt",)
+# output asset keys kept on the hot row (provider metadata and logs go to the archive)
+SLIM_ASSET_KEYS = ("url", "asset_type", "mime_type", "thumbnail_url")
+
+
+def _add_months(day: date, months: int) -> date:
+    years, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + years, month + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"creation_tasks_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_ddl(month: date) -> str:
+    """CREATE TABLE statement of the partition holding tasks created in month"""
+    lower = month.replace(day=1)
+    upper = _add_months(lower, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(lower)} PARTITION OF creation_tasks "
+        f"FOR VALUES FROM ('{lower.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+    )
+
+
+def ensure_task_partitions(db: Session, months_ahead: Optional[int] = None) -> List[str]:
+    """Create the partitions of the current and next months_ahead months; returns the new ones"""
+    if months_ahead is None:
+        months_ahead = settings.TASK_PARTITION_MONTHS_AHEAD
+    existing = set(db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'creation_tasks'::regclass"
+    )).scalars())
+
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = _add_months(this_month, offset)
+        if partition_name(month) in existing:
+            continue
+        db.execute(text(partition_ddl(month)))
+        created.append(partition_name(month))
+    db.commit()
+    return created
+
+
+def _slim_payload(input_data: Any, output_assets: Any) -> Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]:
+    slim_input = {}
+    if isinstance(input_data, dict):
+        slim_input = {key: input_data[key] for key in SLIM_INPUT_KEYS if key in input_data}
+    slim_assets = None
+    if isinstance(output_assets, list):
+        slim_assets = [
+            {key: asset[key] for key in SLIM_ASSET_KEYS if key in asset}
+            for asset in output_assets if isinstance(asset, dict)
+        ]
+    return slim_input, slim_assets
+
+
+def encode_archive_payload(payload: Dict[str, Any]) -> Tuple[bytes, int]:
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return zlib.compress(raw, 6), len(raw)
+
+
+def decode_archive_payload(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload))
+
+
+def archive_finished_tasks(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Move the heavy JSON of old finished tasks to creation_task_archives.
+
+    Works oldest first in batches of batch_size, one transaction each; rows
+    locked by a concurrent run are skipped. Returns counts and byte totals.
+    """
+    if older_than_days is None:
+        older_than_days = settings.TASK_ARCHIVE_AFTER_DAYS
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    tasks = CreationTask.__table__
+    slim_update = (
+        update(tasks)
+        .where(tasks.c.id == bindparam("b_id"), tasks.c.created_at == bindparam("b_created_at"))
+        .values(
+            input_data=bindparam("b_input_data", type_=tasks.c.input_data.type),
+            output_assets=bindparam("b_output_assets", type_=tasks.c.output_assets.type),
+            long_video_config=None,
+            archived_at=bindparam("b_archived_at"),
+        )
+    )
+
+    archived = raw_total = stored_total = batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = db.execute(
+            select(
+                tasks.c.id, tasks.c.created_at, tasks.c.input_data,
+                tasks.c.output_assets, tasks.c.long_video_config,
+            )
+            .where(
+                tasks.c.created_at < cutoff,
+                tasks.c.status.in_(ARCHIVE_STATUSES),
+                tasks.c.archived_at.is_(None),
+            )
+            .order_by(tasks.c.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            break
+
+        task_ids = [row.id for row in rows]
+        provider_payloads = dict(db.execute(
+            select(CreationTaskProviderPayload.task_id, CreationTaskProviderPayload.asset_metadata)
+            .where(CreationTaskProviderPayload.task_id.in_(task_ids))
+        ).all())
+
+        now = datetime.now(timezone.utc)
+        archives, slims = [], []
+        for row in rows:
+            payload, raw_bytes = encode_archive_payload({
+                "input_data": row.input_data,
+                "output_assets": row.output_assets,
+                "long_video_config": row.long_video_config,
+                "provider_payload": provider_payloads.get(row.id),
+            })
+            archives.append({
+                "task_id": row.id,
+                "task_created_at": row.created_at,
+                "payload": payload,
+                "raw_bytes": raw_bytes,
+                "archived_at": now,
+            })
+            slim_input, slim_assets = _slim_payload(row.input_data, row.output_assets)
+            slims.append({
+                "b_id": row.id,
+                "b_created_at": row.created_at,
+                "b_input_data": slim_input,
+                "b_output_assets": slim_assets,
+                "b_archived_at": now,
+            })
+            raw_total += raw_bytes
+            stored_total += len(payload)
+
+        db.execute(insert(CreationTaskArchive).on_conflict_do_nothing(index_elements=["task_id"]), archives)
+        db.execute(slim_update, slims)
+        if provider_payloads:
+            db.execute(
+                delete(CreationTaskProviderPayload)
+                .where(CreationTaskProviderPayload.task_id.in_(list(provider_payloads)))
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+        archived += len(rows)
+        batches += 1
+
+    if archived:
+        logger.info("Archived %s tasks older than %s (%s -> %s bytes)", archived, cutoff, raw_total, stored_total)
+    return {
+        "archived": archived,
+        "cutoff": cutoff.isoformat(),
+        "raw_bytes": raw_total,
+        "stored_bytes": stored_total,
+    }
+
+
+def load_archived_payload(db: Session, task_id: str) -> Optional[Dict[str, Any]]:
+    """Full input_data/output_assets/long_video_config/provider_payload of an archived task, or None"""
+    payload = db.execute(
+        select(CreationTaskArchive.payload).where(CreationTaskArchive.task_id == task_id)
+    ).scalar()
+    return decode_archive_payload(payload) if payload is not None else None
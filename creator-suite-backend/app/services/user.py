@@ -57,12 +57,14 @@ def update_user(db: Session, user_id: int, user: UserUpdate) -> Optional[User]:
 
 
 def delete_user(db: Session, user_id: int) -> Optional[User]:
+    """Soft delete: the credit ledger is append-only, so users with ledger rows cannot be removed"""
     db_user = get_user(db, user_id)
     if not db_user:
         return None
     
-    db.delete(db_user)
+    db_user.is_active = False
     db.commit()
+    db.refresh(db_user)
     return db_user
 
 
@@ -1,7 +1,12 @@
+from sqlalchemy import Integer, cast, delete, func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
+from app.models.service import Service
+from app.models.user import User
 from app.models.user_service import UserService
+from app.services.principal import mark_principals_changed
 from app.schemas.user_service import UserServiceCreate, UserServiceUpdate
 
 
@@ -95,85 +100,136 @@ def delete_user_service(db: Session, user_service_id: int) -> UserService:
     return db_user_service
 
 
+def _unique_pairs(pairs: Iterable[Tuple[Optional[int], Optional[int]]]) -> List[Tuple[int, int]]:
+    """Distinct (user_id, service_id) pairs in input order, skipping incomplete ones"""
+    return list(dict.fromkeys((int(u), int(s)) for u, s in pairs if u and s))
+
+
+def _pairs_table(pairs: List[Tuple[int, int]]):
+    """
+    (user_id, service_id) pairs as a derived table. Bound as two integer
+    arrays and unnested server-side, so the statement has two parameters
+    whatever the number of pairs.
+    """
+    user_ids = [u for u, _ in pairs]
+    service_ids = [s for _, s in pairs]
+    return func.unnest(
+        cast(literal(user_ids, ARRAY(Integer)), ARRAY(Integer)),
+        cast(literal(service_ids, ARRAY(Integer)), ARRAY(Integer)),
+    ).table_valued("user_id", "service_id").render_derived(name="pairs")
+
+
+def find_missing_references(
+    db: Session, user_ids: Iterable[int], service_ids: Iterable[int]
+) -> Tuple[List[int], List[int]]:
+    """IDs among user_ids and service_ids that have no users / services row (one query each)"""
+    user_ids = set(user_ids)
+    service_ids = set(service_ids)
+    found_users = set(db.scalars(select(User.id).where(User.id.in_(user_ids)))) if user_ids else set()
+    found_services = set(
+        db.scalars(select(Service.id).where(Service.id.in_(service_ids)))
+    ) if service_ids else set()
+    return sorted(user_ids - found_users), sorted(service_ids - found_services)
+
+
 def bulk_create_user_services(
     db: Session, user_service_list: List[UserServiceCreate]
 ) -> List[UserService]:
-    """Bulk grant users access to services"""
-    db_user_services = []
-    for user_service in user_service_list:
-        # Check if the user-service relationship already exists
-        existing = get_user_service_by_user_and_service(
-            db, user_service.user_id, user_service.service_id
-        )
-        if not existing:
-            db_user_service = UserService(
-                user_id=user_service.user_id,
-                service_id=user_service.service_id,
-            )
-            db.add(db_user_service)
-            db_user_services.append(db_user_service)
-    
+    """
+    Bulk grant users access to services.
+    One INSERT ... ON CONFLICT DO NOTHING RETURNING; pairs that already exist are skipped.
+    """
+    pairs = _unique_pairs((us.user_id, us.service_id) for us in user_service_list)
+    if not pairs:
+        return []
+
+    source = _pairs_table(pairs)
+    stmt = (
+        insert(UserService)
+        .from_select(["user_id", "service_id"], select(source.c.user_id, source.c.service_id))
+        .on_conflict_do_nothing(index_elements=["user_id", "service_id"])
+        .returning(UserService)
+    )
+    created = db.scalars(stmt).all()
+    mark_principals_changed(db, {user_id for user_id, _ in pairs})
     db.commit()
-    for user_service in db_user_services:
-        db.refresh(user_service)
-    return db_user_services
+    return created
 
 
 def bulk_delete_user_services(
     db: Session, user_service_list: List[dict]
 ) -> int:
-    """Bulk remove users' access to services"""
-    deleted_count = 0
-    for user_service in user_service_list:
-        user_id = user_service.get('user_id')
-        service_id = user_service.get('service_id')
-        
-        if user_id and service_id:
-            existing = get_user_service_by_user_and_service(db, user_id, service_id)
-            if existing:
-                db.delete(existing)
-                deleted_count += 1
-    
+    """Bulk remove users' access to services with one DELETE ... WHERE (user_id, service_id) IN (...)"""
+    pairs = _unique_pairs(
+        (user_service.get('user_id'), user_service.get('service_id')) for user_service in user_service_list
+    )
+    if not pairs:
+        return 0
+
+    source = _pairs_table(pairs)
+    result = db.execute(
+        delete(UserService)
+        .where(tuple_(UserService.user_id, UserService.service_id).in_(
+            select(source.c.user_id, source.c.service_id)
+        ))
+        .execution_options(synchronize_session=False)
+    )
+    mark_principals_changed(db, {user_id for user_id, _ in pairs})
     db.commit()
-    return deleted_count
+    return result.rowcount
+
+
+def _replace_user_services(db: Session, service_ids_by_user: dict) -> Tuple[int, int]:
+    """
+    Make each user's grants exactly the given service IDs; the diff against
+    the current grants is computed by Postgres (one DELETE, one INSERT).
+    Returns (added, removed). Does not commit.
+    """
+    if not service_ids_by_user:
+        return 0, 0
+
+    user_ids = list(service_ids_by_user)
+    mark_principals_changed(db, user_ids)
+    pairs = _unique_pairs(
+        (user_id, service_id)
+        for user_id, service_ids in service_ids_by_user.items()
+        for service_id in service_ids
+    )
+    desired = _pairs_table(pairs)
+
+    removed = db.execute(
+        delete(UserService)
+        .where(
+            UserService.user_id.in_(user_ids),
+            ~select(desired.c.user_id).where(
+                desired.c.user_id == UserService.user_id,
+                desired.c.service_id == UserService.service_id,
+            ).exists(),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    added = 0
+    if pairs:
+        added = len(db.execute(
+            insert(UserService)
+            .from_select(["user_id", "service_id"], select(desired.c.user_id, desired.c.service_id))
+            .on_conflict_do_nothing(index_elements=["user_id", "service_id"])
+            .returning(UserService.id)
+        ).all())
+    return added, removed
 
 
 def bulk_update_user_services(
     db: Session, user_id: int, service_ids: List[int]
 ) -> dict:
     """Update all services for a specific user (replace existing services)"""
-    # Get current services for the user
-    current_services = get_user_services_by_user_id(db, user_id)
-    current_service_ids = {service.service_id for service in current_services}
-    
-    # Determine services to add and remove
-    new_service_ids = set(service_ids)
-    services_to_add = new_service_ids - current_service_ids
-    services_to_remove = current_service_ids - new_service_ids
-    
-    # Add new services
-    added_count = 0
-    for service_id in services_to_add:
-        # Check if already exists (shouldn't happen but safety check)
-        existing = get_user_service_by_user_and_service(db, user_id, service_id)
-        if not existing:
-            db_user_service = UserService(user_id=user_id, service_id=service_id)
-            db.add(db_user_service)
-            added_count += 1
-    
-    # Remove old services
-    removed_count = 0
-    for service_id in services_to_remove:
-        existing = get_user_service_by_user_and_service(db, user_id, service_id)
-        if existing:
-            db.delete(existing)
-            removed_count += 1
-    
+    added, removed = _replace_user_services(db, {user_id: service_ids})
     db.commit()
-    
+
     return {
-        "added": added_count,
-        "removed": removed_count,
+        "added": added,
+        "removed": removed,
         "total_services": len(service_ids)
     }
 
@@ -181,22 +237,18 @@ def bulk_update_user_services(
 def bulk_update_multiple_users_services(
     db: Session, user_service_updates: List[dict]
 ) -> dict:
-    """Bulk update services for multiple users"""
-    total_added = 0
-    total_removed = 0
-    total_users = len(user_service_updates)
-    
+    """Bulk update services for multiple users in one transaction (a later entry for the same user wins)"""
+    service_ids_by_user = {}
     for update in user_service_updates:
         user_id = update.get('user_id')
-        service_ids = update.get('service_ids', [])
-        
         if user_id:
-            result = bulk_update_user_services(db, user_id, service_ids)
-            total_added += result["added"]
-            total_removed += result["removed"]
-    
+            service_ids_by_user[int(user_id)] = update.get('service_ids', [])
+
+    added, removed = _replace_user_services(db, service_ids_by_user)
+    db.commit()
+
     return {
-        "users_updated": total_users,
-        "services_added": total_added,
-        "services_removed": total_removed
-    }
\ No newline at end of file
+        "users_updated": len(user_service_updates),
+        "services_added": added,
+        "services_removed": removed
+    }
@@ -0,0 +1,101 @@
+"""
+Periodic database maintenance tasks, scheduled by Celery beat
+(see beat_schedule in app/core/celery_app.py).
+"""
+
+import logging
+from typing import Optional
+
+import app.models  # noqa: F401  (register all mappers)
+from app.core.celery_app import celery_app
+from app.db.session import SessionLocal
+from app.services.credit_service import reconcile_credit_summaries, release_expired_holds
+from app.services.rollups import REFRESH_WINDOW_DAYS, refresh_rollups
+from app.services.stuck_tasks import sweep_stuck_tasks
+from app.services.task_archive import archive_finished_tasks, ensure_task_partitions
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="refresh_admin_rollups", soft_time_limit=10 * 60, time_limit=15 * 60)
+def refresh_admin_rollups(days: Optional[int] = REFRESH_WINDOW_DAYS):
+    """Recompute the admin dashboard rollups of the last `days` days (all history when None)"""
+    db = SessionLocal()
+    try:
+        result = refresh_rollups(db, days)
+        logger.info("Refreshed admin rollups since %s: %s rows, %s stale removed",
+                    result["since"], result["rows"], result["deleted"])
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="maintain_task_partitions", soft_time_limit=5 * 60, time_limit=10 * 60)
+def maintain_task_partitions(months_ahead: Optional[int] = None):
+    """Create the coming months' creation_tasks partitions"""
+    db = SessionLocal()
+    try:
+        created = ensure_task_partitions(db, months_ahead)
+        if created:
+            logger.info("Created creation_tasks partitions: %s", ", ".join(created))
+        return created
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="archive_creation_tasks", soft_time_limit=50 * 60, time_limit=60 * 60)
+def archive_creation_tasks(older_than_days: Optional[int] = None, max_batches: Optional[int] = 200):
+    """Move old finished tasks' heavy JSON to cold storage (at most max_batches batches per run)"""
+    db = SessionLocal()
+    try:
+        return archive_finished_tasks(db, older_than_days, max_batches=max_batches)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="release_expired_credit_holds", soft_time_limit=5 * 60, time_limit=10 * 60)
+def release_expired_credit_holds(limit: int = 1000):
+    """Return the credits of holds whose task never completed or failed"""
+    db = SessionLocal()
+    try:
+        return release_expired_holds(db, limit)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="reconcile_credit_totals", soft_time_limit=20 * 60, time_limit=30 * 60)
+def reconcile_credit_totals(fix: bool = True):
+    """Check every user's running credit totals and balance against the ledger"""
+    db = SessionLocal()
+    try:
+        return reconcile_credit_summaries(db, fix=fix)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name="sweep_stuck_creation_tasks", soft_time_limit=5 * 60, time_limit=10 * 60)
+def sweep_stuck_creation_tasks(stale_after: Optional[float] = None):
+    """Resume (or fail) creation tasks left in processing by a lost worker"""
+    db = SessionLocal()
+    try:
+        return sweep_stuck_tasks(db, stale_after)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
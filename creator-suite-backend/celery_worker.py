@@ -2,6 +2,16 @@
 Celery worker entry point.
 Run with: celery -A celery_worker worker --loglevel=info
 """
+import os
+
+# Workers use the worker engine profile (small pool, longer statement timeout)
+os.environ.setdefault("DB_ROLE", "worker")
+
+# Tasks run in pool child processes; they share metrics through a fresh multiprocess directory
+if os.getenv("CELERY_METRICS_PORT", "0") != "0" and not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    import tempfile
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="celery-metrics-")
+
 from app.core.celery_app import celery_app
 
 if __name__ == "__main__":
@@ -7,8 +7,14 @@ from datetime import timedelta
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.structured_logging import RequestContextMiddleware, configure_logging
+from app.core.tracing import configure_tracing
 from app.api.deps import get_db
 
+configure_logging()
+configure_tracing("creator-suite-api")
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     description="Creator Suite API - Backend services for content creators",
@@ -31,7 +37,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Next-Cursor", "X-Request-ID"],  # Keyset pagination cursor of list endpoints; log correlation id
 )
+app.add_middleware(MetricsMiddleware)
+# Outermost, so every log line of a request (CORS preflights included) carries its request_id
+app.add_middleware(RequestContextMiddleware)
 
 # Mount static files for public storage
 app.mount("/storage", StaticFiles(directory="public/storage"), name="storage")
@@ -44,6 +54,12 @@ async def health_check():
     """Health check endpoint for deployment verification"""
     return {"status": "healthy", "message": "Creator Suite API is running"}
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # Add a global OPTIONS handler to handle all preflight requests
 @app.options("/{full_path:path}")
 async def options_handler(full_path: str):
@@ -0,0 +1,28 @@
+"""Add long_video_config to creation_tasks
+
+Revision ID: 5a7e2c9d1b34
+Revises: f833755e5d36
+Create Date: 2025-09-20 10:14:03.512840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7e2c9d1b34'
+down_revision: Union[str, Sequence[str], None] = 'f833755e5d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('creation_tasks', sa.Column('long_video_config', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('creation_tasks', 'long_video_config')
@@ -0,0 +1,28 @@
+"""Add progress to creation_tasks
+
+Revision ID: 8b41d6e0f2a7
+Revises: 5a7e2c9d1b34
+Create Date: 2025-09-22 16:02:47.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41d6e0f2a7'
+down_revision: Union[str, Sequence[str], None] = '5a7e2c9d1b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('creation_tasks', sa.Column('progress', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('creation_tasks', 'progress')
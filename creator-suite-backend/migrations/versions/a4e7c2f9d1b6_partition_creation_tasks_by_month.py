@@ -0,0 +1,135 @@
+"""Partition creation_tasks by month and add creation_task_archives
+
+Revision ID: a4e7c2f9d1b6
+Revises: f1c6a8d2b4e9
+Create Date: 2025-10-02 09:41:17.264508
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e7c2f9d1b6'
+down_revision: Union[str, Sequence[str], None] = 'f1c6a8d2b4e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions created beyond the current month (later ones come from the
+# maintain_task_partitions beat task, app.services.task_archive)
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    ('ix_creation_tasks_id', ['id']),
+    ('ix_creation_tasks_status', ['status']),
+    ('ix_creation_tasks_task_type', ['task_type']),
+    ('ix_creation_tasks_created_at', ['created_at']),
+    ('ix_creation_tasks_user_created_id', ['user_id', 'created_at', 'id']),
+]
+
+# A foreign key to a partitioned table must include the partition key, so
+# these become plain columns (see Feedback / CreditTransaction relationships)
+REFERENCING_FKS = [
+    ('feedbacks', 'feedbacks_creation_task_id_fkey', 'creation_task_id'),
+    ('credit_transactions', 'credit_transactions_task_id_fkey', 'task_id'),
+]
+
+
+def _add_months(day: date, months: int) -> date:
+    years, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + years, month + 1, 1)
+
+
+def _create_partition(month: date) -> None:
+    # Same naming and bounds as app.services.task_archive.partition_ddl
+    upper = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE creation_tasks_y{month.year:04d}m{month.month:02d} PARTITION OF creation_tasks "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+    )
+
+
+def _create_indexes() -> None:
+    for name, columns in INDEXES:
+        op.create_index(name, 'creation_tasks', columns, unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, constraint, _ in REFERENCING_FKS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}")
+    op.create_index('ix_feedbacks_creation_task_id', 'feedbacks', ['creation_task_id'], unique=False)
+
+    # The partition key must be NOT NULL to be part of the primary key
+    op.execute("UPDATE creation_tasks SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL")
+    op.add_column('creation_tasks', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Move the existing table aside (index and primary key names are schema-wide)
+    op.rename_table('creation_tasks', 'creation_tasks_unpartitioned')
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER TABLE creation_tasks_unpartitioned RENAME CONSTRAINT creation_tasks_pkey TO creation_tasks_unpartitioned_pkey")
+
+    op.execute("""
+        CREATE TABLE creation_tasks (LIKE creation_tasks_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+    """)
+    op.alter_column('creation_tasks', 'created_at', nullable=False)
+    op.create_primary_key('creation_tasks_pkey', 'creation_tasks', ['id', 'created_at'])
+    op.create_foreign_key('creation_tasks_user_id_fkey', 'creation_tasks', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('creation_tasks_service_id_fkey', 'creation_tasks', 'services', ['service_id'], ['id'])
+
+    oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM creation_tasks_unpartitioned")).scalar()
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    month = oldest.astimezone(timezone.utc).date().replace(day=1) if oldest else this_month
+    while month <= _add_months(this_month, MONTHS_AHEAD):
+        _create_partition(month)
+        month = _add_months(month, 1)
+    # Catches inserts past the last monthly partition should maintenance lag behind
+    op.execute("CREATE TABLE creation_tasks_default PARTITION OF creation_tasks DEFAULT")
+
+    _create_indexes()
+    op.execute("INSERT INTO creation_tasks SELECT * FROM creation_tasks_unpartitioned")
+    op.drop_table('creation_tasks_unpartitioned')
+    op.execute("ANALYZE creation_tasks")
+
+    op.create_table('creation_task_archives',
+    sa.Column('task_id', sa.String(), nullable=False),
+    sa.Column('task_created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('raw_bytes', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('task_id')
+    )
+    # Already compressed; keep Postgres from trying again
+    op.execute("ALTER TABLE creation_task_archives ALTER COLUMN payload SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    archived = op.get_bind().execute(sa.text("SELECT count(*) FROM creation_task_archives")).scalar()
+    if archived:
+        raise RuntimeError(
+            f"{archived} tasks have their payload in creation_task_archives; "
+            "restore them onto creation_tasks before downgrading"
+        )
+    op.drop_table('creation_task_archives')
+
+    op.execute("CREATE TABLE creation_tasks_unpartitioned (LIKE creation_tasks INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO creation_tasks_unpartitioned SELECT * FROM creation_tasks")
+    op.drop_table('creation_tasks')
+    op.rename_table('creation_tasks_unpartitioned', 'creation_tasks')
+
+    op.drop_column('creation_tasks', 'archived_at')
+    op.alter_column('creation_tasks', 'created_at', nullable=True)
+    op.create_primary_key('creation_tasks_pkey', 'creation_tasks', ['id'])
+    op.create_foreign_key('creation_tasks_user_id_fkey', 'creation_tasks', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('creation_tasks_service_id_fkey', 'creation_tasks', 'services', ['service_id'], ['id'])
+    _create_indexes()
+
+    op.drop_index('ix_feedbacks_creation_task_id', table_name='feedbacks')
+    for table, constraint, column in REFERENCING_FKS:
+        op.create_foreign_key(constraint, table, 'creation_tasks', [column], ['id'])
@@ -0,0 +1,99 @@
+"""Move provider logs to creation_task_provider_payloads and switch task JSON to JSONB
+
+Revision ID: b8d2f5a1c7e3
+Revises: a4e7c2f9d1b6
+Create Date: 2025-10-03 16:22:05.731846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d2f5a1c7e3'
+down_revision: Union[str, Sequence[str], None] = 'a4e7c2f9d1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_COLUMNS = ['input_data', 'output_assets', 'long_video_config']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Propagates to every partition (rewrites the table)
+    for column in JSON_COLUMNS:
+        op.alter_column(
+            'creation_tasks', column,
+            type_=postgresql.JSONB(), postgresql_using=f'{column}::jsonb',
+        )
+
+    op.create_table('creation_task_provider_payloads',
+    sa.Column('task_id', sa.String(), nullable=False),
+    sa.Column('asset_metadata', postgresql.JSONB(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('task_id')
+    )
+
+    # Same split as CreationTask._split_provider_payload: per asset,
+    # metadata.logs/metrics go to the side table (null entries keep alignment)
+    op.execute("""
+        INSERT INTO creation_task_provider_payloads (task_id, asset_metadata)
+        SELECT t.id,
+               jsonb_agg(
+                   CASE WHEN (e.asset -> 'metadata') ?| array['logs', 'metrics']
+                        THEN NULLIF(jsonb_strip_nulls(jsonb_build_object(
+                                 'logs', e.asset -> 'metadata' -> 'logs',
+                                 'metrics', e.asset -> 'metadata' -> 'metrics')), '{}'::jsonb)
+                   END
+                   ORDER BY e.ord)
+        FROM creation_tasks t,
+             jsonb_array_elements(t.output_assets) WITH ORDINALITY AS e(asset, ord)
+        WHERE jsonb_typeof(t.output_assets) = 'array'
+        GROUP BY t.id
+        HAVING bool_or((e.asset -> 'metadata') ?| array['logs', 'metrics'])
+    """)
+    op.execute("""
+        UPDATE creation_tasks t
+        SET output_assets = (
+            SELECT jsonb_agg(
+                       CASE WHEN jsonb_typeof(e.asset -> 'metadata') = 'object'
+                            THEN jsonb_set(e.asset, '{metadata}', (e.asset -> 'metadata') - 'logs' - 'metrics')
+                            ELSE e.asset
+                       END
+                       ORDER BY e.ord)
+            FROM jsonb_array_elements(t.output_assets) WITH ORDINALITY AS e(asset, ord)
+        )
+        FROM creation_task_provider_payloads p
+        WHERE p.task_id = t.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        UPDATE creation_tasks t
+        SET output_assets = (
+            SELECT jsonb_agg(
+                       CASE WHEN jsonb_typeof(h.heavy) = 'object' AND jsonb_typeof(e.asset -> 'metadata') = 'object'
+                            THEN jsonb_set(e.asset, '{metadata}', (e.asset -> 'metadata') || h.heavy)
+                            ELSE e.asset
+                       END
+                       ORDER BY e.ord)
+            FROM jsonb_array_elements(t.output_assets) WITH ORDINALITY AS e(asset, ord)
+            LEFT JOIN jsonb_array_elements(p.asset_metadata) WITH ORDINALITY AS h(heavy, ord)
+                ON h.ord = e.ord
+        )
+        FROM creation_task_provider_payloads p
+        WHERE p.task_id = t.id AND jsonb_typeof(t.output_assets) = 'array'
+    """)
+    op.drop_table('creation_task_provider_payloads')
+
+    for column in JSON_COLUMNS:
+        op.alter_column(
+            'creation_tasks', column,
+            type_=sa.JSON(), postgresql_using=f'{column}::json',
+        )
@@ -0,0 +1,31 @@
+"""Persist the provider prediction of running creation tasks
+
+Revision ID: b8e2f5a1c7d4
+Revises: d6a1e8b3f4c2
+Create Date: 2025-10-09 11:18:42.306915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f5a1c7d4'
+down_revision: Union[str, Sequence[str], None] = 'd6a1e8b3f4c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable without default: a catalog-only change, also on every partition
+    op.add_column('creation_tasks', sa.Column('provider_prediction_id', sa.String(), nullable=True))
+    op.add_column('creation_tasks', sa.Column('prediction_submitted_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('creation_tasks', 'prediction_submitted_at')
+    op.drop_column('creation_tasks', 'provider_prediction_id')
@@ -0,0 +1,40 @@
+"""Add (user_id, created_at, id) index to creation_tasks
+
+Revision ID: c3d9f1a7e5b2
+Revises: 8b41d6e0f2a7
+Create Date: 2025-09-24 10:41:09.532871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d9f1a7e5b2'
+down_revision: Union[str, Sequence[str], None] = '8b41d6e0f2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so the table stays writable on large installations
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_creation_tasks_user_created_id',
+            'creation_tasks',
+            ['user_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_creation_tasks_user_created_id',
+            table_name='creation_tasks',
+            postgresql_concurrently=True,
+        )
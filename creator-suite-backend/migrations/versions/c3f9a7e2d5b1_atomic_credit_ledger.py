@@ -0,0 +1,129 @@
+"""Integer micro-credit balance, append-only credit ledger and credit holds
+
+Revision ID: c3f9a7e2d5b1
+Revises: b8d2f5a1c7e3
+Create Date: 2025-10-06 11:08:43.519204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a7e2d5b1'
+down_revision: Union[str, Sequence[str], None] = 'b8d2f5a1c7e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('credit_balance_micros', sa.BigInteger(), server_default='0', nullable=False))
+    op.execute("UPDATE users SET credit_balance_micros = round(COALESCE(credits, 0) * 1000000)::bigint")
+    # NOT VALID: rows already overdrawn by the old read-modify-write code are
+    # left for review; every new or updated row is checked
+    op.execute(
+        "ALTER TABLE users ADD CONSTRAINT ck_users_credit_balance_non_negative "
+        "CHECK (credit_balance_micros >= 0) NOT VALID"
+    )
+
+    op.create_table('credit_holds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount_micros', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('task_id', sa.String(), nullable=True),
+    sa.Column('service_id', sa.Integer(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('settled_amount_micros', sa.BigInteger(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_credit_holds_task_id'), 'credit_holds', ['task_id'], unique=False)
+    op.create_index(
+        'ix_credit_holds_held_expires', 'credit_holds', ['expires_at'], unique=False,
+        postgresql_where=sa.text("status = 'held'"),
+    )
+
+    op.add_column('credit_transactions', sa.Column('amount_micros', sa.BigInteger(), nullable=True))
+    op.add_column('credit_transactions', sa.Column('balance_after_micros', sa.BigInteger(), nullable=True))
+    op.add_column('credit_transactions', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.add_column('credit_transactions', sa.Column('hold_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'credit_transactions_hold_id_fkey', 'credit_transactions', 'credit_holds', ['hold_id'], ['id']
+    )
+    op.execute("""
+        UPDATE credit_transactions
+        SET amount_micros = round(amount * 1000000)::bigint,
+            balance_after_micros = round(balance_after * 1000000)::bigint
+    """)
+    op.create_index(
+        'uq_credit_transactions_user_idempotency_key', 'credit_transactions', ['user_id', 'idempotency_key'],
+        unique=True, postgresql_where=sa.text('idempotency_key IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_credit_transactions_user_created', 'credit_transactions', ['user_id', 'created_at'], unique=False
+    )
+
+    # Past balance changes were not all recorded (admin edits, welcome
+    # credits); one opening entry per user makes the ledger sum to the balance
+    op.execute("""
+        INSERT INTO credit_transactions
+            (user_id, amount, amount_micros, transaction_type, description,
+             balance_before, balance_after, balance_after_micros, idempotency_key)
+        SELECT u.id,
+               (u.credit_balance_micros - COALESCE(l.total, 0)) / 1000000.0,
+               u.credit_balance_micros - COALESCE(l.total, 0),
+               'adjustment',
+               'Opening balance (ledger migration)',
+               COALESCE(l.total, 0) / 1000000.0,
+               u.credit_balance_micros / 1000000.0,
+               u.credit_balance_micros,
+               'opening-balance'
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, sum(amount_micros) AS total FROM credit_transactions GROUP BY user_id
+        ) l ON l.user_id = u.id
+        WHERE u.credit_balance_micros <> COALESCE(l.total, 0)
+    """)
+
+    op.execute("""
+        CREATE FUNCTION credit_transactions_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'credit_transactions is append-only (% rejected)', TG_OP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER credit_transactions_append_only
+        BEFORE UPDATE OR DELETE ON credit_transactions
+        FOR EACH ROW EXECUTE FUNCTION credit_transactions_append_only()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS credit_transactions_append_only ON credit_transactions")
+    op.execute("DROP FUNCTION IF EXISTS credit_transactions_append_only()")
+    op.execute("DELETE FROM credit_transactions WHERE idempotency_key = 'opening-balance'")
+
+    op.drop_index('ix_credit_transactions_user_created', table_name='credit_transactions')
+    op.drop_index('uq_credit_transactions_user_idempotency_key', table_name='credit_transactions')
+    op.drop_constraint('credit_transactions_hold_id_fkey', 'credit_transactions', type_='foreignkey')
+    op.drop_column('credit_transactions', 'hold_id')
+    op.drop_column('credit_transactions', 'idempotency_key')
+    op.drop_column('credit_transactions', 'balance_after_micros')
+    op.drop_column('credit_transactions', 'amount_micros')
+
+    op.drop_index('ix_credit_holds_held_expires', table_name='credit_holds')
+    op.drop_index(op.f('ix_credit_holds_task_id'), table_name='credit_holds')
+    op.drop_table('credit_holds')
+
+    op.drop_constraint('ck_users_credit_balance_non_negative', 'users', type_='check')
+    op.drop_column('users', 'credit_balance_micros')
@@ -0,0 +1,49 @@
+"""Running credit totals on users
+
+Revision ID: d6a1e8b3f4c2
+Revises: c3f9a7e2d5b1
+Create Date: 2025-10-07 14:32:10.882417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a1e8b3f4c2'
+down_revision: Union[str, Sequence[str], None] = 'c3f9a7e2d5b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('credits_earned_micros', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('credits_spent_micros', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('credit_transaction_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Same definitions as credit_service.EARNED_TYPES / SPENT_TYPES
+    op.execute("""
+        UPDATE users u
+        SET credits_earned_micros = l.earned,
+            credits_spent_micros = l.spent,
+            credit_transaction_count = l.entries
+        FROM (
+            SELECT user_id,
+                   COALESCE(sum(amount_micros) FILTER (WHERE transaction_type IN ('purchase', 'bonus', 'refund')), 0) AS earned,
+                   -COALESCE(sum(amount_micros) FILTER (WHERE transaction_type = 'usage'), 0) AS spent,
+                   count(*) AS entries
+            FROM credit_transactions
+            GROUP BY user_id
+        ) l
+        WHERE l.user_id = u.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'credit_transaction_count')
+    op.drop_column('users', 'credits_spent_micros')
+    op.drop_column('users', 'credits_earned_micros')
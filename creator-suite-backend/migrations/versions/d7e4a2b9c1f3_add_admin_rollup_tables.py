@@ -0,0 +1,65 @@
+"""Add admin dashboard rollup tables
+
+Revision ID: d7e4a2b9c1f3
+Revises: c3d9f1a7e5b2
+Create Date: 2025-09-26 11:18:40.664215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e4a2b9c1f3'
+down_revision: Union[str, Sequence[str], None] = 'c3d9f1a7e5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    counter = lambda name: sa.Column(name, sa.Integer(), nullable=False, server_default='0')
+    op.create_table('daily_service_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('task_type', postgresql.ENUM(name='assettype', create_type=False), nullable=False),
+    counter('tasks_created'),
+    counter('tasks_completed'),
+    counter('tasks_failed'),
+    sa.Column('generation_seconds', sa.Float(), nullable=False, server_default='0'),
+    sa.Column('credits_spent', sa.Float(), nullable=False, server_default='0'),
+    counter('feedback_count'),
+    counter('feedback_with_text'),
+    counter('rating_sum'),
+    counter('rating_1'),
+    counter('rating_2'),
+    counter('rating_3'),
+    counter('rating_4'),
+    counter('rating_5'),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.PrimaryKeyConstraint('day', 'service_id', 'task_type')
+    )
+    op.create_table('user_stats_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    counter('total_users'),
+    counter('active_users'),
+    counter('admin_users'),
+    sa.Column('total_credits', sa.Float(), nullable=False, server_default='0'),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # The refresh job scans recent rows by date
+    op.create_index('ix_feedbacks_created_at', 'feedbacks', ['created_at'], unique=False)
+    op.create_index('ix_creation_tasks_created_at', 'creation_tasks', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_creation_tasks_created_at', table_name='creation_tasks')
+    op.drop_index('ix_feedbacks_created_at', table_name='feedbacks')
+    op.drop_table('user_stats_rollup')
+    op.drop_table('daily_service_stats')
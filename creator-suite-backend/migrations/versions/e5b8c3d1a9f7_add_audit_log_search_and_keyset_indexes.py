@@ -0,0 +1,60 @@
+"""Add search and keyset indexes to admin audit and user activity logs
+
+Revision ID: e5b8c3d1a9f7
+Revises: d7e4a2b9c1f3
+Create Date: 2025-09-29 14:05:22.817349
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8c3d1a9f7'
+down_revision: Union[str, Sequence[str], None] = 'd7e4a2b9c1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match app.models.admin.search_document for the ILIKE searches to use them
+AUDIT_SEARCH_DOCUMENT = (
+    "(COALESCE(action, '') || ' ' || COALESCE(target_resource_type, '') || ' ' || "
+    "COALESCE(description, '') || ' ' || COALESCE(CAST(extra_data AS TEXT), ''))"
+)
+ACTIVITY_SEARCH_DOCUMENT = (
+    "(COALESCE(activity_type, '') || ' ' || COALESCE(description, '') || ' ' || "
+    "COALESCE(CAST(extra_data AS TEXT), ''))"
+)
+
+KEYSET_INDEXES = [
+    ('ix_admin_audit_logs_created_id', 'admin_audit_logs', ['created_at', 'id']),
+    ('ix_admin_audit_logs_admin_created_id', 'admin_audit_logs', ['admin_id', 'created_at', 'id']),
+    ('ix_user_activity_logs_created_id', 'user_activity_logs', ['created_at', 'id']),
+    ('ix_user_activity_logs_user_created_id', 'user_activity_logs', ['user_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so logging keeps working on large tables
+    with op.get_context().autocommit_block():
+        for name, table, columns in KEYSET_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_admin_audit_logs_search_trgm "
+            f"ON admin_audit_logs USING gin ({AUDIT_SEARCH_DOCUMENT} gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_activity_logs_search_trgm "
+            f"ON user_activity_logs USING gin ({ACTIVITY_SEARCH_DOCUMENT} gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_user_activity_logs_search_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_admin_audit_logs_search_trgm")
+        for name, table, _ in reversed(KEYSET_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
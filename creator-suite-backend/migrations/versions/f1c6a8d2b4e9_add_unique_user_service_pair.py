@@ -0,0 +1,37 @@
+"""Add unique constraint on user_services (user_id, service_id)
+
+Revision ID: f1c6a8d2b4e9
+Revises: e5b8c3d1a9f7
+Create Date: 2025-09-30 10:12:48.503921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6a8d2b4e9'
+down_revision: Union[str, Sequence[str], None] = 'e5b8c3d1a9f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Earlier bulk grants could race and insert the same pair twice; keep the oldest row
+    op.execute("""
+        DELETE FROM user_services a
+        USING user_services b
+        WHERE a.user_id = b.user_id
+          AND a.service_id = b.service_id
+          AND a.id > b.id
+    """)
+    op.create_unique_constraint(
+        'uq_user_services_user_service', 'user_services', ['user_id', 'service_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_user_services_user_service', 'user_services', type_='unique')
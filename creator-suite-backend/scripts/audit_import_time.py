@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Startup-time audit: what a cold API or worker process spends importing.
+
+Imports each target in fresh interpreters under `python -X importtime`
+and reports:
+
+- the wall time of the import (median of --repeat runs);
+- the packages that cost the most, grouped by top-level package, from the
+  fastest run;
+- whether any module that should be loaded lazily (--forbid; by default the
+  heavy SDKs and the provider/task modules the API never needs at startup)
+  was imported anyway.
+
+Targets:
+
+- api: `import main`, what pm2 runs (needs public/storage next to main.py);
+- worker: `import celery_worker` plus the task modules a worker serving
+  --worker-queues loads at boot (all of them by default), what a fresh worker
+  pays before consuming;
+- any module given with --module.
+
+Prints key=value lines; exits 1 when a forbidden module was imported, an
+import failed or --budget-ms was exceeded, so it can gate a deploy.
+
+Usage:
+    python scripts/audit_import_time.py
+    python scripts/audit_import_time.py --target api --target worker --top 25
+    python scripts/audit_import_time.py --target worker --worker-queues video_runway
+    python scripts/audit_import_time.py --module app.api.v1.endpoints.creations --budget-ms 1500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "api": "import main",
+    "worker": (
+        "import importlib, celery_worker; from app.core.celery_app import worker_task_modules; "
+        "[importlib.import_module(module) for module in worker_task_modules({queues!r})]"
+    ),
+}
+
+# Loaded on first use by the API (see get_gemini_rewriter, get_azure_storage); generation
+# tasks are sent by name, so their providers and ffmpeg/PIL stay in the workers
+API_LAZY_IMPORTS = [
+    "google.generativeai",
+    "azure.storage.blob",
+    "ffmpeg",
+    "app.creator_suite.video.tasks",
+    "app.creator_suite.image.tasks",
+    "app.creator_suite.video.providers",
+    "app.creator_suite.image.providers",
+]
+
+
+def run_import(code: str):
+    """Run code under -X importtime; returns (wall ms, [(depth, module, self us, cumulative us)], error)"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    entries, other = [], []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            other.append(line)
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    error = "\n".join(other[-5:]) if result.returncode else None
+    return wall_ms, entries, error
+
+
+def top_packages(entries, count: int):
+    """Self time per top-level package, heaviest first"""
+    by_package = defaultdict(int)
+    for _, module, self_us, _ in entries:
+        by_package[module.split(".", 1)[0]] += self_us
+    return sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def imported(entries, prefix: str) -> bool:
+    return any(module == prefix or module.startswith(prefix + ".") for _, module, _, _ in entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="Process to audit (default: api)")
+    parser.add_argument("--worker-queues", default="", help="Comma-separated queues of the worker target")
+    parser.add_argument("--module", action="append", default=[], help="Also audit importing this module")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=15, help="How many packages to list")
+    parser.add_argument("--forbid", action="append",
+                        help="Fail if this module (or a submodule) is imported (default: the API's lazy imports)")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the median import takes longer")
+    args = parser.parse_args()
+
+    worker_queues = [queue for queue in args.worker_queues.split(",") if queue]
+    targets = [
+        (name, TARGETS[name].format(queues=worker_queues))
+        for name in (args.target or ([] if args.module else ["api"]))
+    ]
+    targets += [(module, f"import {module}") for module in args.module]
+    failed = False
+
+    for name, code in targets:
+        runs = [run_import(code) for _ in range(args.repeat)]
+        error = next((run[2] for run in runs if run[2]), None)
+        if error:
+            print(f"target={name} result=error error={error!r}")
+            failed = True
+            continue
+        wall_ms = statistics.median(run[0] for run in runs)
+        _, entries, _ = min(runs, key=lambda run: run[0])
+        import_ms = sum(cumulative for depth, _, _, cumulative in entries if depth == 0) / 1000
+        print(f"target={name} wall_ms={wall_ms:.0f} import_ms={import_ms:.0f} modules={len(entries)}")
+        for package, self_us in top_packages(entries, args.top):
+            print(f"target={name} package={package} self_ms={self_us / 1000:.1f}")
+
+        # The worker loads provider and task modules by design
+        forbidden = args.forbid if args.forbid is not None else ([] if name == "worker" else API_LAZY_IMPORTS)
+        for prefix in forbidden:
+            if imported(entries, prefix):
+                print(f"target={name} forbidden_import={prefix}")
+                failed = True
+        if args.budget_ms is not None and wall_ms > args.budget_ms:
+            print(f"target={name} over_budget_ms={wall_ms - args.budget_ms:.0f}")
+            failed = True
+
+    print(f"result={'fail' if failed else 'pass'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Autoscale the local Celery worker pools by queue depth.
+
+Every --interval seconds, reads each queue's depth and recent task runtimes
+from Redis, sizes its pool with app.services.autoscaler.Autoscaler and
+starts or drains `celery -A celery_worker worker -Q <queue> --concurrency=1`
+processes on this machine to match. Prints one key=value line per queue and
+tick.
+
+Draining never interrupts a generation: the worker is told to stop
+consuming its queue (cancel_consumer) and then gets SIGTERM, Celery's warm
+shutdown, which waits for the running task to finish. Idle workers are
+drained first. Nothing is ever sent SIGKILL; a draining worker is tracked
+until it exits on its own.
+
+Workers write their pidfiles to --state-dir, so a restarted autoscaler
+adopts the workers of the previous run instead of starting more. Stopping
+the autoscaler (SIGINT/SIGTERM) drains its workers and waits for them; a
+second signal leaves them running.
+
+Trying it on one machine (Redis running, no provider keys needed):
+    # decisions only, against fake backlog
+    redis-cli rpush video_minimax x x x x x x x x
+    python scripts/autoscale_workers.py --queues video_minimax --dry-run --once
+    redis-cli del video_minimax
+
+    # real local workers, scaling 0..3 with a short delay before draining
+    AUTOSCALE_POOL_LIMITS=video_minimax=0:3 AUTOSCALE_SCALE_DOWN_DELAY_SECONDS=30 \\
+        python scripts/autoscale_workers.py --queues video_minimax --interval 5
+
+Usage:
+    python scripts/autoscale_workers.py
+    python scripts/autoscale_workers.py --queues video_runway,video_veo3 --interval 10 --log-dir logs
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import redis
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.celery_app import celery_app  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.metrics import celery_queues  # noqa: E402
+from app.services.autoscaler import Autoscaler, sample_queues  # noqa: E402
+
+NAME_PREFIX = "autoscale"
+# Seconds to wait for a worker's reply to control commands
+CONTROL_TIMEOUT = 2.0
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class LocalWorker:
+    """A `celery worker -Q <queue>` process started (or adopted) by the autoscaler"""
+
+    def __init__(self, queue: str, index: int, pid: int, process: Optional[subprocess.Popen] = None):
+        self.queue = queue
+        self.index = index
+        self.pid = pid
+        self.process = process
+        self.draining = False
+
+    @property
+    def name(self) -> str:
+        return f"{NAME_PREFIX}_{self.queue}_{self.index}"
+
+    @property
+    def hostname(self) -> str:
+        return f"{self.name}@{socket.gethostname()}"
+
+    def alive(self) -> bool:
+        if self.process is not None:
+            return self.process.poll() is None
+        return pid_alive(self.pid)
+
+
+class WorkerPools:
+    """The local worker processes of each queue"""
+
+    def __init__(self, state_dir: str, log_dir: str, loglevel: str):
+        self.state_dir = state_dir
+        self.log_dir = log_dir
+        self.loglevel = loglevel
+        self.workers: List[LocalWorker] = []
+
+    def _pidfile(self, name: str) -> str:
+        return os.path.join(self.state_dir, f"{name}.pid")
+
+    def adopt(self, queues: List[str]) -> None:
+        """Take over the live workers a previous autoscaler run left behind"""
+        for filename in sorted(os.listdir(self.state_dir)):
+            for queue in queues:
+                prefix = f"{NAME_PREFIX}_{queue}_"
+                index = filename[len(prefix):-len(".pid")]
+                if not (filename.startswith(prefix) and filename.endswith(".pid") and index.isdigit()):
+                    continue
+                try:
+                    with open(os.path.join(self.state_dir, filename)) as f:
+                        pid = int(f.read().strip())
+                except (OSError, ValueError):
+                    continue
+                if pid_alive(pid):
+                    self.workers.append(LocalWorker(queue, int(index), pid))
+                    print(f"event=adopted queue={queue} pid={pid}", flush=True)
+
+    def serving(self, queue: str) -> List[LocalWorker]:
+        return [w for w in self.workers if w.queue == queue and not w.draining]
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for worker in self.workers:
+            if not worker.draining:
+                counts[worker.queue] = counts.get(worker.queue, 0) + 1
+        return counts
+
+    def spawn(self, queue: str) -> LocalWorker:
+        used = {w.index for w in self.workers if w.queue == queue}
+        index = next(i for i in range(1, len(used) + 2) if i not in used)
+        name = f"{NAME_PREFIX}_{queue}_{index}"
+        command = [
+            sys.executable, "-m", "celery", "-A", "celery_worker", "worker",
+            f"--queues={queue}", f"--hostname={name}@%h", "--concurrency=1",
+            f"--loglevel={self.loglevel}", f"--pidfile={self._pidfile(name)}",
+        ]
+        with open(os.path.join(self.log_dir, f"worker_{name}.log"), "ab") as log:
+            # Own session: a Ctrl-C aimed at the autoscaler must not reach the workers
+            process = subprocess.Popen(
+                command, cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT, start_new_session=True,
+            )
+        worker = LocalWorker(queue, index, process.pid, process)
+        self.workers.append(worker)
+        print(f"event=started queue={queue} worker={worker.name} pid={worker.pid}", flush=True)
+        return worker
+
+    def _busy_hostnames(self, workers: List[LocalWorker]) -> Optional[set]:
+        """Hostnames running a task; None if the workers could not be asked"""
+        try:
+            active = celery_app.control.inspect(
+                destination=[w.hostname for w in workers], timeout=CONTROL_TIMEOUT,
+            ).active() or {}
+        except Exception as e:
+            print(f"event=inspect_failed error={e!r}", flush=True)
+            return None
+        return {hostname for hostname, tasks in active.items() if tasks}
+
+    def drain(self, queue: str, count: int) -> None:
+        """Gracefully stop count of the queue's workers, idle ones first"""
+        candidates = self.serving(queue)
+        if not candidates or count <= 0:
+            return
+        busy = self._busy_hostnames(candidates)
+        # Idle first, then the newest (the oldest are the most likely warm)
+        candidates.sort(key=lambda w: (busy is None or w.hostname in busy, -w.index))
+        for worker in candidates[:count]:
+            worker.draining = True
+            try:
+                celery_app.control.cancel_consumer(queue, destination=[worker.hostname])
+            except Exception as e:
+                print(f"event=cancel_consumer_failed worker={worker.name} error={e!r}", flush=True)
+            try:
+                # Warm shutdown: finishes the running task, returns prefetched messages to the queue
+                os.kill(worker.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            state = "busy" if busy is None or worker.hostname in busy else "idle"
+            print(f"event=draining queue={queue} worker={worker.name} pid={worker.pid} state={state}", flush=True)
+
+    def reap(self) -> None:
+        for worker in list(self.workers):
+            if worker.alive():
+                continue
+            self.workers.remove(worker)
+            event = "drained" if worker.draining else "exited_unexpectedly"
+            print(f"event={event} queue={worker.queue} worker={worker.name} pid={worker.pid}", flush=True)
+
+    def drain_all(self) -> None:
+        for queue in {w.queue for w in self.workers}:
+            self.drain(queue, len(self.serving(queue)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queues", help="Comma separated queues to manage (default: every queue in task_routes)")
+    parser.add_argument("--interval", type=float, default=settings.AUTOSCALE_INTERVAL_SECONDS,
+                        help="Seconds between scaling decisions")
+    parser.add_argument("--state-dir", default=os.path.join(BACKEND_DIR, "logs", "autoscale"),
+                        help="Where worker pidfiles are kept")
+    parser.add_argument("--log-dir", default=os.path.join(BACKEND_DIR, "logs"), help="Where worker logs go")
+    parser.add_argument("--loglevel", default="info", help="Worker log level")
+    parser.add_argument("--dry-run", action="store_true", help="Print decisions without starting or draining workers")
+    parser.add_argument("--once", action="store_true",
+                        help="Make one decision and exit (started workers keep running for the next run to adopt)")
+    args = parser.parse_args()
+
+    queues = sorted(q.strip() for q in args.queues.split(",") if q.strip()) if args.queues else sorted(celery_queues())
+    os.makedirs(args.state_dir, exist_ok=True)
+    os.makedirs(args.log_dir, exist_ok=True)
+
+    autoscaler = Autoscaler(queues)
+    pools = WorkerPools(args.state_dir, args.log_dir, args.loglevel)
+    if not args.dry_run:
+        pools.adopt(queues)
+    simulated: Dict[str, int] = {}
+
+    stopping = {"signals": 0}
+
+    def request_stop(signum, frame):
+        stopping["signals"] += 1
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    while not stopping["signals"]:
+        pools.reap()
+        try:
+            samples = sample_queues(queues)
+        except redis.RedisError as e:
+            print(f"event=redis_unavailable error={e!r}", flush=True)
+            samples = {}
+        current = simulated if args.dry_run else pools.counts()
+        for decision in autoscaler.decide(samples, current):
+            print(
+                f"queue={decision.queue} depth={decision.depth} arrival_rate={decision.arrival_rate}"
+                f" runtime_seconds={decision.runtime_seconds} workers={decision.current}"
+                f" desired={decision.desired} target={decision.target}",
+                flush=True,
+            )
+            if args.dry_run:
+                simulated[decision.queue] = decision.target
+            elif decision.target > decision.current:
+                for _ in range(decision.target - decision.current):
+                    pools.spawn(decision.queue)
+            elif decision.target < decision.current:
+                pools.drain(decision.queue, decision.current - decision.target)
+        if args.once:
+            break
+        deadline = time.monotonic() + args.interval
+        while not stopping["signals"] and time.monotonic() < deadline:
+            time.sleep(0.5)
+
+    if args.dry_run or (args.once and not stopping["signals"]):
+        return
+    pools.drain_all()
+    while pools.workers and stopping["signals"] < 2:
+        pools.reap()
+        time.sleep(1)
+    for worker in pools.workers:
+        print(f"event=left_running queue={worker.queue} worker={worker.name} pid={worker.pid}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Build the admin dashboard rollups over all history.
+
+Run once after the rollup migration (the beat job only refreshes recent days):
+    python scripts/backfill_admin_rollups.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: E402,F401  (register all mappers)
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.rollups import refresh_rollups  # noqa: E402
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(refresh_rollups(db, days=None))
+    finally:
+        db.close()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request throughput with print() debugging versus structured logging.
+
+Drives an in-process FastAPI app (no network, no database) whose endpoint
+does what GET /creations/featured did: build six featured items and dump the
+rows and the items. Three runs of the same endpoint:
+
+- print: the old unconditional print() lines;
+- logging_debug_off: logger.debug through configure_logging at LOG_LEVEL=INFO;
+- logging_debug_on: the same with the logger at DEBUG (burst + sampling apply).
+
+Each run reports requests/second; stdout of the endpoint goes to --sink
+(default /dev/null) so the terminal is not the bottleneck.
+
+Usage:
+    python scripts/bench_logging_throughput.py
+    python scripts/bench_logging_throughput.py --requests 20000 --concurrency 64 --sink /tmp/bench.log
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.structured_logging import (  # noqa: E402
+    RequestContextMiddleware, configure_logging, dropped_records, shutdown_logging,
+)
+
+logger = logging.getLogger("app.bench.featured")
+
+ROWS = [
+    {
+        "id": f"task-{i}", "task_type": "video", "status": "COMPLETED", "provider": "minimax",
+        "created_at": datetime.now(timezone.utc), "local_video_url": f"/storage/videos/task-{i}.mp4",
+        "prompt": "A slow aerial shot over a foggy pine forest at sunrise, cinematic lighting " * 2,
+    }
+    for i in range(6)
+]
+MODE = {"name": "print"}
+
+
+def featured_items():
+    return [
+        {"id": row["id"], "title": row["prompt"][:60], "type": row["task_type"],
+         "created_at": row["created_at"].isoformat(), "provider": row["provider"],
+         "video_url": f"/api/v1/media/videos/{row['id']}"}
+        for row in ROWS
+    ]
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/featured")
+    def featured():
+        if MODE["name"] == "print":
+            print("[DEBUG] get_creation_features endpoint called")
+            print("[DEBUG] Retrieved tasks:", ROWS)
+            items = featured_items()
+            print("[DEBUG] Featured items:", items)
+        else:
+            items = featured_items()
+            logger.debug("Featured creations: %s", [item["id"] for item in items])
+        return {"featured": items, "total_count": len(items)}
+
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/featured")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--sink", default=os.devnull, help="Where the endpoint's stdout goes")
+    args = parser.parse_args()
+
+    app = build_app()
+    results = []
+    terminal = sys.stdout
+    with open(args.sink, "w") as sink:
+        sys.stdout = sink
+        try:
+            asyncio.run(run(app, min(args.requests, 200), args.concurrency))  # warm up
+            results.append(("print", asyncio.run(run(app, args.requests, args.concurrency))))
+
+            configure_logging()
+            MODE["name"] = "logging"
+            logger.setLevel(logging.INFO)
+            results.append(("logging_debug_off", asyncio.run(run(app, args.requests, args.concurrency))))
+            logger.setLevel(logging.DEBUG)
+            results.append(("logging_debug_on", asyncio.run(run(app, args.requests, args.concurrency))))
+            shutdown_logging()
+        finally:
+            sys.stdout = terminal
+
+    for name, rate in results:
+        print(f"mode={name} requests_per_second={rate:.0f}")
+    print(f"dropped_log_records={dropped_records()}")
+
+
+if __name__ == "__main__":
+    main()
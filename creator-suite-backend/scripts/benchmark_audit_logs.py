@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: admin audit log page latency on a large table.
+
+Seeds admin_audit_logs server-side, then times the queries
+GET /admin/management/audit-logs issues: first page, a deep keyset page,
+an admin-filtered page and a substring search (trigram index).
+
+Usage:
+    python scripts/benchmark_audit_logs.py --admin-id 1 --seed 1000000
+    python scripts/benchmark_audit_logs.py --cleanup
+
+Seeded rows carry action='benchmark_*' and are removed by --cleanup.
+Run against a scratch database.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: E402,F401  (register all mappers)
+from app.db.pagination import apply_keyset, encode_cursor  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.admin import AdminAuditLog  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+PAGE_SIZE = 50
+
+
+def seed(admin_id: int, rows: int):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO admin_audit_logs (admin_id, action, target_resource_type, description, extra_data, created_at)
+            SELECT :admin_id,
+                   'benchmark_' || (ARRAY['user_updated', 'credits_modified', 'service_created'])[1 + g % 3],
+                   'user',
+                   'Changed settings of account ' || md5(g::text),
+                   json_build_object('amount', g % 100, 'reason', 'benchmark'),
+                   now() - (g || ' seconds')::interval
+            FROM generate_series(1, :rows) AS g
+        """), {"admin_id": admin_id, "rows": rows})
+        conn.execute(text("ANALYZE admin_audit_logs"))
+
+
+def cleanup():
+    with engine.begin() as conn:
+        deleted = conn.execute(text("DELETE FROM admin_audit_logs WHERE action LIKE 'benchmark\\_%'")).rowcount
+    print(f"deleted={deleted}")
+
+
+def base_query(db):
+    return db.query(AdminAuditLog, User.username).outerjoin(User, AdminAuditLog.admin_id == User.id)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def page(query, cursor=None):
+    return apply_keyset(query, AdminAuditLog.created_at, AdminAuditLog.id, cursor, PAGE_SIZE).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--admin-id", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--search", default="a1b2")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        seed(args.admin_id, args.seed)
+
+    db = SessionLocal()
+    try:
+        total = db.query(AdminAuditLog).count()
+        deep = db.query(AdminAuditLog.created_at, AdminAuditLog.id).order_by(
+            AdminAuditLog.created_at.desc(), AdminAuditLog.id.desc()
+        ).offset(total // 2).first()
+        deep_cursor = encode_cursor(deep.created_at, deep.id) if deep else None
+
+        cases = {
+            "first_page": lambda: page(base_query(db)),
+            "middle_page_keyset": lambda: page(base_query(db), deep_cursor),
+            "middle_page_offset": lambda: base_query(db).order_by(
+                AdminAuditLog.created_at.desc(), AdminAuditLog.id.desc()
+            ).offset(total // 2).limit(PAGE_SIZE).all(),
+            "admin_filter": lambda: page(base_query(db).filter(AdminAuditLog.admin_id == args.admin_id)),
+            "search": lambda: page(base_query(db).filter(
+                AdminAuditLog.search_document().ilike(f"%{args.search}%")
+            )),
+        }
+        print(f"rows={total} page_size={PAGE_SIZE}")
+        for name, fn in cases.items():
+            print(f"case={name} median_ms={timed(fn, args.repeat):.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offset vs. keyset pagination and full vs. summary projection of a
+user's creation tasks.
+
+Seeds a large task history for one user server-side (generate_series, so 1M
+rows take seconds), then times the queries list_creation_tasks issues:
+
+- OFFSET pages at increasing depth vs. the keyset page at the same position;
+- full rows (with input/output JSON and the service join) vs. fields=summary,
+  reporting time and serialized payload size per page.
+
+Usage:
+    python scripts/benchmark_task_pagination.py --user-id 1 --service-id 1 --seed 1000000
+    python scripts/benchmark_task_pagination.py --user-id 1 --service-id 1 --cleanup
+
+Seeded rows carry provider='pagination-benchmark' and are removed by --cleanup.
+Run against a scratch database.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.v1.endpoints.creations import SUMMARY_COLUMNS  # noqa: E402
+from app.creator_suite.schemas import CreationTask, CreationTaskSummary  # noqa: E402
+from app.db.pagination import apply_keyset, encode_cursor  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.creation_task import CreationTask as CreationTaskModel  # noqa: E402
+
+BENCHMARK_PROVIDER = "pagination-benchmark"
+PAGE_SIZE = 100
+DEPTHS = [0, 1_000, 10_000, 100_000, 500_000]
+
+
+def seed(user_id: int, service_id: int, rows: int):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO creation_tasks
+                (id, user_id, task_type, status, provider, service_id, input_data, output_assets,
+                 local_video_url, local_thumbnail_url, processing_time_seconds, created_at)
+            SELECT
+                'bench-' || g,
+                :user_id,
+                'VIDEO',
+                'COMPLETED',
+                :provider,
+                :service_id,
+                json_build_object('prompt', repeat('a cinematic shot of a city at dusk ', 12),
+                                  'duration', 6, 'seed', g),
+                json_build_array(json_build_object(
+                    'url', 'https://example.invalid/outputs/' || g || '.mp4',
+                    'asset_type', 'video', 'mime_type', 'video/mp4',
+                    'metadata', json_build_object('logs', repeat('step ', 200)))),
+                '/storage/videos/bench-' || g || '.mp4',
+                '/storage/thumbnails/bench-' || g || '.jpg',
+                42.0,
+                now() - (g || ' seconds')::interval
+            FROM generate_series(1, :rows) AS g
+        """), {"user_id": user_id, "service_id": service_id, "provider": BENCHMARK_PROVIDER, "rows": rows})
+        conn.execute(text("ANALYZE creation_tasks"))
+
+
+def cleanup():
+    with engine.begin() as conn:
+        deleted = conn.execute(
+            text("DELETE FROM creation_tasks WHERE provider = :provider"), {"provider": BENCHMARK_PROVIDER}
+        ).rowcount
+    print(f"deleted={deleted}")
+
+
+def timed(fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def full_query(db, user_id):
+    return db.query(CreationTaskModel).options(
+        joinedload(CreationTaskModel.service)
+    ).filter(CreationTaskModel.user_id == user_id)
+
+
+def summary_query(db, user_id):
+    return db.query(*SUMMARY_COLUMNS).filter(CreationTaskModel.user_id == user_id)
+
+
+def cursor_at(db, user_id, depth):
+    """Cursor of the row just before position depth (what a client would hold there)"""
+    if depth == 0:
+        return None
+    row = db.query(CreationTaskModel.created_at, CreationTaskModel.id).filter(
+        CreationTaskModel.user_id == user_id
+    ).order_by(CreationTaskModel.created_at.desc(), CreationTaskModel.id.desc()).offset(depth - 1).first()
+    return encode_cursor(row.created_at, row.id) if row else None
+
+
+def run(args):
+    db = SessionLocal()
+    try:
+        total = db.query(CreationTaskModel).filter(CreationTaskModel.user_id == args.user_id).count()
+        print(f"user_id={args.user_id} tasks={total} page_size={PAGE_SIZE}")
+
+        for depth in [d for d in DEPTHS if d < total]:
+            offset_ms, _ = timed(lambda: summary_query(db, args.user_id).order_by(
+                CreationTaskModel.created_at.desc(), CreationTaskModel.id.desc()
+            ).offset(depth).limit(PAGE_SIZE).all(), args.repeat)
+
+            cursor = cursor_at(db, args.user_id, depth)
+            keyset_ms, _ = timed(lambda: apply_keyset(
+                summary_query(db, args.user_id), CreationTaskModel.created_at, CreationTaskModel.id,
+                cursor, PAGE_SIZE
+            ).all(), args.repeat)
+
+            full_ms, full_rows = timed(lambda: apply_keyset(
+                full_query(db, args.user_id), CreationTaskModel.created_at, CreationTaskModel.id,
+                cursor, PAGE_SIZE
+            ).all(), args.repeat)
+            full_bytes = len(json.dumps([CreationTask.model_validate(t).model_dump(mode="json") for t in full_rows]))
+            db.expunge_all()
+
+            summary_rows = apply_keyset(
+                summary_query(db, args.user_id), CreationTaskModel.created_at, CreationTaskModel.id,
+                cursor, PAGE_SIZE
+            ).all()
+            summary_bytes = len(json.dumps(
+                [CreationTaskSummary.model_validate(t).model_dump(mode="json") for t in summary_rows]
+            ))
+
+            print(
+                f"depth={depth} offset_ms={offset_ms:.1f} keyset_ms={keyset_ms:.1f} "
+                f"full_ms={full_ms:.1f} full_bytes={full_bytes} summary_bytes={summary_bytes}"
+            )
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--service-id", type=int, default=1, help="Existing service for seeded rows")
+    parser.add_argument("--seed", type=int, default=0, help="Insert this many tasks before measuring")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median reported)")
+    parser.add_argument("--cleanup", action="store_true", help="Delete seeded tasks and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        started = time.perf_counter()
+        seed(args.user_id, args.service_id, args.seed)
+        print(f"seeded={args.seed} seconds={time.perf_counter() - started:.1f}")
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
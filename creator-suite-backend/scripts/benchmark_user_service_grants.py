@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk user-service grants at 10k and 100k pairs.
+
+Seeds benchmark users server-side, then times the service functions behind
+the /user-services bulk endpoints:
+
+- bulk_create_user_services (fresh grants, then the same grants again, which
+  all hit ON CONFLICT DO NOTHING);
+- bulk_update_multiple_users_services (diff against the current grants);
+- bulk_delete_user_services.
+
+For comparison, the previous per-pair approach (SELECT per pair, INSERT per
+row) is timed on --legacy-sample pairs and its per-pair cost reported.
+
+Usage:
+    python scripts/benchmark_user_service_grants.py --service-id 1 --seed-users 100000
+    python scripts/benchmark_user_service_grants.py --cleanup
+
+Seeded users are named 'grant-bench-<n>' and are removed (with their grants)
+by --cleanup. Run against a scratch database.
+"""
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: E402,F401  (register all mappers)
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models.user_service import UserService  # noqa: E402
+from app.schemas.user_service import UserServiceCreate  # noqa: E402
+from app.services.user_service import (  # noqa: E402
+    bulk_create_user_services,
+    bulk_delete_user_services,
+    bulk_update_multiple_users_services,
+    get_user_service_by_user_and_service,
+)
+
+USERNAME_PREFIX = "grant-bench-"
+SIZES = [10_000, 100_000]
+
+
+def seed_users(rows: int):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO users (username, is_active, is_admin, is_super_admin, credits)
+            SELECT :prefix || g, true, false, false, 0
+            FROM generate_series(1, :rows) AS g
+            ON CONFLICT (username) DO NOTHING
+        """), {"prefix": USERNAME_PREFIX, "rows": rows})
+        conn.execute(text("ANALYZE users"))
+
+
+def cleanup():
+    with engine.begin() as conn:
+        grants = conn.execute(text("""
+            DELETE FROM user_services
+            WHERE user_id IN (SELECT id FROM users WHERE username LIKE :pattern)
+        """), {"pattern": f"{USERNAME_PREFIX}%"}).rowcount
+        users = conn.execute(
+            text("DELETE FROM users WHERE username LIKE :pattern"), {"pattern": f"{USERNAME_PREFIX}%"}
+        ).rowcount
+    print(f"deleted_users={users} deleted_grants={grants}")
+
+
+def benchmark_user_ids(limit: int):
+    with engine.connect() as conn:
+        return list(conn.execute(
+            text("SELECT id FROM users WHERE username LIKE :pattern ORDER BY id LIMIT :limit"),
+            {"pattern": f"{USERNAME_PREFIX}%", "limit": limit},
+        ).scalars())
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def legacy_grant(db, pairs):
+    """The per-pair implementation this replaced, for comparison"""
+    rows = []
+    for user_id, service_id in pairs:
+        if not get_user_service_by_user_and_service(db, user_id, service_id):
+            row = UserService(user_id=user_id, service_id=service_id)
+            db.add(row)
+            rows.append(row)
+    db.commit()
+    for row in rows:
+        db.refresh(row)
+    return rows
+
+
+def run(args):
+    db = SessionLocal()
+    try:
+        for size in SIZES:
+            user_ids = benchmark_user_ids(size)
+            if len(user_ids) < size:
+                print(f"size={size} skipped (only {len(user_ids)} benchmark users; use --seed-users)")
+                continue
+            grants = [UserServiceCreate(user_id=user_id, service_id=args.service_id) for user_id in user_ids]
+            pairs = [{"user_id": user_id, "service_id": args.service_id} for user_id in user_ids]
+
+            create_ms, created = timed(lambda: bulk_create_user_services(db, grants))
+            repeat_ms, repeated = timed(lambda: bulk_create_user_services(db, grants))
+            update_ms, updated = timed(lambda: bulk_update_multiple_users_services(
+                db, [{"user_id": user_id, "service_ids": []} for user_id in user_ids[: size // 2]]
+            ))
+            delete_ms, deleted = timed(lambda: bulk_delete_user_services(db, pairs))
+            db.expunge_all()
+
+            print(
+                f"size={size} create_ms={create_ms:.0f} created={len(created)} "
+                f"repeat_ms={repeat_ms:.0f} repeated={len(repeated)} "
+                f"update_ms={update_ms:.0f} removed={updated['services_removed']} "
+                f"delete_ms={delete_ms:.0f} deleted={deleted}"
+            )
+
+        if args.legacy_sample:
+            sample = [(user_id, args.service_id) for user_id in benchmark_user_ids(args.legacy_sample)]
+            legacy_ms, _ = timed(lambda: legacy_grant(db, sample))
+            bulk_delete_user_services(db, [{"user_id": u, "service_id": s} for u, s in sample])
+            per_pair = legacy_ms / max(len(sample), 1)
+            print(
+                f"legacy_sample={len(sample)} legacy_ms={legacy_ms:.0f} per_pair_ms={per_pair:.2f} "
+                + " ".join(f"legacy_estimate_{size}_ms={per_pair * size:.0f}" for size in SIZES)
+            )
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service-id", type=int, default=1, help="Existing service to grant")
+    parser.add_argument("--seed-users", type=int, default=0, help="Create this many benchmark users first")
+    parser.add_argument("--legacy-sample", type=int, default=1000, help="Pairs to time the per-pair approach on (0 to skip)")
+    parser.add_argument("--cleanup", action="store_true", help="Delete benchmark users and their grants and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed_users:
+        started = time.perf_counter()
+        seed_users(args.seed_users)
+        print(f"seeded_users={args.seed_users} seconds={time.perf_counter() - started:.1f}")
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Show where read-only sessions are routed and why.
+
+Prints the measured replica lag and, for a gallery read and a reporting read
+with and without a fresh write by --user-id, which server answered
+(inet_server_port / pg_is_in_recovery).
+
+Try it with two local instances (DB_HOST=localhost:5432,
+DB_REPLICA_HOST=localhost:5433) or a simulated lagging replica:
+
+    DB_REPLICA_HOST=$DB_HOST DB_REPLICA_SIMULATED_LAG_SECONDS=3 \
+        python scripts/check_replica_routing.py --user-id 1
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.db.replica import record_user_write, replica_router, reporting_router, reporting_session  # noqa: E402
+
+SERVER_SQL = text("SELECT inet_server_port(), pg_is_in_recovery(), current_setting('application_name')")
+
+
+def describe(label, db, router):
+    routed = "replica" if router._replica is not None and db.bind is router._replica else "primary"
+    try:
+        port, in_recovery, application = db.execute(SERVER_SQL).one()
+    finally:
+        db.close()
+    print(f"{label}: routed={routed} port={port} in_recovery={in_recovery} application={application}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=1)
+    args = parser.parse_args()
+
+    lag = replica_router.replica_lag()
+    print(f"replica_host={settings.DB_REPLICA_HOST} lag_seconds={lag} max_lag={settings.DB_REPLICA_MAX_LAG_SECONDS}")
+    describe("gallery", replica_router.session(), replica_router)
+    describe("reporting (no recent write)", reporting_session(None), reporting_router)
+
+    record_user_write(args.user_id)
+    describe("reporting (user just wrote)", reporting_session(args.user_id), reporting_router)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Kill test: a worker killed mid-generation must not pay for a second prediction.
+
+Starts a fake Replicate API on localhost, creates a Minimax creation task
+and runs it on a local worker pointed at the fake. Once the prediction is
+submitted (and persisted on the task), the worker gets SIGKILL, so its
+message stays unacknowledged. A second worker is started and the task is
+recovered either by
+
+- sweep: the stuck task sweeper, run right away (stale_after=0), re-sends
+  the generation with the persisted prediction id; or
+- redeliver: the second worker runs with a 10 second broker visibility
+  timeout, so the broker re-delivers the killed worker's message itself.
+
+Passes when the task completes and the fake received exactly one
+prediction. Prints key=value lines; exits 1 on failure.
+
+Needs Postgres, Redis, a minimax/video-01 service and a user; the workers
+consume video_minimax, so run it against a development stack.
+
+Usage:
+    python scripts/kill_test_prediction_resume.py
+    python scripts/kill_test_prediction_resume.py --mode redeliver --generation-seconds 30 --user-id 1
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import app.models  # noqa: E402,F401  (register all mappers)
+from app.core.celery_app import celery_app  # noqa: E402
+from app.core.task_events import get_redis  # noqa: E402
+from app.creator_suite.schemas import AssetType, TaskStatus  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.creation_task import CreationTask  # noqa: E402
+from app.models.service import Service  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.stuck_tasks import SWEEP_LOCK_KEY, sweep_stuck_tasks  # noqa: E402
+
+QUEUE = "video_minimax"
+SERVICE_NAME = "minimax/video-01"
+
+
+class FakeReplicate:
+    """Predictions that succeed generation_seconds after being created"""
+
+    def __init__(self, generation_seconds: float):
+        self.generation_seconds = generation_seconds
+        self.predictions = {}
+        self.created = 0
+        self.polls = 0
+        self.lock = threading.Lock()
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not self.path.endswith("/predictions"):
+                    return self._send(404, {"detail": "Not found"})
+                with fake.lock:
+                    fake.created += 1
+                    prediction_id = uuid.uuid4().hex[:12]
+                    fake.predictions[prediction_id] = time.monotonic()
+                self._send(201, {"id": prediction_id, "status": "starting"})
+
+            def do_GET(self):
+                prediction_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+                with fake.lock:
+                    created = fake.predictions.get(prediction_id)
+                    fake.polls += 1
+                if created is None:
+                    return self._send(404, {"detail": "Not found"})
+                elapsed = time.monotonic() - created
+                if elapsed < fake.generation_seconds:
+                    percent = int(100 * elapsed / fake.generation_seconds)
+                    return self._send(200, {"id": prediction_id, "status": "processing",
+                                            "logs": f" {percent}%|#####     | {percent}/100"})
+                self._send(200, {
+                    "id": prediction_id,
+                    "status": "succeeded",
+                    # Never downloadable: the task keeps the remote URL when media processing fails
+                    "output": f"http://127.0.0.1:9/{prediction_id}.mp4",
+                    "metrics": {"predict_time": fake.generation_seconds},
+                })
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def start_worker(name: str, env: dict, log_dir: str) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "celery", "-A", "celery_worker", "worker",
+        f"--queues={QUEUE}", f"--hostname={name}@%h", "--concurrency=1", "--loglevel=info",
+    ]
+    log = open(os.path.join(log_dir, f"{name}.log"), "ab")
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+                            start_new_session=True)
+
+
+def wait_for(condition, timeout: float, interval: float = 0.5) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval)
+    return False
+
+
+def task_row(task_id: str):
+    db = SessionLocal()
+    try:
+        task = db.get(CreationTask, task_id)
+        return task.status, task.provider_prediction_id
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["sweep", "redeliver"], default="sweep", help="How the task is recovered")
+    parser.add_argument("--generation-seconds", type=float, default=20, help="How long a fake prediction runs")
+    parser.add_argument("--user-id", type=int, help="Owner of the test task (default: the first user)")
+    parser.add_argument("--port", type=int, default=18765, help="Port of the fake Replicate API")
+    parser.add_argument("--timeout", type=float, default=180, help="Seconds to wait for each step")
+    parser.add_argument("--log-dir", default=os.path.join(BACKEND_DIR, "logs"), help="Where worker logs go")
+    args = parser.parse_args()
+    os.makedirs(args.log_dir, exist_ok=True)
+
+    fake = FakeReplicate(args.generation_seconds)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), fake.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    task_id = f"killtest-{uuid.uuid4().hex[:12]}"
+    db = SessionLocal()
+    try:
+        service = db.query(Service).filter(Service.name == SERVICE_NAME).first()
+        user_id = args.user_id or db.query(User.id).order_by(User.id).limit(1).scalar()
+        if service is None or user_id is None:
+            print(f"result=error reason=missing_{'service' if service is None else 'user'}")
+            sys.exit(1)
+        input_data = {"prompt": "Kill test: a lighthouse at dusk", "prompt_optimizer": False}
+        db.add(CreationTask(
+            id=task_id, user_id=user_id, task_type=AssetType.VIDEO, status=TaskStatus.PENDING,
+            provider="replicate", service_id=service.id, input_data=input_data,
+        ))
+        db.commit()
+    finally:
+        db.close()
+    print(f"task_id={task_id} mode={args.mode}", flush=True)
+
+    env = {**os.environ, "REPLICATE_API_URL": f"http://127.0.0.1:{args.port}", "REPLICATE_API_TOKEN": "kill-test"}
+    workers = [start_worker("killtest_a", env, args.log_dir)]
+    try:
+        celery_app.send_task("generate_minimax_video", args=[task_id, input_data])
+        if not wait_for(lambda: task_row(task_id)[1] is not None, args.timeout):
+            print("result=fail reason=prediction_never_persisted")
+            sys.exit(1)
+        time.sleep(1)  # Mid-poll
+        os.killpg(workers[0].pid, signal.SIGKILL)
+        workers[0].wait()
+        status, prediction_id = task_row(task_id)
+        print(f"event=killed worker=killtest_a status={status.value} prediction_id={prediction_id}", flush=True)
+
+        if args.mode == "redeliver":
+            env = {**env, "BROKER_VISIBILITY_TIMEOUT_SECONDS": "10"}
+        workers.append(start_worker("killtest_b", env, args.log_dir))
+        if args.mode == "sweep":
+            wait_for(lambda: bool(celery_app.control.ping(destination=[f"killtest_b@{os.uname().nodename}"])),
+                     args.timeout, interval=2)
+            get_redis().delete(SWEEP_LOCK_KEY)
+            db = SessionLocal()
+            try:
+                print(f"event=swept {' '.join(f'{k}={v}' for k, v in sweep_stuck_tasks(db, 0).items())}",
+                      flush=True)
+            finally:
+                db.close()
+
+        finished = wait_for(lambda: task_row(task_id)[0] in (TaskStatus.COMPLETED, TaskStatus.FAILED), args.timeout)
+        status, _ = task_row(task_id)
+        print(f"status={status.value} predictions_created={fake.created} polls={fake.polls}")
+        passed = finished and status == TaskStatus.COMPLETED and fake.created == 1
+        print(f"result={'pass' if passed else 'fail'}")
+        sys.exit(0 if passed else 1)
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                os.killpg(worker.pid, signal.SIGTERM)
+                worker.wait()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Load test: throughput and latency of the hot read endpoints under many
+concurrent clients.
+
+Each client loops over the task get/list, media lookup and balance endpoints
+as fast as responses come back for a fixed window. Run it against the sync
+(threadpool) build and the async (AsyncSession) build with the same
+--clients to compare; the summary line per endpoint reports requests/s and
+p50/p95/p99 latency.
+
+Usage:
+    python scripts/load_test_read_paths.py --token <jwt> --task-id <id> \
+        --clients 500 --duration 60 --label async
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def endpoints(task_id: str):
+    return {
+        "task_get": f"/creations/{task_id}",
+        "task_list": "/creations/?limit=20&fields=summary",
+        "media_thumbnail": f"/media/thumbnails/{task_id}",
+        "credit_balance": "/credits/balance",
+    }
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def client_loop(client: httpx.AsyncClient, paths, deadline: float, latencies, errors):
+    names = list(paths)
+    i = 0
+    while time.monotonic() < deadline:
+        name = names[i % len(names)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(paths[name])
+            if response.status_code >= 400:
+                errors[name] += 1
+                continue
+        except httpx.HTTPError:
+            errors[name] += 1
+            continue
+        latencies[name].append((time.perf_counter() - started) * 1000)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", default=os.getenv("API_BASE_URL", "http://localhost:8000/api/v1"))
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--task-id", required=True, help="Completed task with a thumbnail, owned by the token's user")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=int, default=60)
+    parser.add_argument("--label", default="run", help="Tag printed with the results (e.g. sync / async)")
+    args = parser.parse_args()
+
+    paths = endpoints(args.task_id)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    headers = {"Authorization": f"Bearer {args.token}"}
+
+    async with httpx.AsyncClient(base_url=args.api, headers=headers, limits=limits, timeout=60.0) as client:
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*[
+            client_loop(client, paths, deadline, latencies, errors) for _ in range(args.clients)
+        ])
+        elapsed = time.monotonic() - started
+
+    total = 0
+    for name in paths:
+        samples = latencies[name]
+        total += len(samples)
+        print(
+            f"label={args.label} endpoint={name} clients={args.clients} "
+            f"rps={len(samples) / elapsed:.1f} errors={errors[name]} "
+            f"p50_ms={statistics.median(samples) if samples else 0:.1f} "
+            f"p95_ms={percentile(samples, 95):.1f} p99_ms={percentile(samples, 99):.1f}"
+        )
+    print(f"label={args.label} endpoint=all clients={args.clients} rps={total / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Load test: database load of N clients waiting on a task, polling vs. push.
+
+Runs N concurrent clients against a running API for a fixed window, either
+polling GET /creations/{task_id} once a second (the old bot/frontend
+behaviour) or holding one SSE subscription each, and reports Postgres
+transactions per second measured from pg_stat_database over the window.
+
+Usage:
+    python scripts/load_test_task_status.py --token <jwt> --task-id <id> \
+        --clients 1000 --duration 60 --mode both
+
+Use a task that stays pending/processing for the whole window, otherwise
+SSE clients disconnect as soon as it finishes.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import engine  # noqa: E402
+
+
+def db_transactions() -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+        )).scalar()
+
+
+async def polling_client(client: httpx.AsyncClient, url: str, deadline: float, stats: dict):
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get(url)
+            stats["requests"] += 1
+            if response.status_code != 200:
+                stats["errors"] += 1
+        except httpx.HTTPError:
+            stats["errors"] += 1
+        await asyncio.sleep(1)
+
+
+async def sse_client(client: httpx.AsyncClient, url: str, deadline: float, stats: dict):
+    try:
+        async with client.stream("GET", url, timeout=None) as response:
+            stats["requests"] += 1
+            if response.status_code != 200:
+                stats["errors"] += 1
+                return
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    stats["events"] += 1
+                if time.monotonic() >= deadline:
+                    return
+    except httpx.HTTPError:
+        stats["errors"] += 1
+
+
+async def run_mode(mode: str, args) -> dict:
+    url = f"{args.api}/creations/{args.task_id}"
+    if mode == "sse":
+        url += "/events"
+    worker = sse_client if mode == "sse" else polling_client
+
+    stats = {"requests": 0, "events": 0, "errors": 0}
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    headers = {"Authorization": f"Bearer {args.token}"}
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=30.0) as client:
+        before = db_transactions()
+        started = time.monotonic()
+        deadline = started + args.duration
+        clients = [asyncio.create_task(worker(client, url, deadline, stats)) for _ in range(args.clients)]
+        # SSE clients block until the next event; stop them at the deadline
+        await asyncio.wait(clients, timeout=args.duration + 5)
+        for task in clients:
+            task.cancel()
+        elapsed = time.monotonic() - started
+        after = db_transactions()
+
+    return {
+        "mode": mode,
+        "clients": args.clients,
+        "seconds": round(elapsed, 1),
+        "http_requests": stats["requests"],
+        "events": stats["events"],
+        "errors": stats["errors"],
+        "db_tx_per_second": round((after - before) / elapsed, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api", default=os.getenv("API_BASE_URL", "http://localhost:8000/api/v1"))
+    parser.add_argument("--token", required=True, help="JWT of the task owner")
+    parser.add_argument("--task-id", required=True)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--duration", type=int, default=60, help="Seconds per mode")
+    parser.add_argument("--mode", choices=["poll", "sse", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["poll", "sse"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        result = await run_mode(mode, args)
+        print(" ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
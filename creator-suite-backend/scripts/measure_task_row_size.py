@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Measure: creation_tasks row size and list-query latency.
+
+Run once before and once after a schema change (e.g. moving provider logs to
+creation_task_provider_payloads) and compare the output. Reports the average
+and p95 stored size of the task row and of each JSON column, the total size
+of the table (all partitions) and of the provider payload side table, and
+the median latency of:
+
+- a page of the user's tasks as full rows (what GET /creations returns);
+- the same page reading only the hot columns (fields=summary);
+- the homepage featured query.
+
+Usage:
+    python scripts/measure_task_row_size.py --user-id 1
+    python scripts/measure_task_row_size.py --user-id 1 --sample 50000 --repeat 10
+
+Only reads; the raw SQL works on both the JSON and JSONB schemas.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import engine  # noqa: E402
+
+PAGE_SIZE = 100
+JSON_COLUMNS = ["input_data", "output_assets", "long_video_config"]
+SUMMARY_COLUMNS = (
+    "id, user_id, task_type, status, provider, service_id, local_video_url, local_image_url, "
+    "local_thumbnail_url, error_message, processing_time_seconds, progress, created_at, updated_at"
+)
+
+
+def row_sizes(conn, sample: int):
+    measured = [("row", "t.*")] + [(c, c) for c in JSON_COLUMNS]
+    columns = ", ".join(
+        f"avg(pg_column_size({expr})) AS {label}_avg, "
+        f"percentile_cont(0.95) WITHIN GROUP (ORDER BY pg_column_size({expr})) AS {label}_p95"
+        for label, expr in measured
+    )
+    return conn.execute(text(f"""
+        SELECT count(*) AS rows, {columns}
+        FROM (SELECT * FROM creation_tasks ORDER BY created_at DESC LIMIT :sample) t
+    """), {"sample": sample}).mappings().one()
+
+
+def relation_size(conn, name: str):
+    return conn.execute(text("""
+        SELECT CASE WHEN to_regclass(:name) IS NULL THEN NULL
+                    ELSE COALESCE((SELECT sum(pg_total_relation_size(relid)) FROM pg_partition_tree(:name)),
+                                  pg_total_relation_size(:name)) END
+    """), {"name": name}).scalar()
+
+
+def timed(conn, sql: str, params: dict, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = conn.execute(text(sql), params).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    payload = sum(len(repr(tuple(row))) for row in rows)
+    return statistics.median(samples), payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, required=True, help="User whose task list is timed")
+    parser.add_argument("--sample", type=int, default=10000, help="Newest tasks to measure row sizes on")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (median reported)")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        sizes = row_sizes(conn, args.sample)
+        print(f"sampled_rows={sizes['rows']}")
+        for name in ["row"] + JSON_COLUMNS:
+            avg = sizes[f"{name}_avg"] or 0
+            p95 = sizes[f"{name}_p95"] or 0
+            print(f"column={name} avg_bytes={avg:.0f} p95_bytes={p95:.0f}")
+
+        for relation in ["creation_tasks", "creation_task_provider_payloads"]:
+            size = relation_size(conn, relation)
+            print(f"relation={relation} total_bytes={size if size is not None else 'absent'}")
+
+        params = {"user_id": args.user_id, "limit": PAGE_SIZE}
+        cases = {
+            "list_full": "SELECT * FROM creation_tasks WHERE user_id = :user_id "
+                         "ORDER BY created_at DESC, id DESC LIMIT :limit",
+            "list_summary": f"SELECT {SUMMARY_COLUMNS} FROM creation_tasks WHERE user_id = :user_id "
+                            "ORDER BY created_at DESC, id DESC LIMIT :limit",
+            "featured": "SELECT id, task_type, status, provider, created_at, local_video_url, local_image_url, "
+                        "local_thumbnail_url, input_data ->> 'prompt' AS prompt FROM creation_tasks "
+                        "WHERE status = 'COMPLETED' ORDER BY created_at DESC LIMIT 6",
+        }
+        for name, sql in cases.items():
+            median_ms, payload = timed(conn, sql, params, args.repeat)
+            print(f"query={name} median_ms={median_ms:.1f} result_chars={payload}")
+
+
+if __name__ == "__main__":
+    main()
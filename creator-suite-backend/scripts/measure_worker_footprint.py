@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Measure worker memory and respawn latency per queue.
+
+For each queue, starts a local prefork worker (-Q queue, concurrency 1) and
+reports:
+
+- boot_ms: from launch until the worker answers a ping;
+- parent_rss_mb, child_rss_mb, child_uss_mb: resident memory of the worker
+  and of its pool process (USS: memory only the child holds, i.e. what each
+  extra child costs);
+- task_modules: task modules the worker imported for the queue;
+- respawn_ms: from killing the pool process until its replacement logged
+  "Worker process ... ready" (see _start_process_warm_up in
+  app/core/celery_app.py), which is what a max_tasks_per_child recycle costs
+  before the next task can start.
+
+--compare runs every queue a second time with WORKER_QUEUE_SCOPED_IMPORTS
+off (every task module in every worker) for the before/after numbers.
+Prints key=value lines.
+
+Needs Redis; Postgres is optional (the warm-up logs a warning without it).
+
+Usage:
+    python scripts/measure_worker_footprint.py
+    python scripts/measure_worker_footprint.py --queue video_runway --queue media_processing --compare
+"""
+import argparse
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+
+import psutil
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.celery_app import celery_app, worker_task_modules  # noqa: E402
+
+READY_LINE = re.compile(r"Worker process (\d+) ready (\d+) ms after fork")
+MODULES_LINE = re.compile(r"imported (\d+) task modules")
+
+
+def all_queues():
+    routed = {route["queue"] for route in celery_app.conf.task_routes.values() if route.get("queue")}
+    return sorted(routed | {celery_app.conf.task_default_queue})
+
+
+def wait_for(condition, timeout: float, interval: float = 0.2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = condition()
+        if result:
+            return result
+        time.sleep(interval)
+    return None
+
+
+def log_matches(path: str, pattern):
+    with open(path, errors="replace") as log:
+        return pattern.findall(log.read())
+
+
+def mb(value: int) -> str:
+    return f"{value / 1024 / 1024:.1f}"
+
+
+def measure(queue: str, scoped: bool, log_dir: str, timeout: float) -> str:
+    hostname = f"footprint_{queue}_{'scoped' if scoped else 'all'}"
+    log_path = os.path.join(log_dir, f"{hostname}.log")
+    env = {**os.environ, "WORKER_QUEUE_SCOPED_IMPORTS": "true" if scoped else "false"}
+    command = [
+        sys.executable, "-m", "celery", "-A", "celery_worker", "worker", f"--queues={queue}",
+        f"--hostname={hostname}@%h", "--concurrency=1", "--pool=prefork", "--loglevel=info",
+    ]
+    with open(log_path, "wb") as log:
+        started = time.monotonic()
+        worker = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                  start_new_session=True)
+    try:
+        destination = [f"{hostname}@{os.uname().nodename}"]
+        if not wait_for(lambda: celery_app.control.ping(destination=destination, timeout=0.5), timeout):
+            return f"queue={queue} scoped={scoped} result=error reason=no_ping log={log_path}"
+        boot_ms = (time.monotonic() - started) * 1000
+        if not wait_for(lambda: log_matches(log_path, READY_LINE), timeout):
+            return f"queue={queue} scoped={scoped} result=error reason=child_not_ready log={log_path}"
+
+        parent = psutil.Process(worker.pid)
+        child = parent.children()[0]
+        child_memory = child.memory_full_info()
+        modules = log_matches(log_path, MODULES_LINE)
+        expected = len(worker_task_modules([queue])) if scoped else "all"
+
+        killed = time.monotonic()
+        child.send_signal(signal.SIGKILL)
+        replaced = wait_for(
+            lambda: any(int(pid) != child.pid for pid, _ in log_matches(log_path, READY_LINE)), timeout, 0.05,
+        )
+        respawn_ms = f"{(time.monotonic() - killed) * 1000:.0f}" if replaced else "timeout"
+
+        return (
+            f"queue={queue} scoped={scoped} boot_ms={boot_ms:.0f} parent_rss_mb={mb(parent.memory_info().rss)}"
+            f" child_rss_mb={mb(child_memory.rss)} child_uss_mb={mb(child_memory.uss)}"
+            f" task_modules={modules[-1] if modules else '?'} expected_modules={expected} respawn_ms={respawn_ms}"
+        )
+    finally:
+        if worker.poll() is None:
+            os.killpg(worker.pid, signal.SIGTERM)
+            try:
+                worker.wait(timeout)
+            except subprocess.TimeoutExpired:
+                os.killpg(worker.pid, signal.SIGKILL)
+                worker.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queue", action="append", help="Queue to measure (default: every routed queue)")
+    parser.add_argument("--compare", action="store_true", help="Also measure with every task module imported")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for each step")
+    parser.add_argument("--log-dir", default=os.path.join(BACKEND_DIR, "logs"), help="Where worker logs go")
+    args = parser.parse_args()
+    os.makedirs(args.log_dir, exist_ok=True)
+
+    for queue in args.queue or all_queues():
+        for scoped in ([True, False] if args.compare else [True]):
+            print(measure(queue, scoped, args.log_dir, args.timeout), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Inspect and replay dead-lettered generations (app/services/dead_letters.py).
+
+A generation lands in the dead-letter list when its retries ran out or its
+error could not be classified. Replaying one puts the creation task back
+to pending, reserves its credits again and re-sends the Celery task,
+resuming the provider prediction when one was still running. Prints one
+key=value line per entry.
+
+Usage:
+    python scripts/replay_dead_letters.py --list
+    python scripts/replay_dead_letters.py --list --kind unknown --limit 20
+    python scripts/replay_dead_letters.py --replay 3f2c9a...
+    python scripts/replay_dead_letters.py --all --kind transient
+    python scripts/replay_dead_letters.py --drop 3f2c9a...
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: E402,F401  (register all mappers)
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.credit_service import InsufficientCreditsError  # noqa: E402
+from app.services.dead_letters import (  # noqa: E402
+    dead_letter,
+    list_dead_letters,
+    replay_dead_letter,
+    take_dead_letter,
+)
+
+
+def print_entry(entry):
+    print(
+        f"id={entry['id']} task={entry['celery_task']} task_id={entry.get('task_id')}"
+        f" kind={entry['kind']} retries={entry['retries']} prediction_id={entry.get('prediction_id')}"
+        f" failed_at={entry['failed_at']} error={entry['error'][:200]!r}"
+    )
+
+
+def replay(db, entry_id):
+    entry = take_dead_letter(entry_id)
+    if entry is None:
+        print(f"id={entry_id} status=not_found")
+        return False
+    try:
+        celery_id = replay_dead_letter(db, entry)
+    except InsufficientCreditsError as e:
+        db.rollback()
+        # Put it back so it can be replayed once the user has credits
+        dead_letter(
+            entry["celery_task"], entry["args"], entry["kwargs"],
+            task_id=entry.get("task_id"), error=entry["error"], kind=entry["kind"],
+            retries=entry["retries"], prediction_id=entry.get("prediction_id"),
+        )
+        print(f"id={entry_id} status=insufficient_credits error={e!r}")
+        return False
+    print(f"id={entry_id} status=replayed celery_id={celery_id}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--list", action="store_true", help="List dead-lettered generations, newest first")
+    action.add_argument("--replay", metavar="ID", help="Replay one entry")
+    action.add_argument("--all", action="store_true", help="Replay every entry (of --kind, if given)")
+    action.add_argument("--drop", metavar="ID", help="Remove an entry without replaying it")
+    parser.add_argument("--kind", help="Only entries of this error kind (transient, rate_limited, unknown)")
+    parser.add_argument("--limit", type=int, help="At most this many entries")
+    args = parser.parse_args()
+
+    if args.drop:
+        entry = take_dead_letter(args.drop)
+        print(f"id={args.drop} status={'dropped' if entry else 'not_found'}")
+        return
+
+    entries = [e for e in list_dead_letters() if not args.kind or e["kind"] == args.kind]
+    if args.limit is not None:
+        entries = entries[:args.limit]
+    if args.list:
+        for entry in entries:
+            print_entry(entry)
+        print(f"count={len(entries)}")
+        return
+
+    db = SessionLocal()
+    try:
+        if args.replay:
+            sys.exit(0 if replay(db, args.replay) else 1)
+        # Oldest first, in the order they failed
+        replayed = sum(replay(db, entry["id"]) for entry in reversed(entries))
+        print(f"replayed={replayed} failed={len(entries) - replayed}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,9 @@ import time
 # Add the app directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+# Bots use the bot engine profile (small pool)
+os.environ.setdefault("DB_ROLE", "bot")
+
 from app.bots.discord_bot import run_discord_bot
 from app.bots.telegram_bot import run_telegram_bot
 from app.bots.whatsapp_bot import run_whatsapp_bot
@@ -10,6 +10,9 @@ import os
 # Add the app directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'app'))
 
+# Bots use the bot engine profile (small pool)
+os.environ.setdefault("DB_ROLE", "bot")
+
 from bots.telegram_bot import run_telegram_bot
 
 if __name__ == "__main__":
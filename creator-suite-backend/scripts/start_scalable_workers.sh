@@ -58,6 +58,15 @@ start_worker "bot_messages" "bot_worker" 3 "info"
 # Default Queue Worker (fallback)
 start_worker "default" "default_worker" 1 "info"
 
+# Beat scheduler for periodic maintenance (admin rollups)
+echo "Starting beat scheduler"
+celery -A celery_worker beat \
+    --loglevel=info \
+    --logfile="$LOG_DIR/worker_beat.log" \
+    --pidfile="$LOG_DIR/worker_beat.pid" \
+    --schedule="$LOG_DIR/celerybeat-schedule" \
+    --detach
+
 echo "✅ All workers started successfully!"
 echo ""
 echo "📊 Worker Status:"
@@ -69,6 +78,7 @@ echo "- Image Generation: Queue 'image_generation' → Worker 'image_worker'"
 echo "- Media Processing: Queue 'media_processing' → Worker 'media_worker'"
 echo "- Bot Messages: Queue 'bot_messages' → Worker 'bot_worker'"
 echo "- Default Tasks: Queue 'default' → Worker 'default_worker'"
+echo "- Periodic Tasks: Beat scheduler → Queue 'default'"
 echo ""
 echo "📁 Logs: $LOG_DIR/worker_*.log"
 echo "🔧 PIDs: $LOG_DIR/worker_*.pid"
@@ -47,9 +47,11 @@ stop_worker "image_worker"
 stop_worker "media_worker"
 stop_worker "bot_worker"
 stop_worker "default_worker"
+stop_worker "beat"
 
 # Also stop any remaining celery workers
 pkill -f "celery.*worker" || true
+pkill -f "celery.*beat" || true
 
 echo "✅ All workers stopped successfully!"
 
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Stress test: concurrent debits and holds against one user's credit balance.
+
+Creates a fresh user with --balance credits, then runs --threads workers that
+each perform --ops random operations through app.services.credit_service:
+
+- debit of a random amount, every few debits retried with the same
+  idempotency key (must be charged once);
+- reserve, then settle part of the hold or release it.
+
+The starting balance is deliberately too small for all of them, so many
+operations fail with InsufficientCreditsError. Afterwards it checks that:
+
+- the balance never went negative;
+- the balance equals the sum of the user's ledger entries;
+- the running totals (spent, entry count) match the ledger;
+- the balance equals the start minus what the workers were told they spent;
+- no hold is left held.
+
+Usage:
+    python scripts/stress_credit_ledger.py
+    python scripts/stress_credit_ledger.py --threads 32 --ops 500 --balance 200
+
+Run against a scratch database: the user and its ledger entries stay
+(credit_transactions is append-only). Exits non-zero if a check fails.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+from sqlalchemy import func, select
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.models  # noqa: E402,F401  (register all mappers)
+from app.db.session import SessionLocal  # noqa: E402
+from app.models.enhanced_auth import CreditHold, CreditTransaction  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import credit_service  # noqa: E402
+
+MAX_AMOUNT_MICROS = 3 * credit_service.MICROS_PER_CREDIT
+
+
+def create_user(balance_micros: int) -> int:
+    db = SessionLocal()
+    try:
+        user = User(
+            username=f"ledger-stress-{uuid.uuid4().hex[:12]}",
+            is_active=True,
+            credits=credit_service.from_micros(balance_micros),
+            credit_balance_micros=balance_micros,
+        )
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+class Worker(threading.Thread):
+    def __init__(self, user_id: int, ops: int, seed: int):
+        super().__init__()
+        self.user_id = user_id
+        self.ops = ops
+        self.random = random.Random(seed)
+        self.spent_micros = 0
+        self.counts = {"debit": 0, "replayed": 0, "hold_settled": 0, "hold_released": 0, "insufficient": 0}
+        self.error = None
+
+    def run(self):
+        db = SessionLocal()
+        try:
+            retry_key = None
+            for _ in range(self.ops):
+                amount = self.random.randint(1, MAX_AMOUNT_MICROS)
+                try:
+                    if self.random.random() < 0.6:
+                        key = retry_key or uuid.uuid4().hex
+                        # Retry roughly every third new debit with the same key
+                        retry_key = key if retry_key is None and self.random.random() < 0.3 else None
+                        self.debit(db, amount, key)
+                    else:
+                        self.hold(db, amount)
+                except credit_service.InsufficientCreditsError:
+                    db.rollback()
+                    self.counts["insufficient"] += 1
+        except Exception as exc:  # Reported by main
+            self.error = exc
+        finally:
+            db.close()
+
+    def debit(self, db, amount: int, key: str):
+        entry = credit_service.debit(db, self.user_id, amount, idempotency_key=key, description="stress")
+        if entry.replayed:
+            self.counts["replayed"] += 1
+        else:
+            self.counts["debit"] += 1
+            self.spent_micros += amount
+
+    def hold(self, db, amount: int):
+        hold = credit_service.reserve_credits(db, self.user_id, amount, description="stress")
+        if self.random.random() < 0.5:
+            used = self.random.randint(0, amount)
+            credit_service.settle_hold(db, hold.id, used)
+            self.spent_micros += used
+            self.counts["hold_settled"] += 1
+        else:
+            credit_service.release_hold(db, hold.id)
+            self.counts["hold_released"] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent workers")
+    parser.add_argument("--ops", type=int, default=200, help="Operations per worker")
+    parser.add_argument("--balance", type=float, default=100.0, help="Starting balance in credits")
+    args = parser.parse_args()
+
+    start_micros = credit_service.to_micros(args.balance)
+    user_id = create_user(start_micros)
+    workers = [Worker(user_id, args.ops, seed) for seed in range(args.threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    totals = {}
+    for worker in workers:
+        for name, count in worker.counts.items():
+            totals[name] = totals.get(name, 0) + count
+    spent = sum(worker.spent_micros for worker in workers)
+    errors = [worker.error for worker in workers if worker.error]
+
+    db = SessionLocal()
+    try:
+        user = db.execute(
+            select(User.credit_balance_micros, User.credits_spent_micros, User.credit_transaction_count)
+            .where(User.id == user_id)
+        ).one()
+        balance = user.credit_balance_micros
+        ledger_sum, ledger_spent, ledger_count = db.execute(
+            select(
+                func.coalesce(func.sum(CreditTransaction.amount_micros), 0),
+                -func.coalesce(func.sum(CreditTransaction.amount_micros).filter(
+                    CreditTransaction.transaction_type.in_(credit_service.SPENT_TYPES)), 0),
+                func.count(CreditTransaction.id),
+            )
+            .where(CreditTransaction.user_id == user_id)
+        ).one()
+        open_holds = db.execute(
+            select(func.count(CreditHold.id))
+            .where(CreditHold.user_id == user_id, CreditHold.status == credit_service.HOLD_HELD)
+        ).scalar()
+    finally:
+        db.close()
+
+    operations = args.threads * args.ops
+    print(f"user_id={user_id} threads={args.threads} operations={operations}")
+    print(f"elapsed_s={elapsed:.2f} ops_per_s={operations / elapsed:.0f}")
+    print(" ".join(f"{name}={count}" for name, count in totals.items()))
+    print(f"start_micros={start_micros} balance_micros={balance} ledger_sum_micros={ledger_sum} spent_micros={spent}")
+
+    checks = {
+        "no_worker_errors": not errors,
+        "non_negative": balance >= 0,
+        "ledger_matches_balance": ledger_sum == balance,
+        "spent_matches_balance": start_micros - spent == balance,
+        "totals_match_ledger": (user.credits_spent_micros, user.credit_transaction_count) == (ledger_spent, ledger_count),
+        "no_open_holds": open_holds == 0,
+    }
+    for name, passed in checks.items():
+        print(f"check={name} {'ok' if passed else 'FAILED'}")
+    for error in errors:
+        print(f"worker_error={error!r}")
+    if not all(checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()